@@ -1,6 +1,8 @@
 """Authentication API endpoints."""
 
 import logging
+from collections.abc import Mapping
+from functools import partial
 
 from fastapi import APIRouter, HTTPException
 from sqlalchemy import select
@@ -11,6 +13,95 @@ from ..models.auth_user import AuthUser, AuthUserResponse, AuthUserSummary
 logger = logging.getLogger(__name__)
 
 
+async def query_authorized_users(
+    session_local: async_sessionmaker[AsyncSession],
+) -> dict[int, AuthUserSummary]:
+    """Query the authorized users from the database.
+
+    Parameters
+    ----------
+    session_local : async_sessionmaker[AsyncSession]
+        Database session factory
+
+    Returns
+    -------
+    dict[int, AuthUserSummary]
+        Authorized users keyed by Strava ID
+    """
+    async with session_local() as session:
+        result = await session.execute(select(AuthUser))
+        return {
+            auth_user.strava_id: AuthUserSummary(
+                strava_id=auth_user.strava_id,
+                firstname=auth_user.firstname,
+                lastname=auth_user.lastname,
+            )
+            for auth_user in result.scalars().all()
+        }
+
+
+async def load_authorized_users(
+    session_local: async_sessionmaker[AsyncSession],
+) -> Mapping[int, AuthUserSummary]:
+    """Get the authorized users, from the in-memory directory when available.
+
+    Parameters
+    ----------
+    session_local : async_sessionmaker[AsyncSession]
+        Database session factory, used when the directory has to be reloaded
+
+    Returns
+    -------
+    Mapping[int, AuthUserSummary]
+        Authorized users keyed by Strava ID
+    """
+    from ..dependencies import auth_directory as global_auth_directory
+
+    if global_auth_directory is None:
+        return await query_authorized_users(session_local)
+    return await global_auth_directory.users(
+        partial(query_authorized_users, session_local)
+    )
+
+
+async def load_authorized_strava_ids(
+    session_local: async_sessionmaker[AsyncSession],
+) -> frozenset[int]:
+    """Get the Strava IDs of the authorized users, see `load_authorized_users`."""
+    from ..dependencies import auth_directory as global_auth_directory
+
+    if global_auth_directory is None:
+        return frozenset(await query_authorized_users(session_local))
+    return await global_auth_directory.strava_ids(
+        partial(query_authorized_users, session_local)
+    )
+
+
+def on_auth_users_changed(payload: str | None = None) -> None:
+    """Drop the data derived from the authorized users after they changed.
+
+    The authorized users directory is reloaded on its next read, and the cached
+    search results and vector tiles, which only show the routes of the
+    authorized users, are removed.
+
+    Parameters
+    ----------
+    payload : str | None
+        Payload of the database notification, unused
+    """
+    from ..dependencies import auth_directory as global_auth_directory
+    from ..dependencies import search_result_cache as global_search_result_cache
+    from ..dependencies import tile_cache as global_tile_cache
+
+    logger.info("Authorized users changed")
+    if global_auth_directory is not None:
+        global_auth_directory.invalidate()
+    if global_search_result_cache is not None:
+        global_search_result_cache.invalidate()
+    if global_tile_cache is not None:
+        global_tile_cache.clear()
+
+
 def create_auth_router(
     session_local: async_sessionmaker[AsyncSession] | None,
 ) -> APIRouter:
@@ -30,7 +121,11 @@ def create_auth_router(
 
     @router.get("/check-authorization")
     async def check_strava_authorization(strava_id: int):
-        """Check if a Strava user is authorized to access editor feature."""
+        """Check if a Strava user is authorized to access editor feature.
+
+        The authorized users are read from the in-memory directory, see
+        `load_authorized_users`.
+        """
         # Import global SessionLocal from main
         from ..dependencies import SessionLocal as global_session_local
 
@@ -38,23 +133,13 @@ def create_auth_router(
             raise HTTPException(status_code=503, detail="Database not initialized")
 
         try:
-            async with global_session_local() as session:
-                result = await session.execute(
-                    select(AuthUser).where(AuthUser.strava_id == strava_id)
-                )
-                auth_user = result.scalar_one_or_none()
-
-                if auth_user:
-                    return {
-                        "authorized": True,
-                        "user": AuthUserSummary(
-                            strava_id=auth_user.strava_id,
-                            firstname=auth_user.firstname,
-                            lastname=auth_user.lastname,
-                        ),
-                    }
-                else:
-                    return {"authorized": False, "user": None}
+            auth_user = (await load_authorized_users(global_session_local)).get(
+                strava_id
+            )
+            if auth_user:
+                return {"authorized": True, "user": auth_user}
+            else:
+                return {"authorized": False, "user": None}
         except Exception as e:
             logger.error(
                 f"Error checking authorization for Strava ID {strava_id}: {str(e)}"
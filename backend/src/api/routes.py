@@ -20,6 +20,9 @@ from ..models.track import (
     TrackResponse,
     TrackType,
 )
+from ..utils.simplify import encode_simplified_polylines
+from ..utils.track_sidecar import compute_track_stats_and_sidecar
+from .segments import notify_track_changed, on_track_written, store_track_lods
 
 logger = logging.getLogger(__name__)
 
@@ -130,6 +133,7 @@ def create_routes_router(
         This endpoint takes a list of segment IDs and creates a route
         with computed statistics based on the segments.
         """
+        from ..dependencies import run_in_worker
         from ..dependencies import storage_manager as global_storage_manager
 
         if not dependencies.SessionLocal:
@@ -164,6 +168,25 @@ def create_routes_router(
                     computed_stats, route_track_points
                 )
 
+                try:
+                    track_stats, track_sidecar = await run_in_worker(
+                        compute_track_stats_and_sidecar, route_gpx_data.encode("utf-8")
+                    )
+                    stats_fields = track_stats._asdict()
+                except Exception as e:
+                    logger.warning(f"Failed to compute route statistics: {str(e)}")
+                    stats_fields, track_sidecar = {}, None
+
+                # Precompute the simplified geometry served inline by the search
+                try:
+                    simplified_polylines = await run_in_worker(
+                        encode_simplified_polylines,
+                        [(point["lat"], point["lng"]) for point in route_track_points],
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to simplify route: {str(e)}")
+                    simplified_polylines = None
+
                 route_file_id = str(uuid.uuid4())
                 with tempfile.NamedTemporaryFile(
                     mode="w", suffix=".gpx", delete=False
@@ -172,9 +195,13 @@ def create_routes_router(
                     temp_file_path = Path(temp_file.name)
 
                 try:
-                    storage_key = global_storage_manager.upload_gpx_segment(
-                        temp_file_path, route_file_id, prefix="routes"
+                    storage_key = await global_storage_manager.aupload_gpx_segment(
+                        temp_file_path,
+                        route_file_id,
+                        prefix="routes",
+                        track_sidecar=track_sidecar,
                     )
+                    await store_track_lods(temp_file_path, route_file_id, "routes")
 
                     route_file_path = (
                         f"{global_storage_manager.get_storage_root_prefix()}/"
@@ -206,12 +233,17 @@ def create_routes_router(
                     tire_wet=TireType(route_features["tire_wet"]),
                     comments=comments,
                     strava_id=strava_id,
+                    simplified_polylines=simplified_polylines,
+                    **stats_fields,
                 )
 
                 session.add(route_track)
                 await session.commit()
                 await session.refresh(route_track)
 
+                on_track_written(route_track)
+                await notify_track_changed(route_track)
+
                 logger.info(f"Created route '{name}' with ID {route_track.id}")
 
                 return TrackResponse(
@@ -231,6 +263,7 @@ def create_routes_router(
                     tire_wet=route_track.tire_wet.value,
                     comments=route_track.comments,
                     strava_id=route_track.strava_id,
+                    **stats_fields,
                 )
 
         except HTTPException:
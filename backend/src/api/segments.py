@@ -1,20 +1,29 @@
 """Segments API endpoints."""
 
+import asyncio
+import hashlib
 import json
 import logging
 import math
+import time
+import unicodedata
 import uuid
 from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import quote
 
-import gpxpy
-from fastapi import APIRouter, Form, HTTPException, Query
+import numpy as np
+import polyline
+from fastapi import APIRouter, Form, HTTPException, Query, Request
 from fastapi.responses import Response, StreamingResponse
-from sqlalchemy import and_, delete, func, select
+from sqlalchemy import ARRAY, String, and_, cast, delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import selectinload
+from starlette.requests import ClientDisconnect
 
 from ..models.image import TrackImage, TrackImageResponse
 from ..models.track import (
+    TRACKS_CHANNEL,
     GPXDataResponse,
     SurfaceType,
     TireType,
@@ -23,11 +32,1213 @@ from ..models.track import (
     TrackType,
 )
 from ..models.video import TrackVideo, TrackVideoResponse
-from ..utils.gpx import GPXData
+from ..utils.compression import accepts_encoding, decompress
+from ..utils.event_stream import run_until_disconnect, stream_events
+from ..utils.fit_encoder import FIT_ENCODER_VERSION, FIT_MEDIA_TYPE
+from ..utils.gpx import (
+    POINT_FORMATS,
+    FitCourse,
+    GPXColumnarPoints,
+    GPXData,
+    GPXEncodedData,
+    GPXPolylinePoints,
+    GPXTotalStats,
+    TrackStats,
+    build_fit_course,
+    encode_gpx_points,
+)
+from ..utils.http_compression import etag_matches
+from ..utils.profile import (
+    MAX_PROFILE_WIDTH,
+    PROFILE_WIDTH_BUCKETS,
+    ElevationProfile,
+    compute_elevation_profile,
+    profile_width_bucket,
+)
+from ..utils.simplify import (
+    LOD_TOLERANCES,
+    encode_gpx_polylines,
+    lod_file_path,
+    select_simplified_polyline,
+    simplify_gpx,
+    simplify_gpx_coordinates,
+    write_lod_files,
+)
+from ..utils.spatial_index import TrackSpatialIndex
+from ..utils.track_sidecar import (
+    TrackSidecarError,
+    build_fit_course_from_sidecar,
+    compute_track_stats_and_sidecar,
+    decode_track_sidecar,
+)
+from ..utils.vector_tiles import (
+    MAX_ZOOM,
+    MVT_MEDIA_TYPE,
+    TILE_BUFFER,
+    TILE_EXTENT,
+    TileFeature,
+    encode_tile,
+    project_to_tile,
+    tile_bounds,
+    tile_resolution,
+)
+from .auth import load_authorized_strava_ids
+from .upload import load_upload_session
 
 logger = logging.getLogger(__name__)
 
 
+class TrackSearchFilters(NamedTuple):
+    """Attribute filters of the segment search.
+
+    The filters are applied before the search limit is taken, both in the SQL
+    query and on the spatial index entries. Empty sets mean no filtering.
+    """
+
+    difficulty_min: int | None = None
+    difficulty_max: int | None = None
+    surface_types: frozenset[str] = frozenset()
+    tires_dry: frozenset[str] = frozenset()
+    tires_wet: frozenset[str] = frozenset()
+    min_distance: float | None = None
+    max_distance: float | None = None
+
+    def conditions(self) -> list:
+        """Build the SQL filter conditions.
+
+        Returns
+        -------
+        list
+            SQLAlchemy conditions on the `Track` columns
+        """
+        conditions = []
+        if self.difficulty_min is not None:
+            conditions.append(Track.difficulty_level >= self.difficulty_min)
+        if self.difficulty_max is not None:
+            conditions.append(Track.difficulty_level <= self.difficulty_max)
+        if self.surface_types:
+            # Array overlap (&&) is served by the GIN index on surface_type
+            conditions.append(
+                Track.surface_type.op("&&")(
+                    cast(sorted(self.surface_types), ARRAY(String))
+                )
+            )
+        if self.tires_dry:
+            conditions.append(
+                Track.tire_dry.in_([TireType(tire) for tire in sorted(self.tires_dry)])
+            )
+        if self.tires_wet:
+            conditions.append(
+                Track.tire_wet.in_([TireType(tire) for tire in sorted(self.tires_wet)])
+            )
+        if self.min_distance is not None:
+            conditions.append(Track.total_distance >= self.min_distance)
+        if self.max_distance is not None:
+            conditions.append(Track.total_distance <= self.max_distance)
+        return conditions
+
+    def matches(self, track: TrackResponse) -> bool:
+        """Check whether a track overview passes the filters.
+
+        Parameters
+        ----------
+        track : TrackResponse
+            Overview data of the track
+
+        Returns
+        -------
+        bool
+            True if the track matches all the filters
+        """
+        if self.difficulty_min is not None and track.difficulty_level < (
+            self.difficulty_min
+        ):
+            return False
+        if self.difficulty_max is not None and track.difficulty_level > (
+            self.difficulty_max
+        ):
+            return False
+        if self.surface_types and self.surface_types.isdisjoint(track.surface_type):
+            return False
+        if self.tires_dry and track.tire_dry not in self.tires_dry:
+            return False
+        if self.tires_wet and track.tire_wet not in self.tires_wet:
+            return False
+        # Tracks without stored statistics never match a distance filter, as in SQL
+        if self.min_distance is not None and (
+            track.total_distance is None or track.total_distance < self.min_distance
+        ):
+            return False
+        if self.max_distance is not None and (
+            track.total_distance is None or track.total_distance > self.max_distance
+        ):
+            return False
+        return True
+
+
+# Decimals of the search bounds identifying the cached search results
+SEARCH_KEY_DECIMALS = 6
+
+# Maximum number of track IDs known by the client in a segment search
+MAX_KNOWN_TRACKS = 2000
+
+
+def decode_track_ids(encoded: str) -> frozenset[int]:
+    """Decode a delta-encoded list of track IDs.
+
+    The IDs are sorted, and each of them is given by its difference with the
+    previous one, separated by commas: "12,3,40" encodes the IDs 12, 15 and 55.
+    An empty string encodes no IDs.
+
+    Parameters
+    ----------
+    encoded : str
+        The delta-encoded IDs.
+
+    Returns
+    -------
+    frozenset[int]
+        The decoded IDs.
+
+    Raises
+    ------
+    ValueError
+        If a difference is not a non-negative integer, or if there are more
+        than `MAX_KNOWN_TRACKS` IDs.
+    """
+    if not encoded:
+        return frozenset()
+    deltas = encoded.split(",")
+    if len(deltas) > MAX_KNOWN_TRACKS:
+        raise ValueError(f"More than {MAX_KNOWN_TRACKS} track IDs")
+
+    track_ids = []
+    track_id = 0
+    for delta in deltas:
+        if not (delta.isascii() and delta.isdigit()):
+            raise ValueError(f"Invalid track ID difference: {delta!r}")
+        track_id += int(delta)
+        track_ids.append(track_id)
+    return frozenset(track_ids)
+
+
+# Sort keys of the segment search, mapped to the stored statistic
+SEARCH_SORT_FIELDS = {
+    "distance": "total_distance",
+    "elevation_gain": "total_elevation_gain",
+}
+
+
+class TrackSearchOrder(NamedTuple):
+    """Ordering of the segment search by a stored statistic.
+
+    Tracks without the statistic come last, and the proximity to the center of
+    the search area breaks ties.
+    """
+
+    field: str
+    descending: bool = False
+
+    @classmethod
+    def parse(cls, sort: str) -> "TrackSearchOrder":
+        """Parse a sort parameter such as 'distance' or '-elevation_gain'.
+
+        Parameters
+        ----------
+        sort : str
+            Sort key, prefixed with '-' for a descending order
+
+        Returns
+        -------
+        TrackSearchOrder
+            The ordering
+
+        Raises
+        ------
+        ValueError
+            If the sort key is unknown
+        """
+        descending = sort.startswith("-")
+        key = sort.removeprefix("-")
+        if key not in SEARCH_SORT_FIELDS:
+            raise ValueError(f"Unknown sort key: {key}")
+        return cls(field=SEARCH_SORT_FIELDS[key], descending=descending)
+
+    def order_by(self):
+        """Build the SQL ordering clause on the `Track` columns."""
+        column = getattr(Track, self.field)
+        return (column.desc() if self.descending else column.asc()).nulls_last()
+
+    def key(self, track: TrackResponse) -> tuple[bool, float]:
+        """Compute the sort key of a track overview."""
+        value = getattr(track, self.field)
+        if value is None:
+            return True, 0.0
+        return False, -value if self.descending else value
+
+
+def track_to_response(track: Track) -> TrackResponse:
+    """Build the overview response of a track, without GPX content.
+
+    Parameters
+    ----------
+    track : Track
+        Track database row
+
+    Returns
+    -------
+    TrackResponse
+        Overview data of the track
+    """
+    return TrackResponse(
+        id=track.id,
+        file_path=track.file_path,
+        bound_north=track.bound_north,
+        bound_south=track.bound_south,
+        bound_east=track.bound_east,
+        bound_west=track.bound_west,
+        barycenter_latitude=track.barycenter_latitude,
+        barycenter_longitude=track.barycenter_longitude,
+        name=track.name,
+        track_type=track.track_type.value,
+        difficulty_level=track.difficulty_level,
+        surface_type=track.surface_type,
+        tire_dry=track.tire_dry.value,
+        tire_wet=track.tire_wet.value,
+        comments=track.comments or "",
+        strava_id=track.strava_id,
+        total_distance=track.total_distance,
+        total_elevation_gain=track.total_elevation_gain,
+        total_elevation_loss=track.total_elevation_loss,
+        total_points=track.total_points,
+        min_elevation=track.min_elevation,
+        max_elevation=track.max_elevation,
+        simplified_polylines=track.simplified_polylines,
+    )
+
+
+async def build_track_index(
+    session_local: async_sessionmaker[AsyncSession],
+) -> TrackSpatialIndex:
+    """Load all the tracks from the database into a spatial index.
+
+    Parameters
+    ----------
+    session_local : async_sessionmaker[AsyncSession]
+        Database session factory
+
+    Returns
+    -------
+    TrackSpatialIndex
+        Spatial index of the track bounds and barycenters
+    """
+    async with session_local() as session:
+        result = await session.execute(select(Track))
+        tracks = result.scalars().all()
+
+    return TrackSpatialIndex(track_to_response(track) for track in tracks)
+
+
+def on_track_written(
+    track: Track, previous_bounds: tuple[float, float, float, float] | None = None
+) -> None:
+    """Refresh the derived data of a track that was just created or updated.
+
+    The track is inserted or refreshed in the spatial index, and the cached
+    search results and the cached vector tiles it intersects are invalidated,
+    when they are available. Errors are logged: the track is already committed
+    and its response must not fail.
+
+    Parameters
+    ----------
+    track : Track
+        Track database row that was just created or updated
+    previous_bounds : tuple[float, float, float, float] | None
+        (north, south, east, west) bounds of the track before an update, whose
+        cached tiles are invalidated as well
+    """
+    from ..dependencies import track_index as global_track_index
+
+    if global_track_index is not None:
+        try:
+            global_track_index.upsert(track_to_response(track))
+        except Exception as e:
+            logger.warning(f"Failed to index track {track.id}: {str(e)}")
+
+    try:
+        invalidate_search_results()
+    except Exception as e:
+        logger.warning(f"Failed to invalidate search results: {str(e)}")
+    invalidate_track_tiles(track)
+    if previous_bounds is not None:
+        invalidate_track_tiles(track, previous_bounds)
+
+
+def on_track_deleted(track: Track) -> None:
+    """Drop the derived data of a track that was just deleted.
+
+    Errors are logged: the track is already deleted and its response must not
+    fail.
+
+    Parameters
+    ----------
+    track : Track
+        Track database row that was just deleted
+    """
+    from ..dependencies import (
+        elevation_profile_cache as global_elevation_profile_cache,
+    )
+    from ..dependencies import parsed_track_cache as global_parsed_track_cache
+    from ..dependencies import track_index as global_track_index
+
+    try:
+        if global_track_index is not None:
+            global_track_index.remove(track.id)
+
+        if global_parsed_track_cache is not None and track.file_path:
+            global_parsed_track_cache.invalidate(track.file_path)
+            for tolerance in LOD_TOLERANCES:
+                global_parsed_track_cache.invalidate(
+                    lod_file_path(track.file_path, tolerance)
+                )
+
+        if global_elevation_profile_cache is not None and track.file_path:
+            for width in PROFILE_WIDTH_BUCKETS:
+                global_elevation_profile_cache.invalidate((track.file_path, width))
+
+        invalidate_search_results()
+    except Exception as e:
+        logger.warning(f"Failed to drop the cached data of track {track.id}: {str(e)}")
+    invalidate_track_tiles(track)
+
+
+# Identifier of this server process in the track notifications, so that it
+# skips the changes it already applied
+NOTIFICATION_SENDER = uuid.uuid4().hex
+
+# Tasks applying the track changes notified by the other server processes
+_track_change_tasks: set[asyncio.Task] = set()
+
+
+async def notify_track_changed(
+    track: Track,
+    deleted: bool = False,
+    previous_bounds: tuple[float, float, float, float] | None = None,
+) -> None:
+    """Notify the other server processes that a track was written or deleted.
+
+    The spatial index and the caches are held by every server process, the ones
+    of the process writing the track are refreshed by `on_track_written` and
+    `on_track_deleted`, the other processes refresh theirs on the notification,
+    see `on_tracks_changed`. Errors are logged.
+
+    Parameters
+    ----------
+    track : Track
+        Track database row that was just written or deleted
+    deleted : bool
+        Whether the track was deleted
+    previous_bounds : tuple[float, float, float, float] | None
+        (north, south, east, west) bounds of the track before an update
+    """
+    from ..dependencies import engine as global_engine
+
+    if global_engine is None:
+        return
+
+    try:
+        payload = json.dumps(
+            {
+                "sender": NOTIFICATION_SENDER,
+                "id": track.id,
+                "deleted": deleted,
+                "file_path": track.file_path,
+                "bounds": [
+                    track.bound_north,
+                    track.bound_south,
+                    track.bound_east,
+                    track.bound_west,
+                ],
+                "previous_bounds": previous_bounds,
+            }
+        )
+        async with global_engine.begin() as connection:
+            await connection.execute(select(func.pg_notify(TRACKS_CHANNEL, payload)))
+    except Exception as e:
+        logger.warning(f"Failed to notify the change of track {track.id}: {str(e)}")
+
+
+def on_tracks_changed(payload: str | None = None) -> None:
+    """Apply a track change notified by another server process.
+
+    Parameters
+    ----------
+    payload : str | None
+        Payload of the database notification, see `notify_track_changed`, None
+        when notifications may have been missed: the spatial index is then
+        loaded again and the caches are emptied
+    """
+    if payload is None:
+        coroutine = reload_tracks()
+    else:
+        try:
+            change = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning(f"Invalid track notification: {payload}")
+            return
+        if change.get("sender") == NOTIFICATION_SENDER:
+            return
+        coroutine = apply_track_change(change)
+
+    task = asyncio.ensure_future(coroutine)
+    _track_change_tasks.add(task)
+    task.add_done_callback(_track_change_tasks.discard)
+
+
+async def apply_track_change(change: dict) -> None:
+    """Refresh the derived data of a track written or deleted by another process.
+
+    Parameters
+    ----------
+    change : dict
+        Decoded payload of the notification, see `notify_track_changed`
+    """
+    from ..dependencies import SessionLocal as global_session_local
+
+    track_id = change["id"]
+    if change["deleted"]:
+        north, south, east, west = change["bounds"]
+        on_track_deleted(
+            Track(
+                id=track_id,
+                file_path=change["file_path"],
+                bound_north=north,
+                bound_south=south,
+                bound_east=east,
+                bound_west=west,
+            )
+        )
+        return
+
+    if global_session_local is None:
+        return
+    try:
+        async with global_session_local() as session:
+            result = await session.execute(select(Track).filter(Track.id == track_id))
+            track = result.scalar_one_or_none()
+    except Exception as e:
+        logger.warning(f"Failed to load the changed track {track_id}: {str(e)}")
+        return
+    if track is None:
+        # Deleted since, its own notification follows
+        return
+
+    previous_bounds = change.get("previous_bounds")
+    on_track_written(
+        track, tuple(previous_bounds) if previous_bounds is not None else None
+    )
+
+
+async def reload_tracks() -> None:
+    """Load the spatial index again and empty the caches derived from the tracks."""
+    from .. import dependencies
+
+    if dependencies.SessionLocal is not None:
+        try:
+            dependencies.track_index = await build_track_index(
+                dependencies.SessionLocal
+            )
+        except Exception as e:
+            logger.warning(f"Failed to reload the track spatial index: {str(e)}")
+
+    invalidate_search_results()
+    if dependencies.tile_cache is not None:
+        dependencies.tile_cache.clear()
+
+
+def invalidate_search_results() -> None:
+    """Remove the cached search results, when they are available."""
+    from ..dependencies import search_result_cache as global_search_result_cache
+
+    if global_search_result_cache is not None:
+        global_search_result_cache.invalidate()
+
+
+def invalidate_track_tiles(
+    track: Track, bounds: tuple[float, float, float, float] | None = None
+) -> None:
+    """Remove the cached vector tiles intersecting the bounds of a track.
+
+    Parameters
+    ----------
+    track : Track
+        Track whose geometry or attributes changed
+    bounds : tuple[float, float, float, float] | None
+        (north, south, east, west) bounds to invalidate, the current bounds of
+        the track by default
+    """
+    from ..dependencies import tile_cache as global_tile_cache
+
+    if global_tile_cache is None:
+        return
+
+    try:
+        if bounds is None:
+            bounds = (
+                track.bound_north,
+                track.bound_south,
+                track.bound_east,
+                track.bound_west,
+            )
+        removed = global_tile_cache.invalidate(*bounds)
+        if removed:
+            logger.info(f"Invalidated {removed} cached tiles for track {track.id}")
+    except Exception as e:
+        logger.warning(f"Failed to invalidate tiles of track {track.id}: {str(e)}")
+
+
+async def store_track_lods(gpx_file_path: Path, file_id: str, prefix: str) -> int:
+    """Build and upload the level of detail GPX files of a track.
+
+    The files are stored next to the track GPX file, see `lod_file_path`. Errors
+    are logged and do not fail the write: missing levels are simplified on the
+    fly when requested.
+
+    Parameters
+    ----------
+    gpx_file_path : Path
+        Local path of the track GPX file
+    file_id : str
+        Identifier of the track GPX file in storage
+    prefix : str
+        Storage prefix of the track GPX file
+
+    Returns
+    -------
+    int
+        Number of uploaded levels
+    """
+    from ..dependencies import run_in_worker
+    from ..dependencies import storage_manager as global_storage_manager
+    from ..utils.storage import cleanup_local_file
+
+    try:
+        lod_files = await run_in_worker(
+            write_lod_files, gpx_file_path, gpx_file_path.parent, file_id
+        )
+    except Exception as e:
+        logger.warning(f"Failed to simplify track file {file_id}: {str(e)}")
+        return 0
+
+    uploaded = 0
+    for tolerance, lod_file in lod_files.items():
+        try:
+            await global_storage_manager.aupload_gpx_segment(
+                local_file_path=lod_file.path,
+                file_id=f"{file_id}.lod{tolerance}",
+                prefix=prefix,
+                track_sidecar=lod_file.sidecar,
+            )
+            uploaded += 1
+        except Exception as e:
+            logger.warning(
+                f"Failed to upload level of detail {tolerance} of track file "
+                f"{file_id}: {str(e)}"
+            )
+        finally:
+            cleanup_local_file(lod_file.path)
+    return uploaded
+
+
+async def delete_track_lods(file_path: str) -> None:
+    """Delete the level of detail GPX files stored next to a track GPX file.
+
+    Parameters
+    ----------
+    file_path : str
+        Storage path of the track GPX file
+    """
+    from ..dependencies import storage_manager as global_storage_manager
+
+    for tolerance in LOD_TOLERANCES:
+        try:
+            await global_storage_manager.adelete_gpx_segment_by_url(
+                lod_file_path(file_path, tolerance)
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to delete level of detail {tolerance} of {file_path}: {str(e)}"
+            )
+
+
+def validate_lod(lod: int | None) -> None:
+    """Check that a requested level of detail is one of the stored levels.
+
+    Parameters
+    ----------
+    lod : int | None
+        Tolerance of the level of detail in meters, None for the full track
+
+    Raises
+    ------
+    HTTPException
+        If the level of detail is not stored
+    """
+    if lod is not None and lod not in LOD_TOLERANCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid lod: {lod}. Must be one of {list(LOD_TOLERANCES)}",
+        )
+
+
+async def load_track_gpx(file_path: str, lod: int | None) -> bytes | None:
+    """Load the GPX content of a track, simplified to a level of detail if needed.
+
+    Levels missing from storage (e.g. tracks written before they were stored)
+    are simplified on the fly from the full GPX file.
+
+    Parameters
+    ----------
+    file_path : str
+        Storage path of the track GPX file
+    lod : int | None
+        Tolerance of the level of detail in meters, None for the full track
+
+    Returns
+    -------
+    bytes | None
+        GPX content, or None if the GPX file is not found
+    """
+    from ..dependencies import run_in_worker
+    from ..dependencies import storage_manager as global_storage_manager
+
+    if lod is not None:
+        lod_bytes = await global_storage_manager.aload_gpx_data(
+            lod_file_path(file_path, lod)
+        )
+        if lod_bytes is not None:
+            return lod_bytes
+
+    gpx_bytes = await global_storage_manager.aload_gpx_data(file_path)
+    if gpx_bytes is None or lod is None:
+        return gpx_bytes
+
+    logger.info(f"Simplifying {file_path} on the fly to level of detail {lod}")
+    levels = await run_in_worker(simplify_gpx, gpx_bytes, (lod,))
+    return levels[lod]
+
+
+async def build_gpx_file_response(
+    file_path: str, lod: int | None, accept_encoding: str | None
+) -> Response:
+    """Build a response serving the GPX file of a track.
+
+    GPX files stored compressed are sent as stored, with their Content-Encoding,
+    to the clients accepting that encoding, and decompressed for the others.
+
+    Parameters
+    ----------
+    file_path : str
+        Storage path of the track GPX file
+    lod : int | None
+        Tolerance of the level of detail in meters, None for the full track
+    accept_encoding : str | None
+        Accept-Encoding header of the request
+
+    Returns
+    -------
+    Response
+        The GPX content
+
+    Raises
+    ------
+    HTTPException
+        If the GPX file is not found
+    """
+    from ..dependencies import run_in_worker
+    from ..dependencies import storage_manager as global_storage_manager
+
+    stored = await global_storage_manager.aload_stored_gpx_data(
+        lod_file_path(file_path, lod) if lod is not None else file_path
+    )
+    headers = {"Vary": "Accept-Encoding"}
+    if stored is None:
+        # Levels of detail missing from storage are simplified on the fly
+        content = await load_track_gpx(file_path, lod) if lod is not None else None
+        if content is None:
+            raise HTTPException(status_code=404, detail="GPX data not found")
+    elif stored.content_encoding is None:
+        content = stored.content
+    elif accepts_encoding(accept_encoding, stored.content_encoding):
+        content = stored.content
+        headers["Content-Encoding"] = stored.content_encoding
+    else:
+        content = await run_in_worker(
+            decompress, stored.content, stored.content_encoding
+        )
+    return Response(content=content, media_type="application/gpx+xml", headers=headers)
+
+
+async def load_track_sidecar(file_path: str) -> bytes | None:
+    """Load the binary sidecar stored next to a GPX file.
+
+    The sidecar only saves parsing the GPX file, so failures to load it are
+    logged and the caller falls back to the GPX file.
+
+    Parameters
+    ----------
+    file_path : str
+        Storage path of the GPX file
+
+    Returns
+    -------
+    bytes | None
+        Sidecar content, or None if it is not available
+    """
+    from ..dependencies import storage_manager as global_storage_manager
+
+    try:
+        return await global_storage_manager.aload_track_sidecar(file_path)
+    except Exception as e:
+        logger.warning(f"Failed to load the track sidecar of {file_path}: {str(e)}")
+        return None
+
+
+async def load_elevation_profile(track: Track, width: int) -> ElevationProfile:
+    """Load the downsampled elevation profile of a track, through its cache.
+
+    Parameters
+    ----------
+    track : Track
+        Track database row
+    width : int
+        Width in pixels of the chart displaying the profile
+
+    Returns
+    -------
+    ElevationProfile
+        The profile of the full track, with as many points as the width bucket
+        of the chart, see `profile_width_bucket`
+
+    Raises
+    ------
+    HTTPException
+        If the GPX file of the track is not found
+    """
+    from ..dependencies import (
+        elevation_profile_cache as global_elevation_profile_cache,
+    )
+    from ..dependencies import run_in_worker
+
+    n_points = profile_width_bucket(width)
+    use_cache = global_elevation_profile_cache is not None and track.file_path
+    cache_key = (track.file_path, n_points)
+    if use_cache:
+        cached_profile = global_elevation_profile_cache.get(cache_key)
+        if cached_profile is not None:
+            return cached_profile
+
+    parsed_data = await load_parsed_track(track, None)
+    points = parsed_data.points
+    profile = await run_in_worker(
+        compute_elevation_profile,
+        np.array([point.latitude for point in points], dtype=np.float64),
+        np.array([point.longitude for point in points], dtype=np.float64),
+        np.array([point.elevation for point in points], dtype=np.float64),
+        n_points,
+    )
+
+    if use_cache:
+        global_elevation_profile_cache.put(cache_key, profile)
+    return profile
+
+
+def fit_export_key(gpx_bytes: bytes, course_name: str) -> str:
+    """Build the cache key of the FIT export of a GPX file.
+
+    Parameters
+    ----------
+    gpx_bytes : bytes
+        GPX content
+    course_name : str
+        Name of the course
+
+    Returns
+    -------
+    str
+        Hash of the GPX content, the course name and the FIT encoder version
+    """
+    digest = hashlib.sha256(gpx_bytes)
+    digest.update(f"\0{course_name}\0{FIT_ENCODER_VERSION}".encode())
+    return digest.hexdigest()
+
+
+def attachment_disposition(filename: str) -> str:
+    """Build the Content-Disposition header of a file download.
+
+    Header values are encoded as latin-1, so the name is given as an ASCII
+    `filename` fallback and as a percent-encoded UTF-8 `filename*` (RFC 5987).
+
+    Parameters
+    ----------
+    filename : str
+        Name of the downloaded file
+
+    Returns
+    -------
+    str
+        Value of the Content-Disposition header
+    """
+    ascii_filename = (
+        unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode()
+    )
+    ascii_filename = "".join(
+        "_" if char in '"\\' or not char.isprintable() else char
+        for char in ascii_filename
+    )
+    return (
+        f'attachment; filename="{ascii_filename}"; '
+        f"filename*=UTF-8''{quote(filename, safe='')}"
+    )
+
+
+class FitExport(NamedTuple):
+    """GPX content of a track and its cached FIT export."""
+
+    gpx_bytes: bytes
+    cache_key: str
+    # None if the track was not exported yet
+    fit_bytes: bytes | None
+
+
+async def load_fit_export(track: Track) -> FitExport:
+    """Load the GPX content of a track and look up its cached FIT export.
+
+    Parameters
+    ----------
+    track : Track
+        The track
+
+    Returns
+    -------
+    FitExport
+        The GPX content, the cache key and the cached FIT file if any
+
+    Raises
+    ------
+    HTTPException
+        If the GPX file is not found
+    """
+    from ..dependencies import storage_manager as global_storage_manager
+
+    gpx_bytes = await global_storage_manager.aload_gpx_data(track.file_path)
+    if gpx_bytes is None:
+        logger.error(f"Failed to load GPX data from {track.file_path}")
+        raise HTTPException(status_code=404, detail="GPX file not found")
+
+    cache_key = fit_export_key(gpx_bytes, track.name)
+    try:
+        fit_bytes = await global_storage_manager.aload_fit_export(cache_key)
+    except Exception as e:
+        logger.warning(f"Failed to load FIT export {cache_key}: {str(e)}")
+        fit_bytes = None
+    return FitExport(gpx_bytes=gpx_bytes, cache_key=cache_key, fit_bytes=fit_bytes)
+
+
+async def load_track_fit_course(track: Track, fit_export: FitExport) -> FitCourse:
+    """Build the FIT course of a track, converting it only if not cached.
+
+    The track is decoded from its binary sidecar, falling back to parsing the
+    GPX file, on a worker. Newly converted FIT files are stored under their
+    cache key; failures to store them are logged.
+
+    Parameters
+    ----------
+    track : Track
+        The track
+    fit_export : FitExport
+        The GPX content and cached FIT export of the track, see
+        `load_fit_export`
+
+    Returns
+    -------
+    FitCourse
+        The GPX data, the FIT file and the time of the GPX file (None when
+        decoded from the sidecar)
+    """
+    from ..dependencies import run_in_worker
+    from ..dependencies import storage_manager as global_storage_manager
+
+    file_id = str(track.id)
+    fit_course = None
+    sidecar = await load_track_sidecar(track.file_path)
+    if sidecar is not None:
+        try:
+            if fit_export.fit_bytes is None:
+                fit_course = await run_in_worker(
+                    build_fit_course_from_sidecar, sidecar, file_id, track.name
+                )
+            else:
+                gpx_data = await run_in_worker(decode_track_sidecar, sidecar, file_id)
+                fit_course = FitCourse(
+                    gpx_data=gpx_data, fit_bytes=fit_export.fit_bytes, time=None
+                )
+        except TrackSidecarError as e:
+            logger.warning(f"Invalid track sidecar for track {track.id}: {str(e)}")
+
+    if fit_course is None:
+        # Parse GPX, extract metadata and convert to FIT on a worker
+        fit_course = await run_in_worker(
+            build_fit_course, fit_export.gpx_bytes, file_id, track.name
+        )
+
+    if fit_export.fit_bytes is not None:
+        return fit_course._replace(fit_bytes=fit_export.fit_bytes)
+
+    try:
+        await global_storage_manager.aupload_fit_export(
+            fit_course.fit_bytes, fit_export.cache_key
+        )
+    except Exception as e:
+        logger.warning(f"Failed to store FIT export of track {track.id}: {str(e)}")
+    return fit_course
+
+
+def validate_point_format(point_format: str | None) -> None:
+    """Check that a requested format of the track points is supported.
+
+    Parameters
+    ----------
+    point_format : str | None
+        Format of the track points, None for the list of point objects
+
+    Raises
+    ------
+    HTTPException
+        If the format is not supported
+    """
+    if point_format is not None and point_format not in POINT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Invalid format: {point_format}. Must be one of {list(POINT_FORMATS)}"
+            ),
+        )
+
+
+async def load_parsed_track(track: Track, lod: int | None) -> GPXData:
+    """Load and parse the GPX data of a track, through the parsed track cache.
+
+    The track is decoded from its binary sidecar when available, the GPX file is
+    parsed otherwise.
+
+    Parameters
+    ----------
+    track : Track
+        Track database row
+    lod : int | None
+        Tolerance of the level of detail in meters, None for the full track. The
+        distance and elevation statistics of the simplified track are replaced
+        by the ones stored with the track, if any.
+
+    Returns
+    -------
+    GPXData
+        The parsed GPX data
+
+    Raises
+    ------
+    HTTPException
+        If the GPX file of the track is not found
+    """
+    from ..dependencies import parsed_track_cache as global_parsed_track_cache
+    from ..dependencies import run_in_worker
+    from ..utils.gpx import parse_gpx_data
+
+    use_cache = global_parsed_track_cache is not None and track.file_path
+    cache_key = (
+        lod_file_path(track.file_path, lod)
+        if use_cache and lod is not None
+        else track.file_path
+    )
+    if use_cache:
+        cached_data = global_parsed_track_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
+
+    file_id = (
+        track.file_path.split("/")[-1].replace(".gpx", "")
+        if track.file_path
+        else str(track.id)
+    )
+
+    # Decode the binary sidecar of the GPX file, saving the XML parsing
+    parsed_data = None
+    sidecar = (
+        await load_track_sidecar(
+            lod_file_path(track.file_path, lod) if lod is not None else track.file_path
+        )
+        if track.file_path
+        else None
+    )
+    if sidecar is not None:
+        try:
+            parsed_data = await run_in_worker(decode_track_sidecar, sidecar, file_id)
+        except TrackSidecarError as e:
+            logger.warning(f"Invalid track sidecar for track {track.id}: {str(e)}")
+
+    if parsed_data is None:
+        # Load GPX data from storage
+        gpx_bytes = await load_track_gpx(track.file_path, lod)
+        if gpx_bytes is None:
+            logger.warning(
+                f"No GPX data found for track {track.id} at path: {track.file_path}"
+            )
+            raise HTTPException(status_code=404, detail="GPX data not found")
+
+        # Extract structured data on a worker process
+        parsed_data = await run_in_worker(parse_gpx_data, gpx_bytes, file_id)
+    if lod is not None and track.total_distance is not None:
+        # Simplification shortens the track and smooths its elevation, report
+        # the statistics of the full track (the point count still matches the
+        # returned points)
+        parsed_data.total_stats = GPXTotalStats(
+            total_points=parsed_data.total_stats.total_points,
+            total_distance=track.total_distance,
+            total_elevation_gain=track.total_elevation_gain,
+            total_elevation_loss=track.total_elevation_loss,
+        )
+    if use_cache:
+        global_parsed_track_cache.put(cache_key, parsed_data)
+
+    return parsed_data
+
+
+async def load_track_geometry(
+    track: TrackResponse, tolerance: float
+) -> list[tuple[float, float]]:
+    """Load the simplified geometry of a track.
+
+    The precomputed polyline closest to the tolerance is used when available.
+    Otherwise the GPX data is loaded from storage and simplified on a worker.
+
+    Parameters
+    ----------
+    track : TrackResponse
+        Overview data of the track
+    tolerance : float
+        Simplification tolerance in meters
+
+    Returns
+    -------
+    list[tuple[float, float]]
+        Simplified track points as (latitude, longitude) pairs
+    """
+    from ..dependencies import run_in_worker
+    from ..dependencies import storage_manager as global_storage_manager
+
+    encoded = select_simplified_polyline(track.simplified_polylines, tolerance)
+    if encoded is not None:
+        return polyline.decode(encoded)
+
+    if global_storage_manager is None:
+        return []
+    gpx_bytes = await global_storage_manager.aload_gpx_data(track.file_path)
+    if gpx_bytes is None:
+        logger.warning(f"No GPX data found for track {track.id}: {track.file_path}")
+        return []
+    return await run_in_worker(simplify_gpx_coordinates, gpx_bytes, tolerance)
+
+
+async def build_vector_tile(
+    session_local: async_sessionmaker[AsyncSession], z: int, x: int, y: int
+) -> bytes:
+    """Build the vector tile of the segments and routes.
+
+    The tile holds a `segments` and a `routes` layer. Routes are restricted to
+    the ones of the authorized users so that the tile does not depend on the
+    requesting user and can be cached by URL.
+
+    Parameters
+    ----------
+    session_local : async_sessionmaker[AsyncSession]
+        Database session factory
+    z : int
+        Zoom level
+    x : int
+        Tile column
+    y : int
+        Tile row
+
+    Returns
+    -------
+    bytes
+        Encoded Mapbox Vector Tile
+    """
+    from ..dependencies import track_index as global_track_index
+
+    north, south, east, west = tile_bounds(z, x, y)
+    # Include the tracks drawn in the tile buffer
+    margin = TILE_BUFFER / TILE_EXTENT
+    margin_latitude = (north - south) * margin
+    margin_longitude = (east - west) * margin
+    north, south = north + margin_latitude, south - margin_latitude
+    east, west = east + margin_longitude, west - margin_longitude
+
+    authorized_strava_ids = await load_authorized_strava_ids(session_local)
+    if global_track_index is not None:
+        tracks = [
+            entry.item
+            for entry in global_track_index.intersecting(north, south, east, west)
+        ]
+    else:
+        async with session_local() as session:
+            result = await session.execute(
+                select(Track).filter(
+                    Track.bound_north > south,
+                    Track.bound_south < north,
+                    Track.bound_east > west,
+                    Track.bound_west < east,
+                )
+            )
+            tracks = [track_to_response(track) for track in result.scalars().all()]
+
+    tolerance = tile_resolution(z)
+    layers: dict[str, list[TileFeature]] = {"segments": [], "routes": []}
+    for track in sorted(tracks, key=lambda track: track.id):
+        if (
+            track.track_type == TrackType.ROUTE.value
+            and track.strava_id not in authorized_strava_ids
+        ):
+            continue
+        try:
+            points = await load_track_geometry(track, tolerance)
+        except Exception as e:
+            logger.warning(f"Failed to load geometry of track {track.id}: {str(e)}")
+            continue
+        lines = project_to_tile(points, z, x, y)
+        if not lines:
+            continue
+        layer = "routes" if track.track_type == TrackType.ROUTE.value else "segments"
+        layers[layer].append(
+            TileFeature(
+                id=track.id,
+                lines=lines,
+                properties={
+                    "name": track.name,
+                    "track_type": track.track_type,
+                    "difficulty_level": track.difficulty_level,
+                    "surface_type": ",".join(track.surface_type),
+                    "tire_dry": track.tire_dry,
+                    "tire_wet": track.tire_wet,
+                    "strava_id": track.strava_id,
+                },
+            )
+        )
+
+    return encode_tile(layers)
+
+
 def create_segments_router(
     session_local: async_sessionmaker[AsyncSession] | None,
 ) -> APIRouter:
@@ -97,9 +1308,10 @@ def create_segments_router(
 
         # Import globals from main
         from ..dependencies import SessionLocal as global_session_local
+        from ..dependencies import run_in_worker
         from ..dependencies import storage_manager as global_storage_manager
         from ..dependencies import temp_dir as global_temp_dir
-        from ..utils.gpx import generate_gpx_segment
+        from ..utils.gpx import write_gpx_segment
 
         # Import utility functions from their correct modules
         from ..utils.storage import cleanup_local_file
@@ -114,14 +1326,8 @@ def create_segments_router(
                 status_code=500, detail="Storage manager not initialized"
             )
 
-        original_file_path = Path(global_temp_dir.name) / f"{file_id}.gpx"
-        logger.info(
-            f"Processing segment from file {file_id}.gpx at: {original_file_path}"
-        )
-
-        if not original_file_path.exists():
-            logger.warning(f"Uploaded file not found: {original_file_path}")
-            raise HTTPException(status_code=404, detail="Uploaded file not found")
+        upload_session = await load_upload_session(Path(global_temp_dir.name), file_id)
+        logger.info(f"Processing segment from uploaded file {file_id}")
 
         frontend_temp_dir = Path(global_temp_dir.name) / "gpx_segments"
         frontend_temp_dir.mkdir(parents=True, exist_ok=True)
@@ -130,23 +1336,59 @@ def create_segments_router(
             logger.info(
                 f"Processing segment '{name}' from indices {start_index} to {end_index}"
             )
-            segment_file_id, segment_file_path, bounds = generate_gpx_segment(
-                input_file_path=original_file_path,
-                start_index=start_index,
-                end_index=end_index,
+            # Only the points of the segment are sent to the worker
+            segment_file_id, segment_file_path, bounds = await run_in_worker(
+                write_gpx_segment,
+                track=upload_session.slice_segment(start_index, end_index),
                 segment_name=name,
                 output_dir=frontend_temp_dir,
             )
             logger.info(f"Successfully created segment file: {segment_file_path}")
 
+            # Precompute the simplified geometry served inline by the search
+            try:
+                simplified_polylines = await run_in_worker(
+                    encode_gpx_polylines, segment_file_path
+                )
+            except Exception as polyline_error:
+                logger.warning(
+                    f"Failed to simplify segment '{name}': {str(polyline_error)}"
+                )
+                simplified_polylines = None
+
+            # Store the statistics so that they are not recomputed on every read,
+            # and the sidecar so that the GPX file is not parsed on every read
+            try:
+                track_stats, track_sidecar = await run_in_worker(
+                    compute_track_stats_and_sidecar, segment_file_path
+                )
+            except Exception as stats_error:
+                logger.warning(
+                    f"Failed to compute statistics of segment '{name}': "
+                    f"{str(stats_error)}"
+                )
+                track_stats, track_sidecar = None, None
+            stats_fields = track_stats._asdict() if track_stats is not None else {}
+
             try:
-                storage_key = global_storage_manager.upload_gpx_segment(
+                storage_key = await global_storage_manager.aupload_gpx_segment(
                     local_file_path=segment_file_path,
                     file_id=segment_file_id,
                     prefix="gpx-segments",
+                    track_sidecar=track_sidecar,
                 )
                 logger.info(f"Successfully uploaded segment to storage: {storage_key}")
 
+                processed_file_path = (
+                    f"{global_storage_manager.get_storage_root_prefix()}/{storage_key}"
+                )
+
+                # Store the simplified levels of detail next to the GPX file,
+                # once it is uploaded so that they are never orphaned
+                await store_track_lods(
+                    segment_file_path, segment_file_id, "gpx-segments"
+                )
+
                 cleanup_success = cleanup_local_file(segment_file_path)
                 if cleanup_success:
                     logger.info(
@@ -157,18 +1399,21 @@ def create_segments_router(
                         f"Failed to clean up local file: {segment_file_path}"
                     )
 
-                processed_file_path = (
-                    f"{global_storage_manager.get_storage_root_prefix()}/{storage_key}"
-                )
-
             except Exception as storage_error:
                 logger.error(f"Failed to upload to storage: {str(storage_error)}")
                 cleanup_local_file(segment_file_path)
+                if "processed_file_path" in locals():
+                    await global_storage_manager.adelete_gpx_segment_by_url(
+                        processed_file_path
+                    )
+                    await delete_track_lods(processed_file_path)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to upload to storage: {str(storage_error)}",
                 )
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to process GPX file for segment '{name}': {str(e)}")
             raise HTTPException(
@@ -198,6 +1443,8 @@ def create_segments_router(
                         tire_wet=TireType(tire_wet),
                         comments=commentary_text,
                         strava_id=strava_id,
+                        simplified_polylines=simplified_polylines,
+                        **stats_fields,
                     )
                     session.add(track)
                     await session.commit()
@@ -266,6 +1513,9 @@ def create_segments_router(
                             logger.warning(f"Failed to process video data: {str(e)}")
                             # Continue without videos
 
+                    on_track_written(track)
+                    await notify_track_changed(track)
+
                     return TrackResponse(
                         id=track.id,
                         file_path=str(processed_file_path),
@@ -283,6 +1533,7 @@ def create_segments_router(
                         tire_wet=track.tire_wet,
                         comments=track.comments,
                         strava_id=track.strava_id,
+                        **stats_fields,
                     )
             except Exception as db_e:
                 logger.warning(f"Failed to store segment in database: {db_e}")
@@ -309,6 +1560,7 @@ def create_segments_router(
             tire_wet=tire_wet,
             comments=commentary_text,
             strava_id=strava_id,
+            **stats_fields,
         )
 
     @router.options("/search")
@@ -326,6 +1578,7 @@ def create_segments_router(
 
     @router.get("/search")
     async def search_segments_in_bounds(
+        request: Request,
         north: float,
         south: float,
         east: float,
@@ -341,6 +1594,50 @@ def create_segments_router(
             None,
             description="Strava ID of the authenticated user (optional)",
         ),
+        difficulty_min: int | None = Query(
+            None, ge=1, le=5, description="Minimum difficulty level (inclusive)"
+        ),
+        difficulty_max: int | None = Query(
+            None, ge=1, le=5, description="Maximum difficulty level (inclusive)"
+        ),
+        surface_type: list[str] | None = Query(
+            None, description="Surface types, a track matches if it has any of them"
+        ),
+        tire_dry: list[str] | None = Query(
+            None, description="Tire types for dry conditions to match (any of)"
+        ),
+        tire_wet: list[str] | None = Query(
+            None, description="Tire types for wet conditions to match (any of)"
+        ),
+        geometry: str | None = Query(
+            None,
+            description="Inline track geometry in the results ('polyline')",
+        ),
+        tolerance: float = Query(
+            20.0,
+            gt=0,
+            description="Simplification tolerance of the inline geometry in meters",
+        ),
+        min_distance: float | None = Query(
+            None, ge=0, description="Minimum track distance in kilometers (inclusive)"
+        ),
+        max_distance: float | None = Query(
+            None, ge=0, description="Maximum track distance in kilometers (inclusive)"
+        ),
+        sort: str | None = Query(
+            None,
+            description=(
+                "Order by 'distance' or 'elevation_gain' instead of the proximity "
+                "to the center, prefixed with '-' for a descending order"
+            ),
+        ),
+        known: str | None = Query(
+            None,
+            description=(
+                "Sorted track IDs already received by the client, delta-encoded "
+                "as comma-separated integers ('12,3,40' for 12, 15 and 55)"
+            ),
+        ),
     ):
         """Search for segments that are at least partially visible within the given map
         bounds using streaming.
@@ -349,14 +1646,23 @@ def create_segments_router(
         bounding rectangle intersects with the search area rectangle (at least
         partially visible). The results are limited to the specified number of
         segments, selecting those closest to the center of the search bounds.
-        Streams segments as they are processed, allowing the frontend to start
-        drawing immediately.
+        The search completes, and releases its database connection, before the
+        segments are streamed, the search is cancelled if the client disconnects
+        meanwhile. The durations of the searches and of the streams are reported
+        by `/api/search-stats`.
+
+        The search is served from the in-memory spatial index when it is available
+        and falls back to a database query otherwise. Identical concurrent
+        searches share a single execution, and their results are cached for a few
+        seconds, until a track is written.
 
         For routes: Only returns routes from authors who authorized storage in the
         database. If user_strava_id is provided, also includes the user's own routes.
 
         Parameters
         ----------
+        request : Request
+            The request, watched for a disconnect of the client during the search
         north : float
             Northern boundary of the search area
         south : float
@@ -371,139 +1677,299 @@ def create_segments_router(
             Maximum number of segments to return (default: 50, max: 1000)
         user_strava_id : int | None
             Strava ID of the authenticated user (optional, used for filtering routes)
+        difficulty_min : int | None
+            Minimum difficulty level (optional, inclusive)
+        difficulty_max : int | None
+            Maximum difficulty level (optional, inclusive)
+        surface_type : list[str] | None
+            Surface types (optional, a track matches if it has any of them)
+        tire_dry : list[str] | None
+            Tire types for dry conditions (optional, any of)
+        tire_wet : list[str] | None
+            Tire types for wet conditions (optional, any of)
+        geometry : str | None
+            If 'polyline', each result includes a `polyline` field holding the
+            encoded simplified track (null if not available), so that the track
+            can be drawn without fetching its GPX data
+        tolerance : float
+            Simplification tolerance in meters of the inline geometry, the
+            closest precomputed level not exceeding it is returned
+        min_distance : float | None
+            Minimum track distance in kilometers (optional, inclusive), tracks
+            without stored statistics are excluded
+        max_distance : float | None
+            Maximum track distance in kilometers (optional, inclusive), tracks
+            without stored statistics are excluded
+        sort : str | None
+            If 'distance' or 'elevation_gain', the tracks visible in the search
+            area are ordered by this statistic before the limit is taken
+            (ascending, or descending with a '-' prefix) instead of by proximity
+            to the center
+        known : str | None
+            Track IDs already received by the client, see `decode_track_ids`.
+            These tracks are not sent again, and a `removed` event lists those
+            that are not in the results anymore, e.g. after a pan of the map
         """
-        # Import global SessionLocal from main
+        # Import globals from main
         from ..dependencies import SessionLocal as global_session_local
+        from ..dependencies import search_result_cache as global_search_result_cache
+        from ..dependencies import search_stream_metrics
+        from ..dependencies import track_index as global_track_index
 
         if not global_session_local:
             raise HTTPException(status_code=500, detail="Database not available")
 
-        # Convert string track_type to enum
+        # Convert string track_type to enum
+        try:
+            track_type_enum = TrackType(track_type)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Invalid track_type: {track_type}. Must be 'segment' or 'route'"
+                ),
+            )
+
+        allowed_surface_types = {st.value for st in SurfaceType}
+        for st in surface_type or []:
+            if st not in allowed_surface_types:
+                raise HTTPException(
+                    status_code=400,
+                    detail=(
+                        f"Invalid surface type: {st}. "
+                        f"Allowed values: {allowed_surface_types}"
+                    ),
+                )
+
+        allowed_tire_types = {tt.value for tt in TireType}
+        for tire in (tire_dry or []) + (tire_wet or []):
+            if tire not in allowed_tire_types:
+                raise HTTPException(
+                    status_code=400,
+                    detail=(
+                        f"Invalid tire type: {tire}. "
+                        f"Allowed values: {allowed_tire_types}"
+                    ),
+                )
+
+        if geometry is not None and geometry != "polyline":
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid geometry: {geometry}. Must be 'polyline'",
+            )
+
+        order = None
+        if sort is not None:
+            try:
+                order = TrackSearchOrder.parse(sort)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail=(
+                        f"Invalid sort: {sort}. Must be one of "
+                        f"{sorted(SEARCH_SORT_FIELDS)}, optionally prefixed with '-'"
+                    ),
+                )
+
         try:
-            track_type_enum = TrackType(track_type)
+            known_track_ids = decode_track_ids(known or "")
         except ValueError:
             raise HTTPException(
                 status_code=400,
                 detail=(
-                    f"Invalid track_type: {track_type}. Must be 'segment' or 'route'"
+                    f"Invalid known: {known}. Must be at most {MAX_KNOWN_TRACKS} "
+                    f"sorted and delta-encoded track IDs"
                 ),
             )
 
-        async def generate():
-            try:
-                async with global_session_local() as session:
-                    search_center_latitude = (north + south) / 2
-                    search_center_longitude = (east + west) / 2
-
-                    # Calculate squared Euclidean distance for better performance on
-                    # local areas. For small distances, this is a good approximation
-                    # and much
-                    # faster than Haversine Using squared distance to avoid sqrt()
-                    # calculation
-                    distance_expr = (
-                        func.pow(Track.barycenter_latitude - search_center_latitude, 2)
-                        + func.pow(
-                            Track.barycenter_longitude - search_center_longitude, 2
-                        )
-                    ).label("distance")
-
-                    # Build filter conditions
-                    filter_conditions = [
-                        Track.bound_north > south,
-                        Track.bound_south < north,
-                        Track.bound_east > west,
-                        Track.bound_west < east,
-                        Track.track_type == track_type_enum,
-                    ]
-
-                    # For routes, filter by authorized users from auth_users table
-                    if track_type_enum == TrackType.ROUTE:
-                        from ..models.auth_user import AuthUser
-
-                        # Get all authorized strava_ids from auth_users table
-                        auth_stmt = select(AuthUser.strava_id)
-                        auth_result = await session.execute(auth_stmt)
-                        authorized_strava_ids = [row[0] for row in auth_result.all()]
-
-                        # If user is authenticated, add their strava_id to the list
-                        if user_strava_id is not None:
-                            if user_strava_id not in authorized_strava_ids:
-                                authorized_strava_ids.append(user_strava_id)
-
-                        # Filter routes to only show those from authorized users
-                        if authorized_strava_ids:
-                            filter_conditions.append(
-                                Track.strava_id.in_(authorized_strava_ids)
-                            )
-                        else:
-                            # No authorized users, return empty results
-                            yield "data: 0\n\n"
-                            yield "data: [DONE]\n\n"
-                            return
-
-                    stmt = (
-                        select(Track, distance_expr)
-                        .filter(and_(*filter_conditions))
-                        .order_by(distance_expr)
-                        .limit(limit)
-                    )
+        filters = TrackSearchFilters(
+            difficulty_min=difficulty_min,
+            difficulty_max=difficulty_max,
+            surface_types=frozenset(surface_type or ()),
+            tires_dry=frozenset(tire_dry or ()),
+            tires_wet=frozenset(tire_wet or ()),
+            min_distance=min_distance,
+            max_distance=max_distance,
+        )
 
-                    result = await session.execute(stmt)
-                    tracks_with_distance = result.all()
-                    tracks = [track for track, _ in tracks_with_distance]
-
-                    for track in tracks:
-                        # Validate bounds to ensure they are finite before returning
-                        bounds = {
-                            "bound_north": track.bound_north,
-                            "bound_south": track.bound_south,
-                            "bound_east": track.bound_east,
-                            "bound_west": track.bound_west,
-                            "barycenter_latitude": track.barycenter_latitude,
-                            "barycenter_longitude": track.barycenter_longitude,
-                        }
-
-                        # Check if any bounds are non-finite and skip this track if so
-                        if not all(
-                            isinstance(value, (int, float)) and math.isfinite(value)
-                            for value in bounds.values()
-                        ):
-                            logger.warning(
-                                f"Skipping track {track.id} with non-finite bounds"
-                            )
-                            continue
-
-                        # Return only overview data without GPX content
-                        track_response = TrackResponse(
-                            id=track.id,
-                            file_path=track.file_path,
-                            bound_north=track.bound_north,
-                            bound_south=track.bound_south,
-                            bound_east=track.bound_east,
-                            bound_west=track.bound_west,
-                            barycenter_latitude=track.barycenter_latitude,
-                            barycenter_longitude=track.barycenter_longitude,
-                            name=track.name,
-                            track_type=track.track_type.value,
-                            difficulty_level=track.difficulty_level,
-                            surface_type=track.surface_type,
-                            tire_dry=track.tire_dry.value,
-                            tire_wet=track.tire_wet.value,
-                            comments=track.comments or "",
-                            strava_id=track.strava_id,
-                        )
+        async def run_search() -> list[TrackResponse] | None:
+            authorized_strava_ids: frozenset[int] | None = None
+
+            # For routes, filter by the authors authorized in the auth_users table
+            if track_type_enum == TrackType.ROUTE:
+                authorized_strava_ids = await load_authorized_strava_ids(
+                    global_session_local
+                )
+
+                # If user is authenticated, add their strava_id to the set
+                if user_strava_id is not None:
+                    authorized_strava_ids = authorized_strava_ids | {user_strava_id}
 
-                        track_json = json.dumps(track_response.model_dump())
-                        yield f"data: {track_json}\n\n"
+                if not authorized_strava_ids:
+                    # No authorized users, return empty results
+                    return None
 
-                    yield "data: [DONE]\n\n"
+            if global_track_index is not None:
+
+                def matches(track_response: TrackResponse) -> bool:
+                    if track_response.track_type != track_type_enum.value:
+                        return False
+                    if (
+                        authorized_strava_ids is not None
+                        and track_response.strava_id not in authorized_strava_ids
+                    ):
+                        return False
+                    return filters.matches(track_response)
+
+                return global_track_index.search(
+                    north,
+                    south,
+                    east,
+                    west,
+                    limit,
+                    predicate=matches,
+                    key=order.key if order is not None else None,
+                )
+            return await query_tracks(authorized_strava_ids)
+
+        # Identical searches share their results, bounds closer than about 10 cm
+        # are the same search
+        search_key = (
+            *(
+                round(bound, SEARCH_KEY_DECIMALS)
+                for bound in (north, south, east, west)
+            ),
+            track_type_enum,
+            limit,
+            user_strava_id if track_type_enum == TrackType.ROUTE else None,
+            filters,
+            order,
+        )
 
+        async def search_events() -> list[str]:
+            try:
+                if global_search_result_cache is None:
+                    track_responses = await run_search()
+                else:
+                    track_responses = await global_search_result_cache.get_or_run(
+                        search_key, run_search
+                    )
             except Exception as e:
                 logger.error(f"Error in streaming endpoint: {str(e)}")
-                yield f"data: {{'error': '{str(e)}'}}\n\n"
+                return [f"data: {{'error': '{str(e)}'}}\n\n"]
+
+            if track_responses is None:
+                events = ["data: 0\n\n"]
+                track_responses = []
+            else:
+                events = []
+
+            # Only the tracks unknown to the client are serialized
+            for track_response in track_responses:
+                if track_response.id in known_track_ids:
+                    continue
+                track_data = track_response.model_dump()
+                if geometry == "polyline":
+                    track_data["polyline"] = select_simplified_polyline(
+                        track_response.simplified_polylines, tolerance
+                    )
+                track_json = json.dumps(track_data)
+                events.append(f"data: {track_json}\n\n")
+
+            removed_track_ids = known_track_ids.difference(
+                track_response.id for track_response in track_responses
+            )
+            if removed_track_ids:
+                events.append(
+                    f"event: removed\ndata: {json.dumps(sorted(removed_track_ids))}\n\n"
+                )
+
+            events.append("data: [DONE]\n\n")
+            return events
+
+        async def query_tracks(
+            authorized_strava_ids: frozenset[int] | None,
+        ) -> list[TrackResponse]:
+            async with global_session_local() as session:
+                search_center_latitude = (north + south) / 2
+                search_center_longitude = (east + west) / 2
+
+                # Calculate squared Euclidean distance for better performance on
+                # local areas. For small distances, this is a good approximation
+                # and much faster than Haversine. Using squared distance to avoid
+                # sqrt() calculation
+                distance_expr = (
+                    func.pow(Track.barycenter_latitude - search_center_latitude, 2)
+                    + func.pow(Track.barycenter_longitude - search_center_longitude, 2)
+                ).label("distance")
+
+                # Build filter conditions
+                filter_conditions = [
+                    Track.bound_north > south,
+                    Track.bound_south < north,
+                    Track.bound_east > west,
+                    Track.bound_west < east,
+                    Track.track_type == track_type_enum,
+                    *filters.conditions(),
+                ]
+
+                # Filter routes to only show those from authorized users
+                if authorized_strava_ids is not None:
+                    filter_conditions.append(
+                        Track.strava_id.in_(sorted(authorized_strava_ids))
+                    )
+
+                stmt = (
+                    select(Track, distance_expr)
+                    .filter(and_(*filter_conditions))
+                    .order_by(
+                        *([order.order_by()] if order is not None else []),
+                        distance_expr,
+                    )
+                    .limit(limit)
+                )
+
+                result = await session.execute(stmt)
+                tracks_with_distance = result.all()
+                tracks = [track for track, _ in tracks_with_distance]
+
+            track_responses = []
+            for track in tracks:
+                # Validate bounds to ensure they are finite before returning
+                bounds = {
+                    "bound_north": track.bound_north,
+                    "bound_south": track.bound_south,
+                    "bound_east": track.bound_east,
+                    "bound_west": track.bound_west,
+                    "barycenter_latitude": track.barycenter_latitude,
+                    "barycenter_longitude": track.barycenter_longitude,
+                }
+
+                # Check if any bounds are non-finite and skip this track if so
+                if not all(
+                    isinstance(value, (int, float)) and math.isfinite(value)
+                    for value in bounds.values()
+                ):
+                    logger.warning(f"Skipping track {track.id} with non-finite bounds")
+                    continue
+
+                # Return only overview data without GPX content
+                track_responses.append(track_to_response(track))
+
+            return track_responses
+
+        start = time.perf_counter()
+        try:
+            events = await run_until_disconnect(request.receive, search_events())
+        except ClientDisconnect:
+            search_stream_metrics.record_disconnect()
+            logger.info("Client disconnected during the segment search")
+            # Nobody reads the response, 499 is the usual "client closed request"
+            return Response(status_code=499)
+        search_stream_metrics.record_query(time.perf_counter() - start)
 
         return StreamingResponse(
-            generate(),
+            stream_events(events, search_stream_metrics),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -515,23 +1981,126 @@ def create_segments_router(
             },
         )
 
-    @router.get("/{track_id}/gpx", response_model=GPXDataResponse)
-    async def get_track_gpx_data(track_id: int):
+    @router.get("/tiles/{z}/{x}/{y}.mvt")
+    async def get_segments_tile(z: int, x: int, y: int, request: Request):
+        """Get a Mapbox Vector Tile of the segments and routes.
+
+        Tiles hold the simplified geometries of the tracks with the attributes
+        needed by the map, in a `segments` and a `routes` layer. They are cached
+        on disk per zoom level and invalidated when a track intersecting them is
+        created, updated or deleted.
+
+        Parameters
+        ----------
+        z : int
+            Zoom level
+        x : int
+            Tile column
+        y : int
+            Tile row (0 at the north)
+        request : Request
+            Incoming request, used for conditional requests (If-None-Match)
+
+        Returns
+        -------
+        Response
+            Protobuf encoded tile (possibly empty), or 304 if the client copy is
+            up to date
+        """
+        # Import globals from main
+        from ..dependencies import SessionLocal as global_session_local
+        from ..dependencies import tile_cache as global_tile_cache
+
+        if not 0 <= z <= MAX_ZOOM or not 0 <= x < 2**z or not 0 <= y < 2**z:
+            raise HTTPException(status_code=400, detail=f"Invalid tile: {z}/{x}/{y}")
+
+        if not global_session_local:
+            raise HTTPException(status_code=500, detail="Database not available")
+
+        content = None
+        generation = None
+        if global_tile_cache is not None:
+            content = global_tile_cache.get(z, x, y)
+            generation = global_tile_cache.generation
+
+        if content is None:
+            try:
+                content = await build_vector_tile(global_session_local, z, x, y)
+            except Exception as e:
+                logger.error(f"Error building tile {z}/{x}/{y}: {str(e)}")
+                raise HTTPException(
+                    status_code=500, detail=f"Failed to build tile: {str(e)}"
+                )
+
+            # A track written during the build may be missing from the tile
+            if (
+                global_tile_cache is not None
+                and global_tile_cache.generation == generation
+            ):
+                try:
+                    global_tile_cache.put(z, x, y, content)
+                except Exception as e:
+                    logger.warning(f"Failed to cache tile {z}/{x}/{y}: {str(e)}")
+
+        etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+        headers = {"Cache-Control": "public, max-age=60", "ETag": etag}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=content, media_type=MVT_MEDIA_TYPE, headers=headers)
+
+    @router.get(
+        "/{track_id}/gpx",
+        response_model=GPXDataResponse | GPXColumnarPoints | GPXPolylinePoints,
+    )
+    async def get_track_gpx_data(
+        request: Request,
+        track_id: int,
+        lod: int | None = Query(
+            None,
+            description=(
+                "Simplification tolerance in meters of the returned track "
+                f"(one of {list(LOD_TOLERANCES)}), full track if omitted"
+            ),
+        ),
+        format: str | None = Query(
+            None,
+            description=(
+                "Compact format of the track points ('polyline' or 'columnar') "
+                "returned instead of the GPX content"
+            ),
+        ),
+    ):
         """Get GPX data for a specific track by ID.
 
         This endpoint fetches the GPX XML data from storage for the given track ID.
         This is called by the frontend only when it needs to render the track on the
         map.
 
+        Clients sending `Accept: application/gpx+xml` get the GPX file itself
+        instead of the JSON response. Files stored compressed are then sent as
+        stored if the client accepts their encoding.
+
         Parameters
         ----------
+        request : Request
+            The request, whose Accept and Accept-Encoding headers select the
+            GPX file response
         track_id : int
             The ID of the track to fetch GPX data for
+        lod : int | None
+            Level of detail, i.e. simplification tolerance in meters, of the
+            returned track. The simplified tracks are precomputed when the track
+            is written, the full track is returned if None.
+        format : str | None
+            If 'columnar' or 'polyline', only the track points are returned, in
+            the same format as the points of `/data`, instead of the GPX content
 
         Returns
         -------
-        GPXDataResponse
-            The GPX XML content only
+        GPXDataResponse | GPXColumnarPoints | GPXPolylinePoints
+            The GPX XML content only, or the encoded track points, or the GPX
+            file
         """
         # Import globals from main
         from ..dependencies import SessionLocal as global_session_local
@@ -543,6 +2112,9 @@ def create_segments_router(
         if not global_storage_manager:
             raise HTTPException(status_code=500, detail="Storage manager not available")
 
+        validate_lod(lod)
+        validate_point_format(format)
+
         try:
             async with global_session_local() as session:
                 stmt = select(Track).filter(Track.id == track_id)
@@ -552,8 +2124,34 @@ def create_segments_router(
                 if not track:
                     raise HTTPException(status_code=404, detail="Track not found")
 
+                if format is not None:
+                    try:
+                        parsed_data = await load_parsed_track(track, lod)
+                    except HTTPException:
+                        raise
+                    except Exception as e:
+                        logger.warning(
+                            f"Failed to parse GPX data for track {track_id}: {str(e)}"
+                        )
+                        raise HTTPException(
+                            status_code=500,
+                            detail=f"Failed to parse GPX data: {str(e)}",
+                        )
+                    # Skip the validation of the response model on the large arrays
+                    return Response(
+                        content=encode_gpx_points(
+                            parsed_data, format
+                        ).model_dump_json(),
+                        media_type="application/json",
+                    )
+
+                if "application/gpx+xml" in request.headers.get("accept", ""):
+                    return await build_gpx_file_response(
+                        track.file_path, lod, request.headers.get("accept-encoding")
+                    )
+
                 try:
-                    gpx_bytes = global_storage_manager.load_gpx_data(track.file_path)
+                    gpx_bytes = await load_track_gpx(track.file_path, lod)
                     if gpx_bytes is None:
                         logger.warning(
                             f"No GPX data found for track {track_id} at path: "
@@ -583,6 +2181,77 @@ def create_segments_router(
                 status_code=500, detail=f"Internal server error: {str(e)}"
             )
 
+    @router.get("/{track_id}/fit")
+    async def get_track_fit(request: Request, track_id: int):
+        """Download a track as a FIT course.
+
+        The FIT file is converted on the first download and then served from the
+        FIT exports of the storage, keyed by the GPX content, the track name and
+        the version of the FIT encoder.
+
+        Parameters
+        ----------
+        request : Request
+            Incoming request, used for conditional requests (If-None-Match)
+        track_id : int
+            The ID of the track to download
+
+        Returns
+        -------
+        Response
+            The FIT file, as an attachment
+        """
+        # Import globals from main
+        from ..dependencies import SessionLocal as global_session_local
+        from ..dependencies import storage_manager as global_storage_manager
+
+        if not global_session_local:
+            raise HTTPException(status_code=500, detail="Database not available")
+
+        if not global_storage_manager:
+            raise HTTPException(status_code=500, detail="Storage manager not available")
+
+        try:
+            async with global_session_local() as session:
+                stmt = select(Track).filter(Track.id == track_id)
+                result = await session.execute(stmt)
+                track = result.scalar_one_or_none()
+
+                if not track:
+                    raise HTTPException(status_code=404, detail="Track not found")
+
+            fit_export = await load_fit_export(track)
+            etag = f'"{fit_export.cache_key}"'
+            headers = {
+                "Content-Disposition": attachment_disposition(f"{track.name}.fit"),
+                "ETag": etag,
+            }
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+
+            fit_bytes = fit_export.fit_bytes
+            if fit_bytes is None:
+                try:
+                    fit_course = await load_track_fit_course(track, fit_export)
+                    fit_bytes = fit_course.fit_bytes
+                except ValueError as e:
+                    raise HTTPException(
+                        status_code=422,
+                        detail=f"Failed to convert the track to FIT: {str(e)}",
+                    )
+
+            return Response(
+                content=fit_bytes, media_type=FIT_MEDIA_TYPE, headers=headers
+            )
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error exporting track {track_id} to FIT: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Internal server error: {str(e)}"
+            )
+
     @router.get("/{track_id}", response_model=TrackResponse)
     async def get_track_info(track_id: int):
         """Get basic track information by ID.
@@ -652,6 +2321,7 @@ def create_segments_router(
                     tire_wet=track.tire_wet,
                     comments=track.comments,
                     strava_id=track.strava_id,
+                    **{field: getattr(track, field) for field in TrackStats._fields},
                 )
 
         except HTTPException:
@@ -662,27 +2332,123 @@ def create_segments_router(
                 status_code=500, detail=f"Internal server error: {str(e)}"
             )
 
-    @router.get("/{track_id}/data", response_model=GPXData)
-    async def get_track_parsed_data(track_id: int):
+    @router.get("/{track_id}/profile", response_model=ElevationProfile)
+    async def get_track_elevation_profile(
+        track_id: int,
+        width: int = Query(
+            ...,
+            ge=1,
+            le=MAX_PROFILE_WIDTH,
+            description="Width in pixels of the chart displaying the profile",
+        ),
+    ):
+        """Get the elevation profile of a track, downsampled for a chart.
+
+        The points are selected with Largest-Triangle-Three-Buckets among the
+        points of the full track. Profiles are cached by track file path and
+        width bucket (the width rounded up to a power of two).
+
+        Parameters
+        ----------
+        track_id : int
+            The ID of the track
+        width : int
+            Width in pixels of the chart displaying the profile
+
+        Returns
+        -------
+        ElevationProfile
+            Distances and elevations of the selected points, with their indices
+            in the points returned by `/data`
+        """
+        # Import globals from main
+        from ..dependencies import SessionLocal as global_session_local
+        from ..dependencies import storage_manager as global_storage_manager
+
+        if not global_session_local:
+            raise HTTPException(status_code=500, detail="Database not available")
+
+        if not global_storage_manager:
+            raise HTTPException(status_code=500, detail="Storage manager not available")
+
+        try:
+            async with global_session_local() as session:
+                stmt = select(Track).filter(Track.id == track_id)
+                result = await session.execute(stmt)
+                track = result.scalar_one_or_none()
+
+                if not track:
+                    raise HTTPException(status_code=404, detail="Track not found")
+
+            try:
+                return await load_elevation_profile(track, width)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Failed to compute elevation profile of track {track_id}: {str(e)}"
+                )
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to compute elevation profile: {str(e)}",
+                )
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(
+                f"Error fetching elevation profile for track {track_id}: {str(e)}"
+            )
+            raise HTTPException(
+                status_code=500, detail=f"Internal server error: {str(e)}"
+            )
+
+    @router.get("/{track_id}/data", response_model=GPXData | GPXEncodedData)
+    async def get_track_parsed_data(
+        track_id: int,
+        lod: int | None = Query(
+            None,
+            description=(
+                "Simplification tolerance in meters of the returned points "
+                f"(one of {list(LOD_TOLERANCES)}), full track if omitted"
+            ),
+        ),
+        format: str | None = Query(
+            None,
+            description=(
+                "Compact format of the points ('polyline' or 'columnar'), list of "
+                "point objects if omitted"
+            ),
+        ),
+    ):
         """Get parsed GPX data for a specific track by ID.
 
         This endpoint fetches the GPX file from storage, parses it, and returns
-        the structured data directly to the frontend.
+        the structured data directly to the frontend. The parsed data are cached
+        by track file path: the file path changes whenever the GPX file of the
+        track is updated, so cached entries never become stale.
 
         Parameters
         ----------
         track_id : int
             The ID of the track to fetch parsed data for
+        lod : int | None
+            Level of detail, i.e. simplification tolerance in meters, of the
+            returned points. The distance and elevation statistics are those of
+            the full track when they are stored with the track.
+        format : str | None
+            If 'columnar', the points are returned as parallel `lat`, `lon`,
+            `ele` and `time` arrays. If 'polyline', they are returned as an
+            encoded polyline with delta-encoded elevations (without times).
 
         Returns
         -------
-        GPXData
+        GPXData | GPXEncodedData
             The parsed GPX data with points, stats, and bounds
         """
         # Import globals from main
         from ..dependencies import SessionLocal as global_session_local
         from ..dependencies import storage_manager as global_storage_manager
-        from ..utils.gpx import extract_from_gpx_file
 
         if not global_session_local:
             raise HTTPException(status_code=500, detail="Database not available")
@@ -690,6 +2456,9 @@ def create_segments_router(
         if not global_storage_manager:
             raise HTTPException(status_code=500, detail="Storage manager not available")
 
+        validate_lod(lod)
+        validate_point_format(format)
+
         try:
             async with global_session_local() as session:
                 stmt = select(Track).filter(Track.id == track_id)
@@ -700,31 +2469,7 @@ def create_segments_router(
                     raise HTTPException(status_code=404, detail="Track not found")
 
                 try:
-                    # Load GPX data from storage
-                    gpx_bytes = global_storage_manager.load_gpx_data(track.file_path)
-                    if gpx_bytes is None:
-                        logger.warning(
-                            f"No GPX data found for track {track_id} at path: "
-                            f"{track.file_path}"
-                        )
-                        raise HTTPException(
-                            status_code=404, detail="GPX data not found"
-                        )
-
-                    # Parse GPX data
-                    gpx_xml_data = gpx_bytes.decode("utf-8")
-                    gpx = gpxpy.parse(gpx_xml_data)
-
-                    # Extract structured data using the utility function
-                    file_id = (
-                        track.file_path.split("/")[-1].replace(".gpx", "")
-                        if track.file_path
-                        else str(track_id)
-                    )
-                    parsed_data = extract_from_gpx_file(gpx, file_id)
-
-                    return parsed_data
-
+                    parsed_data = await load_parsed_track(track, lod)
                 except HTTPException:
                     raise
                 except Exception as e:
@@ -735,6 +2480,22 @@ def create_segments_router(
                         status_code=500, detail=f"Failed to parse GPX data: {str(e)}"
                     )
 
+                if format is None:
+                    return parsed_data
+
+                encoded_data = GPXEncodedData.model_construct(
+                    file_id=parsed_data.file_id,
+                    track_name=parsed_data.track_name,
+                    points=encode_gpx_points(parsed_data, format),
+                    total_stats=parsed_data.total_stats,
+                    bounds=parsed_data.bounds,
+                )
+                # Skip the validation of the response model on the large arrays
+                return Response(
+                    content=encoded_data.model_dump_json(),
+                    media_type="application/json",
+                )
+
         except HTTPException:
             raise
         except Exception as e:
@@ -955,9 +2716,10 @@ def create_segments_router(
 
         # Import globals from main
         from ..dependencies import SessionLocal as global_session_local
+        from ..dependencies import run_in_worker
         from ..dependencies import storage_manager as global_storage_manager
         from ..dependencies import temp_dir as global_temp_dir
-        from ..utils.gpx import generate_gpx_segment
+        from ..utils.gpx import write_gpx_segment
 
         # Import utility functions from their correct modules
         from ..utils.storage import cleanup_local_file
@@ -988,14 +2750,8 @@ def create_segments_router(
             logger.info(f"Updating track {track_id}, old file: {old_file_path}")
 
         # Handle GPX file processing
-        original_file_path = Path(global_temp_dir.name) / f"{file_id}.gpx"
-        logger.info(
-            f"Processing segment from file {file_id}.gpx at: {original_file_path}"
-        )
-
-        if not original_file_path.exists():
-            logger.warning(f"Uploaded file not found: {original_file_path}")
-            raise HTTPException(status_code=404, detail="Uploaded file not found")
+        upload_session = await load_upload_session(Path(global_temp_dir.name), file_id)
+        logger.info(f"Processing segment from uploaded file {file_id}")
 
         frontend_temp_dir = Path(global_temp_dir.name) / "gpx_segments"
         frontend_temp_dir.mkdir(parents=True, exist_ok=True)
@@ -1004,24 +2760,60 @@ def create_segments_router(
             logger.info(
                 f"Processing segment '{name}' from indices {start_index} to {end_index}"
             )
-            segment_file_id, segment_file_path, bounds = generate_gpx_segment(
-                input_file_path=original_file_path,
-                start_index=start_index,
-                end_index=end_index,
+            # Only the points of the segment are sent to the worker
+            segment_file_id, segment_file_path, bounds = await run_in_worker(
+                write_gpx_segment,
+                track=upload_session.slice_segment(start_index, end_index),
                 segment_name=name,
                 output_dir=frontend_temp_dir,
             )
             logger.info(f"Successfully created segment file: {segment_file_path}")
 
+            # Precompute the simplified geometry served inline by the search
+            try:
+                simplified_polylines = await run_in_worker(
+                    encode_gpx_polylines, segment_file_path
+                )
+            except Exception as polyline_error:
+                logger.warning(
+                    f"Failed to simplify segment '{name}': {str(polyline_error)}"
+                )
+                simplified_polylines = None
+
+            # Store the statistics so that they are not recomputed on every read,
+            # and the sidecar so that the GPX file is not parsed on every read
+            try:
+                track_stats, track_sidecar = await run_in_worker(
+                    compute_track_stats_and_sidecar, segment_file_path
+                )
+            except Exception as stats_error:
+                logger.warning(
+                    f"Failed to compute statistics of segment '{name}': "
+                    f"{str(stats_error)}"
+                )
+                track_stats, track_sidecar = None, None
+            stats_fields = track_stats._asdict() if track_stats is not None else {}
+
             try:
                 # Upload new GPX file to storage
-                storage_key = global_storage_manager.upload_gpx_segment(
+                storage_key = await global_storage_manager.aupload_gpx_segment(
                     local_file_path=segment_file_path,
                     file_id=segment_file_id,
                     prefix="gpx-segments",
+                    track_sidecar=track_sidecar,
                 )
                 logger.info(f"Successfully uploaded segment to storage: {storage_key}")
 
+                processed_file_path = (
+                    f"{global_storage_manager.get_storage_root_prefix()}/{storage_key}"
+                )
+
+                # Store the simplified levels of detail next to the GPX file,
+                # once it is uploaded so that they are never orphaned
+                await store_track_lods(
+                    segment_file_path, segment_file_id, "gpx-segments"
+                )
+
                 cleanup_success = cleanup_local_file(segment_file_path)
                 if cleanup_success:
                     logger.info(
@@ -1032,18 +2824,21 @@ def create_segments_router(
                         f"Failed to clean up local file: {segment_file_path}"
                     )
 
-                processed_file_path = (
-                    f"{global_storage_manager.get_storage_root_prefix()}/{storage_key}"
-                )
-
             except Exception as storage_error:
                 logger.error(f"Failed to upload to storage: {str(storage_error)}")
                 cleanup_local_file(segment_file_path)
+                if "processed_file_path" in locals():
+                    await global_storage_manager.adelete_gpx_segment_by_url(
+                        processed_file_path
+                    )
+                    await delete_track_lods(processed_file_path)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to upload to storage: {str(storage_error)}",
                 )
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to process GPX file for segment '{name}': {str(e)}")
             raise HTTPException(
@@ -1061,6 +2856,14 @@ def create_segments_router(
                 if not track:
                     raise HTTPException(status_code=404, detail="Track not found")
 
+                # Tiles at the previous location must be invalidated as well
+                previous_bounds = (
+                    track.bound_north,
+                    track.bound_south,
+                    track.bound_east,
+                    track.bound_west,
+                )
+
                 # Calculate new bounds and barycenter
                 barycenter_latitude = (bounds.north + bounds.south) / 2
                 barycenter_longitude = (bounds.east + bounds.west) / 2
@@ -1081,10 +2884,18 @@ def create_segments_router(
                 track.tire_wet = TireType(tire_wet)
                 track.comments = commentary_text
                 track.strava_id = strava_id
+                track.simplified_polylines = simplified_polylines
+                # Statistics of the previous file are stale even if the new
+                # ones could not be computed
+                for field in TrackStats._fields:
+                    setattr(track, field, stats_fields.get(field))
 
                 await session.commit()
                 await session.refresh(track)
 
+                on_track_written(track, previous_bounds)
+                await notify_track_changed(track, previous_bounds=previous_bounds)
+
                 # Process image data and add new TrackImage records (preserve existing)
                 try:
                     image_data_list = json.loads(image_data) if image_data else []
@@ -1131,7 +2942,7 @@ def create_segments_router(
                         )
                         old_storage_key = old_file_path[prefix_len + 1 :]
                         delete_success = (
-                            global_storage_manager.delete_gpx_segment_by_url(
+                            await global_storage_manager.adelete_gpx_segment_by_url(
                                 old_file_path
                             )
                         )
@@ -1151,6 +2962,7 @@ def create_segments_router(
                 except Exception as cleanup_e:
                     logger.warning(f"Failed to cleanup old file: {cleanup_e}")
                     # Continue even if cleanup fails
+                await delete_track_lods(old_file_path)
 
                 return TrackResponse(
                     id=track.id,
@@ -1169,14 +2981,18 @@ def create_segments_router(
                     tire_wet=track.tire_wet,
                     comments=track.comments,
                     strava_id=track.strava_id,
+                    **stats_fields,
                 )
 
         except Exception as db_e:
             logger.error(f"Failed to update segment in database: {db_e}")
             # Try to clean up the newly uploaded file since DB update failed
             try:
-                if "storage_key" in locals():
-                    global_storage_manager.delete_gpx_segment_by_url(storage_key)
+                if "processed_file_path" in locals():
+                    await global_storage_manager.adelete_gpx_segment_by_url(
+                        processed_file_path
+                    )
+                    await delete_track_lods(processed_file_path)
             except Exception as cleanup_e:
                 logger.error(f"Failed to cleanup new file after DB error: {cleanup_e}")
             raise HTTPException(
@@ -1259,11 +3075,13 @@ def create_segments_router(
                         logger.info(
                             f"Deleting GPX file from storage: {track.file_path}"
                         )
-                        global_storage_manager.delete_gpx_segment_by_url(
+                        await global_storage_manager.adelete_gpx_segment_by_url(
                             track.file_path
                         )
                 except Exception as e:
                     logger.warning(f"Failed to delete GPX file from storage: {str(e)}")
+                if track.file_path:
+                    await delete_track_lods(track.file_path)
 
                 # Delete associated images from storage
                 for image in images:
@@ -1274,7 +3092,7 @@ def create_segments_router(
                             f"{image.storage_key}"
                         )
                         logger.info(f"Deleting image from storage: {storage_url}")
-                        global_storage_manager.delete_image_by_url(storage_url)
+                        await global_storage_manager.adelete_image_by_url(storage_url)
                     except Exception as e:
                         logger.warning(f"Failed to delete image from storage: {str(e)}")
 
@@ -1294,6 +3112,9 @@ def create_segments_router(
                 await session.execute(stmt)
                 await session.commit()
 
+                on_track_deleted(track)
+                await notify_track_changed(track, deleted=True)
+
                 logger.info(
                     f"Successfully deleted track {track_id} and all associated files"
                 )
@@ -6,14 +6,13 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 
-import gpxpy
 from fastapi import APIRouter, Form, HTTPException, Query
 from sqlalchemy import select
 from stravalib import Client
 
 from src.models.strava_token import StravaToken
 from src.services.strava import StravaService
-from src.utils.gpx import extract_from_gpx_file
+from src.utils.track_sidecar import SIDECAR_SUFFIX, stage_activity_streams
 
 logger = logging.getLogger(__name__)
 
@@ -223,7 +222,13 @@ def create_strava_router(temp_dir) -> APIRouter:
         activity_id: str, strava_id: int = Query(..., description="Strava user ID")
     ):
         """Get GPX data for a Strava activity"""
-        from ..dependencies import SessionLocal, strava_config, temp_dir
+        from ..dependencies import (
+            SessionLocal,
+            run_in_worker,
+            strava_config,
+            temp_dir,
+            upload_sessions,
+        )
 
         if SessionLocal is None:
             raise HTTPException(status_code=503, detail="Database not initialized")
@@ -238,60 +243,59 @@ def create_strava_router(temp_dir) -> APIRouter:
                 strava_service = StravaService(
                     strava_config, db_session=db_session, strava_id=strava_id
                 )
-                # Check authentication by trying to get GPX
+                # Check authentication by trying to get the streams
                 # (will raise if not authenticated)
-                gpx_string = await strava_service.get_activity_gpx(activity_id)
+                streams = await strava_service.get_activity_streams(activity_id)
 
-                if not gpx_string:
+                if not streams:
                     raise HTTPException(
                         status_code=404,
                         detail="No GPX data available for this activity",
                     )
 
-                gpx_bytes = gpx_string.encode("utf-8")
-
-                # Save the GPX data to temporary file and process it
                 file_id = str(uuid.uuid4())
-
-                file_path = Path(temp_dir.name) / f"{file_id}.gpx"
                 logger.info(f"Processing Strava activity {activity_id}")
 
+                # Build the track from the streams on a worker. The GPX file is
+                # only written if a segment is created from the activity, until
+                # then the track is staged as a sidecar in the temporary directory
+                sidecar_file = Path(temp_dir.name) / f"{file_id}{SIDECAR_SUFFIX}"
                 try:
-                    with open(file_path, "wb") as f:
-                        f.write(gpx_bytes)
-                    logger.info(f"GPX file saved: {file_id}.gpx")
-                except Exception as e:
-                    logger.error(f"Failed to save Strava GPX: {str(e)}")
-                    raise HTTPException(
-                        status_code=500, detail=f"Failed to save GPX: {str(e)}"
+                    gpx_data = await run_in_worker(
+                        stage_activity_streams,
+                        streams.latlng,
+                        streams.altitude,
+                        streams.time,
+                        streams.start_date,
+                        file_id,
+                        streams.name,
+                        sidecar_file,
                     )
-
-                try:
-                    with open(file_path) as gpx_file:
-                        gpx = gpxpy.parse(gpx_file)
-                except Exception as e:
-                    if file_path.exists():
-                        file_path.unlink()
-                    logger.error(
-                        f"Failed to parse Strava GPX file {file_id}.gpx: {str(e)}"
+                    logger.info(
+                        f"Built track with {len(gpx_data.points)} points from the "
+                        f"streams of Strava activity {activity_id}"
                     )
+                except HTTPException:
+                    raise
+                except OSError as e:
+                    logger.error(f"Failed to save Strava track: {str(e)}")
                     raise HTTPException(
-                        status_code=400, detail=f"Invalid GPX file: {str(e)}"
+                        status_code=500, detail=f"Failed to save GPX: {str(e)}"
                     )
-
-                try:
-                    gpx_data = extract_from_gpx_file(gpx, file_id)
-                    logger.info(f"Parsed GPX file with {len(gpx_data.points)} points")
                 except Exception as e:
-                    if file_path.exists():
-                        file_path.unlink()
                     logger.error(
-                        f"Failed to process Strava GPX file {file_id}.gpx: {str(e)}"
+                        f"Failed to process streams of Strava activity "
+                        f"{activity_id}: {str(e)}"
                     )
                     raise HTTPException(
                         status_code=400, detail=f"Invalid GPX file: {str(e)}"
                     )
 
+                # The session is built from the sidecar when the editor needs it,
+                # registering the upload makes the sidecar expire with it
+                if upload_sessions is not None:
+                    upload_sessions.register(file_id)
+
                 # Add the file ID to the response
                 gpx_data_dict = gpx_data.model_dump()
                 gpx_data_dict["file_id"] = file_id
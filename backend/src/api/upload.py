@@ -5,19 +5,79 @@ import logging
 import uuid
 from pathlib import Path
 
-import gpxpy
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
 from PIL import Image
 from werkzeug.utils import secure_filename
 
-from ..utils.gpx import GPXData, extract_from_gpx_file
+from ..utils.gpx import GPXData
+from ..utils.point_index import MAX_NEAREST_POINTS, NearestTrackPoint
 from ..utils.storage import StorageManager, cleanup_local_file
+from ..utils.track_sidecar import SIDECAR_SUFFIX
+from ..utils.upload_sessions import (
+    UploadSession,
+    parse_upload_session,
+    read_upload_session,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["upload"])
 
 
+async def load_upload_session(temp_dir: Path, file_id: str) -> UploadSession:
+    """Get the session of an uploaded track.
+
+    Sessions are built when the files are uploaded, they are rebuilt from the
+    temporary directory when they were evicted from memory or when the track
+    was imported from Strava.
+
+    Parameters
+    ----------
+    temp_dir : Path
+        The temporary directory of the uploads
+    file_id : str
+        The ID of the uploaded file
+
+    Returns
+    -------
+    UploadSession
+        The parsed track of the upload
+
+    Raises
+    ------
+    HTTPException
+        If the file was not uploaded, or cannot be parsed
+    """
+    from ..dependencies import run_in_worker, upload_sessions
+
+    try:
+        file_id = str(uuid.UUID(file_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Uploaded file not found")
+
+    if upload_sessions is not None:
+        session = upload_sessions.get(file_id)
+        if session is not None:
+            return session
+
+    file_path = temp_dir / f"{file_id}.gpx"
+    if not file_path.exists():
+        file_path = temp_dir / f"{file_id}{SIDECAR_SUFFIX}"
+    if not file_path.exists():
+        logger.warning(f"Uploaded file not found: {file_id}")
+        raise HTTPException(status_code=404, detail="Uploaded file not found")
+
+    try:
+        session = await run_in_worker(read_upload_session, file_path, file_id)
+    except Exception as e:
+        logger.error(f"Failed to parse uploaded file {file_path.name}: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Invalid GPX file: {str(e)}")
+
+    if upload_sessions is not None:
+        upload_sessions.put(session)
+    return session
+
+
 def create_upload_router(temp_dir, storage_manager: StorageManager | None) -> APIRouter:
     """Create upload router with dependencies."""
 
@@ -44,6 +104,7 @@ def create_upload_router(temp_dir, storage_manager: StorageManager | None) -> AP
             The track information of the uploaded GPX file.
         """
         # Import globals from main
+        from ..dependencies import run_in_worker, upload_sessions
         from ..dependencies import temp_dir as global_temp_dir
 
         if not file.filename.endswith(".gpx"):
@@ -72,32 +133,72 @@ def create_upload_router(temp_dir, storage_manager: StorageManager | None) -> AP
             )
 
         try:
-            with open(file_path) as gpx_file:
-                gpx = gpxpy.parse(gpx_file)
-        except Exception as e:
-            if file_path.exists():
-                file_path.unlink()
-            logger.error(f"Failed to parse GPX file {file_id}.gpx: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Invalid GPX file: {str(e)}")
-
-        try:
-            gpx_data = extract_from_gpx_file(gpx, file_id)
+            # Parse the uploaded content directly instead of reading the file back,
+            # the session used by the editor is built in the same task
+            gpx_data, session = await run_in_worker(
+                parse_upload_session, content, file_id
+            )
             logger.info(
                 f"Successfully parsed GPX file {file_id}.gpx with "
                 f"{len(gpx_data.points)} points"
             )
+        except HTTPException:
+            if file_path.exists():
+                file_path.unlink()
+            raise
         except Exception as e:
             if file_path.exists():
                 file_path.unlink()
             logger.error(f"Failed to process GPX file {file_id}.gpx: {str(e)}")
             raise HTTPException(status_code=400, detail=f"Invalid GPX file: {str(e)}")
 
+        if upload_sessions is not None:
+            upload_sessions.put(session)
+
         # Add the file ID to the GPX data so frontend can use it for segment creation
         gpx_data_dict = gpx_data.model_dump()
         gpx_data_dict["file_id"] = file_id
 
         return gpx_data_dict
 
+    @router.get("/upload/{file_id}/nearest", response_model=list[NearestTrackPoint])
+    async def get_nearest_points(
+        file_id: str,
+        lat: float = Query(..., ge=-90, le=90),
+        lon: float = Query(..., ge=-180, le=180),
+        k: int = Query(1, ge=1, le=MAX_NEAREST_POINTS),
+    ):
+        """Find the points of an uploaded track closest to a location.
+
+        Used by the segment editor to snap the cursor to the track.
+
+        Parameters
+        ----------
+        file_id: str
+            The ID of the uploaded file.
+        lat: float
+            Latitude of the location in decimal degrees.
+        lon: float
+            Longitude of the location in decimal degrees.
+        k: int
+            Number of points to return.
+
+        Returns
+        -------
+        list[NearestTrackPoint]
+            Index, coordinates, distance to the location and distance from the
+            start of the track of the closest points, closest first.
+        """
+        from ..dependencies import temp_dir as global_temp_dir
+
+        if not global_temp_dir:
+            raise HTTPException(
+                status_code=500, detail="Temporary directory not initialized"
+            )
+
+        session = await load_upload_session(Path(global_temp_dir.name), file_id)
+        return session.point_index.nearest(lat, lon, k)
+
     @router.post("/upload-image")
     async def upload_image(file: UploadFile = File(...)):
         """Upload an image file to storage manager and return the URL.
@@ -4,15 +4,17 @@ This module provides general utility endpoints including:
 - Root endpoint for API health check
 - Map tiles proxy for secure API key management
 - Storage file serving for local development
+- Counters of the in-memory caches and of the streamed search
 """
 
 import logging
 import random
 
 import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import FileResponse, Response
 
+from ..utils.compression import accepts_encoding
 from ..utils.storage import LocalStorageManager
 
 logger = logging.getLogger(__name__)
@@ -104,16 +106,20 @@ async def get_map_tiles(z: int, x: int, y: int):
 
 
 @router.get("/storage/{file_path:path}")
-async def serve_storage_file(file_path: str):
+async def serve_storage_file(file_path: str, request: Request):
     """Serve files from local storage for development.
 
     This endpoint provides access to files stored in the local storage
     during development. It is only available when using LocalStorageManager.
+    Files stored compressed are sent as stored to the clients accepting their
+    encoding, and decompressed for the others.
 
     Parameters
     ----------
     file_path : str
         Path to the file relative to the storage root
+    request : Request
+        The request, whose Accept-Encoding header is checked for compressed files
 
     Returns
     -------
@@ -145,6 +151,80 @@ async def serve_storage_file(file_path: str):
     if not local_file_path.exists():
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(
-        local_file_path, media_type="application/gpx+xml", filename=local_file_path.name
+    content_encoding = global_storage_manager.get_content_encoding(file_path)
+    if content_encoding is None:
+        return FileResponse(
+            local_file_path,
+            media_type="application/gpx+xml",
+            filename=local_file_path.name,
+        )
+
+    if accepts_encoding(request.headers.get("accept-encoding"), content_encoding):
+        return FileResponse(
+            local_file_path,
+            media_type="application/gpx+xml",
+            filename=local_file_path.name,
+            headers={"Content-Encoding": content_encoding, "Vary": "Accept-Encoding"},
+        )
+
+    content = await global_storage_manager.aload_gpx_data(f"local:///{file_path}")
+    if content is None:
+        raise HTTPException(status_code=500, detail="Failed to decompress file")
+    return Response(
+        content=content,
+        media_type="application/gpx+xml",
+        headers={
+            "Content-Disposition": f'attachment; filename="{local_file_path.name}"',
+            "Vary": "Accept-Encoding",
+        },
+    )
+
+
+@router.get("/api/cache-stats")
+async def get_cache_stats():
+    """Get the counters of the in-memory caches.
+
+    Returns
+    -------
+    dict
+        Hits, misses, evictions, number of entries and size of each cache,
+        keyed by cache name, the number of searches executed and coalesced for
+        the search results, and the number of reloads for the authorized users.
+        Caches that are not initialized are omitted.
+    """
+    from ..dependencies import auth_directory as global_auth_directory
+    from ..dependencies import (
+        elevation_profile_cache as global_elevation_profile_cache,
     )
+    from ..dependencies import parsed_track_cache as global_parsed_track_cache
+    from ..dependencies import search_result_cache as global_search_result_cache
+    from ..dependencies import upload_sessions as global_upload_sessions
+
+    caches = {
+        "parsed_tracks": global_parsed_track_cache,
+        "elevation_profiles": global_elevation_profile_cache,
+        "upload_sessions": global_upload_sessions,
+        "search_results": global_search_result_cache,
+        "auth_users": global_auth_directory,
+    }
+    return {
+        name: cache.stats._asdict()
+        for name, cache in caches.items()
+        if cache is not None
+    }
+
+
+@router.get("/api/search-stats")
+async def get_search_stats():
+    """Get the durations of the streamed segment searches.
+
+    Returns
+    -------
+    dict
+        Number, total and maximum duration in seconds of the search queries and
+        of the event streams, and number of clients that disconnected before
+        the end of their stream.
+    """
+    from ..dependencies import search_stream_metrics
+
+    return search_stream_metrics.stats._asdict()
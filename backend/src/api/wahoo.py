@@ -5,16 +5,15 @@ import json
 import logging
 from datetime import datetime
 
-import gpxpy
 from fastapi import APIRouter, Form, HTTPException, Query
 from sqlalchemy import select
 
+from src.api.segments import load_fit_export, load_track_fit_course
 from src.dependencies import get_wahoo_config
 from src.models.track import Track, TrackType
 from src.models.wahoo_token import WahooToken
 from src.services.wahoo.client import Client
 from src.services.wahoo.service import WahooService
-from src.utils.gpx import convert_gpx_to_fit, extract_from_gpx_file
 
 logger = logging.getLogger(__name__)
 
@@ -271,31 +270,22 @@ def create_wahoo_router() -> APIRouter:
                         status_code=500, detail="Storage manager not available"
                     )
 
-                gpx_bytes = global_storage_manager.load_gpx_data(track.file_path)
-
-                if gpx_bytes is None:
-                    logger.error(f"Failed to load GPX data from {track.file_path}")
-                    raise HTTPException(status_code=404, detail="GPX file not found")
-
-                gpx_content = gpx_bytes.decode("utf-8")
+                # Convert the route to FIT on a worker, unless already converted
+                fit_course = await load_track_fit_course(
+                    track, await load_fit_export(track)
+                )
 
                 wahoo_config = get_wahoo_config()
                 wahoo_service = WahooService(
                     wahoo_config, db_session=session, wahoo_id=wahoo_id
                 )
-
-                # Parse GPX and extract metadata
-                gpx = gpxpy.parse(gpx_content)
-                gpx_data = extract_from_gpx_file(gpx, str(route_id))
+                gpx_data = fit_course.gpx_data
 
                 # Get start point
                 start_point = gpx_data.points[0] if gpx_data.points else None
 
-                # Convert GPX to FIT format
-                fit_bytes = convert_gpx_to_fit(gpx, track.name)
-
                 # Encode FIT content as base64 data URI for Wahoo API
-                fit_base64 = base64.b64encode(fit_bytes).decode("utf-8")
+                fit_base64 = base64.b64encode(fit_course.fit_bytes).decode("utf-8")
                 route_file_data_uri = f"data:application/vnd.fit;base64,{fit_base64}"
 
                 # Call Wahoo service to upload route
@@ -308,7 +298,9 @@ def create_wahoo_router() -> APIRouter:
                     "route_name": track.name,
                     "description": track.comments or "",
                     "provider_updated_at": (
-                        gpx.time.isoformat() if gpx.time else datetime.now().isoformat()
+                        fit_course.time.isoformat()
+                        if fit_course.time
+                        else datetime.now().isoformat()
                     ),
                     "start_lat": start_point.latitude if start_point else 0.0,
                     "start_lng": start_point.longitude if start_point else 0.0,
@@ -5,11 +5,17 @@ for database connections, storage management, and service instances.
 """
 
 import logging
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
 from tempfile import TemporaryDirectory
+from typing import Any, TypeVar
 
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.models.auth_user import AuthUserSummary
+from src.models.track import TrackResponse
+from src.utils.auth_directory import AuthDirectory
+from src.utils.cache import LRUCache
 from src.utils.config import (
     DatabaseConfig,
     MapConfig,
@@ -19,10 +25,20 @@ from src.utils.config import (
     WahooConfig,
     load_environment_config,
 )
+from src.utils.event_stream import EventStreamMetrics
+from src.utils.gpx import GPXData
+from src.utils.profile import ElevationProfile
+from src.utils.search_cache import SearchResultCache
+from src.utils.spatial_index import TrackSpatialIndex
 from src.utils.storage import StorageManager
+from src.utils.upload_sessions import UploadSessionStore
+from src.utils.vector_tiles import TileCache
+from src.utils.worker_pool import WorkerPool, WorkerPoolFullError
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 # Load configuration at module level
 (
     _db_config,
@@ -36,6 +52,25 @@ logger = logging.getLogger(__name__)
 # Global state
 temp_dir: TemporaryDirectory | None = None
 storage_manager: StorageManager | None = None
+# In-memory spatial index of the tracks, built at startup from the database
+track_index: TrackSpatialIndex | None = None
+# On-disk cache of the vector tiles, stored in the temporary directory
+tile_cache: TileCache | None = None
+# Process pool running the CPU-bound track processing off the event loop
+worker_pool: WorkerPool | None = None
+# Parsed GPX data of the tracks, keyed by track file path
+parsed_track_cache: LRUCache[str, GPXData] | None = None
+# Elevation profiles of the tracks, keyed by track file path and width bucket
+elevation_profile_cache: LRUCache[tuple[str, int], ElevationProfile] | None = None
+# Parsed uploaded tracks, and expiry of the uploaded files
+upload_sessions: UploadSessionStore | None = None
+# Tracks found by the recent segment searches, keyed by search parameters, None
+# when no route author is authorized
+search_result_cache: SearchResultCache[tuple, list[TrackResponse] | None] | None = None
+# Authorized users, refreshed on the notifications of the database
+auth_directory: AuthDirectory[AuthUserSummary] | None = None
+# Query and stream durations of the streamed segment search
+search_stream_metrics = EventStreamMetrics()
 # Strava service and Wahoo service are now created per-request with database session
 engine = None
 SessionLocal = None
@@ -90,6 +125,43 @@ def get_storage() -> StorageManager:
     return storage_manager
 
 
+async def run_in_worker(function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a CPU-bound function on the worker pool.
+
+    The function runs inline when the worker pool is not initialized.
+
+    Parameters
+    ----------
+    function : Callable[..., T]
+        Module-level function to run.
+    *args : Any
+        Positional arguments of the function.
+    **kwargs : Any
+        Keyword arguments of the function.
+
+    Returns
+    -------
+    T
+        Value returned by the function.
+
+    Raises
+    ------
+    HTTPException
+        503 if the worker pool is full.
+    """
+    if worker_pool is None:
+        return function(*args, **kwargs)
+    try:
+        return await worker_pool.run(function, *args, **kwargs)
+    except WorkerPoolFullError as e:
+        logger.warning(f"Rejecting {function.__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other files, please retry later",
+            headers={"Retry-After": "5"},
+        )
+
+
 def get_strava_config() -> StravaConfig:
     """Get Strava configuration.
 
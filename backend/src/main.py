@@ -4,8 +4,10 @@ This module provides the FastAPI application initialization, lifespan management
 middleware configuration, and router registration.
 """
 
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
 from tempfile import TemporaryDirectory
 
 import uvicorn
@@ -14,16 +16,34 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from . import dependencies
-from .api.auth import create_auth_router
+from .api.auth import create_auth_router, on_auth_users_changed
 from .api.routes import create_routes_router
-from .api.segments import create_segments_router
+from .api.segments import (
+    build_track_index,
+    create_segments_router,
+    on_tracks_changed,
+)
 from .api.strava import create_strava_router
 from .api.upload import create_upload_router
 from .api.utils import router as utils_router
 from .api.wahoo import create_wahoo_router
+from .models.auth_user import AUTH_USERS_CHANNEL
 from .models.base import Base
-from .utils.postgres import get_database_url
+from .models.track import TRACKS_CHANNEL
+from .utils.auth_directory import AuthDirectory
+from .utils.cache import LRUCache
+from .utils.http_compression import CompressionMiddleware
+from .utils.postgres import (
+    add_missing_columns,
+    create_missing_indexes,
+    get_database_url,
+    listen_for_notifications,
+)
+from .utils.search_cache import SearchResultCache
 from .utils.storage import get_storage_manager
+from .utils.upload_sessions import UploadSessionStore
+from .utils.vector_tiles import TileCache
+from .utils.worker_pool import WorkerPool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -41,10 +61,15 @@ async def lifespan(app: FastAPI):
     """Initialize resources on startup and clean up on shutdown.
 
     This context manager handles:
-    - Temporary directory creation
+    - Temporary directory and vector tile cache creation
+    - Track processing worker pool startup
+    - Parsed track cache, upload session store, search cache and authorized
+      users directory creation
     - Database engine and session initialization
     - Storage manager initialization
     - Database table creation
+    - Track spatial index construction
+    - Listeners of the authorized users and tracks changes
     - Cleanup on shutdown
 
     Parameters
@@ -60,6 +85,39 @@ async def lifespan(app: FastAPI):
     # Initialize temporary directory
     dependencies.temp_dir = TemporaryDirectory(prefix="cycling_gpx_")
     logger.info(f"Created temporary directory: {dependencies.temp_dir.name}")
+    dependencies.tile_cache = TileCache(Path(dependencies.temp_dir.name) / "tiles")
+
+    # Start the worker processes of the CPU-bound track processing
+    dependencies.worker_pool = WorkerPool(
+        max_workers=dependencies.server_config.worker_processes,
+        max_pending=dependencies.server_config.worker_max_pending,
+    )
+    logger.info(
+        f"Worker pool started with {dependencies.server_config.worker_processes} "
+        f"processes"
+    )
+
+    # Parsed GPX data are bounded by their total number of points
+    dependencies.parsed_track_cache = LRUCache(
+        max_size=dependencies.server_config.parsed_track_cache_points,
+        sizeof=lambda gpx_data: len(gpx_data.points) + 1,
+    )
+    dependencies.elevation_profile_cache = LRUCache(
+        max_size=dependencies.server_config.elevation_profile_cache_points,
+        sizeof=lambda profile: len(profile.indices) + 1,
+    )
+    dependencies.upload_sessions = UploadSessionStore(
+        temp_dir=Path(dependencies.temp_dir.name),
+        ttl=dependencies.server_config.upload_session_ttl_seconds,
+        max_points=dependencies.server_config.upload_session_cache_points,
+    )
+    dependencies.search_result_cache = SearchResultCache(
+        ttl=dependencies.server_config.search_cache_ttl_seconds,
+        max_entries=dependencies.server_config.search_cache_entries,
+    )
+    dependencies.auth_directory = AuthDirectory(
+        ttl=dependencies.server_config.auth_users_cache_ttl_seconds
+    )
 
     # Initialize database
     try:
@@ -96,19 +154,72 @@ async def lifespan(app: FastAPI):
         try:
             async with dependencies.engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(add_missing_columns, Base.metadata)
+                await conn.run_sync(create_missing_indexes, Base.metadata)
             logger.info("Database tables ensured")
         except Exception as db_e:
             logger.warning(f"Could not initialize database: {db_e}")
     else:
         logger.warning("Skipping database initialization - engine not available")
 
+    # Build the in-memory spatial index used by the segment search
+    if dependencies.SessionLocal is not None:
+        try:
+            dependencies.track_index = await build_track_index(
+                dependencies.SessionLocal
+            )
+            logger.info(
+                f"Track spatial index built with {len(dependencies.track_index)} tracks"
+            )
+        except Exception as index_e:
+            logger.warning(f"Could not build track spatial index: {index_e}")
+            dependencies.track_index = None
+    else:
+        logger.warning("Skipping track spatial index - database not available")
+
+    # Keep the authorized users, the spatial index and the caches of every
+    # server process in sync with the database
+    listeners = []
+    if dependencies.engine is not None:
+        listeners = [
+            asyncio.create_task(
+                listen_for_notifications(dependencies.engine, channel, callback)
+            )
+            for channel, callback in (
+                (AUTH_USERS_CHANNEL, on_auth_users_changed),
+                (TRACKS_CHANNEL, on_tracks_changed),
+            )
+        ]
+
     yield
 
+    for listener in listeners:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
+
+    # The index must not outlive the database it was loaded from
+    dependencies.track_index = None
+    dependencies.tile_cache = None
+    dependencies.parsed_track_cache = None
+    dependencies.elevation_profile_cache = None
+    dependencies.upload_sessions = None
+    dependencies.search_result_cache = None
+    dependencies.auth_directory = None
+
+    if dependencies.worker_pool is not None:
+        logger.info("Stopping worker pool")
+        dependencies.worker_pool.shutdown()
+        dependencies.worker_pool = None
+
     # Cleanup on shutdown
     if dependencies.temp_dir:
         logger.info(f"Cleaning up temporary directory: {dependencies.temp_dir.name}")
         dependencies.temp_dir.cleanup()
 
+    if dependencies.storage_manager is not None:
+        dependencies.storage_manager.close()
+
     if dependencies.engine:
         logger.info("Closing database engine")
         await dependencies.engine.dispose()
@@ -138,6 +249,12 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compress the responses with the encoding accepted by the client
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=dependencies.server_config.compression_minimum_size,
+)
+
 # Register routers
 app.include_router(utils_router)
 app.include_router(
@@ -8,6 +8,9 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
 
+# Channel of the database notifications sent when the authorized users change
+AUTH_USERS_CHANNEL = "auth_users_changed"
+
 
 class AuthUser(Base):
     """Database model for users authorized to access editor feature."""
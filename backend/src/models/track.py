@@ -1,12 +1,25 @@
 import enum
 from datetime import UTC, datetime
 
-from pydantic import BaseModel
-from sqlalchemy import ARRAY, DateTime, Enum, Float, Index, Integer, String, Text
+from pydantic import BaseModel, Field
+from sqlalchemy import (
+    ARRAY,
+    JSON,
+    DateTime,
+    Enum,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
 
+# Channel of the database notifications sent when a track is written or deleted
+TRACKS_CHANNEL = "tracks_changed"
+
 
 class TrackType(enum.Enum):
     SEGMENT = "segment"
@@ -38,6 +51,17 @@ class Track(Base):
             "bound_east",
             "bound_west",
         ),
+        # Attribute filters of the segment search
+        Index(
+            "idx_track_type_difficulty_tires",
+            "track_type",
+            "difficulty_level",
+            "tire_dry",
+            "tire_wet",
+        ),
+        Index("idx_track_surface_type", "surface_type", postgresql_using="gin"),
+        # Distance filter and sorting of the segment search
+        Index("idx_track_total_distance", "total_distance"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -58,6 +82,18 @@ class Track(Base):
     tire_wet: Mapped[TireType] = mapped_column(Enum(TireType))
     comments: Mapped[str] = mapped_column(Text)
     strava_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    # Encoded polylines of the simplified track, keyed by tolerance in meters
+    simplified_polylines: Mapped[dict[str, str] | None] = mapped_column(
+        JSON, nullable=True
+    )
+    # Statistics computed from the GPX file when the track is written, null for
+    # the tracks written before they were stored (see backfill_track_stats.py)
+    total_distance: Mapped[float | None] = mapped_column(Float, nullable=True)
+    total_elevation_gain: Mapped[float | None] = mapped_column(Float, nullable=True)
+    total_elevation_loss: Mapped[float | None] = mapped_column(Float, nullable=True)
+    total_points: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    min_elevation: Mapped[float | None] = mapped_column(Float, nullable=True)
+    max_elevation: Mapped[float | None] = mapped_column(Float, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.now(UTC), nullable=False
     )
@@ -90,6 +126,14 @@ class TrackResponse(BaseModel):
     tire_wet: str
     comments: str
     strava_id: int
+    total_distance: float | None = None
+    total_elevation_gain: float | None = None
+    total_elevation_loss: float | None = None
+    total_points: int | None = None
+    min_elevation: float | None = None
+    max_elevation: float | None = None
+    # Only serialized on request by the search endpoint
+    simplified_polylines: dict[str, str] | None = Field(default=None, exclude=True)
 
 
 class TrackWithGPXDataResponse(TrackResponse):
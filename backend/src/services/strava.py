@@ -3,7 +3,7 @@
 import json
 import logging
 from datetime import datetime
-from typing import Any
+from typing import Any, NamedTuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,6 +16,17 @@ from ..utils.config import StravaConfig
 logger = logging.getLogger(__name__)
 
 
+class ActivityStreams(NamedTuple):
+    """GPS streams of a Strava activity, one value per sample."""
+
+    name: str
+    start_date: datetime
+    latlng: list[tuple[float, float]]
+    # None if the activity has no altitude or time stream
+    altitude: list[float] | None
+    time: list[float] | None
+
+
 class StravaService:
     """Strava API service using the official stravalib library.
 
@@ -477,6 +488,66 @@ class StravaService:
             logger.error(f"Failed to get GPX for activity {activity_id}: {e}")
             raise
 
+    async def get_activity_streams(self, activity_id: str) -> ActivityStreams | None:
+        """Get the GPS streams of a specific activity.
+
+        Parameters
+        ----------
+        activity_id : str
+            The Strava activity ID as a string.
+
+        Returns
+        -------
+        ActivityStreams | None
+            The name, start date and position, altitude and time streams of the
+            activity, or None if the activity doesn't have GPS data.
+
+        Raises
+        ------
+        AccessUnauthorized
+            If authentication fails or tokens are invalid.
+        Exception
+            If the API request fails for any other reason.
+
+        Notes
+        -----
+        Unlike `get_activity_gpx`, the streams are returned as is, so that the
+        track is built from them without formatting and parsing GPX data.
+        """
+        try:
+            await self._ensure_authenticated()
+
+            activity = self.client.get_activity(int(activity_id))
+            streams = self.client.get_activity_streams(
+                int(activity_id), types=["time", "latlng", "altitude"]
+            )
+
+            latlng_stream = streams.get("latlng")
+            if not latlng_stream:
+                logger.warning(f"No GPS data available for activity {activity_id}")
+                return None
+
+            altitude_stream = streams.get("altitude")
+            time_stream = streams.get("time")
+            logger.info(f"Retrieved GPS streams for activity {activity_id}")
+            return ActivityStreams(
+                name=activity.name or "Strava Activity",
+                start_date=activity.start_date,
+                latlng=latlng_stream.data,
+                altitude=altitude_stream.data if altitude_stream else None,
+                time=time_stream.data if time_stream else None,
+            )
+
+        except RateLimitExceeded as e:
+            logger.error(f"Strava API rate limit exceeded: {e}")
+            raise
+        except AccessUnauthorized as e:
+            logger.error(f"Strava API access unauthorized: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to get streams for activity {activity_id}: {e}")
+            raise
+
     def _construct_gpx_from_streams(self, activity, streams) -> str | None:
         """Construct GPX XML from activity streams.
 
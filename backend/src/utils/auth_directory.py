@@ -0,0 +1,119 @@
+"""
+Auth Directory Module
+
+This module keeps the set of authorized users in memory. The route search and
+the vector tiles filter the routes by their author, and the editor checks the
+authorization of its user on every page load: all of them read the same
+in-memory snapshot of the authorized users instead of querying the database.
+
+The snapshot is reloaded after a time to live, or on the next read after an
+explicit invalidation, e.g. when the database notifies that the authorized
+users changed. Concurrent reads of an expired snapshot share a single reload.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from types import MappingProxyType
+from typing import Generic, NamedTuple, TypeVar
+
+V = TypeVar("V")
+
+
+class AuthDirectoryStats(NamedTuple):
+    """Counters of an auth directory."""
+
+    hits: int
+    loads: int
+    invalidations: int
+    entries: int
+
+
+class AuthDirectory(Generic[V]):
+    """In-memory snapshot of the authorized users, keyed by Strava ID.
+
+    A snapshot loaded while the directory is invalidated is returned to the
+    reader that loaded it but is not kept, so that a change notified during a
+    reload is not missed.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """Initialize the directory.
+
+        Parameters
+        ----------
+        ttl : float
+            Time in seconds after which the snapshot is reloaded.
+        clock : Callable[[], float]
+            Function returning the current time in seconds.
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._users: Mapping[int, V] | None = None
+        self._strava_ids: frozenset[int] = frozenset()
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    def _fresh(self) -> bool:
+        return self._users is not None and self._expires_at > self._clock()
+
+    async def users(
+        self, load: Callable[[], Awaitable[Mapping[int, V]]]
+    ) -> Mapping[int, V]:
+        """Get the authorized users, reloading them if needed.
+
+        Parameters
+        ----------
+        load : Callable[[], Awaitable[Mapping[int, V]]]
+            Function loading the authorized users from the database, called
+            when the snapshot is expired or invalidated.
+
+        Returns
+        -------
+        Mapping[int, V]
+            Read-only mapping of the authorized users by Strava ID.
+        """
+        if self._fresh():
+            self.hits += 1
+            return self._users
+        async with self._lock:
+            # Another reader may have reloaded the snapshot meanwhile
+            if self._fresh():
+                self.hits += 1
+                return self._users
+            generation = self._generation
+            users = MappingProxyType(dict(await load()))
+            self.loads += 1
+            if generation == self._generation:
+                self._users = users
+                self._strava_ids = frozenset(users)
+                self._expires_at = self._clock() + self.ttl
+            return users
+
+    async def strava_ids(
+        self, load: Callable[[], Awaitable[Mapping[int, V]]]
+    ) -> frozenset[int]:
+        """Get the Strava IDs of the authorized users, see `users`."""
+        users = await self.users(load)
+        return self._strava_ids if users is self._users else frozenset(users)
+
+    def invalidate(self) -> None:
+        """Reload the authorized users on the next read."""
+        self._generation += 1
+        self._users = None
+        self._strava_ids = frozenset()
+        self.invalidations += 1
+
+    @property
+    def stats(self) -> AuthDirectoryStats:
+        """Counters and current size of the directory."""
+        return AuthDirectoryStats(
+            hits=self.hits,
+            loads=self.loads,
+            invalidations=self.invalidations,
+            entries=len(self._users) if self._users is not None else 0,
+        )
@@ -0,0 +1,138 @@
+"""
+Cache Module
+
+This module provides a size-bounded in-memory LRU (least recently used) cache
+with hit, miss and eviction counters, used to keep derived track data (e.g.
+parsed GPX files) in memory between requests.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, NamedTuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheStats(NamedTuple):
+    """Counters of a cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+    max_size: int
+
+
+class LRUCache(Generic[K, V]):
+    """In-memory cache evicting the least recently used entries.
+
+    The size of each entry is given by a `sizeof` function (1 per entry by
+    default), and entries are evicted until the total size fits in `max_size`.
+    An entry larger than `max_size` is not cached at all.
+    """
+
+    def __init__(self, max_size: int, sizeof: Callable[[V], int] | None = None):
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        max_size : int
+            Maximum total size of the cached entries.
+        sizeof : Callable[[V], int] | None
+            Function computing the size of a value, each entry counts for 1
+            if None.
+        """
+        self.max_size = max_size
+        self._sizeof = sizeof
+        self._entries: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def get(self, key: K) -> V | None:
+        """Get a cached value and mark it as the most recently used.
+
+        Parameters
+        ----------
+        key : K
+            Key of the value.
+
+        Returns
+        -------
+        V | None
+            Cached value, or None if the key is not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: K, value: V) -> None:
+        """Cache a value, evicting the least recently used entries if needed.
+
+        Parameters
+        ----------
+        key : K
+            Key of the value.
+        value : V
+            Value to cache, replacing any value cached with the same key.
+        """
+        size = 1 if self._sizeof is None else self._sizeof(value)
+        self.invalidate(key)
+        if size > self.max_size:
+            return
+
+        self._entries[key] = (value, size)
+        self._size += size
+        while self._size > self.max_size:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self.evictions += 1
+
+    def invalidate(self, key: K) -> bool:
+        """Remove a cached value.
+
+        Parameters
+        ----------
+        key : K
+            Key of the value.
+
+        Returns
+        -------
+        bool
+            True if the key was cached, False otherwise.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._size -= entry[1]
+        return True
+
+    def clear(self) -> None:
+        """Remove all the cached values, keeping the counters."""
+        self._entries.clear()
+        self._size = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """Counters and current size of the cache."""
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            size=self._size,
+            max_size=self.max_size,
+        )
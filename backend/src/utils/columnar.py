@@ -0,0 +1,146 @@
+"""
+Columnar Track Module
+
+This module provides a columnar representation of GPS tracks, holding the point
+attributes as NumPy arrays so that distances, elevation changes and bounds are
+computed with vectorized operations instead of Python loops over the points.
+"""
+
+from collections.abc import Iterable
+from typing import NamedTuple
+
+import numpy as np
+
+from .math import cumulative_distances, haversine_distances
+
+
+class ColumnarTrack(NamedTuple):
+    """Track points stored as columns.
+
+    Attributes
+    ----------
+    latitudes : np.ndarray
+        Latitudes in decimal degrees (float64).
+    longitudes : np.ndarray
+        Longitudes in decimal degrees (float64).
+    elevations : np.ndarray
+        Elevations in meters (float64).
+    times : np.ndarray
+        ISO 8601 timestamps (object array of str), kept as text so that the
+        timezone of the source file is preserved.
+    segment_ids : np.ndarray
+        Index of the track segment of each point (int64). Distances and elevation
+        changes are not accumulated between points of different segments.
+    """
+
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    elevations: np.ndarray
+    times: np.ndarray
+    segment_ids: np.ndarray
+
+    @classmethod
+    def from_points(
+        cls, points: Iterable[tuple[float, float, float, str, int]]
+    ) -> "ColumnarTrack":
+        """Build a columnar track from (latitude, longitude, elevation, time,
+        segment index) tuples.
+
+        Parameters
+        ----------
+        points : Iterable[tuple[float, float, float, str, int]]
+            Track points, in order.
+
+        Returns
+        -------
+        ColumnarTrack
+            The columnar track.
+        """
+        columns = list(zip(*points, strict=True)) or [(), (), (), (), ()]
+        latitudes, longitudes, elevations, times, segment_ids = columns
+        return cls(
+            latitudes=np.array(latitudes, dtype=np.float64),
+            longitudes=np.array(longitudes, dtype=np.float64),
+            elevations=np.array(elevations, dtype=np.float64),
+            times=np.array(times, dtype=object),
+            segment_ids=np.array(segment_ids, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    def _same_segment(self) -> np.ndarray:
+        """Mask of the consecutive point pairs belonging to the same segment."""
+        return self.segment_ids[1:] == self.segment_ids[:-1]
+
+    def step_distances(self) -> np.ndarray:
+        """Compute the distance between consecutive points in kilometers.
+
+        Returns
+        -------
+        np.ndarray
+            Array of length `len(self) - 1`, 0 between points of different
+            segments.
+        """
+        if len(self) < 2:
+            return np.zeros(0)
+        distances = haversine_distances(
+            self.latitudes[:-1],
+            self.longitudes[:-1],
+            self.latitudes[1:],
+            self.longitudes[1:],
+        )
+        return np.where(self._same_segment(), distances, 0.0)
+
+    def cumulative_distances(self) -> np.ndarray:
+        """Compute the distance from the first point for each point in kilometers.
+
+        Returns
+        -------
+        np.ndarray
+            Array of length `len(self)`, starting at 0.
+        """
+        if len(self) == 0:
+            return np.zeros(0)
+        if np.all(self.segment_ids == self.segment_ids[0]):
+            return cumulative_distances(self.latitudes, self.longitudes)
+        return np.concatenate(([0.0], np.cumsum(self.step_distances())))
+
+    def total_distance(self) -> float:
+        """Compute the total distance of the track in kilometers."""
+        return float(self.step_distances().sum())
+
+    def elevation_gain_loss(self) -> tuple[float, float]:
+        """Compute the total elevation gain and loss of the track in meters.
+
+        Returns
+        -------
+        tuple[float, float]
+            Total elevation gain and total elevation loss (both positive).
+        """
+        if len(self) < 2:
+            return 0.0, 0.0
+        differences = np.where(self._same_segment(), np.diff(self.elevations), 0.0)
+        gain = float(differences[differences > 0].sum())
+        loss = float(-differences[differences < 0].sum())
+        return gain, loss
+
+    def bounds(self) -> tuple[float, float, float, float, float, float]:
+        """Compute the geographic and elevation bounds of the track.
+
+        Returns
+        -------
+        tuple[float, float, float, float, float, float]
+            North, south, east, west bounds in degrees, then minimum and maximum
+            elevations in meters. Empty tracks have infinite bounds.
+        """
+        if len(self) == 0:
+            return -np.inf, np.inf, -np.inf, np.inf, np.inf, -np.inf
+        return (
+            float(self.latitudes.max()),
+            float(self.latitudes.min()),
+            float(self.longitudes.max()),
+            float(self.longitudes.min()),
+            float(self.elevations.min()),
+            float(self.elevations.max()),
+        )
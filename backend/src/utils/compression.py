@@ -0,0 +1,276 @@
+"""
+Compression Module
+
+This module compresses the GPX files stored at rest. GPX XML compresses by an
+order of magnitude, so the storage managers can store it gzip or zstd
+compressed, marking the objects with a content encoding. The encodings are the
+HTTP content codings, so that the stored bytes can be sent as is to the clients
+accepting them.
+
+It also provides the content negotiation and the streaming compressors used to
+compress the HTTP responses, see `http_compression`.
+
+zstd compression requires the optional `zstandard` package, and brotli
+compression the optional `brotli` package.
+"""
+
+import gzip
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Content encodings of the GPX files stored at rest
+GPX_CONTENT_ENCODINGS = ("gzip", "zstd")
+
+# zstd level 9 keeps the compression fast while compressing GPX files better
+# than the maximum gzip level
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 9
+
+
+def validate_content_encoding(encoding: str | None) -> None:
+    """Check that a content encoding is supported.
+
+    Parameters
+    ----------
+    encoding : str | None
+        Content encoding, None for uncompressed content.
+
+    Raises
+    ------
+    ValueError
+        If the encoding is unknown, or zstd without the `zstandard` package.
+    """
+    if encoding is None:
+        return
+    if encoding not in GPX_CONTENT_ENCODINGS:
+        raise ValueError(
+            f"Invalid content encoding: {encoding}. "
+            f"Must be one of {list(GPX_CONTENT_ENCODINGS)}"
+        )
+    if encoding == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the 'zstandard' package")
+
+
+def compress(data: bytes, encoding: str | None) -> bytes:
+    """Compress content with a content encoding.
+
+    Parameters
+    ----------
+    data : bytes
+        Uncompressed content.
+    encoding : str | None
+        'gzip' or 'zstd', None to return the content as is.
+
+    Returns
+    -------
+    bytes
+        Compressed content.
+    """
+    validate_content_encoding(encoding)
+    if encoding == "gzip":
+        # No modification time in the header, so that the output only depends
+        # on the content
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def decompress(data: bytes, encoding: str | None) -> bytes:
+    """Decompress content stored with a content encoding.
+
+    Parameters
+    ----------
+    data : bytes
+        Stored content.
+    encoding : str | None
+        Content encoding of the stored content, None if uncompressed.
+
+    Returns
+    -------
+    bytes
+        Uncompressed content.
+    """
+    validate_content_encoding(encoding)
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "zstd":
+        # Frames written by `compress` hold the content size, streaming
+        # decompression also handles frames without it
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def accepts_encoding(accept_encoding: str | None, encoding: str) -> bool:
+    """Check whether an Accept-Encoding header accepts a content encoding.
+
+    Parameters
+    ----------
+    accept_encoding : str | None
+        Value of the Accept-Encoding request header.
+    encoding : str
+        Content encoding of the response.
+
+    Returns
+    -------
+    bool
+        True if the encoding is accepted with a non-zero quality, explicitly
+        or through the '*' wildcard.
+    """
+    qualities = parse_accept_encoding(accept_encoding)
+    # An explicit quality of the encoding takes precedence over the wildcard
+    return qualities.get(encoding, qualities.get("*", 0.0)) > 0
+
+
+def parse_accept_encoding(accept_encoding: str | None) -> dict[str, float]:
+    """Parse the qualities of the content codings of an Accept-Encoding header.
+
+    Parameters
+    ----------
+    accept_encoding : str | None
+        Value of the Accept-Encoding request header.
+
+    Returns
+    -------
+    dict[str, float]
+        Quality of each content coding listed in the header, in lower case.
+    """
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *parameters = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities
+
+
+def available_http_encodings() -> tuple[str, ...]:
+    """Get the content encodings of the HTTP responses, preferred first.
+
+    zstd and brotli compress faster and smaller than gzip, they are only
+    available with their optional packages.
+
+    Returns
+    -------
+    tuple[str, ...]
+        Content encodings supported by `StreamCompressor`.
+    """
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+def negotiate_encoding(
+    accept_encoding: str | None, encodings: tuple[str, ...]
+) -> str | None:
+    """Select the content encoding of a response from an Accept-Encoding header.
+
+    Parameters
+    ----------
+    accept_encoding : str | None
+        Value of the Accept-Encoding request header.
+    encodings : tuple[str, ...]
+        Content encodings supported by the server, preferred first.
+
+    Returns
+    -------
+    str | None
+        Accepted encoding with the highest quality, the server preference
+        breaking ties, or None if the client accepts none of them.
+    """
+    qualities = parse_accept_encoding(accept_encoding)
+    best_encoding, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+class StreamCompressor:
+    """Incremental compressor of an HTTP response body.
+
+    Each chunk is compressed and flushed, so that the client can decode it
+    without waiting for the end of the stream, while the compression context is
+    kept from one chunk to the next.
+    """
+
+    def __init__(self, encoding: str):
+        """Initialize the compressor.
+
+        Parameters
+        ----------
+        encoding : str
+            Content encoding, one of `available_http_encodings`.
+
+        Raises
+        ------
+        ValueError
+            If the encoding is not available.
+        """
+        if encoding not in available_http_encodings():
+            raise ValueError(f"Unavailable content encoding: {encoding}")
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        elif encoding == "zstd":
+            # Lower level than at rest, responses are compressed on every request
+            self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        else:
+            self._compressor = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it.
+
+        Parameters
+        ----------
+        data : bytes
+            Uncompressed chunk.
+
+        Returns
+        -------
+        bytes
+            Compressed data, decodable together with the previous chunks.
+        """
+        if self.encoding == "gzip":
+            return self._compressor.compress(data) + self._compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+        if self.encoding == "zstd":
+            return self._compressor.compress(data) + self._compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        """End the compressed stream.
+
+        Returns
+        -------
+        bytes
+            Remaining compressed data and end of stream marker.
+        """
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
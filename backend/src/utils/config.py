@@ -7,11 +7,17 @@ from typing import NamedTuple
 
 from dotenv import load_dotenv
 
+from .compression import validate_content_encoding
+
 # Configure detailed logging for configuration loading
 logger = logging.getLogger(__name__)
 # Don't override the global logging level - use INFO level
 logger.setLevel(logging.INFO)
 
+# Default number of worker processes for the CPU-bound track processing: one per
+# CPU, at most 4
+DEFAULT_WORKER_PROCESSES = min(4, os.cpu_count() or 1)
+
 
 class DatabaseConfig(NamedTuple):
     """Database configuration parameters."""
@@ -31,6 +37,11 @@ class S3StorageConfig(NamedTuple):
     access_key_id: str
     secret_access_key: str
     region: str
+    # Size of the shared HTTP connection pool of the S3 client
+    max_connections: int = 10
+    # Content encoding ('gzip' or 'zstd') of the GPX files stored at rest, None
+    # to store them uncompressed
+    gpx_compression: str | None = None
 
 
 class LocalStorageConfig(NamedTuple):
@@ -39,6 +50,11 @@ class LocalStorageConfig(NamedTuple):
     storage_type: str  # Always "local"
     storage_root: str
     base_url: str
+    # Maximum number of concurrent file operations
+    max_connections: int = 10
+    # Content encoding ('gzip' or 'zstd') of the GPX files stored at rest, None
+    # to store them uncompressed
+    gpx_compression: str | None = None
 
 
 class StravaConfig(NamedTuple):
@@ -71,6 +87,26 @@ class ServerConfig(NamedTuple):
     frontend_port: int
     frontend_url: str
     backend_url: str
+    # Worker processes for the CPU-bound track processing (0 runs it inline)
+    worker_processes: int = DEFAULT_WORKER_PROCESSES
+    # Maximum number of track processing tasks running or queued
+    worker_max_pending: int = 16
+    # Maximum number of GPX points kept in the parsed track cache
+    parsed_track_cache_points: int = 500000
+    # Maximum number of points kept in the elevation profile cache
+    elevation_profile_cache_points: int = 200000
+    # Maximum number of points of the upload sessions kept in memory
+    upload_session_cache_points: int = 1000000
+    # Time in seconds after which unused uploads and their files are removed
+    upload_session_ttl_seconds: int = 7200
+    # Time in seconds during which identical segment searches share their results
+    search_cache_ttl_seconds: float = 5.0
+    # Maximum number of segment search results kept in memory
+    search_cache_entries: int = 1000
+    # Time in seconds after which the authorized users are read again
+    auth_users_cache_ttl_seconds: float = 300.0
+    # Minimum size in bytes of the complete HTTP responses to compress
+    compression_minimum_size: int = 1024
 
 
 # Union type for storage configurations
@@ -240,6 +276,10 @@ def load_environment_config(
         password=os.getenv("DB_PASSWORD"),
     )
 
+    storage_max_connections = int(os.getenv("STORAGE_MAX_CONNECTIONS", "10"))
+    gpx_compression = os.getenv("STORAGE_GPX_COMPRESSION", "").lower() or None
+    validate_content_encoding(gpx_compression)
+
     # Create storage configuration based on type
     if storage_type == "s3":
         storage_config = S3StorageConfig(
@@ -248,12 +288,16 @@ def load_environment_config(
             access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
             secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
             region=os.getenv("AWS_REGION", "us-east-1"),
+            max_connections=storage_max_connections,
+            gpx_compression=gpx_compression,
         )
     else:  # local storage
         storage_config = LocalStorageConfig(
             storage_type="local",
             storage_root=os.getenv("LOCAL_STORAGE_ROOT"),
             base_url=os.getenv("LOCAL_STORAGE_BASE_URL"),
+            max_connections=storage_max_connections,
+            gpx_compression=gpx_compression,
         )
 
     # Extract Strava configuration from environment variables
@@ -338,6 +382,22 @@ def load_environment_config(
     frontend_port = int(os.getenv("FRONTEND_PORT", "3000"))
     frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
     backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
+    worker_processes = int(os.getenv("WORKER_PROCESSES", str(DEFAULT_WORKER_PROCESSES)))
+    worker_max_pending = int(os.getenv("WORKER_MAX_PENDING", "16"))
+    parsed_track_cache_points = int(os.getenv("PARSED_TRACK_CACHE_POINTS", "500000"))
+    elevation_profile_cache_points = int(
+        os.getenv("ELEVATION_PROFILE_CACHE_POINTS", "200000")
+    )
+    upload_session_cache_points = int(
+        os.getenv("UPLOAD_SESSION_CACHE_POINTS", "1000000")
+    )
+    upload_session_ttl_seconds = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", "7200"))
+    search_cache_ttl_seconds = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "5"))
+    search_cache_entries = int(os.getenv("SEARCH_CACHE_ENTRIES", "1000"))
+    auth_users_cache_ttl_seconds = float(
+        os.getenv("AUTH_USERS_CACHE_TTL_SECONDS", "300")
+    )
+    compression_minimum_size = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
 
     server_config = ServerConfig(
         backend_host=backend_host,
@@ -345,6 +405,16 @@ def load_environment_config(
         frontend_port=frontend_port,
         frontend_url=frontend_url,
         backend_url=backend_url,
+        worker_processes=worker_processes,
+        worker_max_pending=worker_max_pending,
+        parsed_track_cache_points=parsed_track_cache_points,
+        elevation_profile_cache_points=elevation_profile_cache_points,
+        upload_session_cache_points=upload_session_cache_points,
+        upload_session_ttl_seconds=upload_session_ttl_seconds,
+        search_cache_ttl_seconds=search_cache_ttl_seconds,
+        search_cache_entries=search_cache_entries,
+        auth_users_cache_ttl_seconds=auth_users_cache_ttl_seconds,
+        compression_minimum_size=compression_minimum_size,
     )
 
     return (
@@ -0,0 +1,163 @@
+"""
+Event Stream Module
+
+This module provides the building blocks of the server-sent event (SSE)
+responses, such as the streamed segment search:
+
+- The work producing the events (database queries, index lookups) is completed
+  before the response starts, so that the database connections are released
+  before the events are sent, however slowly the client reads them. The work is
+  cancelled if the client disconnects meanwhile.
+- The durations of the queries and of the streams are recorded separately, to
+  tell slow queries from slow clients.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Iterable
+from typing import NamedTuple, TypeVar
+
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive
+
+T = TypeVar("T")
+
+
+class EventStreamStats(NamedTuple):
+    """Counters of the event streams, durations in seconds."""
+
+    queries: int
+    query_seconds_total: float
+    query_seconds_max: float
+    streams: int
+    stream_seconds_total: float
+    stream_seconds_max: float
+    disconnects: int
+
+
+class EventStreamMetrics:
+    """Durations of the queries and of the streams of an event stream endpoint.
+
+    A query is the work done before the response starts, a stream is the time
+    taken to send the events. A disconnect is counted when the client leaves
+    during the query or before the end of the stream.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds_total = 0.0
+        self.query_seconds_max = 0.0
+        self.streams = 0
+        self.stream_seconds_total = 0.0
+        self.stream_seconds_max = 0.0
+        self.disconnects = 0
+
+    def record_query(self, seconds: float) -> None:
+        """Record the duration of a completed query."""
+        self.queries += 1
+        self.query_seconds_total += seconds
+        self.query_seconds_max = max(self.query_seconds_max, seconds)
+
+    def record_stream(self, seconds: float, completed: bool = True) -> None:
+        """Record the duration of a stream, and whether all its events were sent."""
+        self.streams += 1
+        self.stream_seconds_total += seconds
+        self.stream_seconds_max = max(self.stream_seconds_max, seconds)
+        if not completed:
+            self.disconnects += 1
+
+    def record_disconnect(self) -> None:
+        """Record a client disconnected before the response started."""
+        self.disconnects += 1
+
+    @property
+    def stats(self) -> EventStreamStats:
+        """Current values of the counters."""
+        return EventStreamStats(
+            queries=self.queries,
+            query_seconds_total=self.query_seconds_total,
+            query_seconds_max=self.query_seconds_max,
+            streams=self.streams,
+            stream_seconds_total=self.stream_seconds_total,
+            stream_seconds_max=self.stream_seconds_max,
+            disconnects=self.disconnects,
+        )
+
+
+async def wait_for_disconnect(receive: Receive) -> None:
+    """Wait until the client of a request disconnects.
+
+    Parameters
+    ----------
+    receive : Receive
+        ASGI receive channel of the request, the messages other than the
+        disconnect (e.g. the empty body of a GET request) are discarded.
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_until_disconnect(receive: Receive, work: Awaitable[T]) -> T:
+    """Run some work, cancelling it if the client disconnects first.
+
+    Parameters
+    ----------
+    receive : Receive
+        ASGI receive channel of the request.
+    work : Awaitable[T]
+        The work producing the response.
+
+    Returns
+    -------
+    T
+        The result of the work.
+
+    Raises
+    ------
+    ClientDisconnect
+        If the client disconnected before the work completed, the work is
+        cancelled.
+    """
+    work_task = asyncio.ensure_future(work)
+    disconnect_task = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await asyncio.wait(
+            {work_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        disconnect_task.cancel()
+        if not work_task.done():
+            work_task.cancel()
+
+    if work_task.done() and not work_task.cancelled():
+        return work_task.result()
+    raise ClientDisconnect()
+
+
+async def stream_events(
+    events: Iterable[str], metrics: EventStreamMetrics
+) -> AsyncIterator[str]:
+    """Stream precomputed events and record the duration of the stream.
+
+    Parameters
+    ----------
+    events : Iterable[str]
+        The formatted events.
+    metrics : EventStreamMetrics
+        Metrics of the endpoint.
+
+    Yields
+    ------
+    str
+        The events, in order.
+    """
+    start = time.perf_counter()
+    completed = False
+    try:
+        for event in events:
+            yield event
+        completed = True
+    finally:
+        metrics.record_stream(time.perf_counter() - start, completed)
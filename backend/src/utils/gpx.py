@@ -3,32 +3,31 @@ GPX Editor Module
 
 This module provides functionality to process GPX files, particularly for extracting
 segments based on start and end indices, and saving processed GPX files.
+
+Track points are read with a streaming parser (`GPXStreamReader`) on the hot paths,
+gpxpy is only used as a fallback for files the streaming parser does not handle.
 """
 
 import datetime
+import io
+import logging
 import math
 import uuid
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import Literal, NamedTuple
+from xml.parsers import expat
+from xml.sax.saxutils import escape
 
 import gpxpy
-from fit_tool.fit_file_builder import FitFileBuilder
-from fit_tool.profile.messages.course_message import CourseMessage
-from fit_tool.profile.messages.course_point_message import CoursePointMessage
-from fit_tool.profile.messages.event_message import EventMessage
-from fit_tool.profile.messages.file_id_message import FileIdMessage
-from fit_tool.profile.messages.lap_message import LapMessage
-from fit_tool.profile.messages.record_message import RecordMessage
-from fit_tool.profile.profile_type import (
-    CoursePoint,
-    Event,
-    EventType,
-    FileType,
-    Manufacturer,
-    Sport,
-)
+import numpy as np
+import polyline
 from pydantic import BaseModel
 
-from .math import haversine_distance
+from .columnar import ColumnarTrack
+from .fit_encoder import encode_fit_course
+
+logger = logging.getLogger(__name__)
 
 
 class GPXPoint(BaseModel):
@@ -62,6 +61,396 @@ class GPXData(BaseModel):
     bounds: GPXBounds
 
 
+# Output formats of the track points, besides the list of point objects
+POINT_FORMATS = ("polyline", "columnar")
+
+# Elevations of the polyline format are integers in units of 1 / ELEVATION_SCALE
+# meters
+ELEVATION_SCALE = 10
+
+
+class GPXColumnarPoints(BaseModel):
+    """Track points as parallel arrays."""
+
+    format: Literal["columnar"] = "columnar"
+    lat: list[float]
+    lon: list[float]
+    ele: list[float]
+    time: list[str]
+
+
+class GPXPolylinePoints(BaseModel):
+    """Track points as an encoded polyline and delta-encoded elevations.
+
+    `ele` holds the first elevation, then the difference with the previous
+    elevation for each following point, in units of 1 / `elevation_scale` meters.
+    """
+
+    format: Literal["polyline"] = "polyline"
+    polyline: str
+    ele: list[int]
+    elevation_scale: int = ELEVATION_SCALE
+
+
+class GPXEncodedData(BaseModel):
+    """`GPXData` with the track points in a compact format."""
+
+    file_id: str
+    track_name: str
+    points: GPXColumnarPoints | GPXPolylinePoints
+    total_stats: GPXTotalStats
+    bounds: GPXBounds
+
+
+class GPXStreamError(ValueError):
+    """Raised when a GPX file cannot be handled by the streaming parser."""
+
+
+class GPXStreamPoint(NamedTuple):
+    """Track point read by the streaming parser."""
+
+    latitude: float
+    longitude: float
+    elevation: float | None
+    time: str | None
+    segment_index: int
+
+
+# Size of the chunks fed to the streaming parser
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class GPXStreamReader:
+    """Stream the track points of the first track of a GPX file.
+
+    The file is fed by chunks to an expat parser and the track points are yielded
+    as soon as they are parsed, without building an element tree, so that memory
+    does not grow with the size of the file beyond what the caller keeps. The
+    track name is available in `track_name` once the points have been iterated
+    over. Namespace prefixes are ignored.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+    """
+
+    def __init__(self, source: bytes | Path):
+        self.source = source
+        self.track_name: str | None = None
+        self.track_found = False
+
+    def __iter__(self) -> Iterator[GPXStreamPoint]:
+        if isinstance(self.source, bytes):
+            yield from self._parse(io.BytesIO(self.source))
+        else:
+            with open(self.source, "rb") as gpx_file:
+                yield from self._parse(gpx_file)
+
+    def _parse(self, gpx_file) -> Iterator[GPXStreamPoint]:
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+
+        parsed: list[GPXStreamPoint] = []
+        stack: list[str] = []
+        text: list[str] = []
+        point: dict[str, str | None] = {}
+        # Mutable parsing state: whether the first track is open or done, whether
+        # character data is captured, and the current track segment index
+        state = {"in_track": False, "done": False, "capture": False, "segment": -1}
+
+        def start_element(name: str, attributes: dict[str, str]) -> None:
+            tag = name.rpartition(":")[2]
+            parent = stack[-1] if stack else None
+            stack.append(tag)
+            if state["done"]:
+                return
+            if tag == "trk":
+                self.track_found = True
+                state["in_track"] = True
+            elif not state["in_track"]:
+                return
+            elif tag == "trkseg":
+                state["segment"] += 1
+            elif tag == "trkpt":
+                point.clear()
+                point["lat"] = attributes.get("lat")
+                point["lon"] = attributes.get("lon")
+            elif (tag in ("ele", "time") and parent == "trkpt") or (
+                tag == "name" and parent == "trk"
+            ):
+                state["capture"] = True
+                text.clear()
+
+        def end_element(name: str) -> None:
+            tag = stack.pop()
+            if not state["in_track"]:
+                return
+            if state["capture"]:
+                state["capture"] = False
+                value = "".join(text).strip() or None
+                if tag == "name":
+                    self.track_name = value
+                else:
+                    point[tag] = value
+            elif tag == "trkpt":
+                if point["lat"] is None or point["lon"] is None:
+                    raise GPXStreamError("Track point without coordinates")
+                elevation = point.get("ele")
+                parsed.append(
+                    GPXStreamPoint(
+                        latitude=float(point["lat"]),
+                        longitude=float(point["lon"]),
+                        elevation=float(elevation) if elevation is not None else None,
+                        time=point.get("time"),
+                        segment_index=state["segment"],
+                    )
+                )
+            elif tag == "trk":
+                # Only the first track is read
+                state["in_track"] = False
+                state["done"] = True
+
+        def character_data(data: str) -> None:
+            if state["capture"]:
+                text.append(data)
+
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.CharacterDataHandler = character_data
+
+        while not state["done"]:
+            chunk = gpx_file.read(STREAM_CHUNK_SIZE)
+            parser.Parse(chunk, not chunk)
+            yield from parsed
+            parsed.clear()
+            if not chunk:
+                break
+
+
+def _parse_time(time: str | None) -> datetime.datetime | None:
+    """Parse an ISO 8601 GPX timestamp."""
+    if time is None:
+        return None
+    return datetime.datetime.fromisoformat(time)
+
+
+def read_gpx_time(source: bytes | Path) -> datetime.datetime | None:
+    """Read the time of a GPX file, from its metadata (or the root in GPX 1.0).
+
+    Only the beginning of the file is parsed, up to the first track.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+
+    Returns
+    -------
+    datetime.datetime | None
+        The time of the GPX file, None if missing or not in ISO 8601 format.
+    """
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+
+    stack: list[str] = []
+    text: list[str] = []
+    # Whether character data is captured, and whether the header was read
+    state = {"capture": False, "done": False}
+
+    def start_element(name: str, attributes: dict[str, str]) -> None:
+        tag = name.rpartition(":")[2]
+        parent = stack[-1] if stack else None
+        stack.append(tag)
+        if tag in ("trk", "rte", "wpt"):
+            state["done"] = True
+        elif tag == "time" and parent in ("metadata", "gpx") and not state["done"]:
+            state["capture"] = True
+            text.clear()
+
+    def end_element(name: str) -> None:
+        stack.pop()
+        if state["capture"]:
+            state["capture"] = False
+            state["done"] = True
+
+    def character_data(data: str) -> None:
+        if state["capture"]:
+            text.append(data)
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+
+    gpx_file = io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+    with gpx_file:
+        while not state["done"]:
+            chunk = gpx_file.read(STREAM_CHUNK_SIZE)
+            parser.Parse(chunk, not chunk)
+            if not chunk:
+                break
+
+    time = "".join(text).strip()
+    if not time:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(time)
+    except ValueError:
+        return None
+
+
+def stream_track_columns(source: bytes | Path) -> tuple[ColumnarTrack, str | None]:
+    """Read the points of the first track of a GPX file in a streaming pass.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+
+    Returns
+    -------
+    tuple[ColumnarTrack, str | None]
+        The track points and the track name.
+
+    Raises
+    ------
+    GPXStreamError
+        If the file has no track, or track points without elevation or time.
+    """
+    reader = GPXStreamReader(source)
+    columns = stream_points_to_columns(reader)
+
+    if not reader.track_found:
+        raise GPXStreamError("GPX file has no track")
+
+    return columns, reader.track_name
+
+
+def stream_points_to_columns(points: Iterable[GPXStreamPoint]) -> ColumnarTrack:
+    """Convert the points read by the streaming parser to a columnar track.
+
+    Parameters
+    ----------
+    points : Iterable[GPXStreamPoint]
+        Track points, in order.
+
+    Returns
+    -------
+    ColumnarTrack
+        The track points, with timestamps normalized to ISO 8601.
+
+    Raises
+    ------
+    GPXStreamError
+        If a track point has no elevation or time.
+    """
+    rows = []
+    for point in points:
+        if point.elevation is None or point.time is None:
+            raise GPXStreamError("Track point without elevation or time")
+        rows.append(
+            (
+                point.latitude,
+                point.longitude,
+                point.elevation,
+                _parse_time(point.time).isoformat(),
+                point.segment_index,
+            )
+        )
+    return ColumnarTrack.from_points(rows)
+
+
+def stream_gpx_data(source: bytes | Path, file_id: str) -> GPXData:
+    """Extract track information from a GPX file in a single streaming pass.
+
+    The result is the same as `extract_from_gpx_file`, without building the gpxpy
+    object graph.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+    file_id: str
+        The ID of the file.
+
+    Returns
+    -------
+    GPXData
+        GPXData object containing parsed GPX data.
+
+    Raises
+    ------
+    GPXStreamError
+        If the file has no track, or track points without elevation or time.
+    """
+    columns, track_name = stream_track_columns(source)
+    return gpx_data_from_columns(columns, file_id, track_name)
+
+
+def parse_gpx_columns(
+    source: bytes | Path, file_id: str
+) -> tuple[ColumnarTrack, str | None]:
+    """Read the points of the first track of a GPX file.
+
+    The streaming parser is used first, gpxpy is used as a fallback for the files
+    it does not handle, as in `parse_gpx_data`.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+    file_id: str
+        The ID of the file.
+
+    Returns
+    -------
+    tuple[ColumnarTrack, str | None]
+        The track points and the track name.
+    """
+    try:
+        return stream_track_columns(source)
+    except (expat.ExpatError, ValueError) as e:
+        logger.info(f"Falling back to gpxpy to parse GPX file {file_id}: {str(e)}")
+
+    if isinstance(source, bytes):
+        gpx = gpxpy.parse(source.decode("utf-8"))
+    else:
+        with open(source) as gpx_file:
+            gpx = gpxpy.parse(gpx_file)
+    return extract_track_columns(gpx)
+
+
+def parse_gpx_data(source: bytes | Path, file_id: str) -> GPXData:
+    """Extract track information from a GPX file.
+
+    The streaming parser is used first, gpxpy is used as a fallback for the files
+    it does not handle (e.g. unusual timestamp formats).
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+    file_id: str
+        The ID of the file.
+
+    Returns
+    -------
+    GPXData
+        GPXData object containing parsed GPX data.
+    """
+    try:
+        return stream_gpx_data(source, file_id)
+    except (expat.ExpatError, ValueError) as e:
+        logger.info(f"Falling back to gpxpy to parse GPX file {file_id}: {str(e)}")
+
+    if isinstance(source, bytes):
+        gpx = gpxpy.parse(source.decode("utf-8"))
+    else:
+        with open(source) as gpx_file:
+            gpx = gpxpy.parse(gpx_file)
+    return extract_from_gpx_file(gpx, file_id)
+
+
 def extract_from_gpx_file(gpx: gpxpy.gpx.GPX, file_id: str) -> GPXData:
     """Extract comprehensive track information from a parsed GPX object.
 
@@ -107,74 +496,229 @@ def extract_from_gpx_file(gpx: gpxpy.gpx.GPX, file_id: str) -> GPXData:
     >>> print(f"Distance: {result.total_stats.total_distance:.2f} km")
     >>> print(f"Points: {result.total_stats.total_points}")
     """
-    track = gpx.tracks[0]
+    columns, track_name = extract_track_columns(gpx)
+    return gpx_data_from_columns(columns, file_id, track_name)
 
-    points: list[GPXPoint] = []
-    total_distance, total_elevation_gain, total_elevation_loss = 0.0, 0.0, 0.0
-    min_latitude, min_longitude, min_elevation = math.inf, math.inf, math.inf
-    max_latitude, max_longitude, max_elevation = -math.inf, -math.inf, -math.inf
 
-    for segment in track.segments:
-        for point_index, point in enumerate(segment.points):
-            elevation = point.elevation
-
-            min_latitude = min(min_latitude, point.latitude)
-            max_latitude = max(max_latitude, point.latitude)
-            min_longitude = min(min_longitude, point.longitude)
-            max_longitude = max(max_longitude, point.longitude)
-            min_elevation = min(min_elevation, elevation)
-            max_elevation = max(max_elevation, elevation)
-
-            if point_index > 0:
-                previous_point = points[-1]
-                distance = haversine_distance(
-                    latitude_1=previous_point.latitude,
-                    longitude_1=previous_point.longitude,
-                    latitude_2=point.latitude,
-                    longitude_2=point.longitude,
-                )
-                total_distance += distance
+def extract_track_columns(gpx: gpxpy.gpx.GPX) -> tuple[ColumnarTrack, str | None]:
+    """Extract the points of the first track of a parsed GPX object.
 
-                elevation_diff = elevation - previous_point.elevation
-                if elevation_diff > 0:
-                    total_elevation_gain += elevation_diff
-                else:
-                    total_elevation_loss += abs(elevation_diff)
-
-            points.append(
-                GPXPoint(
-                    latitude=point.latitude,
-                    longitude=point.longitude,
-                    elevation=elevation,
-                    time=point.time.isoformat(),
-                )
-            )
+    Parameters
+    ----------
+    gpx : gpxpy.gpx.GPX
+        The parsed GPX object.
 
-    bounds = GPXBounds(
-        north=max_latitude,
-        south=min_latitude,
-        east=max_longitude,
-        west=min_longitude,
-        min_elevation=min_elevation,
-        max_elevation=max_elevation,
-    )
+    Returns
+    -------
+    tuple[ColumnarTrack, str | None]
+        The track points and the track name.
+    """
+    track = gpx.tracks[0]
 
-    total_stats = GPXTotalStats(
-        total_points=len(points),
-        total_distance=total_distance,
-        total_elevation_gain=total_elevation_gain,
-        total_elevation_loss=total_elevation_loss,
+    columns = ColumnarTrack.from_points(
+        (
+            point.latitude,
+            point.longitude,
+            point.elevation,
+            point.time.isoformat(),
+            segment_index,
+        )
+        for segment_index, segment in enumerate(track.segments)
+        for point in segment.points
     )
 
+    return columns, track.name
+
+
+def gpx_data_from_columns(
+    columns: ColumnarTrack, file_id: str, track_name: str | None
+) -> GPXData:
+    """Build the track information from a columnar track.
+
+    Distances, elevation changes and bounds are computed with vectorized
+    operations on the columns.
+
+    Parameters
+    ----------
+    columns : ColumnarTrack
+        The track points.
+    file_id: str
+        The ID of the file.
+    track_name: str | None
+        The name of the track.
+
+    Returns
+    -------
+    GPXData
+        GPXData object containing the points, statistics and bounds of the track.
+    """
+    if np.isnan(columns.elevations).any():
+        raise ValueError("Track points must have an elevation")
+
+    total_elevation_gain, total_elevation_loss = columns.elevation_gain_loss()
+    north, south, east, west, min_elevation, max_elevation = columns.bounds()
+
+    # Values come from typed columns, skip the pydantic validation overhead
+    points = [
+        GPXPoint.model_construct(
+            latitude=latitude, longitude=longitude, elevation=elevation, time=time
+        )
+        for latitude, longitude, elevation, time in zip(
+            columns.latitudes.tolist(),
+            columns.longitudes.tolist(),
+            columns.elevations.tolist(),
+            columns.times.tolist(),
+            strict=True,
+        )
+    ]
+
     return GPXData(
         file_id=file_id,
-        track_name=track.name or "Unnamed Track",
+        track_name=track_name or "Unnamed Track",
         points=points,
-        total_stats=total_stats,
-        bounds=bounds,
+        total_stats=GPXTotalStats(
+            total_points=len(columns),
+            total_distance=columns.total_distance(),
+            total_elevation_gain=total_elevation_gain,
+            total_elevation_loss=total_elevation_loss,
+        ),
+        bounds=GPXBounds(
+            north=north,
+            south=south,
+            east=east,
+            west=west,
+            min_elevation=min_elevation,
+            max_elevation=max_elevation,
+        ),
     )
 
 
+def gpx_data_from_streams(
+    latlng: list[tuple[float, float]],
+    altitude: list[float] | None,
+    time: list[float] | None,
+    start_date: datetime.datetime,
+    file_id: str,
+    track_name: str | None,
+) -> GPXData:
+    """Build the track information from the streams of a recorded activity.
+
+    The points are the ones of a GPX file with a track point per sample, without
+    writing and parsing the GPX file (see `write_gpx_file` to write it).
+
+    Parameters
+    ----------
+    latlng : list[tuple[float, float]]
+        (latitude, longitude) of each sample.
+    altitude : list[float] | None
+        Elevation in meters of each sample.
+    time : list[float] | None
+        Time in seconds of each sample since the start of the activity.
+    start_date : datetime.datetime
+        Start of the activity. Point times are in the local time of the server,
+        without time zone.
+    file_id : str
+        The ID of the file.
+    track_name : str | None
+        The name of the track.
+
+    Returns
+    -------
+    GPXData
+        GPXData object containing the points, statistics and bounds of the track.
+
+    Raises
+    ------
+    ValueError
+        If the streams have no point, or no elevation or time for every point.
+    """
+    if not latlng:
+        raise ValueError("GPX file must contain at least one track with segments")
+    if altitude is None or len(altitude) < len(latlng):
+        raise ValueError("Track points must have an elevation")
+    if time is None or len(time) < len(latlng):
+        raise ValueError("Track points must have a time")
+
+    n_points = len(latlng)
+    coordinates = np.asarray(latlng, dtype=np.float64).reshape(n_points, 2)
+    start = start_date.timestamp()
+    columns = ColumnarTrack(
+        latitudes=coordinates[:, 0],
+        longitudes=coordinates[:, 1],
+        elevations=np.asarray(altitude[:n_points], dtype=np.float64),
+        times=np.array(
+            [
+                datetime.datetime.fromtimestamp(start + seconds).isoformat()
+                for seconds in time[:n_points]
+            ],
+            dtype=object,
+        ),
+        segment_ids=np.zeros(n_points, dtype=np.int64),
+    )
+    return gpx_data_from_columns(columns, file_id, track_name)
+
+
+def write_gpx_file(gpx_data: GPXData, file_path: Path) -> None:
+    """Write a track as a GPX 1.1 file with a single track segment.
+
+    Parameters
+    ----------
+    gpx_data : GPXData
+        The track.
+    file_path : Path
+        Path of the GPX file to write.
+    """
+    name = escape(gpx_data.track_name)
+    with open(file_path, "w", encoding="utf-8") as gpx_file:
+        gpx_file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<gpx version="1.1" creator="Gravly" '
+            'xmlns="http://www.topografix.com/GPX/1/1">\n'
+            f"  <trk>\n    <name>{name}</name>\n    <trkseg>\n"
+        )
+        gpx_file.writelines(
+            f'      <trkpt lat="{point.latitude!r}" lon="{point.longitude!r}">'
+            f"<ele>{point.elevation!r}</ele><time>{point.time}</time></trkpt>\n"
+            for point in gpx_data.points
+        )
+        gpx_file.write("    </trkseg>\n  </trk>\n</gpx>\n")
+
+
+class _SegmentPoint(NamedTuple):
+    latitude: float
+    longitude: float
+    elevation: float | None
+    time: datetime.datetime | None
+
+
+def _read_first_segment(file_path: Path) -> list[_SegmentPoint]:
+    """Read the points of the first segment of the first track of a GPX file."""
+    try:
+        reader = GPXStreamReader(file_path)
+        points = [
+            _SegmentPoint(
+                point.latitude,
+                point.longitude,
+                point.elevation,
+                _parse_time(point.time),
+            )
+            for point in reader
+            if point.segment_index == 0
+        ]
+        if not reader.track_found:
+            raise GPXStreamError("GPX file has no track")
+        return points
+    except (expat.ExpatError, ValueError) as e:
+        logger.info(f"Falling back to gpxpy to read {file_path}: {str(e)}")
+
+    with open(file_path) as gpx_file:
+        gpx = gpxpy.parse(gpx_file)
+    return [
+        _SegmentPoint(point.latitude, point.longitude, point.elevation, point.time)
+        for point in gpx.tracks[0].segments[0].points
+    ]
+
+
 def generate_gpx_segment(
     input_file_path: Path,
     start_index: int,
@@ -206,6 +750,57 @@ def generate_gpx_segment(
         - bounds: A `GPXBounds` object containing the minimum and maximum latitude
           and longitude.
     """
+    points = _read_first_segment(input_file_path)
+    return _write_gpx_segment(
+        points[max(start_index, 0) : max(end_index + 1, 0)], segment_name, output_dir
+    )
+
+
+def write_gpx_segment(
+    track: ColumnarTrack, segment_name: str, output_dir: Path
+) -> tuple[str, Path, GPXBounds]:
+    """Write the points of a columnar track as a GPX segment.
+
+    Used with the tracks of the upload sessions, which are sliced to the segment
+    instead of reading the uploaded file again as `generate_gpx_segment` does.
+
+    Parameters
+    ----------
+    track: ColumnarTrack
+        The points of the segment.
+    segment_name: str
+        The name of the segment.
+    output_dir: Path
+        The path to the output directory.
+
+    Returns
+    -------
+    tuple[str, Path, GPXBounds]
+        The ID of the generated GPX segment, the path to the generated GPX file
+        and its bounds, see `generate_gpx_segment`.
+    """
+    points = [
+        _SegmentPoint(
+            latitude,
+            longitude,
+            None if math.isnan(elevation) else elevation,
+            _parse_time(time),
+        )
+        for latitude, longitude, elevation, time in zip(
+            track.latitudes.tolist(),
+            track.longitudes.tolist(),
+            track.elevations.tolist(),
+            track.times.tolist(),
+            strict=True,
+        )
+    ]
+    return _write_gpx_segment(points, segment_name, output_dir)
+
+
+def _write_gpx_segment(
+    points: list[_SegmentPoint], segment_name: str, output_dir: Path
+) -> tuple[str, Path, GPXBounds]:
+    """Write segment points to a new GPX file named after a new file ID."""
     file_id = str(uuid.uuid4())
     new_gpx = gpxpy.gpx.GPX()
     new_track = gpxpy.gpx.GPXTrack(name=segment_name)
@@ -213,27 +808,23 @@ def generate_gpx_segment(
     new_segment = gpxpy.gpx.GPXTrackSegment()
     new_track.segments.append(new_segment)
 
-    with open(input_file_path) as gpx_file:
-        original_gpx = gpxpy.parse(gpx_file)
-
     min_latitude, min_longitude, min_elevation = math.inf, math.inf, math.inf
     max_latitude, max_longitude, max_elevation = -math.inf, -math.inf, -math.inf
-    for point_idx, point in enumerate(original_gpx.tracks[0].segments[0].points):
-        if point_idx >= start_index and point_idx <= end_index:
-            latitude, longitude = point.latitude, point.longitude
-            new_point = gpxpy.gpx.GPXTrackPoint(
-                latitude=latitude,
-                longitude=longitude,
-                elevation=point.elevation,
-                time=point.time,
-            )
-            min_latitude = min(min_latitude, latitude)
-            max_latitude = max(max_latitude, latitude)
-            min_longitude = min(min_longitude, longitude)
-            max_longitude = max(max_longitude, longitude)
-            min_elevation = min(min_elevation, point.elevation)
-            max_elevation = max(max_elevation, point.elevation)
-            new_segment.points.append(new_point)
+    for point in points:
+        latitude, longitude = point.latitude, point.longitude
+        new_point = gpxpy.gpx.GPXTrackPoint(
+            latitude=latitude,
+            longitude=longitude,
+            elevation=point.elevation,
+            time=point.time,
+        )
+        min_latitude = min(min_latitude, latitude)
+        max_latitude = max(max_latitude, latitude)
+        min_longitude = min(min_longitude, longitude)
+        max_longitude = max(max_longitude, longitude)
+        min_elevation = min(min_elevation, point.elevation)
+        max_elevation = max(max_elevation, point.elevation)
+        new_segment.points.append(new_point)
 
     output_dir.mkdir(parents=True, exist_ok=True)
     output_file_path = output_dir / f"{file_id}.gpx"
@@ -254,6 +845,96 @@ def generate_gpx_segment(
     )
 
 
+def load_track_coordinates(source: bytes | Path) -> list[tuple[float, float]]:
+    """Load the coordinates of the track points of a GPX file.
+
+    Parameters
+    ----------
+    source: bytes | Path
+        GPX content or path to a GPX file.
+
+    Returns
+    -------
+    list[tuple[float, float]]
+        The (latitude, longitude) pairs of the points of the first track, in order.
+    """
+    return [(point.latitude, point.longitude) for point in GPXStreamReader(source)]
+
+
+class TrackStats(NamedTuple):
+    """Summary statistics of a track, stored with the track in the database.
+
+    The field names match the `Track` columns.
+    """
+
+    total_distance: float
+    total_elevation_gain: float
+    total_elevation_loss: float
+    total_points: int
+    min_elevation: float | None
+    max_elevation: float | None
+
+
+def compute_track_stats(source: bytes | Path) -> TrackStats:
+    """Compute the summary statistics of a GPX file in a single streaming pass.
+
+    Unlike `parse_gpx_data`, points without elevation or time are accepted:
+    they are skipped by the elevation statistics.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+
+    Returns
+    -------
+    TrackStats
+        Distance in kilometers, elevation gain and loss in meters, number of
+        points and elevation range in meters (None if no point has an
+        elevation) of the first track.
+    """
+    return track_stats_from_points(GPXStreamReader(source))
+
+
+def track_stats_from_points(points: Iterable[GPXStreamPoint]) -> TrackStats:
+    """Compute the summary statistics of the points read by the streaming parser.
+
+    Parameters
+    ----------
+    points : Iterable[GPXStreamPoint]
+        Track points, in order.
+
+    Returns
+    -------
+    TrackStats
+        Statistics of the points, see `compute_track_stats`.
+    """
+    columns = ColumnarTrack.from_points(
+        (
+            point.latitude,
+            point.longitude,
+            np.nan if point.elevation is None else point.elevation,
+            point.time,
+            point.segment_index,
+        )
+        for point in points
+    )
+
+    # Differences involving a missing elevation are NaN and count neither as a
+    # gain nor as a loss
+    total_elevation_gain, total_elevation_loss = columns.elevation_gain_loss()
+    has_elevation = not np.isnan(columns.elevations).all()
+
+    return TrackStats(
+        total_distance=columns.total_distance(),
+        total_elevation_gain=total_elevation_gain,
+        total_elevation_loss=total_elevation_loss,
+        total_points=len(columns),
+        min_elevation=(float(np.nanmin(columns.elevations)) if has_elevation else None),
+        max_elevation=(float(np.nanmax(columns.elevations)) if has_elevation else None),
+    )
+
+
 def convert_gpx_to_fit(gpx: gpxpy.gpx.GPX, course_name: str = "GPX Course") -> bytes:
     """Convert a GPX object to a FIT file in bytes format.
 
@@ -278,127 +959,144 @@ def convert_gpx_to_fit(gpx: gpxpy.gpx.GPX, course_name: str = "GPX Course") -> b
     >>> with open("course.fit", "wb") as fit_file:
     ...     fit_file.write(fit_bytes)
     """
-    builder = FitFileBuilder(auto_define=True, min_string_size=50)
-
-    # File ID message - required for all FIT files
-    message = FileIdMessage()
-    message.type = FileType.COURSE
-    message.manufacturer = Manufacturer.DEVELOPMENT.value
-    message.product = 0
-    message.timeCreated = round(datetime.datetime.now().timestamp() * 1000)
-    message.serialNumber = 0x12345678
-    builder.add(message)
-
-    # Course message - required for FIT course files
-    message = CourseMessage()
-    message.courseName = course_name
-    message.sport = Sport.CYCLING
-    builder.add(message)
-
-    # Timer start event - required for FIT course files
-    # FIT timestamps are in milliseconds from January 1st, 1970 at 00:00:00 UTC
-    # We need to convert our timestamp to milliseconds
-    import time
-
-    start_timestamp = int(time.time() * 1000)  # Convert to milliseconds
-    message = EventMessage()
-    message.event = Event.TIMER
-    message.event_type = EventType.START
-    message.timestamp = start_timestamp
-    builder.add(message)
-
-    # Process track points
-    distance = 0.0
-    timestamp = start_timestamp
-    course_records = []
-    prev_coordinate = None
-
     # Get the first track and segment
     if not gpx.tracks or not gpx.tracks[0].segments:
         raise ValueError("GPX file must contain at least one track with segments")
 
-    track = gpx.tracks[0]
-    segment = track.segments[0]
-
-    for track_point in segment.points:
-        current_coordinate = (track_point.latitude, track_point.longitude)
-
-        # Calculate distance from previous coordinate and accumulate distance
-        if prev_coordinate:
-            delta = (
-                haversine_distance(
-                    latitude_1=prev_coordinate[0],
-                    longitude_1=prev_coordinate[1],
-                    latitude_2=current_coordinate[0],
-                    longitude_2=current_coordinate[1],
-                )
-                * 1000
-            )  # convert from kilometers to meters
-        else:
-            delta = 0.0
-        distance += delta
-
-        # Create record message for this point
-        message = RecordMessage()
-        message.position_lat = track_point.latitude
-        message.position_long = track_point.longitude
-        message.altitude = track_point.elevation
-        message.distance = distance
-        message.timestamp = timestamp
-        course_records.append(message)
-
-        # Increment timestamp by 1 millisecond per point
-        timestamp += 1
-        prev_coordinate = current_coordinate
-
-    if not course_records:
+    segment = gpx.tracks[0].segments[0]
+    return _convert_points_to_fit(
+        [point.latitude for point in segment.points],
+        [point.longitude for point in segment.points],
+        [point.elevation for point in segment.points],
+        course_name,
+    )
+
+
+def convert_gpx_data_to_fit(
+    gpx_data: GPXData, course_name: str = "GPX Course"
+) -> bytes:
+    """Convert parsed track data to a FIT file in bytes format.
+
+    Parameters
+    ----------
+    gpx_data : GPXData
+        The parsed track, e.g. decoded from a track sidecar.
+    course_name : str, optional
+        The name for the course in the FIT file, by default "GPX Course".
+
+    Returns
+    -------
+    bytes
+        The FIT file as bytes.
+    """
+    points = gpx_data.points
+    return _convert_points_to_fit(
+        [point.latitude for point in points],
+        [point.longitude for point in points],
+        [point.elevation for point in points],
+        course_name,
+    )
+
+
+def _convert_points_to_fit(
+    latitudes: list[float],
+    longitudes: list[float],
+    elevations: list[float | None],
+    course_name: str,
+) -> bytes:
+    """Build a FIT course file from the coordinates of the track points.
+
+    The course name is not part of the FIT file, whose course message only
+    holds the sport.
+    """
+    return encode_fit_course(
+        np.asarray(latitudes, dtype=np.float64),
+        np.asarray(longitudes, dtype=np.float64),
+        np.array(
+            [np.nan if elevation is None else elevation for elevation in elevations],
+            dtype=np.float64,
+        ),
+    )
+
+
+class FitCourse(NamedTuple):
+    """GPX data and FIT course built from the same GPX file."""
+
+    gpx_data: GPXData
+    fit_bytes: bytes
+    time: datetime.datetime | None
+
+
+def build_fit_course(gpx_bytes: bytes, file_id: str, course_name: str) -> FitCourse:
+    """Parse a GPX file and convert it to a FIT course.
+
+    The track points are parsed once into columns (with the streaming parser,
+    gpxpy being a fallback, see `parse_gpx_columns`) for both the track data
+    and the FIT conversion, so that the whole processing can run on a worker
+    process. As for the sidecar path, the course holds the points of all the
+    track segments.
+
+    Parameters
+    ----------
+    gpx_bytes : bytes
+        Raw GPX content.
+    file_id : str
+        Identifier of the GPX file.
+    course_name : str
+        The name for the course in the FIT file.
+
+    Returns
+    -------
+    FitCourse
+        The GPX data, the FIT file bytes and the time of the GPX file.
+    """
+    columns, track_name = parse_gpx_columns(gpx_bytes, file_id)
+    if not len(columns):
         raise ValueError("No track points found in GPX file")
+    return FitCourse(
+        gpx_data=gpx_data_from_columns(columns, file_id, track_name),
+        fit_bytes=encode_fit_course(
+            columns.latitudes, columns.longitudes, columns.elevations
+        ),
+        time=read_gpx_time(gpx_bytes),
+    )
+
+
+def encode_gpx_points(
+    gpx_data: GPXData, point_format: str
+) -> GPXColumnarPoints | GPXPolylinePoints:
+    """Encode the track points in one of the compact `POINT_FORMATS`.
+
+    Parameters
+    ----------
+    gpx_data : GPXData
+        The parsed track.
+    point_format : str
+        'columnar' for parallel latitude, longitude, elevation and time arrays,
+        'polyline' for an encoded polyline with delta-encoded elevations.
+
+    Returns
+    -------
+    GPXColumnarPoints | GPXPolylinePoints
+        The encoded points.
+    """
+    points = gpx_data.points
+    latitudes = [point.latitude for point in points]
+    longitudes = [point.longitude for point in points]
+    elevations = [point.elevation for point in points]
 
-    # Add all course records
-    builder.add_all(course_records)
-
-    # Add start course point
-    message = CoursePointMessage()
-    message.timestamp = course_records[0].timestamp
-    message.position_lat = course_records[0].position_lat
-    message.position_long = course_records[0].position_long
-    message.type = CoursePoint.SEGMENT_START
-    message.course_point_name = "start"
-    builder.add(message)
-
-    # Add end course point
-    message = CoursePointMessage()
-    message.timestamp = course_records[-1].timestamp
-    message.position_lat = course_records[-1].position_lat
-    message.position_long = course_records[-1].position_long
-    message.type = CoursePoint.SEGMENT_END
-    message.course_point_name = "end"
-    builder.add(message)
-
-    # Stop event
-    message = EventMessage()
-    message.event = Event.TIMER
-    message.eventType = EventType.STOP_ALL
-    message.timestamp = timestamp
-    builder.add(message)
-
-    # Lap message - required for FIT course files
-    elapsed_time = timestamp - start_timestamp
-    # Cap elapsed time to prevent overflow (max 32-bit unsigned int is 4294967295)
-    if elapsed_time > 4294967295:
-        elapsed_time = 4294967295
-    message = LapMessage()
-    message.timestamp = timestamp
-    message.start_time = start_timestamp
-    message.total_elapsed_time = elapsed_time
-    message.total_timer_time = elapsed_time
-    message.start_position_lat = course_records[0].position_lat
-    message.start_position_long = course_records[0].position_long
-    message.end_position_lat = course_records[-1].position_lat
-    message.endPositionLong = course_records[-1].position_long
-    message.total_distance = course_records[-1].distance
-    builder.add(message)
-
-    # Build the FIT file and return as bytes
-    fit_file = builder.build()
-    return fit_file.to_bytes()
+    # Values come from a validated GPXData, skip the pydantic validation overhead
+    if point_format == "columnar":
+        return GPXColumnarPoints.model_construct(
+            lat=latitudes,
+            lon=longitudes,
+            ele=elevations,
+            time=[point.time for point in points],
+        )
+    if point_format == "polyline":
+        scaled = np.rint(np.asarray(elevations, dtype=np.float64) * ELEVATION_SCALE)
+        return GPXPolylinePoints.model_construct(
+            polyline=polyline.encode(list(zip(latitudes, longitudes, strict=True))),
+            ele=np.diff(scaled, prepend=0).astype(np.int64).tolist(),
+        )
+    raise ValueError(f"Unknown point format: {point_format}")
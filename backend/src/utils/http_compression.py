@@ -0,0 +1,192 @@
+"""
+HTTP Compression Module
+
+This module provides an ASGI middleware compressing the HTTP responses with the
+content encoding negotiated from the Accept-Encoding header of the request
+(zstd, brotli or gzip, depending on the installed packages).
+
+- Complete responses are only compressed above a minimum size, small responses
+  do not benefit from it.
+- Streamed responses, such as the server-sent events of the segment search, are
+  compressed chunk by chunk and flushed after each chunk, so that every event
+  reaches the client as soon as it is produced.
+- Responses already carrying a Content-Encoding, such as the GPX files stored
+  compressed, are sent as is: they are compressed once when written instead of
+  on every request.
+- The ETag of a compressed response is made weak, the compressed body being a
+  different representation than the identity body the ETag was computed on.
+  Conditional requests compare the ETags with `etag_matches`.
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .compression import (
+    StreamCompressor,
+    available_http_encodings,
+    negotiate_encoding,
+)
+
+# Media types worth compressing, binary formats like images are already
+# compressed
+COMPRESSIBLE_MEDIA_TYPES = frozenset(
+    {
+        "application/json",
+        "application/gpx+xml",
+        "application/xml",
+        "application/javascript",
+        "application/vnd.mapbox-vector-tile",
+        "application/x-protobuf",
+        "image/svg+xml",
+    }
+)
+
+
+def is_compressible(content_type: str | None) -> bool:
+    """Check whether a response of some content type is worth compressing.
+
+    Parameters
+    ----------
+    content_type : str | None
+        Content-Type header of the response.
+
+    Returns
+    -------
+    bool
+        True for text and the structured formats of `COMPRESSIBLE_MEDIA_TYPES`.
+    """
+    if not content_type:
+        return False
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_MEDIA_TYPES
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check whether an If-None-Match header matches the ETag of a resource.
+
+    The weak comparison of RFC 9110 is used, so that the ETags made weak by the
+    compression of the responses still match.
+
+    Parameters
+    ----------
+    if_none_match : str | None
+        If-None-Match header of the request.
+    etag : str
+        ETag of the current representation of the resource.
+
+    Returns
+    -------
+    bool
+        True if the header lists the ETag, or is `*`.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing the responses with a negotiated encoding."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        """Initialize the middleware.
+
+        Parameters
+        ----------
+        app : ASGIApp
+            Application whose responses are compressed.
+        minimum_size : int
+            Minimum size in bytes of the complete responses to compress.
+            Streamed responses are always compressed.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_http_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding"), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Compress the messages of a single response."""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Message | None = None
+        self.compressor: StreamCompressor | None = None
+        # Whether the response is sent as is
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            # Responses already encoded, e.g. precompressed files, are sent as is
+            self.passthrough = "content-encoding" in headers or not is_compressible(
+                headers.get("content-type")
+            )
+            if self.passthrough:
+                await self._send(message)
+            else:
+                # Sent with the first body message, once the size is known
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+            # Empty bodies (e.g. 304 and HEAD responses) are never compressed
+            if not more_body and (not body or len(body) < self.minimum_size):
+                self.passthrough = True
+                await self._send(start_message)
+                await self._send(message)
+                return
+
+            self.compressor = StreamCompressor(self.encoding)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            if more_body:
+                # The size of the streamed body is unknown
+                del headers["Content-Length"]
+                await self._send(start_message)
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._send(start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+        body = self.compressor.compress(body)
+        if not more_body:
+            body += self.compressor.finish()
+        await self._send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 def haversine_distance(
     *, latitude_1: float, longitude_1: float, latitude_2: float, longitude_2: float
@@ -53,3 +55,75 @@ def haversine_distance(
     )
 
     return earth_radius * 2 * math.asin(math.sqrt(haversine))
+
+
+def haversine_distances(
+    latitudes_1: np.ndarray,
+    longitudes_1: np.ndarray,
+    latitudes_2: np.ndarray,
+    longitudes_2: np.ndarray,
+) -> np.ndarray:
+    """Compute the great circle distances between arrays of points in kilometers.
+
+    This is the vectorized version of `haversine_distance`, the distance is
+    computed element-wise between the points of the first and second arrays.
+
+    Parameters
+    ----------
+    latitudes_1 : np.ndarray
+        Latitudes of the first points in decimal degrees.
+    longitudes_1 : np.ndarray
+        Longitudes of the first points in decimal degrees.
+    latitudes_2 : np.ndarray
+        Latitudes of the second points in decimal degrees.
+    longitudes_2 : np.ndarray
+        Longitudes of the second points in decimal degrees.
+
+    Returns
+    -------
+    np.ndarray
+        Distances between the points in kilometers.
+
+    Examples
+    --------
+    >>> haversine_distances(
+    ...     np.array([46.0]), np.array([4.0]), np.array([46.1]), np.array([4.1])
+    ... )
+    array([13.535...])
+    """
+    latitudes_1, longitudes_1, latitudes_2, longitudes_2 = (
+        np.radians(np.asarray(values, dtype=float))
+        for values in (latitudes_1, longitudes_1, latitudes_2, longitudes_2)
+    )
+    earth_radius = 6371
+
+    haversine = (
+        np.sin((latitudes_2 - latitudes_1) / 2) ** 2
+        + np.cos(latitudes_1)
+        * np.cos(latitudes_2)
+        * np.sin((longitudes_2 - longitudes_1) / 2) ** 2
+    )
+
+    # Rounding may push the value slightly above 1 for antipodal points
+    return earth_radius * 2 * np.arcsin(np.sqrt(np.minimum(haversine, 1.0)))
+
+
+def cumulative_distances(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Compute the distance along a path from its first point, in kilometers.
+
+    Parameters
+    ----------
+    latitudes : np.ndarray
+        Latitudes of the path points in decimal degrees.
+    longitudes : np.ndarray
+        Longitudes of the path points in decimal degrees.
+
+    Returns
+    -------
+    np.ndarray
+        Distance from the first point for each point of the path, starting at 0.
+    """
+    steps = haversine_distances(
+        latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:]
+    )
+    return np.concatenate(([0.0], np.cumsum(steps)))
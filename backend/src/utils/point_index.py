@@ -0,0 +1,262 @@
+"""
+Track Point Index Module
+
+This module provides a nearest-point index over the points of a single track,
+used by the segment editor to snap a cursor position to the uploaded track.
+
+The index is a static KD-tree built with numpy over the points projected on a
+local equirectangular plane. Nodes are split at the median of their widest axis
+until they hold at most `LEAF_SIZE` points, and queries traverse the tree
+best-first using the distance to the node bounds, so that a lookup visits a
+few leaves instead of every point of tracks with 100,000 points.
+"""
+
+import heapq
+import math
+
+import numpy as np
+from pydantic import BaseModel
+
+from .math import cumulative_distances, haversine_distances
+
+# Maximum number of points of the leaves of the KD-tree
+LEAF_SIZE = 32
+
+# Maximum number of points returned by a nearest-point lookup
+MAX_NEAREST_POINTS = 100
+
+EARTH_RADIUS_M = 6_371_000
+
+
+class NearestTrackPoint(BaseModel):
+    """Track point returned by a nearest-point lookup.
+
+    `distance` is the distance in meters from the queried location and
+    `cumulative_distance` the distance in kilometers from the start of the
+    track along its points.
+    """
+
+    index: int
+    latitude: float
+    longitude: float
+    elevation: float
+    distance: float
+    cumulative_distance: float
+
+
+class TrackPointIndex:
+    """KD-tree of the points of a track.
+
+    Instances only hold numpy arrays, so that they are built in the worker
+    processes and sent back to the event loop.
+    """
+
+    def __init__(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        elevations: np.ndarray,
+        leaf_size: int = LEAF_SIZE,
+    ):
+        """Build the index of the points of a track.
+
+        Parameters
+        ----------
+        latitudes : np.ndarray
+            Latitudes of the track points in decimal degrees.
+        longitudes : np.ndarray
+            Longitudes of the track points in decimal degrees.
+        elevations : np.ndarray
+            Elevations of the track points in meters.
+        leaf_size : int
+            Maximum number of points of the leaves.
+        """
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.elevations = np.asarray(elevations, dtype=np.float64)
+        n_points = len(self.latitudes)
+        self.cumulative_distances = (
+            cumulative_distances(self.latitudes, self.longitudes)
+            if n_points
+            else np.empty(0)
+        )
+
+        # Projection of the points on the plane tangent at the mean latitude
+        self._scale_x = EARTH_RADIUS_M * math.cos(
+            math.radians(float(self.latitudes.mean())) if n_points else 0.0
+        )
+        x, y = self._project(self.latitudes, self.longitudes)
+
+        order = np.arange(n_points)
+        starts: list[int] = []
+        ends: list[int] = []
+        children: list[list[int]] = []
+        bounds: list[tuple[float, float, float, float]] = []
+
+        def build(start: int, end: int) -> int:
+            node = len(starts)
+            points = order[start:end]
+            node_x, node_y = x[points], y[points]
+            min_x, max_x = float(node_x.min()), float(node_x.max())
+            min_y, max_y = float(node_y.min()), float(node_y.max())
+            starts.append(start)
+            ends.append(end)
+            children.append([-1, -1])
+            bounds.append((min_x, min_y, max_x, max_y))
+            if end - start > leaf_size:
+                values = node_x if max_x - min_x >= max_y - min_y else node_y
+                middle = (end - start) // 2
+                order[start:end] = points[np.argpartition(values, middle)]
+                children[node] = [
+                    build(start, start + middle),
+                    build(start + middle, end),
+                ]
+            return node
+
+        if n_points:
+            build(0, n_points)
+
+        self._order = order
+        self._x = x[order]
+        self._y = y[order]
+        self._starts = np.array(starts, dtype=np.int64)
+        self._ends = np.array(ends, dtype=np.int64)
+        self._children = np.array(children, dtype=np.int64).reshape(-1, 2)
+        self._bounds = np.array(bounds, dtype=np.float64).reshape(-1, 4)
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    def _project(
+        self, latitudes: np.ndarray, longitudes: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Project coordinates on the plane of the index, in meters."""
+        return (
+            np.radians(longitudes) * self._scale_x,
+            np.radians(latitudes) * EARTH_RADIUS_M,
+        )
+
+    def _box_distance(self, node: int, x: float, y: float) -> float:
+        """Squared distance from a projected location to the bounds of a node."""
+        min_x, min_y, max_x, max_y = self._bounds[node]
+        diff_x = max(min_x - x, 0.0, x - max_x)
+        diff_y = max(min_y - y, 0.0, y - max_y)
+        return diff_x * diff_x + diff_y * diff_y
+
+    def query(self, latitude: float, longitude: float, k: int = 1) -> np.ndarray:
+        """Find the indices of the points closest to a location.
+
+        Parameters
+        ----------
+        latitude : float
+            Latitude of the location in decimal degrees.
+        longitude : float
+            Longitude of the location in decimal degrees.
+        k : int
+            Number of points to find.
+
+        Returns
+        -------
+        np.ndarray
+            Indices of the at most `k` closest track points, ordered by their
+            distance to the location on the projection plane.
+        """
+        if k < 1:
+            raise ValueError("At least one point must be requested")
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+
+        x, y = self._project(np.float64(latitude), np.float64(longitude))
+        x, y = float(x), float(y)
+        positions = np.empty(0, dtype=np.int64)
+        distances = np.empty(0)
+        # Squared distance of the k-th closest point found so far
+        bound = math.inf
+
+        heap = [(self._box_distance(0, x, y), 0)]
+        while heap:
+            box_distance, node = heapq.heappop(heap)
+            if box_distance > bound:
+                break
+            left, right = self._children[node]
+            if left >= 0:
+                for child in (int(left), int(right)):
+                    child_distance = self._box_distance(child, x, y)
+                    if child_distance <= bound:
+                        heapq.heappush(heap, (child_distance, child))
+                continue
+
+            start, end = self._starts[node], self._ends[node]
+            positions = np.concatenate((positions, np.arange(start, end)))
+            distances = np.concatenate(
+                (
+                    distances,
+                    (self._x[start:end] - x) ** 2 + (self._y[start:end] - y) ** 2,
+                )
+            )
+            if len(distances) >= k:
+                if len(distances) > k:
+                    kept = np.argpartition(distances, k - 1)[:k]
+                    positions, distances = positions[kept], distances[kept]
+                bound = float(distances.max())
+
+        indices = self._order[positions]
+        return indices[np.lexsort((indices, distances))]
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int = 1
+    ) -> list[NearestTrackPoint]:
+        """Find the points closest to a location.
+
+        Parameters
+        ----------
+        latitude : float
+            Latitude of the location in decimal degrees.
+        longitude : float
+            Longitude of the location in decimal degrees.
+        k : int
+            Number of points to find.
+
+        Returns
+        -------
+        list[NearestTrackPoint]
+            The at most `k` closest track points, closest first.
+        """
+        indices = self.query(latitude, longitude, k)
+        latitudes = self.latitudes[indices]
+        longitudes = self.longitudes[indices]
+        distances = (
+            haversine_distances(
+                np.full(len(indices), latitude),
+                np.full(len(indices), longitude),
+                latitudes,
+                longitudes,
+            )
+            * 1000
+        )
+        return [
+            NearestTrackPoint(
+                index=index,
+                latitude=point_latitude,
+                longitude=point_longitude,
+                elevation=elevation,
+                distance=distance,
+                cumulative_distance=cumulative_distance,
+            )
+            for (
+                index,
+                point_latitude,
+                point_longitude,
+                elevation,
+                distance,
+                cumulative_distance,
+            ) in zip(
+                indices.tolist(),
+                latitudes.tolist(),
+                longitudes.tolist(),
+                self.elevations[indices].tolist(),
+                distances.tolist(),
+                self.cumulative_distances[indices].tolist(),
+                strict=True,
+            )
+        ]
@@ -0,0 +1,149 @@
+"""
+Elevation Profile Module
+
+This module downsamples the elevation profile of a track for the charts of the
+frontend, which are at most a few thousand pixels wide. Points are selected with
+the Largest-Triangle-Three-Buckets (LTTB) algorithm, which keeps the visual
+shape of the profile (summits and valleys) better than regular sampling.
+
+The number of returned points is rounded up to a power of two (the width
+bucket), so that profiles computed for similar chart widths are cached once.
+"""
+
+import numpy as np
+from pydantic import BaseModel
+
+from .math import cumulative_distances
+
+# Number of points of the elevation profiles, the width buckets
+PROFILE_WIDTH_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096)
+MAX_PROFILE_WIDTH = PROFILE_WIDTH_BUCKETS[-1]
+
+
+class ElevationProfile(BaseModel):
+    """Downsampled distance versus elevation series of a track.
+
+    `indices` holds the index of each profile point in the full-resolution
+    track points, e.g. to map a selection on the profile back to the track.
+    """
+
+    distances: list[float]
+    elevations: list[float]
+    indices: list[int]
+    total_points: int
+    total_distance: float
+
+
+def profile_width_bucket(width: int) -> int:
+    """Round a chart width to the number of points of its elevation profile.
+
+    Parameters
+    ----------
+    width : int
+        Width of the chart in pixels.
+
+    Returns
+    -------
+    int
+        Smallest bucket of `PROFILE_WIDTH_BUCKETS` greater than or equal to the
+        width, the largest one for wider charts.
+    """
+    return next(
+        (bucket for bucket in PROFILE_WIDTH_BUCKETS if bucket >= width),
+        MAX_PROFILE_WIDTH,
+    )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Select points of a series with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always selected. The other points are split
+    in `n_out - 2` buckets of consecutive points, and the point of each bucket
+    forming the largest triangle with the point selected in the previous bucket
+    and the mean of the next bucket is selected.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Increasing abscissas of the series.
+    y : np.ndarray
+        Values of the series.
+    n_out : int
+        Number of points to select, at least 3.
+
+    Returns
+    -------
+    np.ndarray
+        Increasing indices of the selected points, all the indices if the series
+        has at most `n_out` points.
+    """
+    if n_out < 3:
+        raise ValueError("At least 3 points must be selected")
+    n_points = len(x)
+    if n_out >= n_points:
+        return np.arange(n_points)
+
+    # Bucket boundaries of the points between the first and the last one
+    bucket_size = (n_points - 2) / (n_out - 2)
+    edges = np.floor(np.arange(n_out - 1) * bucket_size).astype(np.int64) + 1
+    edges[-1] = n_points - 1
+    # Mean of each bucket, the last point stands for the bucket after the last one
+    sizes = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[1:-1], edges[:-1] - 1) / sizes, x[-1])
+    mean_y = np.append(np.add.reduceat(y[1:-1], edges[:-1] - 1) / sizes, y[-1])
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n_points - 1
+    selected = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        selected_x, selected_y = x[selected], y[selected]
+        # Twice the area of the triangles, the factor does not change the argmax
+        areas = np.abs(
+            (selected_x - mean_x[bucket + 1]) * (y[start:end] - selected_y)
+            - (selected_x - x[start:end]) * (mean_y[bucket + 1] - selected_y)
+        )
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+    return indices
+
+
+def compute_elevation_profile(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    elevations: np.ndarray,
+    n_out: int,
+) -> ElevationProfile:
+    """Compute the downsampled elevation profile of a track.
+
+    Parameters
+    ----------
+    latitudes : np.ndarray
+        Latitudes of the track points in decimal degrees.
+    longitudes : np.ndarray
+        Longitudes of the track points in decimal degrees.
+    elevations : np.ndarray
+        Elevations of the track points in meters.
+    n_out : int
+        Maximum number of points of the profile.
+
+    Returns
+    -------
+    ElevationProfile
+        Distances from the start in kilometers and elevations of the selected
+        points, with their indices in the track points.
+    """
+    if len(latitudes) == 0:
+        return ElevationProfile(
+            distances=[], elevations=[], indices=[], total_points=0, total_distance=0
+        )
+
+    distances = cumulative_distances(latitudes, longitudes)
+    indices = lttb_indices(distances, elevations, n_out)
+    return ElevationProfile(
+        distances=distances[indices].tolist(),
+        elevations=elevations[indices].tolist(),
+        indices=indices.tolist(),
+        total_points=len(latitudes),
+        total_distance=float(distances[-1]),
+    )
@@ -0,0 +1,179 @@
+"""
+Search Cache Module
+
+This module provides the result cache of the segment search. Explorer clients
+looking at the same popular map areas send identical searches:
+
+- Concurrent identical searches are coalesced, they all wait for a single
+  execution of the search (single flight).
+- The results are then kept for a short time to live, in a cache bounded by
+  its number of entries and emptied whenever a track is written.
+
+The execution of a search is cancelled once every request waiting for it has
+been cancelled, e.g. because their clients disconnected.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, NamedTuple, TypeVar
+
+from .cache import LRUCache
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SearchCacheStats(NamedTuple):
+    """Counters of a search cache.
+
+    `coalescing_ratio` is the share of the requests that did not execute a
+    search, answered from the cache or by joining a running execution.
+    """
+
+    requests: int
+    hits: int
+    coalesced: int
+    executions: int
+    invalidations: int
+    entries: int
+    max_entries: int
+    coalescing_ratio: float
+
+
+class _InFlight(Generic[V]):
+    """Running execution of a search and number of requests waiting for it."""
+
+    def __init__(self, task: "asyncio.Task[V]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SearchResultCache(Generic[K, V]):
+    """Short-lived results of the searches, with coalescing of the executions.
+
+    Results of executions started before an invalidation are returned to the
+    requests waiting for them but are not cached, and later requests do not
+    join these executions.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        ttl : float
+            Time in seconds during which a result is served from the cache, 0
+            only coalesces the concurrent searches.
+        max_entries : int
+            Maximum number of cached results.
+        clock : Callable[[], float]
+            Function returning the current time in seconds.
+        """
+        self.ttl = ttl
+        self._clock = clock
+        # Cached results with their expiry time
+        self._results: LRUCache[K, tuple[V, float]] = LRUCache(max_size=max_entries)
+        self._in_flight: dict[K, _InFlight[V]] = {}
+        self._generation = 0
+        self.requests = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.executions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    async def get_or_run(self, key: K, search: Callable[[], Awaitable[V]]) -> V:
+        """Get the result of a search, executing it if needed.
+
+        Parameters
+        ----------
+        key : K
+            Key identifying the search.
+        search : Callable[[], Awaitable[V]]
+            Function executing the search, called when the result is neither
+            cached nor being computed.
+
+        Returns
+        -------
+        V
+            The result of the search. Errors of the search are raised to every
+            request waiting for it and are not cached.
+        """
+        self.requests += 1
+        cached = self._results.get(key)
+        if cached is not None:
+            result, expires_at = cached
+            if expires_at > self._clock():
+                self.hits += 1
+                return result
+            self._results.invalidate(key)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            self.executions += 1
+            in_flight = _InFlight(
+                asyncio.ensure_future(self._execute(key, search, self._generation))
+            )
+            self._in_flight[key] = in_flight
+        else:
+            self.coalesced += 1
+
+        in_flight.waiters += 1
+        try:
+            # Shielded so that a cancelled request does not cancel the others
+            return await asyncio.shield(in_flight.task)
+        finally:
+            in_flight.waiters -= 1
+            if in_flight.waiters == 0 and not in_flight.task.done():
+                # Nobody waits for the result anymore
+                in_flight.task.cancel()
+                self._forget(key, in_flight.task)
+
+    async def _execute(
+        self, key: K, search: Callable[[], Awaitable[V]], generation: int
+    ) -> V:
+        """Execute a search and cache its result if still valid."""
+        try:
+            result = await search()
+            if generation == self._generation and self.ttl > 0:
+                self._results.put(key, (result, self._clock() + self.ttl))
+            return result
+        finally:
+            self._forget(key, asyncio.current_task())
+
+    def _forget(self, key: K, task: "asyncio.Task[V] | None") -> None:
+        """Stop coalescing the requests with an execution of a search."""
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None and in_flight.task is task:
+            del self._in_flight[key]
+
+    def invalidate(self) -> None:
+        """Remove all the cached results, after a track was written."""
+        self._generation += 1
+        self._results.clear()
+        self._in_flight.clear()
+        self.invalidations += 1
+
+    @property
+    def stats(self) -> SearchCacheStats:
+        """Counters and current size of the cache."""
+        return SearchCacheStats(
+            requests=self.requests,
+            hits=self.hits,
+            coalesced=self.coalesced,
+            executions=self.executions,
+            invalidations=self.invalidations,
+            entries=len(self._results),
+            max_entries=self._results.max_size,
+            coalescing_ratio=(
+                (self.hits + self.coalesced) / self.requests if self.requests else 0.0
+            ),
+        )
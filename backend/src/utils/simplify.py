@@ -0,0 +1,351 @@
+"""
+Track Simplification Module
+
+This module simplifies track geometries so that they can be sent to the map
+without the full GPX content. Simplified geometries are precomputed for a small
+set of tolerances when a track is written, both as Google polylines (inlined in
+the search results) and as level of detail (LOD) GPX files stored next to the
+track GPX file.
+"""
+
+import math
+from collections.abc import Sequence
+from itertools import chain, groupby
+from pathlib import Path
+from typing import NamedTuple
+from xml.sax.saxutils import escape, quoteattr
+
+import polyline
+
+from .gpx import GPXStreamPoint, GPXStreamReader, load_track_coordinates
+from .track_sidecar import encode_stream_points_sidecar
+
+# Mean Earth radius in meters, as used by the haversine distance
+EARTH_RADIUS_METERS = 6371000.0
+
+# Tolerances (in meters) of the precomputed simplified polylines, from the most
+# detailed to the coarsest
+POLYLINE_TOLERANCES = (5, 20, 100)
+
+# Tolerances (in meters) of the level of detail GPX files, from the most detailed
+# to the coarsest
+LOD_TOLERANCES = (1, 10, 50)
+
+
+def _project(
+    points: Sequence[tuple[float, float]],
+) -> list[tuple[float, float]]:
+    """Project (latitude, longitude) points to a local plane in meters.
+
+    An equirectangular projection centered on the mean latitude of the points is
+    accurate enough at the scale of a track.
+    """
+    mean_latitude = math.radians(sum(point[0] for point in points) / len(points))
+    scale = math.radians(1) * EARTH_RADIUS_METERS
+    longitude_scale = scale * math.cos(mean_latitude)
+    return [
+        (longitude * longitude_scale, latitude * scale)
+        for latitude, longitude in points
+    ]
+
+
+def _segment_distance(
+    point: tuple[float, float],
+    start: tuple[float, float],
+    end: tuple[float, float],
+) -> float:
+    """Compute the distance from a point to the segment [start, end]."""
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    length_squared = dx * dx + dy * dy
+    if length_squared == 0:
+        return math.hypot(point[0] - start[0], point[1] - start[1])
+    ratio = ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / length_squared
+    ratio = max(0.0, min(1.0, ratio))
+    return math.hypot(
+        point[0] - (start[0] + ratio * dx), point[1] - (start[1] + ratio * dy)
+    )
+
+
+def simplify_douglas_peucker(
+    points: Sequence[tuple[float, float]], tolerance: float
+) -> list[tuple[float, float]]:
+    """Simplify a track with the Douglas-Peucker algorithm.
+
+    Parameters
+    ----------
+    points : Sequence[tuple[float, float]]
+        Track points as (latitude, longitude) pairs.
+    tolerance : float
+        Maximum distance (in meters) between the original track and the
+        simplified one.
+
+    Returns
+    -------
+    list[tuple[float, float]]
+        Subset of the points, always including the first and last ones.
+    """
+    keep = _douglas_peucker_mask(points, tolerance)
+    return [point for point, kept in zip(points, keep, strict=True) if kept]
+
+
+def _douglas_peucker_mask(
+    points: Sequence[tuple[float, float]], tolerance: float
+) -> list[bool]:
+    """Compute which points are kept by the Douglas-Peucker algorithm."""
+    if len(points) <= 2:
+        return [True] * len(points)
+
+    projected = _project(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+
+    # Iterative version to avoid hitting the recursion limit on long tracks
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        max_distance, max_index = -1.0, start
+        for index in range(start + 1, end):
+            distance = _segment_distance(
+                projected[index], projected[start], projected[end]
+            )
+            if distance > max_distance:
+                max_distance, max_index = distance, index
+        if max_distance > tolerance:
+            keep[max_index] = True
+            stack.append((start, max_index))
+            stack.append((max_index, end))
+
+    return keep
+
+
+def encode_simplified_polylines(
+    points: Sequence[tuple[float, float]],
+) -> dict[str, str] | None:
+    """Encode the track simplified at each of the `POLYLINE_TOLERANCES`.
+
+    Parameters
+    ----------
+    points : Sequence[tuple[float, float]]
+        Track points as (latitude, longitude) pairs.
+
+    Returns
+    -------
+    dict[str, str] | None
+        Encoded polylines keyed by tolerance in meters, or None if the track has
+        less than two points.
+    """
+    if len(points) < 2:
+        return None
+    return {
+        str(tolerance): polyline.encode(simplify_douglas_peucker(points, tolerance))
+        for tolerance in POLYLINE_TOLERANCES
+    }
+
+
+def select_simplified_polyline(
+    polylines: dict[str, str] | None, tolerance: float
+) -> str | None:
+    """Select the precomputed polyline appropriate for a tolerance.
+
+    The coarsest polyline whose tolerance does not exceed the requested one is
+    selected, falling back to the most detailed polyline.
+
+    Parameters
+    ----------
+    polylines : dict[str, str] | None
+        Encoded polylines keyed by tolerance in meters.
+    tolerance : float
+        Requested tolerance in meters.
+
+    Returns
+    -------
+    str | None
+        Encoded polyline, or None if no polyline has been precomputed.
+    """
+    if not polylines:
+        return None
+    tolerances = sorted(polylines, key=float)
+    selected = tolerances[0]
+    for candidate in tolerances:
+        if float(candidate) <= tolerance:
+            selected = candidate
+    return polylines[selected]
+
+
+def encode_gpx_polylines(source: bytes | Path) -> dict[str, str] | None:
+    """Encode the simplified polylines of a GPX file.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+
+    Returns
+    -------
+    dict[str, str] | None
+        Encoded polylines keyed by tolerance in meters, or None if the track has
+        less than two points.
+    """
+    return encode_simplified_polylines(load_track_coordinates(source))
+
+
+def simplify_gpx_coordinates(
+    source: bytes | Path, tolerance: float
+) -> list[tuple[float, float]]:
+    """Simplify the track of a GPX file with the Douglas-Peucker algorithm.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+    tolerance : float
+        Maximum distance (in meters) between the original track and the
+        simplified one.
+
+    Returns
+    -------
+    list[tuple[float, float]]
+        Simplified track points as (latitude, longitude) pairs.
+    """
+    return simplify_douglas_peucker(load_track_coordinates(source), tolerance)
+
+
+def lod_file_path(file_path: str, tolerance: int) -> str:
+    """Build the path of a level of detail GPX file from the track GPX path.
+
+    Parameters
+    ----------
+    file_path : str
+        Storage path (or local path) of the track GPX file.
+    tolerance : int
+        Tolerance of the level of detail in meters.
+
+    Returns
+    -------
+    str
+        Path of the level of detail file, next to the GPX file, e.g.
+        `gpx-segments/<id>.lod10.gpx` for `gpx-segments/<id>.gpx`.
+    """
+    return f"{file_path.removesuffix('.gpx')}.lod{tolerance}.gpx"
+
+
+class LodFile(NamedTuple):
+    """Level of detail GPX file written for a track."""
+
+    path: Path
+    # Content of the sidecar of the file, None if it cannot have one
+    sidecar: bytes | None
+
+
+def _format_gpx(track_name: str | None, segments: list[list[GPXStreamPoint]]) -> bytes:
+    """Serialize track segments as a GPX 1.1 document."""
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1" '
+        'creator="Gravly">',
+        "<trk>",
+    ]
+    if track_name is not None:
+        lines.append(f"<name>{escape(track_name)}</name>")
+    for points in segments:
+        lines.append("<trkseg>")
+        for point in points:
+            children = ""
+            if point.elevation is not None:
+                children += f"<ele>{point.elevation}</ele>"
+            if point.time is not None:
+                children += f"<time>{escape(point.time)}</time>"
+            lines.append(
+                f"<trkpt lat={quoteattr(str(point.latitude))} "
+                f"lon={quoteattr(str(point.longitude))}>{children}</trkpt>"
+            )
+        lines.append("</trkseg>")
+    lines.extend(["</trk>", "</gpx>", ""])
+    return "\n".join(lines).encode("utf-8")
+
+
+def simplify_gpx(
+    source: bytes | Path, tolerances: Sequence[int] = LOD_TOLERANCES
+) -> dict[int, bytes]:
+    """Build the level of detail GPX documents of a track.
+
+    The track points are read once, then each track segment is simplified with
+    the Douglas-Peucker algorithm for every tolerance. The kept points retain
+    their elevation and time.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+    tolerances : Sequence[int]
+        Simplification tolerances in meters.
+
+    Returns
+    -------
+    dict[int, bytes]
+        GPX content of the first track simplified at each tolerance.
+    """
+    track_name, levels = _simplify_segments(source, tolerances)
+    return {
+        tolerance: _format_gpx(track_name, segments)
+        for tolerance, segments in levels.items()
+    }
+
+
+def _simplify_segments(
+    source: bytes | Path, tolerances: Sequence[int]
+) -> tuple[str | None, dict[int, list[list[GPXStreamPoint]]]]:
+    """Simplify the segments of the first track of a GPX file at each tolerance.
+
+    Returns the track name and the kept points of each segment by tolerance.
+    """
+    reader = GPXStreamReader(source)
+    segments = [
+        list(points)
+        for _, points in groupby(reader, key=lambda point: point.segment_index)
+    ]
+    coordinates = [[(p.latitude, p.longitude) for p in points] for points in segments]
+
+    levels = {}
+    for tolerance in tolerances:
+        levels[tolerance] = [
+            [
+                point
+                for point, kept in zip(
+                    points, _douglas_peucker_mask(segment, tolerance), strict=True
+                )
+                if kept
+            ]
+            for points, segment in zip(segments, coordinates, strict=True)
+        ]
+    return reader.track_name, levels
+
+
+def write_lod_files(source: Path, output_dir: Path, file_id: str) -> dict[int, LodFile]:
+    """Write the level of detail GPX files of a track and build their sidecars.
+
+    Parameters
+    ----------
+    source : Path
+        Path to the track GPX file.
+    output_dir : Path
+        Directory where the files are written.
+    file_id : str
+        Identifier of the track GPX file, the files are named
+        `<file_id>.lod<tolerance>.gpx`.
+
+    Returns
+    -------
+    dict[int, LodFile]
+        Path and sidecar of the written file for each of the `LOD_TOLERANCES`.
+    """
+    track_name, levels = _simplify_segments(source, LOD_TOLERANCES)
+    files = {}
+    for tolerance, segments in levels.items():
+        path = Path(lod_file_path(str(output_dir / f"{file_id}.gpx"), tolerance))
+        path.write_bytes(_format_gpx(track_name, segments))
+        files[tolerance] = LodFile(
+            path,
+            encode_stream_points_sidecar(chain.from_iterable(segments), track_name),
+        )
+    return files
@@ -0,0 +1,389 @@
+"""
+Spatial Index Module
+
+This module provides an in-memory spatial index of track bounding boxes and
+barycenters. It answers the map viewport searches (bounding box intersection
+ordered by distance to the viewport center) without a database round trip.
+
+The index is an STR (Sort-Tile-Recursive) packed R-tree. Incremental updates are
+buffered in a small unpacked area and tombstone set that are scanned linearly,
+and the tree is repacked once the buffer grows past a fraction of the index size.
+"""
+
+import heapq
+import logging
+import math
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of children per R-tree node
+NODE_CAPACITY = 16
+
+# Minimum number of buffered updates before the tree gets repacked
+MIN_REBUILD_THRESHOLD = 64
+
+# Fraction of the index size that buffered updates may reach before repacking
+REBUILD_RATIO = 0.1
+
+
+class IndexedTrack(NamedTuple):
+    """Entry stored in the spatial index."""
+
+    track_id: int
+    north: float
+    south: float
+    east: float
+    west: float
+    latitude: float
+    longitude: float
+    item: Any
+
+
+class _Node:
+    """R-tree node holding either child nodes or entries (leaf)."""
+
+    __slots__ = ("north", "south", "east", "west", "children", "leaf")
+
+    def __init__(self, children: list, leaf: bool):
+        self.children = children
+        self.leaf = leaf
+        self.north = max(child.north for child in children)
+        self.south = min(child.south for child in children)
+        self.east = max(child.east for child in children)
+        self.west = min(child.west for child in children)
+
+
+def _intersects(box, north: float, south: float, east: float, west: float) -> bool:
+    """Check whether a box intersects the search area.
+
+    The comparison is strict to match the database search: a track that only
+    touches the search area border is not considered visible.
+    """
+    return (
+        box.north > south and box.south < north and box.east > west and box.west < east
+    )
+
+
+def _pack(children: list, leaf: bool) -> list[_Node]:
+    """Pack one level of the tree using Sort-Tile-Recursive.
+
+    Parameters
+    ----------
+    children : list
+        Entries (for the leaf level) or nodes to group into parent nodes.
+    leaf : bool
+        Whether the created nodes are leaves.
+
+    Returns
+    -------
+    list[_Node]
+        Nodes of the level above, each holding at most `NODE_CAPACITY` children.
+    """
+    node_count = math.ceil(len(children) / NODE_CAPACITY)
+    slice_count = math.ceil(math.sqrt(node_count))
+    slice_size = slice_count * NODE_CAPACITY
+
+    by_longitude = sorted(children, key=lambda child: child.east + child.west)
+    nodes = []
+    for slice_start in range(0, len(by_longitude), slice_size):
+        vertical_slice = sorted(
+            by_longitude[slice_start : slice_start + slice_size],
+            key=lambda child: child.north + child.south,
+        )
+        for node_start in range(0, len(vertical_slice), NODE_CAPACITY):
+            nodes.append(
+                _Node(vertical_slice[node_start : node_start + NODE_CAPACITY], leaf)
+            )
+    return nodes
+
+
+class TrackSpatialIndex:
+    """In-memory R-tree of track bounds and barycenters.
+
+    Items stored in the index must expose the `id`, `bound_north`, `bound_south`,
+    `bound_east`, `bound_west`, `barycenter_latitude` and `barycenter_longitude`
+    attributes, e.g. `TrackResponse` objects. The index is local to the process:
+    it is kept up to date by the write endpoints of the worker that serves them.
+    """
+
+    def __init__(self, items: Iterable[Any] = ()):
+        """Initialize the index and bulk load the given items.
+
+        Parameters
+        ----------
+        items : Iterable[Any]
+            Items to load into the index.
+        """
+        self._entries: dict[int, IndexedTrack] = {}
+        self._root: _Node | None = None
+        self._pending: dict[int, IndexedTrack] = {}
+        self._removed: set[int] = set()
+
+        for item in items:
+            entry = self._make_entry(item)
+            if entry is not None:
+                self._entries[entry.track_id] = entry
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._entries
+
+    @staticmethod
+    def _make_entry(item: Any) -> IndexedTrack | None:
+        """Create an index entry from an item, or None if its bounds are invalid."""
+        entry = IndexedTrack(
+            track_id=item.id,
+            north=item.bound_north,
+            south=item.bound_south,
+            east=item.bound_east,
+            west=item.bound_west,
+            latitude=item.barycenter_latitude,
+            longitude=item.barycenter_longitude,
+            item=item,
+        )
+        if not all(
+            isinstance(value, (int, float)) and math.isfinite(value)
+            for value in entry[1:7]
+        ):
+            logger.warning(f"Not indexing track {item.id} with non-finite bounds")
+            return None
+        return entry
+
+    def _rebuild(self) -> None:
+        """Repack the R-tree from all the entries and clear the update buffers."""
+        self._pending.clear()
+        self._removed.clear()
+
+        level: list = list(self._entries.values())
+        if not level:
+            self._root = None
+            return
+
+        leaf = True
+        while True:
+            level = _pack(level, leaf)
+            leaf = False
+            if len(level) == 1:
+                break
+        self._root = level[0]
+
+    def _maybe_rebuild(self) -> None:
+        """Repack the R-tree when the update buffers become too large."""
+        buffered = len(self._pending) + len(self._removed)
+        threshold = max(MIN_REBUILD_THRESHOLD, REBUILD_RATIO * len(self._entries))
+        if buffered > threshold:
+            self._rebuild()
+
+    def upsert(self, item: Any) -> bool:
+        """Insert an item in the index or replace the item with the same ID.
+
+        Parameters
+        ----------
+        item : Any
+            Item to index.
+
+        Returns
+        -------
+        bool
+            True if the item was indexed, False if its bounds are invalid (any
+            previous version of the item is removed from the index in that case).
+        """
+        entry = self._make_entry(item)
+        if entry is None:
+            self.remove(item.id)
+            return False
+
+        if entry.track_id in self._entries and entry.track_id not in self._pending:
+            # The previous version lives in the packed tree
+            self._removed.add(entry.track_id)
+        self._entries[entry.track_id] = entry
+        self._pending[entry.track_id] = entry
+        self._maybe_rebuild()
+        return True
+
+    def remove(self, track_id: int) -> bool:
+        """Remove an item from the index.
+
+        Parameters
+        ----------
+        track_id : int
+            ID of the item to remove.
+
+        Returns
+        -------
+        bool
+            True if the item was in the index, False otherwise.
+        """
+        if track_id not in self._entries:
+            return False
+
+        del self._entries[track_id]
+        if self._pending.pop(track_id, None) is None:
+            self._removed.add(track_id)
+        self._maybe_rebuild()
+        return True
+
+    def intersecting(
+        self, north: float, south: float, east: float, west: float
+    ) -> Iterator[IndexedTrack]:
+        """Iterate over the entries whose bounds intersect the search area.
+
+        Parameters
+        ----------
+        north : float
+            Northern boundary of the search area
+        south : float
+            Southern boundary of the search area
+        east : float
+            Eastern boundary of the search area
+        west : float
+            Western boundary of the search area
+
+        Yields
+        ------
+        IndexedTrack
+            Entries intersecting the search area, in no particular order.
+        """
+        if self._root is not None and _intersects(self._root, north, south, east, west):
+            stack = [self._root]
+            while stack:
+                node = stack.pop()
+                for child in node.children:
+                    if not _intersects(child, north, south, east, west):
+                        continue
+                    if not node.leaf:
+                        stack.append(child)
+                    elif child.track_id not in self._removed:
+                        yield child
+
+        for entry in self._pending.values():
+            if _intersects(entry, north, south, east, west):
+                yield entry
+
+    def search(
+        self,
+        north: float,
+        south: float,
+        east: float,
+        west: float,
+        limit: int,
+        predicate: Callable[[Any], bool] | None = None,
+        key: Callable[[Any], Any] | None = None,
+    ) -> list[Any]:
+        """Find the items visible in the search area closest to its center.
+
+        Parameters
+        ----------
+        north : float
+            Northern boundary of the search area
+        south : float
+            Southern boundary of the search area
+        east : float
+            Eastern boundary of the search area
+        west : float
+            Western boundary of the search area
+        limit : int
+            Maximum number of items to return
+        predicate : Callable[[Any], bool] | None
+            Optional filter applied to the items before the limit is taken
+        key : Callable[[Any], Any] | None
+            Optional sort key of the items, taking precedence over the distance
+            to the center of the search area
+
+        Returns
+        -------
+        list[Any]
+            Items ordered by their key if given, then by the squared Euclidean
+            distance between their barycenter and the center of the search area.
+        """
+        center_latitude = (north + south) / 2
+        center_longitude = (east + west) / 2
+
+        candidates = (
+            (
+                key(entry.item) if key is not None else 0,
+                (entry.latitude - center_latitude) ** 2
+                + (entry.longitude - center_longitude) ** 2,
+                entry.track_id,
+                entry.item,
+            )
+            for entry in self.intersecting(north, south, east, west)
+            if predicate is None or predicate(entry.item)
+        )
+        return [item for _, _, _, item in heapq.nsmallest(limit, candidates)]
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        limit: int,
+        predicate: Callable[[Any], bool] | None = None,
+    ) -> list[Any]:
+        """Find the items whose barycenter is closest to a location.
+
+        The tree is traversed best-first using the distance from the location to
+        the node bounds, which is a lower bound of the barycenter distances of
+        the entries below it.
+
+        Parameters
+        ----------
+        latitude : float
+            Latitude of the location
+        longitude : float
+            Longitude of the location
+        limit : int
+            Maximum number of items to return
+        predicate : Callable[[Any], bool] | None
+            Optional filter applied to the items
+
+        Returns
+        -------
+        list[Any]
+            Items ordered by the squared Euclidean distance between their
+            barycenter and the location.
+        """
+
+        def box_distance(box) -> float:
+            diff_latitude = max(box.south - latitude, 0.0, latitude - box.north)
+            diff_longitude = max(box.west - longitude, 0.0, longitude - box.east)
+            return diff_latitude**2 + diff_longitude**2
+
+        def entry_distance(entry: IndexedTrack) -> float:
+            return (entry.latitude - latitude) ** 2 + (entry.longitude - longitude) ** 2
+
+        # Heap items: (distance, tie breaker, is_entry, node or entry)
+        heap: list = [
+            (entry_distance(entry), entry.track_id, True, entry)
+            for entry in self._pending.values()
+            if predicate is None or predicate(entry.item)
+        ]
+        heapq.heapify(heap)
+        if self._root is not None:
+            heapq.heappush(heap, (box_distance(self._root), -1, False, self._root))
+
+        counter = -1
+        results = []
+        while heap and len(results) < limit:
+            _, _, is_entry, element = heapq.heappop(heap)
+            if is_entry:
+                results.append(element.item)
+                continue
+            for child in element.children:
+                if element.leaf:
+                    if child.track_id in self._removed or (
+                        predicate is not None and not predicate(child.item)
+                    ):
+                        continue
+                    heapq.heappush(
+                        heap, (entry_distance(child), child.track_id, True, child)
+                    )
+                else:
+                    # Negative tie breakers keep nodes apart from track IDs
+                    counter -= 1
+                    heapq.heappush(heap, (box_distance(child), counter, False, child))
+        return results
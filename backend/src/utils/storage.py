@@ -6,27 +6,84 @@ and local filesystem storage, allowing seamless switching between production
 and local development environments.
 """
 
+import asyncio
+import functools
 import logging
+import os
 import shutil
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Protocol
+from typing import Any, NamedTuple, Protocol, TypeVar
 from urllib.parse import urljoin
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 
+from .compression import compress, decompress
 from .config import LocalStorageConfig, S3StorageConfig
+from .fit_encoder import FIT_MEDIA_TYPE
+from .track_sidecar import sidecar_path
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Storage prefix of the cached FIT exports
+FIT_EXPORTS_PREFIX = "fit-exports"
+
+
+class StoredGPXData(NamedTuple):
+    """GPX content as stored, possibly compressed."""
+
+    content: bytes
+    # Content encoding ('gzip' or 'zstd') of the content, None if uncompressed
+    content_encoding: str | None
+
+
+def _decompress_gpx_data(stored: StoredGPXData | None, url: str) -> bytes | None:
+    """Decompress stored GPX data, logging failures."""
+    if stored is None:
+        return None
+    try:
+        return decompress(stored.content, stored.content_encoding)
+    except Exception as e:
+        logger.error(f"Failed to decompress GPX data from {url}: {str(e)}")
+        return None
+
+
+def fit_export_path(cache_key: str) -> str:
+    """Build the storage key of a FIT export.
+
+    FIT exports are shared by all the tracks with the same GPX content, so they
+    are stored by cache key rather than next to the GPX files.
+
+    Parameters
+    ----------
+    cache_key : str
+        Cache key of the FIT export, see `api.segments.fit_export_key`.
+
+    Returns
+    -------
+    str
+        Storage key of the FIT export.
+    """
+    return f"{FIT_EXPORTS_PREFIX}/{cache_key}.fit"
+
 
 class StorageManager(Protocol):
     """Protocol defining the storage manager interface."""
 
     def upload_gpx_segment(
-        self, local_file_path: Path, file_id: str, prefix: str = "gpx-segments"
+        self,
+        local_file_path: Path,
+        file_id: str,
+        prefix: str = "gpx-segments",
+        track_sidecar: bytes | None = None,
     ) -> str:
-        """Upload a GPX segment file to storage."""
+        """Upload a GPX segment file, and its sidecar if any, to storage."""
         ...
 
     def get_gpx_segment_url(
@@ -57,17 +114,169 @@ class StorageManager(Protocol):
         """Load GPX data from storage URL (s3:// or local://)."""
         ...
 
+    def load_stored_gpx_data(self, url: str) -> StoredGPXData | None:
+        """Load GPX data as stored, without decompressing it."""
+        ...
+
+    def load_track_sidecar(self, url: str) -> bytes | None:
+        """Load the binary sidecar of a GPX file from its storage URL."""
+        ...
+
+    def upload_fit_export(self, fit_bytes: bytes, cache_key: str) -> str:
+        """Store the FIT export of a GPX file under its cache key."""
+        ...
+
+    def load_fit_export(self, cache_key: str) -> bytes | None:
+        """Load the FIT export stored under a cache key."""
+        ...
+
     def delete_gpx_segment_by_url(self, url: str) -> bool:
-        """Delete a GPX segment file from storage using full URL."""
+        """Delete a GPX segment file and its sidecar from storage using full URL."""
         ...
 
     def delete_image_by_url(self, url: str) -> bool:
         """Delete an image file from storage using full URL."""
         ...
 
+    async def aupload_gpx_segment(
+        self,
+        local_file_path: Path,
+        file_id: str,
+        prefix: str = "gpx-segments",
+        track_sidecar: bytes | None = None,
+    ) -> str:
+        """Upload a GPX segment file to storage without blocking the event loop."""
+        ...
+
+    async def aupload_image(
+        self, local_file_path: Path, file_id: str, prefix: str = "images-segments"
+    ) -> str:
+        """Upload an image file to storage without blocking the event loop."""
+        ...
+
+    async def aload_gpx_data(self, url: str) -> bytes | None:
+        """Load GPX data from storage URL without blocking the event loop."""
+        ...
+
+    async def aload_stored_gpx_data(self, url: str) -> StoredGPXData | None:
+        """Load GPX data as stored without blocking the event loop."""
+        ...
+
+    async def aload_track_sidecar(self, url: str) -> bytes | None:
+        """Load the sidecar of a GPX file without blocking the event loop."""
+        ...
+
+    async def aupload_fit_export(self, fit_bytes: bytes, cache_key: str) -> str:
+        """Store a FIT export without blocking the event loop."""
+        ...
+
+    async def aload_fit_export(self, cache_key: str) -> bytes | None:
+        """Load a FIT export without blocking the event loop."""
+        ...
+
+    async def adelete_gpx_segment_by_url(self, url: str) -> bool:
+        """Delete a GPX segment file without blocking the event loop."""
+        ...
 
-class S3Manager:
-    """Manages S3 operations for GPX file storage."""
+    async def adelete_image_by_url(self, url: str) -> bool:
+        """Delete an image file without blocking the event loop."""
+        ...
+
+    def close(self) -> None:
+        """Release the resources used by the asynchronous operations."""
+        ...
+
+
+class AsyncStorageMixin:
+    """Asynchronous variants of the storage operations.
+
+    The blocking operations run on a thread pool owned by the storage manager,
+    whose size bounds the number of concurrent storage operations. The
+    asynchronous methods call the synchronous ones, so both always behave the
+    same way.
+    """
+
+    _executor: ThreadPoolExecutor
+
+    def _create_executor(self, max_workers: int) -> None:
+        """Create the thread pool running the blocking operations."""
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="storage"
+        )
+
+    async def _run(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking operation on the thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(function, *args, **kwargs)
+        )
+
+    async def aupload_gpx_segment(
+        self,
+        local_file_path: Path,
+        file_id: str,
+        prefix: str = "gpx-segments",
+        track_sidecar: bytes | None = None,
+    ) -> str:
+        """Upload a GPX segment file, see `upload_gpx_segment`."""
+        return await self._run(
+            self.upload_gpx_segment,
+            local_file_path,
+            file_id,
+            prefix=prefix,
+            track_sidecar=track_sidecar,
+        )
+
+    async def aupload_image(
+        self,
+        local_file_path: Path,
+        file_id: str,
+        prefix: str = "images-segments",
+    ) -> str:
+        """Upload an image file, see `upload_image`."""
+        return await self._run(
+            self.upload_image, local_file_path, file_id, prefix=prefix
+        )
+
+    async def aload_gpx_data(self, url: str) -> bytes | None:
+        """Load GPX data, see `load_gpx_data`."""
+        return await self._run(self.load_gpx_data, url)
+
+    async def aload_stored_gpx_data(self, url: str) -> StoredGPXData | None:
+        """Load GPX data as stored, see `load_stored_gpx_data`."""
+        return await self._run(self.load_stored_gpx_data, url)
+
+    async def aload_track_sidecar(self, url: str) -> bytes | None:
+        """Load the sidecar of a GPX file, see `load_track_sidecar`."""
+        return await self._run(self.load_track_sidecar, url)
+
+    async def aupload_fit_export(self, fit_bytes: bytes, cache_key: str) -> str:
+        """Store a FIT export, see `upload_fit_export`."""
+        return await self._run(self.upload_fit_export, fit_bytes, cache_key)
+
+    async def aload_fit_export(self, cache_key: str) -> bytes | None:
+        """Load a FIT export, see `load_fit_export`."""
+        return await self._run(self.load_fit_export, cache_key)
+
+    async def adelete_gpx_segment_by_url(self, url: str) -> bool:
+        """Delete a GPX segment file, see `delete_gpx_segment_by_url`."""
+        return await self._run(self.delete_gpx_segment_by_url, url)
+
+    async def adelete_image_by_url(self, url: str) -> bool:
+        """Delete an image file, see `delete_image_by_url`."""
+        return await self._run(self.delete_image_by_url, url)
+
+    def close(self) -> None:
+        """Shut down the thread pool, waiting for the running operations."""
+        self._executor.shutdown(wait=True)
+
+
+class S3Manager(AsyncStorageMixin):
+    """Manages S3 operations for GPX file storage.
+
+    A single S3 client is shared by all the requests: boto3 clients are thread
+    safe and reuse the connections of their pool.
+    """
 
     def __init__(self, config: S3StorageConfig):
         """Initialize S3 manager with configuration.
@@ -75,10 +284,12 @@ class S3Manager:
         Parameters
         ----------
         config : S3StorageConfig
-            S3 storage configuration containing bucket, credentials, and region.
+            S3 storage configuration containing bucket, credentials, region,
+            size of the connection pool and compression of the GPX files.
         """
         self.bucket_name = config.bucket
         self.aws_region = config.region
+        self.gpx_compression = config.gpx_compression
 
         if not self.bucket_name:
             raise ValueError("S3 bucket name must be provided")
@@ -89,17 +300,23 @@ class S3Manager:
                 aws_access_key_id=config.access_key_id,
                 aws_secret_access_key=config.secret_access_key,
                 region_name=config.region,
+                config=Config(max_pool_connections=config.max_connections),
             )
             logger.info(f"S3 client initialized for bucket: {self.bucket_name}")
         except NoCredentialsError:
             logger.error("AWS credentials not found")
             raise
 
+        # One thread per pooled connection, so that requests never wait for a
+        # connection while holding a thread
+        self._create_executor(config.max_connections)
+
     def upload_gpx_segment(
         self,
         local_file_path: Path,
         file_id: str,
         prefix: str = "gpx-segments",
+        track_sidecar: bytes | None = None,
     ) -> str:
         """Upload a GPX segment file to S3.
 
@@ -111,6 +328,9 @@ class S3Manager:
             Unique identifier for the file.
         prefix : str
             S3 prefix to organize files. Defaults to "gpx-segments".
+        track_sidecar : bytes | None
+            Content of the sidecar of the GPX file, stored next to it. Sidecars
+            are built by the caller on the worker pool, None stores no sidecar.
 
         Returns
         -------
@@ -134,22 +354,34 @@ class S3Manager:
                 f"Uploading {local_file_path} to s3://{self.bucket_name}/{s3_key}"
             )
 
-            self.s3_client.upload_file(
-                str(local_file_path),
-                self.bucket_name,
-                s3_key,
-                ExtraArgs={
-                    "ContentType": "application/gpx+xml",
-                    "Metadata": {
-                        "file-id": file_id,
-                        "file-type": "gpx-segment",
+            metadata = {"file-id": file_id, "file-type": "gpx-segment"}
+            if self.gpx_compression is None:
+                self.s3_client.upload_file(
+                    str(local_file_path),
+                    self.bucket_name,
+                    s3_key,
+                    ExtraArgs={
+                        "ContentType": "application/gpx+xml",
+                        "Metadata": metadata,
                     },
-                },
-            )
+                )
+            else:
+                # The Content-Encoding of the object is also sent on downloads,
+                # so that HTTP clients decompress it transparently
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Body=compress(local_file_path.read_bytes(), self.gpx_compression),
+                    ContentType="application/gpx+xml",
+                    ContentEncoding=self.gpx_compression,
+                    Metadata=metadata,
+                )
 
             logger.info(
                 f"Successfully uploaded GPX segment to s3://{self.bucket_name}/{s3_key}"
             )
+            if track_sidecar is not None:
+                self._upload_track_sidecar(track_sidecar, file_id, s3_key)
             return s3_key
 
         except ClientError as e:
@@ -158,6 +390,23 @@ class S3Manager:
             logger.error(f"Failed to upload to S3: {error_code} - {error_message}")
             raise
 
+    def _upload_track_sidecar(self, sidecar: bytes, file_id: str, s3_key: str) -> None:
+        """Upload the binary sidecar of a GPX file next to it, logging failures."""
+        sidecar_key = sidecar_path(s3_key)
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=sidecar_key,
+                Body=sidecar,
+                ContentType="application/octet-stream",
+                Metadata={"file-id": file_id, "file-type": "track-sidecar"},
+            )
+            logger.info(
+                f"Uploaded track sidecar to s3://{self.bucket_name}/{sidecar_key}"
+            )
+        except ClientError as e:
+            logger.warning(f"Failed to upload track sidecar {sidecar_key}: {str(e)}")
+
     def get_gpx_segment_url(self, s3_key: str, expiration: int = 3600) -> str | None:
         """Generate a presigned URL for a GPX segment file.
 
@@ -217,6 +466,8 @@ class S3Manager:
     def load_gpx_data(self, url: str) -> bytes | None:
         """Load GPX data from S3 storage URL.
 
+        GPX files stored compressed are decompressed.
+
         Parameters
         ----------
         url : str
@@ -227,6 +478,22 @@ class S3Manager:
         bytes | None
             GPX data as bytes if successful, None otherwise.
         """
+        return _decompress_gpx_data(self.load_stored_gpx_data(url), url)
+
+    def load_stored_gpx_data(self, url: str) -> StoredGPXData | None:
+        """Load GPX data from S3 storage URL, as stored.
+
+        Parameters
+        ----------
+        url : str
+            S3 URL in format 's3://bucket/key' of the GPX file to load.
+
+        Returns
+        -------
+        StoredGPXData | None
+            Stored GPX data and the Content-Encoding of the S3 object if
+            successful, None otherwise.
+        """
         try:
             if not url.startswith(self.get_storage_root_prefix()):
                 logger.error(f"Invalid S3 URL format: {url}")
@@ -252,12 +519,96 @@ class S3Manager:
             gpx_data = response["Body"].read()
 
             logger.info(f"Successfully loaded GPX data from S3: {key}")
-            return gpx_data
+            return StoredGPXData(
+                content=gpx_data, content_encoding=response.get("ContentEncoding")
+            )
 
         except Exception as e:
             logger.error(f"Failed to load GPX data from S3 URL {url}: {str(e)}")
             return None
 
+    def load_track_sidecar(self, url: str) -> bytes | None:
+        """Load the binary sidecar of a GPX file from S3 storage.
+
+        Parameters
+        ----------
+        url : str
+            S3 URL in format 's3://bucket/key' of the GPX file.
+
+        Returns
+        -------
+        bytes | None
+            Sidecar content, None if the GPX file has no sidecar (e.g. uploaded
+            before sidecars were written) or if it cannot be loaded.
+        """
+        prefix = f"{self.get_storage_root_prefix()}/"
+        if not url.startswith(prefix):
+            logger.error(f"Invalid S3 URL format: {url}")
+            return None
+
+        key = sidecar_path(url.removeprefix(prefix))
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+            return response["Body"].read()
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("NoSuchKey", "404"):
+                logger.error(f"Failed to load track sidecar from S3 {key}: {str(e)}")
+            return None
+
+    def upload_fit_export(self, fit_bytes: bytes, cache_key: str) -> str:
+        """Store a FIT export in S3.
+
+        Parameters
+        ----------
+        fit_bytes : bytes
+            Content of the FIT file.
+        cache_key : str
+            Cache key of the FIT export.
+
+        Returns
+        -------
+        str
+            S3 key of the FIT export.
+
+        Raises
+        ------
+        ClientError
+            If the upload fails.
+        """
+        s3_key = fit_export_path(cache_key)
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            Body=fit_bytes,
+            ContentType=FIT_MEDIA_TYPE,
+            Metadata={"file-type": "fit-export"},
+        )
+        logger.info(f"Uploaded FIT export to s3://{self.bucket_name}/{s3_key}")
+        return s3_key
+
+    def load_fit_export(self, cache_key: str) -> bytes | None:
+        """Load a FIT export from S3.
+
+        Parameters
+        ----------
+        cache_key : str
+            Cache key of the FIT export.
+
+        Returns
+        -------
+        bytes | None
+            Content of the FIT file, None if it is not stored or cannot be
+            loaded.
+        """
+        s3_key = fit_export_path(cache_key)
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            return response["Body"].read()
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("NoSuchKey", "404"):
+                logger.error(f"Failed to load FIT export from S3 {s3_key}: {str(e)}")
+            return None
+
     def upload_image(
         self,
         local_file_path: Path,
@@ -365,7 +716,7 @@ class S3Manager:
             return None
 
     def delete_gpx_segment_by_url(self, url: str) -> bool:
-        """Delete a GPX segment file from S3 storage using full URL.
+        """Delete a GPX segment file and its sidecar from S3 storage using full URL.
 
         Parameters
         ----------
@@ -400,6 +751,13 @@ class S3Manager:
 
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
             logger.info(f"Successfully deleted GPX segment from S3: {key}")
+
+            try:
+                self.s3_client.delete_object(
+                    Bucket=self.bucket_name, Key=sidecar_path(key)
+                )
+            except Exception as e:
+                logger.warning(f"Failed to delete track sidecar of {key}: {str(e)}")
             return True
 
         except ClientError as e:
@@ -463,7 +821,7 @@ class S3Manager:
             return False
 
 
-class LocalStorageManager:
+class LocalStorageManager(AsyncStorageMixin):
     """Local filesystem storage manager that mimics S3 API."""
 
     def __init__(self, config: LocalStorageConfig):
@@ -472,11 +830,15 @@ class LocalStorageManager:
         Parameters
         ----------
         config : LocalStorageConfig
-            Local storage configuration containing storage root and base URL.
+            Local storage configuration containing storage root, base URL,
+            maximum number of concurrent file operations and compression of the
+            GPX files.
         """
         self.storage_root = Path(config.storage_root)
         self.storage_root.mkdir(parents=True, exist_ok=True)
         self.base_url = config.base_url
+        self.gpx_compression = config.gpx_compression
+        self._create_executor(config.max_connections)
 
         logger.info(f"Local storage manager initialized with root: {self.storage_root}")
 
@@ -485,6 +847,7 @@ class LocalStorageManager:
         local_file_path: Path,
         file_id: str,
         prefix: str = "gpx-segments",
+        track_sidecar: bytes | None = None,
     ) -> str:
         """Upload a GPX segment file to local storage.
 
@@ -496,6 +859,9 @@ class LocalStorageManager:
             Unique identifier for the file.
         prefix : str
             Storage prefix to organize files. Defaults to "gpx-segments".
+        track_sidecar : bytes | None
+            Content of the sidecar of the GPX file, stored next to it. Sidecars
+            are built by the caller on the worker pool, None stores no sidecar.
 
         Returns
         -------
@@ -517,7 +883,12 @@ class LocalStorageManager:
         try:
             logger.info(f"Uploading {local_file_path} to local storage: {target_path}")
 
-            shutil.copy2(local_file_path, target_path)
+            if self.gpx_compression is None:
+                shutil.copy2(local_file_path, target_path)
+            else:
+                target_path.write_bytes(
+                    compress(local_file_path.read_bytes(), self.gpx_compression)
+                )
 
             metadata_path = target_path.with_suffix(".gpx.metadata")
             metadata_content = f"""file-id: {file_id}
@@ -525,11 +896,22 @@ file-type: gpx-segment
 content-type: application/gpx+xml
 original-path: {local_file_path}
 """
+            if self.gpx_compression is not None:
+                metadata_content += f"content-encoding: {self.gpx_compression}\n"
             metadata_path.write_text(metadata_content)
 
             logger.info(
                 f"Successfully uploaded GPX segment to local storage: {target_path}"
             )
+
+            if track_sidecar is not None:
+                sidecar_file_path = self.storage_root / sidecar_path(storage_key)
+                try:
+                    sidecar_file_path.write_bytes(track_sidecar)
+                except OSError as e:
+                    logger.warning(
+                        f"Failed to write track sidecar {sidecar_file_path}: {str(e)}"
+                    )
             return storage_key
 
         except Exception as e:
@@ -745,9 +1127,36 @@ original-path: {local_file_path}
         """
         return "local://"
 
+    def get_content_encoding(self, storage_key: str) -> str | None:
+        """Get the content encoding of a stored file from its metadata file.
+
+        Parameters
+        ----------
+        storage_key : str
+            Storage key (path) of the file, or full storage URL.
+
+        Returns
+        -------
+        str | None
+            Content encoding of the file, None if it is stored uncompressed.
+        """
+        file_path = self.get_file_path(storage_key)
+        metadata_path = file_path.with_suffix(f"{file_path.suffix}.metadata")
+        try:
+            metadata = metadata_path.read_text()
+        except OSError:
+            return None
+        for line in metadata.splitlines():
+            name, _, value = line.partition(":")
+            if name.strip() == "content-encoding":
+                return value.strip() or None
+        return None
+
     def load_gpx_data(self, url: str) -> bytes | None:
         """Load GPX data from local storage URL.
 
+        GPX files stored compressed are decompressed.
+
         Parameters
         ----------
         url : str
@@ -758,6 +1167,22 @@ original-path: {local_file_path}
         bytes | None
             GPX data as bytes if successful, None otherwise.
         """
+        return _decompress_gpx_data(self.load_stored_gpx_data(url), url)
+
+    def load_stored_gpx_data(self, url: str) -> StoredGPXData | None:
+        """Load GPX data from local storage URL, as stored.
+
+        Parameters
+        ----------
+        url : str
+            Local URL in format 'local:///path/to/file' of the GPX file to load.
+
+        Returns
+        -------
+        StoredGPXData | None
+            Stored GPX data and the content encoding recorded in its metadata
+            file if successful, None otherwise.
+        """
         try:
             if not url.startswith(self.get_storage_root_prefix()):
                 logger.error(f"Invalid local URL format: {url}")
@@ -778,14 +1203,95 @@ original-path: {local_file_path}
             logger.info(
                 f"Successfully loaded GPX data from local storage: {local_file_path}"
             )
-            return gpx_bytes
+            return StoredGPXData(
+                content=gpx_bytes, content_encoding=self.get_content_encoding(url)
+            )
 
         except Exception as e:
             logger.error(f"Failed to load GPX data from local URL {url}: {str(e)}")
             return None
 
+    def load_track_sidecar(self, url: str) -> bytes | None:
+        """Load the binary sidecar of a GPX file from local storage.
+
+        Parameters
+        ----------
+        url : str
+            Local URL in format 'local:///path/to/file' of the GPX file.
+
+        Returns
+        -------
+        bytes | None
+            Sidecar content, None if the GPX file has no sidecar (e.g. uploaded
+            before sidecars were written) or if it cannot be loaded.
+        """
+        if not url.startswith(self.get_storage_root_prefix()):
+            logger.error(f"Invalid local URL format: {url}")
+            return None
+
+        sidecar_file_path = self.storage_root / sidecar_path(url[9:])
+        try:
+            return sidecar_file_path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to load track sidecar {sidecar_file_path}: {str(e)}")
+            return None
+
+    def upload_fit_export(self, fit_bytes: bytes, cache_key: str) -> str:
+        """Store a FIT export in local storage.
+
+        The file is written to a temporary file first and renamed, so that
+        concurrent readers never see a partially written file.
+
+        Parameters
+        ----------
+        fit_bytes : bytes
+            Content of the FIT file.
+        cache_key : str
+            Cache key of the FIT export.
+
+        Returns
+        -------
+        str
+            Storage key of the FIT export.
+        """
+        storage_key = fit_export_path(cache_key)
+        target_path = self.storage_root / storage_key
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=target_path.parent, suffix=".tmp", delete=False
+        ) as temp_file:
+            temp_file.write(fit_bytes)
+        os.replace(temp_file.name, target_path)
+        logger.info(f"Stored FIT export in local storage: {target_path}")
+        return storage_key
+
+    def load_fit_export(self, cache_key: str) -> bytes | None:
+        """Load a FIT export from local storage.
+
+        Parameters
+        ----------
+        cache_key : str
+            Cache key of the FIT export.
+
+        Returns
+        -------
+        bytes | None
+            Content of the FIT file, None if it is not stored or cannot be
+            loaded.
+        """
+        fit_file_path = self.storage_root / fit_export_path(cache_key)
+        try:
+            return fit_file_path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to load FIT export {fit_file_path}: {str(e)}")
+            return None
+
     def delete_gpx_segment_by_url(self, url: str) -> bool:
-        """Delete a GPX segment file from local storage using full URL.
+        """Delete a GPX segment file and its sidecar from local storage by full URL.
 
         Parameters
         ----------
@@ -813,6 +1319,14 @@ original-path: {local_file_path}
 
             local_file_path.unlink()
             logger.info(f"Successfully deleted GPX segment: {local_file_path}")
+
+            sidecar_file_path = self.storage_root / sidecar_path(file_path)
+            try:
+                sidecar_file_path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(
+                    f"Failed to delete track sidecar {sidecar_file_path}: {str(e)}"
+                )
             return True
 
         except Exception as e:
@@ -0,0 +1,528 @@
+"""
+Track Sidecar Module
+
+This module reads and writes the binary sidecar stored next to each GPX file. The
+sidecar holds the parsed track in a compact, versioned layout, so that the read
+paths load the track points without parsing XML. GPX files remain the canonical
+format: a sidecar can always be rebuilt from its GPX file.
+
+The layout is little-endian and memory-mappable, every array starting at an
+offset aligned on its item size:
+
+- a fixed-size header (`HEADER`): magic bytes, format version, flags, number of
+  points, length of the track name, UTC offset and time unit of the timestamps,
+  start time, and the precomputed statistics and bounds of the track,
+- the UTF-8 track name, padded to a multiple of 8 bytes,
+- four int32 arrays of one value per point: latitudes and longitudes in 1e-7
+  degrees, elevations in centimeters and times in the time unit of the header.
+  The first value of each array is absolute (relative to the start time for the
+  times), the following values are deltas from the previous point.
+"""
+
+import datetime
+import mmap
+import struct
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from .gpx import (
+    FitCourse,
+    GPXBounds,
+    GPXData,
+    GPXPoint,
+    GPXStreamPoint,
+    GPXStreamReader,
+    GPXTotalStats,
+    TrackStats,
+    convert_gpx_data_to_fit,
+    gpx_data_from_columns,
+    gpx_data_from_streams,
+    parse_gpx_data,
+    stream_points_to_columns,
+    track_stats_from_points,
+)
+
+SIDECAR_MAGIC = b"GRVT"
+SIDECAR_VERSION = 1
+
+# Extension of the sidecar files, replacing the `.gpx` extension of the GPX file
+SIDECAR_SUFFIX = ".trk"
+
+# magic, version, flags, point count, name length, UTC offset (s), time unit (us),
+# start time (us since epoch), total distance (km), elevation gain and loss (m),
+# north, south, east and west bounds, minimum and maximum elevations (m)
+HEADER = struct.Struct("<4sHHIIiIq9d")
+
+# The timestamps of the track have no time zone
+FLAG_NAIVE_TIMES = 0x1
+
+# Fixed-point scales of the coordinates and elevations
+COORDINATE_SCALE = 10_000_000
+ELEVATION_SCALE = 100
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
+
+
+class TrackSidecarError(ValueError):
+    """Raised when a track cannot be stored in or read from a sidecar."""
+
+
+class TrackSidecar(NamedTuple):
+    """Columns and header values of a decoded sidecar."""
+
+    track_name: str
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    elevations: np.ndarray
+    times: list[str]
+    total_stats: GPXTotalStats
+    bounds: GPXBounds
+
+
+def sidecar_path(file_path: str) -> str:
+    """Build the path of the sidecar of a GPX file.
+
+    Parameters
+    ----------
+    file_path : str
+        Storage path (or local path) of the GPX file.
+
+    Returns
+    -------
+    str
+        Path of the sidecar, next to the GPX file, e.g. `gpx-segments/<id>.trk`
+        for `gpx-segments/<id>.gpx`.
+    """
+    return f"{file_path.removesuffix('.gpx')}{SIDECAR_SUFFIX}"
+
+
+def _padded(length: int) -> int:
+    """Round a length up to a multiple of 8 bytes."""
+    return (length + 7) // 8 * 8
+
+
+def _delta_encode(values: np.ndarray, name: str) -> np.ndarray:
+    """Delta-encode integer values as int32, checking that they fit."""
+    deltas = np.diff(values, prepend=0)
+    if len(deltas) and (deltas.min() < INT32_MIN or deltas.max() > INT32_MAX):
+        raise TrackSidecarError(f"Track {name} do not fit in the sidecar")
+    return deltas.astype("<i4")
+
+
+def _encode_times(times: list[str]) -> tuple[int, int, int, int, np.ndarray]:
+    """Convert ISO 8601 timestamps to integer offsets from the first one.
+
+    Returns the flags, UTC offset in seconds, time unit in microseconds, start
+    time in microseconds since epoch and times in time units.
+    """
+    parsed = [datetime.datetime.fromisoformat(time) for time in times]
+    offsets = {time.utcoffset() for time in parsed}
+    if len(offsets) > 1:
+        raise TrackSidecarError("Track points have different UTC offsets")
+    offset = offsets.pop() if offsets else datetime.timedelta(0)
+
+    flags = 0
+    if offset is None:
+        flags |= FLAG_NAIVE_TIMES
+        offset = datetime.timedelta(0)
+        parsed = [time.replace(tzinfo=datetime.UTC) for time in parsed]
+
+    one_us = datetime.timedelta(microseconds=1)
+    micros = np.array([(time - EPOCH) // one_us for time in parsed], dtype=np.int64)
+    start = int(micros[0]) if len(micros) else 0
+
+    # Recorded tracks have whole second or millisecond timestamps, use
+    # milliseconds when possible so that long pauses fit in int32 deltas
+    time_unit = 1000 if not np.any(micros % 1000) else 1
+    return (
+        flags,
+        int(offset.total_seconds()),
+        time_unit,
+        start,
+        (micros - start) // time_unit,
+    )
+
+
+def encode_track_sidecar(gpx_data: GPXData) -> bytes:
+    """Encode a parsed track in the sidecar format.
+
+    Coordinates are rounded to 1e-7 degrees (about 1 cm) and elevations to the
+    centimeter, the statistics and bounds are stored as computed on the GPX file.
+
+    Parameters
+    ----------
+    gpx_data : GPXData
+        The parsed track.
+
+    Returns
+    -------
+    bytes
+        Content of the sidecar.
+
+    Raises
+    ------
+    TrackSidecarError
+        If the track cannot be represented, e.g. timestamps with different UTC
+        offsets or time gaps too large for the time unit.
+    """
+    points = gpx_data.points
+    coordinates = np.array(
+        [(point.latitude, point.longitude, point.elevation) for point in points],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    if not np.isfinite(coordinates).all():
+        raise TrackSidecarError("Track points must have finite coordinates")
+
+    flags, utc_offset, time_unit, start_time, times = _encode_times(
+        [point.time for point in points]
+    )
+    name = gpx_data.track_name.encode("utf-8")
+    stats, bounds = gpx_data.total_stats, gpx_data.bounds
+    header = HEADER.pack(
+        SIDECAR_MAGIC,
+        SIDECAR_VERSION,
+        flags,
+        len(points),
+        len(name),
+        utc_offset,
+        time_unit,
+        start_time,
+        stats.total_distance,
+        stats.total_elevation_gain,
+        stats.total_elevation_loss,
+        bounds.north,
+        bounds.south,
+        bounds.east,
+        bounds.west,
+        bounds.min_elevation,
+        bounds.max_elevation,
+    )
+
+    columns = [
+        _delta_encode(
+            np.rint(coordinates[:, 0] * COORDINATE_SCALE).astype(np.int64),
+            "latitudes",
+        ),
+        _delta_encode(
+            np.rint(coordinates[:, 1] * COORDINATE_SCALE).astype(np.int64),
+            "longitudes",
+        ),
+        _delta_encode(
+            np.rint(coordinates[:, 2] * ELEVATION_SCALE).astype(np.int64),
+            "elevations",
+        ),
+        _delta_encode(times, "times"),
+    ]
+    return b"".join(
+        [
+            header,
+            name.ljust(_padded(len(name)), b"\0"),
+            *(column.tobytes() for column in columns),
+        ]
+    )
+
+
+def decode_track_columns(buffer: bytes | memoryview | mmap.mmap) -> TrackSidecar:
+    """Decode the columns of a sidecar.
+
+    The arrays are read in place from the buffer, which can be a memory-mapped
+    sidecar file.
+
+    Parameters
+    ----------
+    buffer : bytes | memoryview | mmap.mmap
+        Content of the sidecar.
+
+    Returns
+    -------
+    TrackSidecar
+        Track name, coordinates, elevations, ISO 8601 times, statistics and
+        bounds of the track.
+
+    Raises
+    ------
+    TrackSidecarError
+        If the buffer is not a sidecar of a supported version.
+    """
+    if len(buffer) < HEADER.size:
+        raise TrackSidecarError("Track sidecar is truncated")
+    (
+        magic,
+        version,
+        flags,
+        point_count,
+        name_length,
+        utc_offset,
+        time_unit,
+        start_time,
+        *values,
+    ) = HEADER.unpack_from(buffer)
+    if magic != SIDECAR_MAGIC:
+        raise TrackSidecarError("Not a track sidecar")
+    if version != SIDECAR_VERSION:
+        raise TrackSidecarError(f"Unsupported track sidecar version: {version}")
+
+    offset = HEADER.size + _padded(name_length)
+    if len(buffer) != offset + 4 * 4 * point_count:
+        raise TrackSidecarError("Track sidecar size does not match its header")
+    track_name = bytes(buffer[HEADER.size : HEADER.size + name_length]).decode("utf-8")
+
+    latitudes, longitudes, elevations, times = (
+        np.cumsum(
+            np.frombuffer(
+                buffer,
+                dtype="<i4",
+                count=point_count,
+                offset=offset + 4 * i * point_count,
+            ),
+            dtype=np.int64,
+        )
+        for i in range(4)
+    )
+
+    if flags & FLAG_NAIVE_TIMES:
+        origin = datetime.datetime(1970, 1, 1)
+    else:
+        time_zone = datetime.timezone(datetime.timedelta(seconds=utc_offset))
+        origin = EPOCH.astimezone(time_zone)
+    start = origin + datetime.timedelta(microseconds=start_time)
+    unit = datetime.timedelta(microseconds=time_unit)
+
+    (
+        total_distance,
+        total_elevation_gain,
+        total_elevation_loss,
+        north,
+        south,
+        east,
+        west,
+        min_elevation,
+        max_elevation,
+    ) = values
+    return TrackSidecar(
+        track_name=track_name,
+        latitudes=np.round(latitudes / COORDINATE_SCALE, 7),
+        longitudes=np.round(longitudes / COORDINATE_SCALE, 7),
+        elevations=np.round(elevations / ELEVATION_SCALE, 2),
+        times=[(start + time * unit).isoformat() for time in times.tolist()],
+        total_stats=GPXTotalStats(
+            total_points=point_count,
+            total_distance=total_distance,
+            total_elevation_gain=total_elevation_gain,
+            total_elevation_loss=total_elevation_loss,
+        ),
+        bounds=GPXBounds(
+            north=north,
+            south=south,
+            east=east,
+            west=west,
+            min_elevation=min_elevation,
+            max_elevation=max_elevation,
+        ),
+    )
+
+
+def decode_track_sidecar(
+    buffer: bytes | memoryview | mmap.mmap, file_id: str
+) -> GPXData:
+    """Decode a sidecar into the parsed track.
+
+    Parameters
+    ----------
+    buffer : bytes | memoryview | mmap.mmap
+        Content of the sidecar.
+    file_id : str
+        The ID of the GPX file.
+
+    Returns
+    -------
+    GPXData
+        GPXData object, as parsed from the GPX file up to the sidecar precision.
+    """
+    sidecar = decode_track_columns(buffer)
+
+    # Values come from typed columns, skip the pydantic validation overhead
+    points = [
+        GPXPoint.model_construct(
+            latitude=latitude, longitude=longitude, elevation=elevation, time=time
+        )
+        for latitude, longitude, elevation, time in zip(
+            sidecar.latitudes.tolist(),
+            sidecar.longitudes.tolist(),
+            sidecar.elevations.tolist(),
+            sidecar.times,
+            strict=True,
+        )
+    ]
+    return GPXData(
+        file_id=file_id,
+        track_name=sidecar.track_name,
+        points=points,
+        total_stats=sidecar.total_stats,
+        bounds=sidecar.bounds,
+    )
+
+
+def read_track_sidecar(path: Path, file_id: str) -> GPXData:
+    """Read a sidecar file through a memory map.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the sidecar file.
+    file_id : str
+        The ID of the GPX file.
+
+    Returns
+    -------
+    GPXData
+        The parsed track.
+    """
+    with open(path, "rb") as sidecar_file:
+        if path.stat().st_size < HEADER.size:
+            raise TrackSidecarError("Track sidecar is truncated")
+        with mmap.mmap(sidecar_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return decode_track_sidecar(buffer, file_id)
+
+
+def build_track_sidecar(source: bytes | Path) -> bytes:
+    """Parse a GPX file and encode it in the sidecar format.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+
+    Returns
+    -------
+    bytes
+        Content of the sidecar.
+    """
+    return encode_track_sidecar(parse_gpx_data(source, ""))
+
+
+def encode_stream_points_sidecar(
+    points: Iterable[GPXStreamPoint], track_name: str | None
+) -> bytes | None:
+    """Encode the points read by the streaming parser in the sidecar format.
+
+    Parameters
+    ----------
+    points : Iterable[GPXStreamPoint]
+        Track points, in order.
+    track_name : str | None
+        The name of the track.
+
+    Returns
+    -------
+    bytes | None
+        Content of the sidecar, None if the track cannot be stored in a sidecar
+        (e.g. points without elevation or time): the sidecar only saves parsing
+        the GPX file, which is then read instead.
+    """
+    try:
+        columns = stream_points_to_columns(points)
+        return encode_track_sidecar(gpx_data_from_columns(columns, "", track_name))
+    except ValueError:
+        return None
+
+
+def compute_track_stats_and_sidecar(
+    source: bytes | Path,
+) -> tuple[TrackStats, bytes | None]:
+    """Compute the statistics and the sidecar of a GPX file from a single parse.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+
+    Returns
+    -------
+    tuple[TrackStats, bytes | None]
+        Statistics of the track, see `compute_track_stats`, and content of its
+        sidecar, see `encode_stream_points_sidecar`.
+    """
+    reader = GPXStreamReader(source)
+    points = list(reader)
+    sidecar = (
+        encode_stream_points_sidecar(points, reader.track_name)
+        if reader.track_found
+        else None
+    )
+    return track_stats_from_points(points), sidecar
+
+
+def build_fit_course_from_sidecar(
+    buffer: bytes, file_id: str, course_name: str
+) -> FitCourse:
+    """Decode a sidecar and convert it to a FIT course.
+
+    Parameters
+    ----------
+    buffer : bytes
+        Content of the sidecar.
+    file_id : str
+        Identifier of the GPX file.
+    course_name : str
+        The name for the course in the FIT file.
+
+    Returns
+    -------
+    FitCourse
+        The GPX data and the FIT file bytes. The sidecar does not store the time
+        of the GPX file.
+    """
+    gpx_data = decode_track_sidecar(buffer, file_id)
+    return FitCourse(
+        gpx_data=gpx_data,
+        fit_bytes=convert_gpx_data_to_fit(gpx_data, course_name),
+        time=None,
+    )
+
+
+def stage_activity_streams(
+    latlng: list[tuple[float, float]],
+    altitude: list[float] | None,
+    time: list[float] | None,
+    start_date: datetime.datetime,
+    file_id: str,
+    track_name: str | None,
+    sidecar_file: Path,
+) -> GPXData:
+    """Build the track of activity streams and stage it as a sidecar file.
+
+    The track of an imported activity is kept as a sidecar in the temporary
+    directory, from which its upload session is built, no GPX file is written.
+
+    Parameters
+    ----------
+    latlng : list[tuple[float, float]]
+        (latitude, longitude) of each sample.
+    altitude : list[float] | None
+        Elevation in meters of each sample.
+    time : list[float] | None
+        Time in seconds of each sample since the start of the activity.
+    start_date : datetime.datetime
+        Start of the activity.
+    file_id : str
+        The ID of the file.
+    track_name : str | None
+        The name of the track.
+    sidecar_file : Path
+        Path of the sidecar file to write.
+
+    Returns
+    -------
+    GPXData
+        The track, see `gpx_data_from_streams`.
+    """
+    gpx_data = gpx_data_from_streams(
+        latlng, altitude, time, start_date, file_id, track_name
+    )
+    sidecar_file.write_bytes(encode_track_sidecar(gpx_data))
+    return gpx_data
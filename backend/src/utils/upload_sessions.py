@@ -0,0 +1,286 @@
+"""
+Upload Sessions Module
+
+This module keeps the uploaded tracks warm between the requests of the segment
+editor. A file is uploaded once, then several segments are usually created
+from it and the cursor is snapped to it many times: the session of an upload
+holds its parsed columns and its nearest-point index, so that creating a
+segment slices the columns instead of parsing the uploaded file again.
+
+Sessions are evicted in least recently used order once the total number of
+points exceeds a maximum, and they are rebuilt from the uploaded file when
+needed again. Uploads not used for a time to live expire: their session and
+their files in the temporary directory are deleted.
+"""
+
+import logging
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from .cache import CacheStats, LRUCache
+from .columnar import ColumnarTrack
+from .gpx import GPXData, gpx_data_from_columns, parse_gpx_columns
+from .point_index import TrackPointIndex
+from .track_sidecar import SIDECAR_SUFFIX, decode_track_columns
+
+logger = logging.getLogger(__name__)
+
+# Suffixes of the files of an upload in the temporary directory: the uploaded
+# GPX file, and the sidecar of the tracks imported from Strava
+UPLOAD_FILE_SUFFIXES = (".gpx", SIDECAR_SUFFIX)
+
+
+class UploadSession(NamedTuple):
+    """Parsed track of an upload.
+
+    Attributes
+    ----------
+    file_id : str
+        The ID of the uploaded file.
+    track : ColumnarTrack
+        Points of the first track of the file, as returned to the editor.
+    segment_start : int
+        Index in the track of the first point of its first segment, from which
+        the segments are created.
+    segment_end : int
+        Index in the track after the last point of its first segment.
+    point_index : TrackPointIndex
+        Nearest-point index of the track points.
+    """
+
+    file_id: str
+    track: ColumnarTrack
+    segment_start: int
+    segment_end: int
+    point_index: TrackPointIndex
+
+    @classmethod
+    def from_track(cls, file_id: str, track: ColumnarTrack) -> "UploadSession":
+        """Build the session of a parsed track.
+
+        Parameters
+        ----------
+        file_id : str
+            The ID of the uploaded file.
+        track : ColumnarTrack
+            Points of the first track of the file.
+
+        Returns
+        -------
+        UploadSession
+            The session, with the first segment and the point index.
+        """
+        # Segment indices increase along the track, the first segment is a slice
+        positions = np.flatnonzero(track.segment_ids == 0)
+        start, end = (positions[0], positions[-1] + 1) if len(positions) else (0, 0)
+        return cls(
+            file_id=file_id,
+            track=track,
+            segment_start=int(start),
+            segment_end=int(end),
+            point_index=TrackPointIndex(
+                track.latitudes, track.longitudes, track.elevations
+            ),
+        )
+
+    def slice_segment(self, start_index: int, end_index: int) -> ColumnarTrack:
+        """Get the points of a segment of the upload.
+
+        Parameters
+        ----------
+        start_index : int
+            Index of the first point in the first segment of the track.
+        end_index : int
+            Index of the last point, included.
+
+        Returns
+        -------
+        ColumnarTrack
+            Copy of the segment points, in the same way as the points selected
+            by `generate_gpx_segment`.
+        """
+        start = self.segment_start + max(start_index, 0)
+        end = min(self.segment_start + max(end_index + 1, 0), self.segment_end)
+        return ColumnarTrack(*(column[start:end].copy() for column in self.track))
+
+
+def parse_upload_session(
+    source: bytes | Path, file_id: str
+) -> tuple[GPXData, UploadSession]:
+    """Parse an uploaded GPX file and build its session.
+
+    Parameters
+    ----------
+    source : bytes | Path
+        GPX content or path to a GPX file.
+    file_id : str
+        The ID of the uploaded file.
+
+    Returns
+    -------
+    tuple[GPXData, UploadSession]
+        The track information, see `parse_gpx_data`, and the session.
+    """
+    track, track_name = parse_gpx_columns(source, file_id)
+    gpx_data = gpx_data_from_columns(track, file_id, track_name)
+    return gpx_data, UploadSession.from_track(file_id, track)
+
+
+def read_upload_session(file_path: Path, file_id: str) -> UploadSession:
+    """Build the session of an uploaded GPX file or of a staged sidecar file.
+
+    Parameters
+    ----------
+    file_path : Path
+        Path of the uploaded GPX file, or of the sidecar of a staged track.
+    file_id : str
+        The ID of the uploaded file.
+
+    Returns
+    -------
+    UploadSession
+        The session of the upload.
+    """
+    if file_path.suffix == SIDECAR_SUFFIX:
+        sidecar = decode_track_columns(file_path.read_bytes())
+        track = ColumnarTrack(
+            latitudes=sidecar.latitudes,
+            longitudes=sidecar.longitudes,
+            elevations=sidecar.elevations,
+            times=np.array(sidecar.times, dtype=object),
+            segment_ids=np.zeros(len(sidecar.latitudes), dtype=np.int64),
+        )
+    else:
+        track, _ = parse_gpx_columns(file_path, file_id)
+    return UploadSession.from_track(file_id, track)
+
+
+class UploadSessionStore:
+    """Sessions of the uploaded files, with expiry of the files.
+
+    Every upload has a deadline, pushed back whenever its session is used. The
+    sessions themselves are kept in an LRU cache bounded by their number of
+    points, an evicted session is rebuilt from the files of the upload until
+    the upload expires. Expired uploads are removed on the next access to the
+    store.
+    """
+
+    def __init__(
+        self,
+        temp_dir: Path,
+        ttl: float,
+        max_points: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the store.
+
+        Parameters
+        ----------
+        temp_dir : Path
+            Temporary directory holding the uploaded files.
+        ttl : float
+            Time in seconds after which an unused upload expires.
+        max_points : int
+            Maximum total number of points of the sessions kept in memory.
+        clock : Callable[[], float]
+            Function returning the current time in seconds.
+        """
+        self.temp_dir = temp_dir
+        self.ttl = ttl
+        self._clock = clock
+        self._sessions: LRUCache[str, UploadSession] = LRUCache(
+            max_size=max_points, sizeof=lambda session: len(session.track) + 1
+        )
+        self._deadlines: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, file_id: str) -> bool:
+        return file_id in self._deadlines
+
+    def register(self, file_id: str) -> None:
+        """Register an upload, or push back its deadline.
+
+        Parameters
+        ----------
+        file_id : str
+            The ID of the uploaded file.
+        """
+        self.expire()
+        self._touch(file_id)
+
+    def _touch(self, file_id: str) -> None:
+        """Set the deadline of an upload one time to live from now."""
+        self._deadlines.pop(file_id, None)
+        # Deadlines are kept in increasing order, see `expire`
+        self._deadlines[file_id] = self._clock() + self.ttl
+
+    def put(self, session: UploadSession) -> None:
+        """Register an upload and keep its session in memory.
+
+        Parameters
+        ----------
+        session : UploadSession
+            The session of the upload.
+        """
+        self.register(session.file_id)
+        self._sessions.put(session.file_id, session)
+
+    def get(self, file_id: str) -> UploadSession | None:
+        """Get the session of an upload and push back its deadline.
+
+        Parameters
+        ----------
+        file_id : str
+            The ID of the uploaded file.
+
+        Returns
+        -------
+        UploadSession | None
+            The session, or None if it is not in memory.
+        """
+        self.expire()
+        if file_id in self._deadlines:
+            self._touch(file_id)
+        return self._sessions.get(file_id)
+
+    def expire(self) -> list[str]:
+        """Remove the expired uploads and their files.
+
+        Returns
+        -------
+        list[str]
+            The IDs of the expired uploads.
+        """
+        now = self._clock()
+        expired = []
+        for file_id, deadline in self._deadlines.items():
+            if deadline > now:
+                break
+            expired.append(file_id)
+
+        for file_id in expired:
+            del self._deadlines[file_id]
+            self._sessions.invalidate(file_id)
+            for suffix in UPLOAD_FILE_SUFFIXES:
+                try:
+                    (self.temp_dir / f"{file_id}{suffix}").unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(f"Failed to remove upload {file_id}: {str(e)}")
+        if expired:
+            logger.info(f"Expired {len(expired)} upload sessions")
+        return expired
+
+    def clear(self) -> None:
+        """Remove all the sessions from memory, keeping the uploaded files."""
+        self._sessions.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Counters and current size of the sessions kept in memory."""
+        return self._sessions.stats
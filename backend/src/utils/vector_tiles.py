@@ -0,0 +1,410 @@
+"""
+Vector Tiles Module
+
+This module provides the building blocks of the Mapbox Vector Tile (MVT)
+endpoint: Web Mercator tile arithmetic, projection and clipping of track
+geometries to tile coordinates, protobuf encoding of the tiles following the
+MVT 2.1 specification, and an on-disk tile cache organized by zoom level.
+"""
+
+import logging
+import math
+import os
+import shutil
+import struct
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Number of integer coordinates along a tile side
+TILE_EXTENT = 4096
+
+# Geometries are kept up to this many tile units outside of the tile so that
+# lines are not cut at the tile border when rendered
+TILE_BUFFER = 64
+
+MAX_ZOOM = 22
+
+# Latitude limit of the Web Mercator projection
+MAX_LATITUDE = 85.0511287798066
+
+# Equatorial circumference of the Earth in meters (Web Mercator)
+EARTH_CIRCUMFERENCE = 40075016.686
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+# MVT geometry types and commands
+_LINESTRING = 2
+_MOVE_TO = 1
+_LINE_TO = 2
+
+# Protobuf wire types
+_VARINT = 0
+_LENGTH_DELIMITED = 2
+_FIXED64 = 1
+
+
+class TileFeature(NamedTuple):
+    """Line feature of a vector tile layer."""
+
+    id: int
+    lines: list[list[tuple[int, int]]]
+    properties: dict[str, str | int | float | bool]
+
+
+def _mercator(latitude: float, longitude: float) -> tuple[float, float]:
+    """Project a location to normalized Web Mercator coordinates in [0, 1]."""
+    latitude = max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude))
+    x = (longitude + 180.0) / 360.0
+    sin_latitude = math.sin(math.radians(latitude))
+    y = 0.5 - math.log((1 + sin_latitude) / (1 - sin_latitude)) / (4 * math.pi)
+    return x, y
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """Compute the geographic bounds of a tile.
+
+    Parameters
+    ----------
+    z : int
+        Zoom level
+    x : int
+        Tile column
+    y : int
+        Tile row (0 at the north)
+
+    Returns
+    -------
+    tuple[float, float, float, float]
+        North, south, east and west bounds in degrees.
+    """
+    tile_count = 2**z
+
+    def latitude(row: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / tile_count))))
+
+    return (
+        latitude(y),
+        latitude(y + 1),
+        (x + 1) / tile_count * 360.0 - 180.0,
+        x / tile_count * 360.0 - 180.0,
+    )
+
+
+def tile_range(
+    z: int, north: float, south: float, east: float, west: float
+) -> tuple[int, int, int, int]:
+    """Compute the range of tiles covering geographic bounds at a zoom level.
+
+    Parameters
+    ----------
+    z : int
+        Zoom level
+    north : float
+        Northern bound in degrees
+    south : float
+        Southern bound in degrees
+    east : float
+        Eastern bound in degrees
+    west : float
+        Western bound in degrees
+
+    Returns
+    -------
+    tuple[int, int, int, int]
+        Minimum and maximum tile columns, then minimum and maximum tile rows
+        (all inclusive). Tiles whose buffer overlaps the bounds are included.
+    """
+    tile_count = 2**z
+    buffer = TILE_BUFFER / TILE_EXTENT
+    x_min, y_min = _mercator(north, west)
+    x_max, y_max = _mercator(south, east)
+
+    def clamp(value: float) -> int:
+        return max(0, min(tile_count - 1, math.floor(value)))
+
+    return (
+        clamp(x_min * tile_count - buffer),
+        clamp(x_max * tile_count + buffer),
+        clamp(y_min * tile_count - buffer),
+        clamp(y_max * tile_count + buffer),
+    )
+
+
+def tile_resolution(z: int) -> float:
+    """Compute the ground size in meters of a 256 pixels tile pixel at a zoom level.
+
+    The size is computed at the equator, it is an upper bound elsewhere.
+    """
+    return EARTH_CIRCUMFERENCE / (256 * 2**z)
+
+
+def project_to_tile(
+    points: Sequence[tuple[float, float]], z: int, x: int, y: int
+) -> list[list[tuple[int, int]]]:
+    """Project a track to tile coordinates and clip it to the buffered tile.
+
+    Parameters
+    ----------
+    points : Sequence[tuple[float, float]]
+        Track points as (latitude, longitude) pairs
+    z : int
+        Zoom level
+    x : int
+        Tile column
+    y : int
+        Tile row
+
+    Returns
+    -------
+    list[list[tuple[int, int]]]
+        Parts of the track crossing the buffered tile, as lists of integer tile
+        coordinates. Segments entirely outside of the buffered tile are dropped,
+        which splits the track into several parts.
+    """
+    tile_count = 2**z
+    projected = []
+    for latitude, longitude in points:
+        mercator_x, mercator_y = _mercator(latitude, longitude)
+        projected.append(
+            (
+                round((mercator_x * tile_count - x) * TILE_EXTENT),
+                round((mercator_y * tile_count - y) * TILE_EXTENT),
+            )
+        )
+
+    low, high = -TILE_BUFFER, TILE_EXTENT + TILE_BUFFER
+    lines: list[list[tuple[int, int]]] = []
+    current: list[tuple[int, int]] = []
+    for start, end in zip(projected, projected[1:], strict=False):
+        visible = (
+            min(start[0], end[0]) <= high
+            and max(start[0], end[0]) >= low
+            and min(start[1], end[1]) <= high
+            and max(start[1], end[1]) >= low
+        )
+        if not visible:
+            if len(current) >= 2:
+                lines.append(current)
+            current = []
+            continue
+        if not current:
+            current = [start]
+        if end != current[-1]:
+            current.append(end)
+    if len(current) >= 2:
+        lines.append(current)
+    return lines
+
+
+def _varint(value: int) -> bytes:
+    """Encode an unsigned integer as a protobuf varint."""
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _zigzag(value: int) -> int:
+    """Map a signed integer to an unsigned one (protobuf sint32 encoding)."""
+    return (value << 1) ^ (value >> 31)
+
+
+def _field(number: int, wire_type: int) -> bytes:
+    return _varint((number << 3) | wire_type)
+
+
+def _length_delimited(number: int, payload: bytes) -> bytes:
+    return _field(number, _LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+
+def _packed(number: int, values: Sequence[int]) -> bytes:
+    return _length_delimited(number, b"".join(_varint(value) for value in values))
+
+
+def _encode_value(value: str | int | float | bool) -> bytes:
+    """Encode a property value as an MVT Value message."""
+    if isinstance(value, bool):
+        return _field(7, _VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _field(5, _VARINT) + _varint(value)
+        return _field(6, _VARINT) + _varint((value << 1) ^ (value >> 63))
+    if isinstance(value, float):
+        return _field(3, _FIXED64) + struct.pack("<d", value)
+    return _length_delimited(1, str(value).encode("utf-8"))
+
+
+def _encode_geometry(lines: list[list[tuple[int, int]]]) -> list[int]:
+    """Encode lines as MVT geometry commands with delta-encoded coordinates."""
+    commands: list[int] = []
+    cursor_x, cursor_y = 0, 0
+    for line in lines:
+        for index, (point_x, point_y) in enumerate(line):
+            if index == 0:
+                commands.append((1 << 3) | _MOVE_TO)
+            elif index == 1:
+                commands.append(((len(line) - 1) << 3) | _LINE_TO)
+            commands.append(_zigzag(point_x - cursor_x))
+            commands.append(_zigzag(point_y - cursor_y))
+            cursor_x, cursor_y = point_x, point_y
+    return commands
+
+
+def _encode_layer(name: str, features: Sequence[TileFeature]) -> bytes:
+    """Encode an MVT Layer message, deduplicating keys and values."""
+    keys: dict[str, int] = {}
+    values: dict[tuple[type, str | int | float | bool], int] = {}
+    encoded_features = []
+    for feature in features:
+        if not feature.lines:
+            continue
+        tags = []
+        for key, value in feature.properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            # The type is part of the key so that e.g. 1 and True differ
+            tags.append(values.setdefault((type(value), value), len(values)))
+        encoded_features.append(
+            _length_delimited(
+                2,
+                _field(1, _VARINT)
+                + _varint(feature.id)
+                + _packed(2, tags)
+                + _field(3, _VARINT)
+                + _varint(_LINESTRING)
+                + _packed(4, _encode_geometry(feature.lines)),
+            )
+        )
+
+    return _length_delimited(
+        3,
+        _field(15, _VARINT)
+        + _varint(2)
+        + _length_delimited(1, name.encode("utf-8"))
+        + b"".join(encoded_features)
+        + b"".join(_length_delimited(3, key.encode("utf-8")) for key in keys)
+        + b"".join(_length_delimited(4, _encode_value(value)) for _, value in values)
+        + _field(5, _VARINT)
+        + _varint(TILE_EXTENT),
+    )
+
+
+def encode_tile(layers: dict[str, Sequence[TileFeature]]) -> bytes:
+    """Encode a vector tile.
+
+    Parameters
+    ----------
+    layers : dict[str, Sequence[TileFeature]]
+        Line features of each layer, keyed by layer name. Empty layers are
+        omitted from the tile.
+
+    Returns
+    -------
+    bytes
+        Protobuf encoded Mapbox Vector Tile.
+    """
+    return b"".join(
+        _encode_layer(name, features) for name, features in layers.items() if features
+    )
+
+
+class TileCache:
+    """On-disk cache of encoded tiles, stored as `<root>/<z>/<x>/<y>.mvt`.
+
+    `generation` is incremented by every invalidation: a tile built while a
+    track was written must not be cached if the generation changed in between.
+    """
+
+    def __init__(self, root: Path):
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        root : Path
+            Directory holding the cached tiles, created if needed.
+        """
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.generation = 0
+
+    def _path(self, z: int, x: int, y: int) -> Path:
+        return self.root / str(z) / str(x) / f"{y}.mvt"
+
+    def get(self, z: int, x: int, y: int) -> bytes | None:
+        """Get a cached tile.
+
+        Returns
+        -------
+        bytes | None
+            Encoded tile, or None if the tile is not cached.
+        """
+        try:
+            return self._path(z, x, y).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, z: int, x: int, y: int, content: bytes) -> None:
+        """Store an encoded tile in the cache.
+
+        The tile is written to a temporary file first and renamed, so that
+        concurrent readers never see a partially written tile.
+        """
+        path = self._path(z, x, y)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=path.parent, suffix=".tmp", delete=False
+        ) as temp_file:
+            temp_file.write(content)
+        os.replace(temp_file.name, path)
+
+    def invalidate(self, north: float, south: float, east: float, west: float) -> int:
+        """Remove the cached tiles, at all zoom levels, intersecting some bounds.
+
+        Parameters
+        ----------
+        north : float
+            Northern bound in degrees
+        south : float
+            Southern bound in degrees
+        east : float
+            Eastern bound in degrees
+        west : float
+            Western bound in degrees
+
+        Returns
+        -------
+        int
+            Number of removed tiles.
+        """
+        self.generation += 1
+        removed = 0
+        for zoom_dir in self.root.iterdir():
+            if not zoom_dir.is_dir() or not zoom_dir.name.isdigit():
+                continue
+            x_min, x_max, y_min, y_max = tile_range(
+                int(zoom_dir.name), north, south, east, west
+            )
+            # Only visit the cached tiles, the range may be huge at high zoom
+            for column_dir in zoom_dir.iterdir():
+                if not column_dir.name.isdigit():
+                    continue
+                if not x_min <= int(column_dir.name) <= x_max:
+                    continue
+                for tile_path in column_dir.glob("*.mvt"):
+                    if y_min <= int(tile_path.stem) <= y_max:
+                        tile_path.unlink(missing_ok=True)
+                        removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove all the cached tiles."""
+        self.generation += 1
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
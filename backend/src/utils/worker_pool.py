@@ -0,0 +1,112 @@
+"""
+Worker Pool Module
+
+This module provides a bounded process pool for the CPU-bound track processing
+(GPX parsing, segment extraction, simplification and FIT conversion), so that a
+large file does not block the asyncio event loop serving the other requests.
+
+The number of tasks waiting for or running on a worker is limited: once the
+limit is reached, new tasks are rejected immediately instead of queueing up
+behind a backlog that the clients would time out on anyway.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerPoolFullError(RuntimeError):
+    """Raised when the worker pool already holds its maximum number of tasks."""
+
+
+class WorkerPool:
+    """Bounded pool of worker processes for CPU-bound functions.
+
+    Functions and arguments sent to the workers must be picklable, i.e.
+    functions must be defined at module level. With no worker, functions run
+    inline in the calling thread, which is useful for tests and debugging.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        """Initialize the pool.
+
+        Parameters
+        ----------
+        max_workers : int
+            Number of worker processes, 0 to run the functions inline.
+        max_pending : int
+            Maximum number of tasks running or waiting for a worker.
+        """
+        if max_workers < 0:
+            raise ValueError(f"max_workers must be >= 0, got {max_workers}")
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be >= 1, got {max_pending}")
+
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+        if max_workers > 0:
+            # Forking a process running an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    @property
+    def pending(self) -> int:
+        """Number of tasks running or waiting for a worker."""
+        return self._pending
+
+    async def run(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a function on a worker process.
+
+        Parameters
+        ----------
+        function : Callable[..., T]
+            Module-level function to run.
+        *args : Any
+            Positional arguments of the function.
+        **kwargs : Any
+            Keyword arguments of the function.
+
+        Returns
+        -------
+        T
+            Value returned by the function. Exceptions raised by the function
+            are raised again in the caller.
+
+        Raises
+        ------
+        WorkerPoolFullError
+            If `max_pending` tasks are already running or waiting.
+        """
+        if self._pending >= self.max_pending:
+            raise WorkerPoolFullError(
+                f"Worker pool is full ({self._pending} pending tasks)"
+            )
+
+        self._pending += 1
+        try:
+            if self._executor is None:
+                return function(*args, **kwargs)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(function, *args, **kwargs)
+            )
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, cancelling the tasks not started yet."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
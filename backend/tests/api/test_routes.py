@@ -896,7 +896,7 @@ def test_create_route_endpoint_with_segments_success(client):
         mock_session_local.return_value = MockAsyncContextManager()
 
         # Setup mock storage manager
-        mock_storage.upload_gpx_segment = MagicMock(
+        mock_storage.aupload_gpx_segment = AsyncMock(
             return_value="routes/test-route.gpx"
         )
         mock_storage.get_storage_root_prefix = MagicMock(
@@ -966,7 +966,7 @@ def test_create_route_endpoint_without_segments_success(client):
         mock_session_local.return_value = MockAsyncContextManager()
 
         # Setup mock storage manager
-        mock_storage.upload_gpx_segment = MagicMock(
+        mock_storage.aupload_gpx_segment = AsyncMock(
             return_value="routes/waypoint-route.gpx"
         )
         mock_storage.get_storage_root_prefix = MagicMock(
@@ -1001,6 +1001,13 @@ def test_create_route_endpoint_without_segments_success(client):
         assert data["difficulty_level"] == 2  # Default for waypoint routes
         assert data["tire_dry"] == "semi-slick"  # Default
         assert data["tire_wet"] == "knobs"  # Default
+        # Statistics are computed from the route GPX and stored with the track
+        (route_track,) = mock_session.added_tracks
+        assert route_track.total_points == data["total_points"] == 3
+        assert data["total_distance"] == pytest.approx(2.72, abs=0.01)
+        assert data["total_elevation_gain"] == 50.0
+        assert data["total_elevation_loss"] == 0.0
+        assert (data["min_elevation"], data["max_elevation"]) == (100.0, 150.0)
 
 
 def test_create_route_endpoint_segments_not_found(client):
@@ -1182,7 +1189,7 @@ def test_create_route_endpoint_storage_upload_failure(client):
         mock_session_local.return_value = MockAsyncContextManager()
 
         # Make storage upload fail
-        mock_storage.upload_gpx_segment = MagicMock(
+        mock_storage.aupload_gpx_segment = AsyncMock(
             side_effect=Exception("Upload failed")
         )
 
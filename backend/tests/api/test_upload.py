@@ -186,7 +186,7 @@ def test_upload_gpx_disk_full_failure(mock_open, client, sample_gpx_file):
 
 
 @patch(
-    "src.api.upload.extract_from_gpx_file",
+    "src.utils.upload_sessions.parse_gpx_columns",
     side_effect=Exception("GPX processing failed"),
 )
 def test_upload_gpx_processing_failure(mock_extract, client, sample_gpx_file):
@@ -202,7 +202,8 @@ def test_upload_gpx_processing_failure(mock_extract, client, sample_gpx_file):
 
 
 @patch(
-    "src.api.upload.extract_from_gpx_file", side_effect=ValueError("Invalid track data")
+    "src.utils.upload_sessions.parse_gpx_columns",
+    side_effect=ValueError("Invalid track data"),
 )
 def test_upload_gpx_invalid_track_data(mock_extract, client, sample_gpx_file):
     """Test upload when GPX file has invalid track data."""
@@ -216,6 +217,72 @@ def test_upload_gpx_invalid_track_data(mock_extract, client, sample_gpx_file):
     assert "Invalid track data" in response.json()["detail"]
 
 
+# ============== NEAREST-POINT ENDPOINT TESTS ==============
+
+
+def test_get_nearest_points(client, sample_gpx_file):
+    """Test snapping a location to an uploaded track."""
+    import src.dependencies as dependencies
+
+    with open(sample_gpx_file, "rb") as f:
+        data = client.post(
+            "/api/upload-gpx", files={"file": ("test.gpx", f, "application/gpx+xml")}
+        ).json()
+    point = data["points"][2000]
+    assert dependencies.upload_sessions.get(data["file_id"]) is not None
+
+    response = client.get(
+        f"/api/upload/{data['file_id']}/nearest",
+        params={"lat": point["latitude"], "lon": point["longitude"], "k": 3},
+    )
+
+    assert response.status_code == 200
+    points = response.json()
+    assert len(points) == 3
+    assert points[0]["index"] == 2000
+    assert points[0]["distance"] == pytest.approx(0, abs=1e-6)
+    assert points[0]["latitude"] == point["latitude"]
+    assert points[0]["elevation"] == point["elevation"]
+    assert 0 < points[0]["cumulative_distance"] < data["total_stats"]["total_distance"]
+    assert points[1]["distance"] <= points[2]["distance"]
+
+
+def test_get_nearest_points_rebuilds_index(client, sample_gpx_file):
+    """Test that evicted sessions are rebuilt from the uploaded file."""
+    import src.dependencies as dependencies
+
+    with open(sample_gpx_file, "rb") as f:
+        data = client.post(
+            "/api/upload-gpx", files={"file": ("test.gpx", f, "application/gpx+xml")}
+        ).json()
+    dependencies.upload_sessions.clear()
+    point = data["points"][-1]
+
+    response = client.get(
+        f"/api/upload/{data['file_id']}/nearest",
+        params={"lat": point["latitude"], "lon": point["longitude"]},
+    )
+
+    assert response.status_code == 200
+    assert [point["index"] for point in response.json()] == [6950]
+    assert dependencies.upload_sessions.get(data["file_id"]) is not None
+
+
+def test_get_nearest_points_errors(client):
+    """Test lookups on unknown uploads and with invalid parameters."""
+    for file_id in ["00000000-0000-0000-0000-000000000000", "not-a-uuid"]:
+        response = client.get(
+            f"/api/upload/{file_id}/nearest", params={"lat": 45, "lon": 5}
+        )
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Uploaded file not found"
+
+    file_id = "00000000-0000-0000-0000-000000000000"
+    for params in [{"lat": 45}, {"lat": 91, "lon": 5}, {"lat": 45, "lon": 5, "k": 0}]:
+        response = client.get(f"/api/upload/{file_id}/nearest", params=params)
+        assert response.status_code == 422
+
+
 # ============== UPLOAD-IMAGE ENDPOINT TESTS ==============
 
 
@@ -149,6 +149,39 @@ def test_serve_storage_file_local_mode_success(client, sample_gpx_file, tmp_path
         dependencies.storage_manager = original_storage_manager
 
 
+def test_serve_storage_file_compressed(client, sample_gpx_file, tmp_path):
+    """Test serving a GPX file stored compressed in local storage."""
+    original_storage_manager = dependencies.storage_manager
+
+    try:
+        config = LocalStorageConfig(
+            storage_type="local",
+            storage_root=str(tmp_path),
+            base_url="http://localhost:8000/storage",
+            gpx_compression="gzip",
+        )
+        local_manager = LocalStorageManager(config)
+        dependencies.storage_manager = local_manager
+        storage_key = local_manager.upload_gpx_segment(sample_gpx_file, "track")
+        compressed_size = (tmp_path / storage_key).stat().st_size
+
+        accepted = client.get(f"/storage/{storage_key}")
+        identity = client.get(
+            f"/storage/{storage_key}", headers={"Accept-Encoding": "identity"}
+        )
+
+        assert accepted.status_code == 200
+        assert accepted.headers["content-encoding"] == "gzip"
+        assert accepted.headers["content-length"] == str(compressed_size)
+        assert accepted.content == sample_gpx_file.read_bytes()
+        assert identity.status_code == 200
+        assert "content-encoding" not in identity.headers
+        assert 'filename="track.gpx"' in identity.headers["content-disposition"]
+        assert identity.content == sample_gpx_file.read_bytes()
+    finally:
+        dependencies.storage_manager = original_storage_manager
+
+
 def test_serve_storage_file_manager_not_initialized(client):
     """Test serving storage file when storage manager is not initialized."""
     original_storage_manager = dependencies.storage_manager
@@ -6,7 +6,9 @@ from unittest.mock import AsyncMock, Mock, patch
 import pytest
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from src.api.segments import fit_export_key
 from src.main import app
+from src.utils.gpx import FitCourse
 
 
 @pytest.fixture
@@ -1029,7 +1031,7 @@ class TestWahooUploadRouteEndpoint:
 
         # Mock storage manager
         mock_storage_manager = Mock()
-        mock_storage_manager.load_gpx_data.return_value = None
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=None)
 
         with (
             patch("src.dependencies.SessionLocal") as mock_session_local,
@@ -1045,14 +1047,10 @@ class TestWahooUploadRouteEndpoint:
             assert "gpx file not found" in data["detail"].lower()
 
     @patch("src.api.wahoo.get_wahoo_config")
-    @patch("src.api.wahoo.gpxpy")
-    @patch("src.api.wahoo.extract_from_gpx_file")
-    @patch("src.api.wahoo.convert_gpx_to_fit")
+    @patch("src.api.segments.build_fit_course")
     def test_upload_route_success_new(
         self,
-        mock_convert_gpx,
-        mock_extract_gpx,
-        mock_gpxpy,
+        mock_build_fit_course,
         mock_get_wahoo_config,
         client,
     ):
@@ -1075,10 +1073,6 @@ class TestWahooUploadRouteEndpoint:
         mock_track.comments = "Test description"
 
         # Mock GPX data
-        mock_gpx = Mock()
-        mock_gpx.time = None
-        mock_gpxpy.parse.return_value = mock_gpx
-
         mock_gpx_point = Mock()
         mock_gpx_point.latitude = 45.0
         mock_gpx_point.longitude = 5.0
@@ -1091,9 +1085,9 @@ class TestWahooUploadRouteEndpoint:
         mock_gpx_data = Mock()
         mock_gpx_data.points = [mock_gpx_point]
         mock_gpx_data.total_stats = mock_stats
-        mock_extract_gpx.return_value = mock_gpx_data
-
-        mock_convert_gpx.return_value = b"fit_file_content"
+        mock_build_fit_course.return_value = FitCourse(
+            gpx_data=mock_gpx_data, fit_bytes=b"fit_file_content", time=None
+        )
 
         # Mock database session
         mock_session = AsyncMock()
@@ -1103,7 +1097,7 @@ class TestWahooUploadRouteEndpoint:
 
         # Mock storage manager
         mock_storage_manager = Mock()
-        mock_storage_manager.load_gpx_data.return_value = b"<gpx>test</gpx>"
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=b"<gpx>test</gpx>")
 
         # Mock Wahoo service
         mock_service = AsyncMock()
@@ -1127,14 +1121,10 @@ class TestWahooUploadRouteEndpoint:
             mock_service.create_route.assert_called_once()
 
     @patch("src.api.wahoo.get_wahoo_config")
-    @patch("src.api.wahoo.gpxpy")
-    @patch("src.api.wahoo.extract_from_gpx_file")
-    @patch("src.api.wahoo.convert_gpx_to_fit")
+    @patch("src.api.segments.build_fit_course")
     def test_upload_route_success_update(
         self,
-        mock_convert_gpx,
-        mock_extract_gpx,
-        mock_gpxpy,
+        mock_build_fit_course,
         mock_get_wahoo_config,
         client,
     ):
@@ -1157,10 +1147,6 @@ class TestWahooUploadRouteEndpoint:
         mock_track.comments = "Test description"
 
         # Mock GPX data
-        mock_gpx = Mock()
-        mock_gpx.time = None
-        mock_gpxpy.parse.return_value = mock_gpx
-
         mock_gpx_point = Mock()
         mock_gpx_point.latitude = 45.0
         mock_gpx_point.longitude = 5.0
@@ -1173,9 +1159,9 @@ class TestWahooUploadRouteEndpoint:
         mock_gpx_data = Mock()
         mock_gpx_data.points = [mock_gpx_point]
         mock_gpx_data.total_stats = mock_stats
-        mock_extract_gpx.return_value = mock_gpx_data
-
-        mock_convert_gpx.return_value = b"fit_file_content"
+        mock_build_fit_course.return_value = FitCourse(
+            gpx_data=mock_gpx_data, fit_bytes=b"fit_file_content", time=None
+        )
 
         # Mock database session
         mock_session = AsyncMock()
@@ -1185,7 +1171,7 @@ class TestWahooUploadRouteEndpoint:
 
         # Mock storage manager
         mock_storage_manager = Mock()
-        mock_storage_manager.load_gpx_data.return_value = b"<gpx>test</gpx>"
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=b"<gpx>test</gpx>")
 
         # Mock Wahoo service
         mock_service = AsyncMock()
@@ -1210,6 +1196,138 @@ class TestWahooUploadRouteEndpoint:
             assert "updated" in data["message"].lower()
             mock_service.update_route.assert_called_once()
 
+    @patch("src.api.wahoo.get_wahoo_config")
+    @patch("src.api.segments.build_fit_course")
+    def test_upload_route_from_track_sidecar(
+        self,
+        mock_build_fit_course,
+        mock_get_wahoo_config,
+        client,
+    ):
+        """Test that the FIT course is built from the sidecar of the route."""
+        import base64
+        from pathlib import Path
+
+        from src.models.track import TrackType
+        from src.utils.track_sidecar import build_track_sidecar
+
+        mock_get_wahoo_config.return_value = Mock()
+
+        mock_track = Mock()
+        mock_track.id = 123
+        mock_track.name = "Test Route"
+        mock_track.track_type = TrackType.ROUTE
+        mock_track.file_path = "local:///routes/route.gpx"
+        mock_track.comments = ""
+
+        mock_session = AsyncMock()
+        mock_result = Mock()
+        mock_result.scalar_one_or_none.return_value = mock_track
+        mock_session.execute = AsyncMock(return_value=mock_result)
+
+        gpx_file_path = Path(__file__).parent.parent / "data" / "file.gpx"
+        mock_storage_manager = Mock()
+        mock_storage_manager.aload_track_sidecar = AsyncMock(
+            return_value=build_track_sidecar(gpx_file_path)
+        )
+        mock_storage_manager.aload_gpx_data = AsyncMock(
+            return_value=gpx_file_path.read_bytes()
+        )
+        mock_storage_manager.aload_fit_export = AsyncMock(return_value=None)
+        mock_storage_manager.aupload_fit_export = AsyncMock()
+
+        mock_service = AsyncMock()
+        mock_service.get_routes.return_value = []
+        mock_service.create_route.return_value = {"id": 456, "name": "Test Route"}
+
+        with (
+            patch("src.dependencies.SessionLocal") as mock_session_local,
+            patch("src.api.wahoo.WahooService", return_value=mock_service),
+            patch("src.dependencies.storage_manager", mock_storage_manager),
+        ):
+            mock_session_local.return_value.__aenter__.return_value = mock_session
+            mock_session_local.return_value.__aexit__.return_value = False
+
+            response = client.post("/api/wahoo/routes/123/upload?wahoo_id=1")
+
+        assert response.status_code == 200
+        mock_storage_manager.aload_track_sidecar.assert_awaited_once_with(
+            "local:///routes/route.gpx"
+        )
+        mock_build_fit_course.assert_not_called()
+        route_file = mock_service.create_route.call_args.kwargs["route_file"]
+        fit_bytes = base64.b64decode(route_file.split(",", 1)[1])
+        assert fit_bytes[8:12] == b".FIT"
+        # The FIT file is stored for the next uploads
+        mock_storage_manager.aupload_fit_export.assert_awaited_once_with(
+            fit_bytes, fit_export_key(gpx_file_path.read_bytes(), "Test Route")
+        )
+
+    @patch("src.api.wahoo.get_wahoo_config")
+    @patch("src.api.segments.build_fit_course")
+    def test_upload_route_from_fit_export(
+        self,
+        mock_build_fit_course,
+        mock_get_wahoo_config,
+        client,
+    ):
+        """Test that a route already converted to FIT is not converted again."""
+        import base64
+        from pathlib import Path
+
+        from src.models.track import TrackType
+        from src.utils.track_sidecar import build_track_sidecar
+
+        mock_get_wahoo_config.return_value = Mock()
+
+        mock_track = Mock()
+        mock_track.id = 123
+        mock_track.name = "Test Route"
+        mock_track.track_type = TrackType.ROUTE
+        mock_track.file_path = "local:///routes/route.gpx"
+        mock_track.comments = ""
+
+        mock_session = AsyncMock()
+        mock_result = Mock()
+        mock_result.scalar_one_or_none.return_value = mock_track
+        mock_session.execute = AsyncMock(return_value=mock_result)
+
+        gpx_file_path = Path(__file__).parent.parent / "data" / "file.gpx"
+        mock_storage_manager = Mock()
+        mock_storage_manager.aload_track_sidecar = AsyncMock(
+            return_value=build_track_sidecar(gpx_file_path)
+        )
+        mock_storage_manager.aload_gpx_data = AsyncMock(
+            return_value=gpx_file_path.read_bytes()
+        )
+        mock_storage_manager.aload_fit_export = AsyncMock(return_value=b"cached fit")
+        mock_storage_manager.aupload_fit_export = AsyncMock()
+
+        mock_service = AsyncMock()
+        mock_service.get_routes.return_value = []
+        mock_service.create_route.return_value = {"id": 456, "name": "Test Route"}
+
+        with (
+            patch("src.dependencies.SessionLocal") as mock_session_local,
+            patch("src.api.wahoo.WahooService", return_value=mock_service),
+            patch("src.dependencies.storage_manager", mock_storage_manager),
+        ):
+            mock_session_local.return_value.__aenter__.return_value = mock_session
+            mock_session_local.return_value.__aexit__.return_value = False
+
+            response = client.post("/api/wahoo/routes/123/upload?wahoo_id=1")
+
+        assert response.status_code == 200
+        mock_storage_manager.aload_fit_export.assert_awaited_once_with(
+            fit_export_key(gpx_file_path.read_bytes(), "Test Route")
+        )
+        mock_storage_manager.aupload_fit_export.assert_not_awaited()
+        mock_build_fit_course.assert_not_called()
+        route_file = mock_service.create_route.call_args.kwargs["route_file"]
+        assert base64.b64decode(route_file.split(",", 1)[1]) == b"cached fit"
+        # The start point is read from the sidecar
+        assert mock_service.create_route.call_args.kwargs["start_lat"] != 0.0
+
     @patch("src.api.wahoo.get_wahoo_config")
     def test_upload_route_service_error(self, mock_get_wahoo_config, client):
         """Test upload route with service error."""
@@ -1237,7 +1355,9 @@ class TestWahooUploadRouteEndpoint:
 
         # Mock storage manager
         mock_storage_manager = Mock()
-        mock_storage_manager.load_gpx_data.side_effect = RuntimeError("Storage error")
+        mock_storage_manager.aload_gpx_data = AsyncMock(
+            side_effect=RuntimeError("Storage error")
+        )
 
         with (
             patch("src.dependencies.SessionLocal") as mock_session_local,
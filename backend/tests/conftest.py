@@ -27,6 +27,10 @@ def pytest_configure(config):
     )
 
 
+# Process the GPX files inline: the patched functions of the tests cannot be
+# sent to worker processes
+os.environ.setdefault("WORKER_PROCESSES", "0")
+
 # Ensure backend src is on sys.path for imports like `from src import main`
 # When running from project root, we need to add the backend/src directory
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
@@ -731,6 +731,76 @@ class TestGetActivityGpx:
         assert gpx_data is None
 
 
+class TestGetActivityStreams:
+    """Test the retrieval of the GPS streams of an activity."""
+
+    @pytest.mark.asyncio
+    async def test_get_activity_streams_matches_gpx(self, strava_service):
+        """Test that the track built from the streams is the one of the GPX."""
+        from datetime import UTC
+
+        from src.utils.gpx import gpx_data_from_streams, parse_gpx_data
+
+        mock_activity = Mock()
+        mock_activity.name = "Test Activity"
+        mock_activity.start_date = datetime(2024, 3, 31, 0, 59, 50, tzinfo=UTC)
+
+        mock_latlng_stream = Mock()
+        mock_latlng_stream.data = [[40.0, -74.0], [40.1, -74.1], [40.15, -74.12]]
+        mock_altitude_stream = Mock()
+        mock_altitude_stream.data = [100.0, 105.3, 99.9]
+        mock_time_stream = Mock()
+        mock_time_stream.data = [0, 60, 61]
+
+        mock_client = Mock()
+        mock_client.get_activity.return_value = mock_activity
+        mock_client.get_activity_streams.return_value = {
+            "latlng": mock_latlng_stream,
+            "altitude": mock_altitude_stream,
+            "time": mock_time_stream,
+        }
+        strava_service.client = mock_client
+        strava_service._ensure_authenticated = AsyncMock()
+
+        streams = await strava_service.get_activity_streams("12345")
+        gpx_string = await strava_service.get_activity_gpx("12345")
+
+        assert streams.name == "Test Activity"
+        assert streams.latlng == mock_latlng_stream.data
+        gpx_data = gpx_data_from_streams(
+            streams.latlng,
+            streams.altitude,
+            streams.time,
+            streams.start_date,
+            "file",
+            streams.name,
+        )
+        expected = parse_gpx_data(gpx_string.encode("utf-8"), "file")
+        assert gpx_data.points == expected.points
+        assert gpx_data.total_stats == expected.total_stats
+        assert gpx_data.bounds == expected.bounds
+
+    @pytest.mark.asyncio
+    async def test_get_activity_streams_no_latlng(self, strava_service):
+        """Test getting the streams of an activity without GPS data."""
+        mock_client = Mock()
+        mock_client.get_activity_streams.return_value = {}
+        strava_service.client = mock_client
+        strava_service._ensure_authenticated = AsyncMock()
+
+        assert await strava_service.get_activity_streams("12345") is None
+
+    @pytest.mark.asyncio
+    async def test_get_activity_streams_access_unauthorized(self, strava_service):
+        """Test that authentication errors are raised."""
+        strava_service._ensure_authenticated = AsyncMock(
+            side_effect=AccessUnauthorized("Unauthorized")
+        )
+
+        with pytest.raises(AccessUnauthorized):
+            await strava_service.get_activity_streams("12345")
+
+
 class TestGetAthlete:
     """Test athlete retrieval functionality."""
 
@@ -74,8 +74,12 @@ def test_authorization_check_authorized_user_success(client):
     )
 
     class MockResult:
-        def scalar_one_or_none(self):
-            return mock_auth_user
+        def scalars(self):
+            class MockScalars:
+                def all(self):
+                    return [mock_auth_user]
+
+            return MockScalars()
 
     class MockSession:
         async def __aenter__(self):
@@ -106,8 +110,12 @@ def test_authorization_check_unauthorized_user_success(client):
     """Test authorization check for unauthorized user - success path."""
 
     class MockResult:
-        def scalar_one_or_none(self):
-            return None  # No matching user found
+        def scalars(self):
+            class MockScalars:
+                def all(self):
+                    return []  # No matching user found
+
+            return MockScalars()
 
     class MockSession:
         async def __aenter__(self):
@@ -272,3 +280,51 @@ def test_authorization_users_list_database_error(client):
     assert response.status_code == 500
     data = response.json()
     assert "Failed to list users" in data["detail"]
+
+
+def test_authorization_check_uses_directory(client):
+    """Test that the authorized users are loaded once until they change."""
+    from src.api.auth import on_auth_users_changed
+    from src.models.auth_user import AuthUser
+
+    auth_users = [AuthUser(strava_id=820773, firstname="Test", lastname="User")]
+    calls = []
+
+    class MockResult:
+        def scalars(self):
+            class MockScalars:
+                def all(self):
+                    return list(auth_users)
+
+            return MockScalars()
+
+    class MockSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            pass
+
+        async def execute(self, stmt):
+            calls.append(stmt)
+            return MockResult()
+
+    class MockSessionLocal:
+        def __call__(self):
+            return MockSession()
+
+    with patch("src.dependencies.SessionLocal", new=MockSessionLocal()):
+        first = client.get("/api/auth/check-authorization?strava_id=820773")
+        second = client.get("/api/auth/check-authorization?strava_id=123456")
+        auth_users.append(AuthUser(strava_id=123456))
+        on_auth_users_changed()
+        third = client.get("/api/auth/check-authorization?strava_id=123456")
+        stats = client.get("/api/cache-stats").json()["auth_users"]
+
+    assert first.json()["authorized"] is True
+    assert second.json()["authorized"] is False
+    assert third.json()["authorized"] is True
+    assert len(calls) == 2
+    assert stats["loads"] == 2
+    assert stats["invalidations"] == 1
+    assert stats["entries"] == 2
@@ -98,3 +98,32 @@ def test_strava_config_loaded_at_module_level():
     assert dependencies.strava_config is not None
     assert hasattr(dependencies.strava_config, "client_id")
     assert hasattr(dependencies.strava_config, "client_secret")
+
+
+def test_run_in_worker_runs_inline_without_pool(monkeypatch):
+    """Test that functions run inline when the worker pool is not started."""
+    import asyncio
+
+    monkeypatch.setattr(dependencies, "worker_pool", None)
+
+    assert asyncio.run(dependencies.run_in_worker(divmod, 7, 2)) == (3, 1)
+
+
+def test_run_in_worker_rejects_when_pool_is_full(monkeypatch):
+    """Test that a full worker pool is reported as a 503 error."""
+    import asyncio
+
+    from fastapi import HTTPException
+    from src.utils.worker_pool import WorkerPoolFullError
+
+    class FullPool:
+        async def run(self, function, *args, **kwargs):
+            raise WorkerPoolFullError("full")
+
+    monkeypatch.setattr(dependencies, "worker_pool", FullPool())
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(dependencies.run_in_worker(divmod, 7, 2))
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "5"}
@@ -3,6 +3,7 @@
 import asyncio
 import io
 import json
+import math
 import os
 import time
 from datetime import UTC, datetime
@@ -15,7 +16,7 @@ from fastapi.testclient import TestClient
 from moto import mock_aws
 from PIL import Image
 from src.utils.config import LocalStorageConfig, S3StorageConfig
-from src.utils.gpx import GPXBounds, generate_gpx_segment
+from src.utils.gpx import GPXBounds, GPXData, generate_gpx_segment
 from src.utils.storage import LocalStorageManager, S3Manager, cleanup_local_file
 
 
@@ -47,6 +48,16 @@ def create_test_image_bytes(format: str = "JPEG") -> bytes:
     return img_data.getvalue()
 
 
+def track_file_deletions(file_path):
+    """Expected storage deletions of a track GPX file and its levels of detail."""
+    from src.utils.simplify import LOD_TOLERANCES, lod_file_path
+
+    return [
+        call(file_path),
+        *(call(lod_file_path(file_path, tolerance)) for tolerance in LOD_TOLERANCES),
+    ]
+
+
 @pytest.fixture(autouse=True)
 def setup_test_database_config():
     """Set up database and storage configuration for tests.
@@ -548,7 +559,7 @@ def test_create_segment_no_temp_directory(client):
 
 
 @patch(
-    "src.utils.gpx.generate_gpx_segment",
+    "src.utils.gpx.write_gpx_segment",
     side_effect=Exception("Segment generation failed"),
 )
 def test_create_segment_generation_failure(
@@ -593,7 +604,7 @@ def test_create_segment_generation_failure(
 
 
 @patch(
-    "src.utils.gpx.generate_gpx_segment",
+    "src.utils.gpx.write_gpx_segment",
     side_effect=ValueError("Invalid segment indices"),
 )
 def test_create_segment_invalid_indices_generation(
@@ -1205,8 +1216,13 @@ def test_create_segment_storage_upload_failure(
         assert upload_response.status_code == 200
         file_id = upload_response.json()["file_id"]
 
+        uploaded_file_ids = []
+
         class MockStorageManager:
-            def upload_gpx_segment(self, local_file_path, file_id, prefix):
+            async def aupload_gpx_segment(
+                self, local_file_path, file_id, prefix, track_sidecar=None
+            ):
+                uploaded_file_ids.append(file_id)
                 raise Exception("Storage upload failed")
 
             def get_storage_root_prefix(self):
@@ -1233,6 +1249,9 @@ def test_create_segment_storage_upload_failure(
         assert response.status_code == 500
         assert "Failed to upload to storage" in response.json()["detail"]
         assert "Storage upload failed" in response.json()["detail"]
+        # The levels of detail are not uploaded without the track GPX file
+        assert len(uploaded_file_ids) == 1
+        assert ".lod" not in uploaded_file_ids[0]
 
     finally:
         dependencies_module.storage_manager = original_storage_manager
@@ -1828,7 +1847,7 @@ def test_get_track_gpx_data_endpoint_storage_load_error(client, dependencies_mod
     original_session_local = dependencies_module.SessionLocal
 
     class MockStorageManager:
-        def load_gpx_data(self, url):
+        async def aload_gpx_data(self, url):
             raise Exception("Storage connection failed")
 
     # Mock track object
@@ -1874,7 +1893,7 @@ def test_get_track_gpx_data_endpoint_storage_returns_none(client, dependencies_m
     original_session_local = dependencies_module.SessionLocal
 
     class MockStorageManager:
-        def load_gpx_data(self, url):
+        async def aload_gpx_data(self, url):
             return None
 
     # Mock track object
@@ -1960,7 +1979,7 @@ def test_get_track_gpx_data_endpoint_gpx_bytes_none_check(client, dependencies_m
             return MockSession()
 
     class MockStorageManager:
-        def load_gpx_data(self, url):
+        async def aload_gpx_data(self, url):
             # Return None to test the None check in lines 495-500
             return None
 
@@ -2003,7 +2022,7 @@ def test_get_track_gpx_data_endpoint_success(client, dependencies_module):
     original_storage_manager = dependencies_module.storage_manager
 
     class MockStorageManager:
-        def load_gpx_data(self, url):
+        async def aload_gpx_data(self, url):
             return (
                 b'<?xml version="1.0" encoding="UTF-8"?>\n'
                 b'<gpx version="1.1"><trk><name>Test Track</name></trk></gpx>'
@@ -2062,7 +2081,7 @@ def test_get_track_gpx_data_endpoint_success_with_existing_track(
         original_storage_manager = dependencies_module.storage_manager
 
         class MockStorageManager:
-            def load_gpx_data(self, url):
+            async def aload_gpx_data(self, url):
                 return (
                     b'<?xml version="1.0" encoding="UTF-8"?>\n'
                     b'<gpx version="1.1"><trk><name>Success Track</name></trk></gpx>'
@@ -2142,7 +2161,7 @@ def test_get_track_gpx_data_endpoint_success_with_mock_database(
             return MockSession()
 
     class MockStorageManager:
-        def load_gpx_data(self, url):
+        async def aload_gpx_data(self, url):
             return (
                 b'<?xml version="1.0" encoding="UTF-8"?>\n'
                 b'<gpx version="1.1"><trk><name>Mock Track</name></trk></gpx>'
@@ -2259,7 +2278,7 @@ def test_get_track_gpx_data_endpoint_decode_exception_path(client, dependencies_
             return MockSession()
 
     class MockStorageManager:
-        def load_gpx_data(self, url):
+        async def aload_gpx_data(self, url):
             # Return bytes that will cause a decode exception
             # Using a mock object that will raise an exception when decode() is called
             class MockBytes:
@@ -2300,7 +2319,7 @@ def test_get_track_gpx_data_endpoint_decode_error(client, dependencies_module):
     original_session_local = dependencies_module.SessionLocal
 
     class MockStorageManager:
-        def load_gpx_data(self, url):
+        async def aload_gpx_data(self, url):
             # Return bytes that cannot be decoded as UTF-8
             return b"\xff\xfe\x00\x00"
 
@@ -2368,12 +2387,14 @@ def test_search_segments_endpoint_streaming_error(client, dependencies_module):
     """Test search endpoint when streaming generation fails (covers lines 452-454)."""
     # Mock the database session to raise an exception during streaming
     original_session_local = dependencies_module.SessionLocal
+    original_track_index = dependencies_module.track_index
 
     class MockSessionLocal:
         def __call__(self):
             raise Exception("Mocked database connection error")
 
     dependencies_module.SessionLocal = MockSessionLocal
+    dependencies_module.track_index = None
 
     try:
         # Search for segments - should handle streaming error gracefully
@@ -2410,6 +2431,7 @@ def test_search_segments_endpoint_streaming_error(client, dependencies_module):
     finally:
         # Restore original SessionLocal
         dependencies_module.SessionLocal = original_session_local
+        dependencies_module.track_index = original_track_index
 
 
 def test_search_segments_endpoint_database_not_available(client, dependencies_module):
@@ -2691,8 +2713,11 @@ def test_search_segments_with_non_finite_bounds(client):
         created_at=datetime.now(),
     )
 
-    # Mock the database session
-    with patch("src.dependencies.SessionLocal") as mock_session_local:
+    # Mock the database session and bypass the spatial index
+    with (
+        patch("src.dependencies.SessionLocal") as mock_session_local,
+        patch("src.dependencies.track_index", None),
+    ):
 
         class MockSession:
             async def __aenter__(self):
@@ -2793,6 +2818,12 @@ def test_get_track_info_success(client):
         tire_wet=TireType.KNOBS,
         comments="Test comments",
         strava_id=123456,
+        total_distance=1234.5,
+        total_elevation_gain=56.0,
+        total_elevation_loss=42.0,
+        total_points=100,
+        min_elevation=310.0,
+        max_elevation=366.0,
         created_at=datetime.now(),
     )
 
@@ -2843,6 +2874,12 @@ def test_get_track_info_success(client):
         assert data["tire_dry"] == "semi-slick"
         assert data["tire_wet"] == "knobs"
         assert data["comments"] == "Test comments"
+        assert data["total_distance"] == 1234.5
+        assert data["total_elevation_gain"] == 56.0
+        assert data["total_elevation_loss"] == 42.0
+        assert data["total_points"] == 100
+        assert data["min_elevation"] == 310.0
+        assert data["max_elevation"] == 366.0
 
 
 def test_get_track_info_database_not_available(client):
@@ -3046,8 +3083,7 @@ def test_get_track_parsed_data_success(client):
     with (
         patch("src.dependencies.SessionLocal") as mock_session_local,
         patch("src.dependencies.storage_manager") as mock_storage_manager,
-        patch("src.api.segments.gpxpy.parse"),
-        patch("src.utils.gpx.extract_from_gpx_file") as mock_extract,
+        patch("src.utils.gpx.parse_gpx_data") as mock_extract,
     ):
         # Setup mocks
         class MockSession:
@@ -3073,8 +3109,8 @@ def test_get_track_parsed_data_success(client):
 
         mock_session_local.return_value = MockSessionLocal()
 
-        mock_storage_manager.load_gpx_data.return_value = real_gpx_data
-        mock_extract.return_value = mock_parsed_data
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=real_gpx_data)
+        mock_extract.return_value = GPXData(**mock_parsed_data)
 
         response = client.get("/api/segments/456/data")
 
@@ -3090,6 +3126,471 @@ def test_get_track_parsed_data_success(client):
         assert data["bounds"]["north"] == 45.0
 
 
+def test_get_track_parsed_data_is_cached_by_file_path(client, dependencies_module):
+    """Test that parsed data are served from the cache on the next requests."""
+    from datetime import datetime
+
+    from backend.src.models.track import SurfaceType, TireType, Track, TrackType
+
+    mock_track = Track(
+        id=456,
+        file_path="local:///gpx-segments/file.gpx",
+        bound_north=45.0,
+        bound_south=44.0,
+        bound_east=5.0,
+        bound_west=3.0,
+        barycenter_latitude=44.5,
+        barycenter_longitude=4.0,
+        name="Test chemin Gravel autour du Puit",
+        track_type=TrackType.SEGMENT,
+        difficulty_level=3,
+        surface_type=SurfaceType.FOREST_TRAIL,
+        tire_dry=TireType.SEMI_SLICK,
+        tire_wet=TireType.KNOBS,
+        comments="Test comments",
+        created_at=datetime.now(),
+    )
+    gpx_file_path = Path(__file__).parent / "data" / "file.gpx"
+
+    class MockSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            pass
+
+        async def execute(self, stmt):
+            class MockResult:
+                def scalar_one_or_none(self):
+                    return mock_track
+
+            return MockResult()
+
+    cache = dependencies_module.parsed_track_cache
+    assert cache is not None
+
+    with (
+        patch("src.dependencies.SessionLocal", lambda: MockSession()),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_gpx_data = AsyncMock(
+            return_value=gpx_file_path.read_bytes()
+        )
+
+        first_response = client.get("/api/segments/456/data")
+        second_response = client.get("/api/segments/456/data")
+
+        assert first_response.status_code == 200
+        assert second_response.json() == first_response.json()
+        assert first_response.json()["file_id"] == "file"
+        mock_storage_manager.aload_gpx_data.assert_awaited_once()
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert mock_track.file_path in cache
+
+        stats = client.get("/api/cache-stats").json()["parsed_tracks"]
+        assert stats["hits"] == 1
+        assert stats["entries"] == 1
+        assert stats["size"] == len(first_response.json()["points"]) + 1
+
+        # Deleting the track drops its parsed data
+        from src.api.segments import on_track_deleted
+
+        on_track_deleted(mock_track)
+        assert mock_track.file_path not in cache
+
+
+def make_lod_session(**track_attributes):
+    """Create a session factory returning a track stored at a local path."""
+    from src.models.track import TireType, Track, TrackType
+
+    track = Track(
+        id=456,
+        file_path="local:///gpx-segments/file.gpx",
+        name="Track",
+        track_type=TrackType.SEGMENT,
+        tire_dry=TireType.SLICK,
+        tire_wet=TireType.KNOBS,
+        strava_id=123456,
+        **track_attributes,
+    )
+    mock_result = Mock()
+    mock_result.scalar_one_or_none.return_value = track
+    mock_session = AsyncMock()
+    mock_session.execute.return_value = mock_result
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.__aexit__.return_value = None
+    return Mock(return_value=mock_session)
+
+
+def test_get_track_gpx_data_level_of_detail(client):
+    """Test that the stored levels of detail are served by the GPX endpoint."""
+    from src.utils.gpx import GPXStreamReader
+    from src.utils.simplify import lod_file_path
+
+    gpx_bytes = (Path(__file__).parent / "data" / "file.gpx").read_bytes()
+    stored = {"local:///gpx-segments/file.gpx": gpx_bytes}
+    stored[lod_file_path("local:///gpx-segments/file.gpx", 10)] = b"<gpx>lod</gpx>"
+
+    with (
+        patch("src.dependencies.SessionLocal", make_lod_session()),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_gpx_data = AsyncMock(side_effect=stored.get)
+
+        stored_response = client.get("/api/segments/456/gpx", params={"lod": 10})
+        # Level missing from storage, simplified from the full track
+        fallback_response = client.get("/api/segments/456/gpx", params={"lod": 50})
+        invalid_response = client.get("/api/segments/456/gpx", params={"lod": 5})
+
+    assert stored_response.status_code == 200
+    assert stored_response.json()["gpx_xml_data"] == "<gpx>lod</gpx>"
+    assert fallback_response.status_code == 200
+    fallback_points = list(
+        GPXStreamReader(fallback_response.json()["gpx_xml_data"].encode("utf-8"))
+    )
+    assert 2 <= len(fallback_points) < len(list(GPXStreamReader(gpx_bytes)))
+    assert invalid_response.status_code == 400
+    assert "Invalid lod: 5" in invalid_response.json()["detail"]
+
+
+def test_get_track_parsed_data_level_of_detail(client, dependencies_module):
+    """Test that simplified parsed data keep the statistics of the full track."""
+    from src.utils.simplify import lod_file_path
+
+    gpx_bytes = (Path(__file__).parent / "data" / "file.gpx").read_bytes()
+    session_local = make_lod_session(
+        total_distance=12.5, total_elevation_gain=300.0, total_elevation_loss=250.0
+    )
+
+    with (
+        patch("src.dependencies.SessionLocal", session_local),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_gpx_data = AsyncMock(
+            side_effect=lambda path: gpx_bytes if path.endswith("file.gpx") else None
+        )
+
+        full_response = client.get("/api/segments/456/data")
+        lod_response = client.get("/api/segments/456/data", params={"lod": 50})
+
+    assert full_response.status_code == 200
+    assert lod_response.status_code == 200
+    full_data, lod_data = full_response.json(), lod_response.json()
+    assert len(lod_data["points"]) < len(full_data["points"])
+    assert lod_data["total_stats"] == {
+        "total_points": len(lod_data["points"]),
+        "total_distance": 12.5,
+        "total_elevation_gain": 300.0,
+        "total_elevation_loss": 250.0,
+    }
+    cache = dependencies_module.parsed_track_cache
+    assert lod_file_path("local:///gpx-segments/file.gpx", 50) in cache
+    assert "local:///gpx-segments/file.gpx" in cache
+
+
+def test_get_track_data_point_formats(client):
+    """Test the compact point formats of the data and GPX endpoints."""
+    import polyline
+
+    gpx_bytes = (Path(__file__).parent / "data" / "file.gpx").read_bytes()
+
+    with (
+        patch("src.dependencies.SessionLocal", make_lod_session()),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_gpx_data = AsyncMock(
+            side_effect=lambda path: gpx_bytes if path.endswith("file.gpx") else None
+        )
+
+        default_data = client.get("/api/segments/456/data").json()
+        columnar_data = client.get(
+            "/api/segments/456/data", params={"format": "columnar"}
+        ).json()
+        polyline_data = client.get(
+            "/api/segments/456/data", params={"format": "polyline"}
+        ).json()
+        polyline_points = client.get(
+            "/api/segments/456/gpx", params={"format": "polyline", "lod": 10}
+        ).json()
+        invalid_response = client.get(
+            "/api/segments/456/gpx", params={"format": "geojson"}
+        )
+
+    points = default_data["points"]
+    assert columnar_data["points"] == {
+        "format": "columnar",
+        "lat": [point["latitude"] for point in points],
+        "lon": [point["longitude"] for point in points],
+        "ele": [point["elevation"] for point in points],
+        "time": [point["time"] for point in points],
+    }
+    for data in (columnar_data, polyline_data):
+        assert data["total_stats"] == default_data["total_stats"]
+        assert data["bounds"] == default_data["bounds"]
+        assert data["track_name"] == default_data["track_name"]
+    assert polyline_data["points"]["format"] == "polyline"
+    assert len(polyline.decode(polyline_data["points"]["polyline"])) == len(points)
+    assert len(polyline_data["points"]["ele"]) == len(points)
+    assert polyline_points["format"] == "polyline"
+    assert len(polyline_points["ele"]) < len(points)
+    assert invalid_response.status_code == 400
+    assert "Invalid format: geojson" in invalid_response.json()["detail"]
+
+
+def test_get_track_gpx_file_passes_compressed_content_through(client):
+    """Test that GPX files stored compressed are sent as stored when accepted."""
+    import gzip
+
+    from src.utils.storage import StoredGPXData
+
+    gpx_bytes = (Path(__file__).parent / "data" / "file.gpx").read_bytes()
+    compressed = gzip.compress(gpx_bytes)
+
+    with (
+        patch("src.dependencies.SessionLocal", make_lod_session()),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_stored_gpx_data = AsyncMock(
+            return_value=StoredGPXData(content=compressed, content_encoding="gzip")
+        )
+
+        accepted = client.get(
+            "/api/segments/456/gpx",
+            headers={"Accept": "application/gpx+xml", "Accept-Encoding": "gzip"},
+        )
+        identity = client.get(
+            "/api/segments/456/gpx",
+            headers={"Accept": "application/gpx+xml", "Accept-Encoding": "identity"},
+        )
+        mock_storage_manager.aload_stored_gpx_data.return_value = None
+        missing = client.get(
+            "/api/segments/456/gpx", headers={"Accept": "application/gpx+xml"}
+        )
+
+    assert accepted.status_code == 200
+    assert accepted.headers["content-encoding"] == "gzip"
+    assert accepted.headers["content-length"] == str(len(compressed))
+    assert accepted.headers["content-type"] == "application/gpx+xml"
+    assert accepted.content == gpx_bytes
+    assert identity.status_code == 200
+    assert "content-encoding" not in identity.headers
+    assert identity.content == gpx_bytes
+    assert missing.status_code == 404
+
+
+def test_get_track_parsed_data_from_track_sidecar(client):
+    """Test that the parsed data are decoded from the sidecar of the GPX file."""
+    from src.utils.track_sidecar import build_track_sidecar, decode_track_sidecar
+
+    gpx_file_path = Path(__file__).parent / "data" / "file.gpx"
+    sidecar = build_track_sidecar(gpx_file_path)
+
+    with (
+        patch("src.dependencies.SessionLocal", make_lod_session()),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_track_sidecar = AsyncMock(
+            side_effect=lambda path: sidecar if path.endswith("file.gpx") else None
+        )
+        mock_storage_manager.aload_gpx_data = AsyncMock(
+            return_value=gpx_file_path.read_bytes()
+        )
+
+        response = client.get("/api/segments/456/data")
+        # Invalid sidecar of a level of detail, parsed from the GPX file instead
+        mock_storage_manager.aload_track_sidecar.side_effect = None
+        mock_storage_manager.aload_track_sidecar.return_value = b"invalid"
+        lod_response = client.get("/api/segments/456/data", params={"lod": 10})
+
+    assert response.status_code == 200
+    assert response.json() == decode_track_sidecar(sidecar, "file").model_dump()
+    assert lod_response.status_code == 200
+    assert mock_storage_manager.aload_track_sidecar.await_args_list == [
+        call("local:///gpx-segments/file.gpx"),
+        call("local:///gpx-segments/file.lod10.gpx"),
+    ]
+    mock_storage_manager.aload_gpx_data.assert_awaited_once_with(
+        "local:///gpx-segments/file.lod10.gpx"
+    )
+
+
+def test_get_track_fit(client):
+    """Test that FIT files are converted once and then served from storage."""
+    from src.api.segments import fit_export_key
+    from src.utils.track_sidecar import build_track_sidecar
+
+    gpx_file_path = Path(__file__).parent / "data" / "file.gpx"
+    gpx_bytes = gpx_file_path.read_bytes()
+    fit_exports = {}
+
+    async def upload_fit_export(fit_bytes, cache_key):
+        fit_exports[cache_key] = fit_bytes
+        return f"fit-exports/{cache_key}.fit"
+
+    with (
+        patch("src.dependencies.SessionLocal", make_lod_session()),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=gpx_bytes)
+        mock_storage_manager.aload_track_sidecar = AsyncMock(
+            return_value=build_track_sidecar(gpx_file_path)
+        )
+        mock_storage_manager.aload_fit_export = AsyncMock(
+            side_effect=lambda cache_key: fit_exports.get(cache_key)
+        )
+        mock_storage_manager.aupload_fit_export = AsyncMock(
+            side_effect=upload_fit_export
+        )
+
+        converted = client.get("/api/segments/456/fit")
+        cached = client.get("/api/segments/456/fit")
+        not_modified = client.get(
+            "/api/segments/456/fit",
+            headers={"If-None-Match": converted.headers["etag"]},
+        )
+
+    cache_key = fit_export_key(gpx_bytes, "Track")
+    assert converted.status_code == 200
+    assert converted.headers["content-type"] == "application/vnd.ant.fit"
+    assert converted.headers["content-disposition"] == (
+        "attachment; filename=\"Track.fit\"; filename*=UTF-8''Track.fit"
+    )
+    assert converted.headers["etag"] == f'"{cache_key}"'
+    assert converted.content[8:12] == b".FIT"
+    assert fit_exports == {cache_key: converted.content}
+    assert cached.status_code == 200
+    assert cached.content == converted.content
+    mock_storage_manager.aupload_fit_export.assert_awaited_once()
+    mock_storage_manager.aload_track_sidecar.assert_awaited_once()
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+def test_get_track_fit_non_latin1_name(client):
+    """Test the FIT download of a track whose name is not latin-1 encodable."""
+    session_local = make_lod_session()
+    track = session_local.return_value.execute.return_value.scalar_one_or_none()
+    track.name = 'Łódź "Loop"'
+
+    with (
+        patch("src.dependencies.SessionLocal", session_local),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=b"<gpx/>")
+        mock_storage_manager.aload_fit_export = AsyncMock(return_value=b"fit")
+        response = client.get("/api/segments/456/fit")
+
+    assert response.status_code == 200
+    assert response.content == b"fit"
+    assert response.headers["content-disposition"] == (
+        'attachment; filename="odz _Loop_.fit"; '
+        "filename*=UTF-8''%C5%81%C3%B3d%C5%BA%20%22Loop%22.fit"
+    )
+
+
+def test_fit_export_key():
+    """Test that the FIT exports depend on the GPX, the name and the encoder."""
+    from src.api.segments import fit_export_key
+
+    key = fit_export_key(b"<gpx/>", "Track")
+
+    assert key == fit_export_key(b"<gpx/>", "Track")
+    assert key != fit_export_key(b"<gpx />", "Track")
+    assert key != fit_export_key(b"<gpx/>", "Track 2")
+    with patch("src.api.segments.FIT_ENCODER_VERSION", 0):
+        assert key != fit_export_key(b"<gpx/>", "Track")
+
+
+def test_get_track_fit_errors(client):
+    """Test the FIT download of missing tracks and GPX files."""
+    with patch("src.dependencies.SessionLocal", None):
+        assert client.get("/api/segments/456/fit").status_code == 500
+
+    missing_track = make_lod_session()
+    missing_track.return_value.execute.return_value.scalar_one_or_none.return_value = (
+        None
+    )
+    with (
+        patch("src.dependencies.SessionLocal", missing_track),
+        patch("src.dependencies.storage_manager"),
+    ):
+        response = client.get("/api/segments/456/fit")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Track not found"
+
+    with (
+        patch("src.dependencies.SessionLocal", make_lod_session()),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=None)
+        response = client.get("/api/segments/456/fit")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "GPX file not found"
+
+
+def test_get_track_elevation_profile(client, dependencies_module):
+    """Test that the profile is downsampled and cached by width bucket."""
+    from src.utils.gpx import parse_gpx_data
+
+    gpx_file_path = Path(__file__).parent / "data" / "file.gpx"
+    track_points = parse_gpx_data(gpx_file_path, "file").points
+    cache = dependencies_module.elevation_profile_cache
+    assert cache is not None
+    session_local = make_lod_session()
+
+    with (
+        patch("src.dependencies.SessionLocal", session_local),
+        patch("src.dependencies.storage_manager") as mock_storage_manager,
+    ):
+        mock_storage_manager.aload_track_sidecar = AsyncMock(return_value=None)
+        mock_storage_manager.aload_gpx_data = AsyncMock(
+            return_value=gpx_file_path.read_bytes()
+        )
+
+        response = client.get("/api/segments/456/profile", params={"width": 100})
+        same_bucket = client.get("/api/segments/456/profile", params={"width": 120})
+        too_wide = client.get("/api/segments/456/profile", params={"width": 5000})
+
+    assert response.status_code == 200
+    profile = response.json()
+    assert len(profile["indices"]) == min(128, len(track_points))
+    assert profile["total_points"] == len(track_points)
+    assert profile["elevations"] == [
+        track_points[index].elevation for index in profile["indices"]
+    ]
+    assert profile["distances"][0] == 0
+    assert profile["distances"][-1] == profile["total_distance"]
+    assert same_bucket.json() == profile
+    mock_storage_manager.aload_gpx_data.assert_awaited_once()
+    assert too_wide.status_code == 422
+
+    # Deleting the track drops its profiles
+    from src.api.segments import on_track_deleted
+
+    assert ("local:///gpx-segments/file.gpx", 128) in cache
+    on_track_deleted(
+        session_local.return_value.execute.return_value.scalar_one_or_none()
+    )
+    assert ("local:///gpx-segments/file.gpx", 128) not in cache
+
+
+def test_get_track_elevation_profile_not_found(client):
+    """Test the profile of a missing track."""
+    missing_track = make_lod_session()
+    missing_track.return_value.execute.return_value.scalar_one_or_none.return_value = (
+        None
+    )
+    with (
+        patch("src.dependencies.SessionLocal", missing_track),
+        patch("src.dependencies.storage_manager"),
+    ):
+        response = client.get("/api/segments/456/profile", params={"width": 100})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Track not found"
+
+
 def test_get_track_parsed_data_database_not_available(client):
     """Test track parsed data retrieval when database is not available."""
     with patch("src.dependencies.SessionLocal", None):
@@ -3248,7 +3749,7 @@ def test_get_track_parsed_data_gpx_not_found(client):
         mock_session_local.return_value = MockSessionLocal()
 
         # Storage manager returns None (GPX not found)
-        mock_storage_manager.load_gpx_data.return_value = None
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=None)
 
         response = client.get("/api/segments/456/data")
 
@@ -3287,7 +3788,6 @@ def test_get_track_parsed_data_gpx_parsing_failure(client):
     with (
         patch("src.dependencies.SessionLocal") as mock_session_local,
         patch("src.dependencies.storage_manager") as mock_storage_manager,
-        patch("src.api.segments.gpxpy.parse"),
     ):
 
         class MockSession:
@@ -3313,9 +3813,9 @@ def test_get_track_parsed_data_gpx_parsing_failure(client):
 
         mock_session_local.return_value = MockSessionLocal()
 
-        mock_storage_manager.load_gpx_data.return_value = mock_gpx_data
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=mock_gpx_data)
         # GPX parsing throws an exception
-        with patch("src.api.segments.gpxpy.parse") as mock_gpx_parse:
+        with patch("src.utils.gpx.parse_gpx_data") as mock_gpx_parse:
             mock_gpx_parse.side_effect = Exception("Invalid GPX format")
 
             response = client.get("/api/segments/456/data")
@@ -3358,8 +3858,7 @@ def test_get_track_parsed_data_extraction_failure(client):
     with (
         patch("src.dependencies.SessionLocal") as mock_session_local,
         patch("src.dependencies.storage_manager") as mock_storage_manager,
-        patch("src.api.segments.gpxpy.parse"),
-        patch("src.utils.gpx.extract_from_gpx_file") as mock_extract,
+        patch("src.utils.gpx.parse_gpx_data") as mock_extract,
     ):
 
         class MockSession:
@@ -3385,7 +3884,7 @@ def test_get_track_parsed_data_extraction_failure(client):
 
         mock_session_local.return_value = MockSessionLocal()
 
-        mock_storage_manager.load_gpx_data.return_value = mock_gpx_data
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=mock_gpx_data)
         # Data extraction throws an exception
         mock_extract.side_effect = Exception("Failed to extract data")
 
@@ -3480,8 +3979,7 @@ def test_get_track_parsed_data_file_path_none(client):
     with (
         patch("src.dependencies.SessionLocal") as mock_session_local,
         patch("src.dependencies.storage_manager") as mock_storage_manager,
-        patch("src.api.segments.gpxpy.parse"),
-        patch("src.utils.gpx.extract_from_gpx_file") as mock_extract,
+        patch("src.utils.gpx.parse_gpx_data") as mock_extract,
     ):
 
         class MockSession:
@@ -3507,7 +4005,7 @@ def test_get_track_parsed_data_file_path_none(client):
 
         mock_session_local.return_value = MockSessionLocal()
 
-        mock_storage_manager.load_gpx_data.return_value = mock_gpx_data
+        mock_storage_manager.aload_gpx_data = AsyncMock(return_value=mock_gpx_data)
         mock_extract.return_value = mock_parsed_data
 
         response = client.get("/api/segments/456/data")
@@ -5699,6 +6197,10 @@ def test_update_segment_file_not_found(client, dependencies_module):
             self.id = 1
             self.file_path = "old/path/file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         async def execute(self, stmt):
@@ -5771,6 +6273,10 @@ def test_update_segment_generation_failure(
             self.id = 1
             self.file_path = "old/path/file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         async def execute(self, stmt):
@@ -5794,7 +6300,7 @@ def test_update_segment_generation_failure(
 
     try:
         with patch(
-            "src.utils.gpx.generate_gpx_segment",
+            "src.utils.gpx.write_gpx_segment",
             side_effect=Exception("Generation failed"),
         ):
             response = client.put(
@@ -5847,6 +6353,10 @@ def test_update_segment_storage_upload_failure(
             self.id = 1
             self.file_path = "old/path/file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         async def execute(self, stmt):
@@ -5923,6 +6433,10 @@ def test_update_segment_database_exception_handling(
             self.id = 1
             self.file_path = "old/path/file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         def __init__(self):
@@ -5990,8 +6504,12 @@ def test_update_segment_database_exception_handling(
 
         assert response.status_code == 500
         assert "Failed to update segment" in response.json()["detail"]
-        # Verify that cleanup was attempted
-        mock_delete.assert_called_once()
+        # Verify that cleanup was attempted on the storage URL of the new file
+        new_file_path = mock_delete.call_args_list[0].args[0]
+        assert new_file_path.startswith(
+            dependencies_module.storage_manager.get_storage_root_prefix() + "/"
+        )
+        assert mock_delete.call_args_list == track_file_deletions(new_file_path)
 
     finally:
         dependencies_module.SessionLocal = original_session_local
@@ -6128,6 +6646,10 @@ def test_update_segment_media_json_error(
             self.id = 1
             self.file_path = "old/path/file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         async def execute(self, stmt):
@@ -6510,6 +7032,10 @@ def test_update_segment_with_existing_media(
             self.id = track_id
             self.file_path = "old/path/file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockImage:
         def __init__(self):
@@ -6655,6 +7181,10 @@ def test_update_segment_preserve_existing_media(
             self.id = track_id
             self.file_path = "old/path/file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         def __init__(self):
@@ -6850,6 +7380,10 @@ def test_update_segment_old_file_deletion_failure(
             self.file_path = (
                 "s3://test-bucket/gpx-segments/old_file.gpx"  # Valid storage path
             )
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         def __init__(self):
@@ -6902,9 +7436,11 @@ def test_update_segment_old_file_deletion_failure(
             # Mock storage manager to simulate deletion failure
             with patch("src.dependencies.storage_manager") as mock_storage:
                 mock_storage.get_storage_root_prefix.return_value = "s3://test-bucket"
-                mock_storage.delete_gpx_segment_by_url.return_value = (
-                    False  # Simulate deletion failure
+                mock_storage.aupload_gpx_segment = AsyncMock(
+                    return_value="gpx-segments/new_file.gpx"
                 )
+                # Simulate deletion failure
+                mock_storage.adelete_gpx_segment_by_url = AsyncMock(return_value=False)
 
                 # Update segment
                 update_response = client.put(
@@ -6929,8 +7465,8 @@ def test_update_segment_old_file_deletion_failure(
         assert update_response.status_code == 200
 
         # Verify that delete_gpx_segment_by_url was called
-        mock_storage.delete_gpx_segment_by_url.assert_called_once_with(
-            "s3://test-bucket/gpx-segments/old_file.gpx"
+        assert mock_storage.adelete_gpx_segment_by_url.call_args_list == (
+            track_file_deletions("s3://test-bucket/gpx-segments/old_file.gpx")
         )
 
     finally:
@@ -6995,6 +7531,10 @@ def test_update_segment_old_file_cleanup_with_prefix(
             self.id = track_id
             self.file_path = "s3://test-bucket/gpx-segments/old_file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         async def execute(self, stmt):
@@ -7070,7 +7610,7 @@ def test_update_segment_old_file_cleanup_with_prefix(
 
         assert update_response.status_code == 200
         # Verify that delete was called with the correct full URL
-        mock_delete.assert_called_once_with(
+        assert mock_delete.call_args_list == track_file_deletions(
             "s3://test-bucket/gpx-segments/old_file.gpx"
         )
 
@@ -7135,6 +7675,10 @@ def test_update_segment_old_file_cleanup_exception(
             self.id = track_id
             self.file_path = "s3://test-bucket/gpx-segments/old_file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         async def execute(self, stmt):
@@ -7240,6 +7784,10 @@ def test_update_segment_database_error_cleanup_failure(
             self.id = 1
             self.file_path = "old/path/file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         def __init__(self):
@@ -7379,6 +7927,10 @@ def test_update_segment_track_not_found_in_second_session(
             self.id = track_id
             self.file_path = "old/path/file.gpx"
             self.strava_id = 123456
+            self.bound_north = 45.6
+            self.bound_south = 45.5
+            self.bound_east = 4.1
+            self.bound_west = 4.0
 
     class MockSession:
         def __init__(self, session_id):
@@ -7510,8 +8062,8 @@ def test_delete_segment_success(client, sample_gpx_file, tmp_path, dependencies_
     try:
         # Mock storage manager to track delete calls
         with patch("src.dependencies.storage_manager") as mock_storage:
-            mock_storage.delete_gpx_segment_by_url.return_value = True
-            mock_storage.delete_image_by_url.return_value = True
+            mock_storage.adelete_gpx_segment_by_url = AsyncMock(return_value=True)
+            mock_storage.adelete_image_by_url = AsyncMock(return_value=True)
 
             # Delete the segment (with matching strava_id)
             response = client.delete("/api/segments/123?user_strava_id=123456")
@@ -7524,7 +8076,8 @@ def test_delete_segment_success(client, sample_gpx_file, tmp_path, dependencies_
             assert response_data["deleted_track"]["id"] == 123
 
             # Verify that storage cleanup was called
-            mock_storage.delete_gpx_segment_by_url.assert_called_once()
+            deletions = mock_storage.adelete_gpx_segment_by_url.call_args_list
+            assert deletions == track_file_deletions(deletions[0].args[0])
 
     finally:
         dependencies_module.SessionLocal = original_session_local
@@ -7688,10 +8241,11 @@ def test_delete_segment_gpx_deletion_exception_handling(
         # Mock storage manager to raise an exception during GPX deletion
         with patch("src.dependencies.storage_manager") as mock_storage:
             # Make delete_gpx_segment_by_url raise an exception
-            mock_storage.delete_gpx_segment_by_url.side_effect = Exception(
+            mock_storage.adelete_gpx_segment_by_url = AsyncMock()
+            mock_storage.adelete_gpx_segment_by_url.side_effect = Exception(
                 "Storage service unavailable"
             )
-            mock_storage.delete_image_by_url.return_value = True
+            mock_storage.adelete_image_by_url = AsyncMock(return_value=True)
 
             # Mock logger to capture warning messages
             with patch("src.api.segments.logger") as mock_logger:
@@ -7706,8 +8260,8 @@ def test_delete_segment_gpx_deletion_exception_handling(
                 assert response_data["deleted_track"]["id"] == 123
 
                 # Verify that storage cleanup was attempted
-                mock_storage.delete_gpx_segment_by_url.assert_called_once_with(
-                    "gpx-segments/test.gpx"
+                assert mock_storage.adelete_gpx_segment_by_url.call_args_list == (
+                    track_file_deletions("gpx-segments/test.gpx")
                 )
 
                 # Verify that the exception was logged as a warning
@@ -7786,11 +8340,12 @@ def test_delete_segment_image_deletion_exception_handling(
         # Mock storage manager to raise exceptions during image deletion
         with patch("src.dependencies.storage_manager") as mock_storage:
             # Make delete_gpx_segment_by_url succeed
-            mock_storage.delete_gpx_segment_by_url.return_value = True
+            mock_storage.adelete_gpx_segment_by_url = AsyncMock(return_value=True)
             # Mock get_storage_root_prefix to return local storage prefix
             mock_storage.get_storage_root_prefix.return_value = "local://"
             # Make delete_image_by_url raise an exception for the first image
-            mock_storage.delete_image_by_url.side_effect = Exception(
+            mock_storage.adelete_image_by_url = AsyncMock()
+            mock_storage.adelete_image_by_url.side_effect = Exception(
                 "Image storage service unavailable"
             )
 
@@ -7807,18 +8362,18 @@ def test_delete_segment_image_deletion_exception_handling(
                 assert response_data["deleted_track"]["id"] == 123
 
                 # Verify that storage cleanup was attempted for GPX
-                mock_storage.delete_gpx_segment_by_url.assert_called_once_with(
-                    "gpx-segments/test.gpx"
+                assert mock_storage.adelete_gpx_segment_by_url.call_args_list == (
+                    track_file_deletions("gpx-segments/test.gpx")
                 )
 
                 # Verify that image deletion was attempted (called twice for two images)
                 # with the proper storage URL format
-                assert mock_storage.delete_image_by_url.call_count == 2
+                assert mock_storage.adelete_image_by_url.call_count == 2
                 expected_calls = [
                     call("local:///images-segments/image1.jpg"),
                     call("local:///images-segments/image2.jpg"),
                 ]
-                mock_storage.delete_image_by_url.assert_has_calls(
+                mock_storage.adelete_image_by_url.assert_has_calls(
                     expected_calls, any_order=True
                 )
 
@@ -7962,10 +8517,10 @@ def test_delete_segment_success_with_authorization(
 
     # Mock storage manager
     class MockStorageManager:
-        def delete_gpx_segment_by_url(self, url):
+        async def adelete_gpx_segment_by_url(self, url):
             pass
 
-        def delete_image_by_url(self, url):
+        async def adelete_image_by_url(self, url):
             pass
 
         def get_storage_root_prefix(self):
@@ -8062,8 +8617,8 @@ def test_nonregression_image_deletion_uses_storage_url_not_http_url(
 
     try:
         with patch("src.dependencies.storage_manager") as mock_storage:
-            mock_storage.delete_gpx_segment_by_url.return_value = True
-            mock_storage.delete_image_by_url.return_value = True
+            mock_storage.adelete_gpx_segment_by_url = AsyncMock(return_value=True)
+            mock_storage.adelete_image_by_url = AsyncMock(return_value=True)
             mock_storage.get_storage_root_prefix.return_value = "local://"
 
             # Delete the segment (with matching strava_id)
@@ -8074,10 +8629,10 @@ def test_nonregression_image_deletion_uses_storage_url_not_http_url(
 
             # CRITICAL: Verify that delete_image_by_url was called with
             # storage URLs (local:///...), NOT HTTP URLs
-            assert mock_storage.delete_image_by_url.call_count == 2
+            assert mock_storage.adelete_image_by_url.call_count == 2
 
             # Get all calls to delete_image_by_url
-            delete_calls = mock_storage.delete_image_by_url.call_args_list
+            delete_calls = mock_storage.adelete_image_by_url.call_args_list
 
             # Extract the URLs that were passed
             called_urls = [call_args[0][0] for call_args in delete_calls]
@@ -8117,7 +8672,7 @@ def test_nonregression_gpx_endpoint_with_storage_error_requires_mocked_database(
 
     # Mock storage manager to return None (simulating file not found)
     class MockStorageManager:
-        def load_gpx_data(self, url):
+        async def aload_gpx_data(self, url):
             return None  # File not found in storage
 
     # Mock track object (must exist in DB to reach storage code)
@@ -8173,7 +8728,7 @@ def test_nonregression_gpx_endpoint_storage_exception_with_valid_track(
 
     # Mock storage manager to raise an exception
     class MockStorageManager:
-        def load_gpx_data(self, url):
+        async def aload_gpx_data(self, url):
             raise Exception("Storage service unavailable")
 
     # Mock track object
@@ -8655,7 +9210,7 @@ def test_search_routes_empty_auth_users_table_returns_empty():
     with patch("src.api.segments.select"):
         # Create a mock that returns empty list for auth_users query
         mock_result = Mock()
-        mock_result.all.return_value = []
+        mock_result.scalars.return_value.all.return_value = []
 
         async def mock_execute(stmt):
             # Return empty list for AuthUser query
@@ -8787,3 +9342,969 @@ def test_search_segments_unaffected_by_auth(client):
 
     # Should have the same number of data lines
     assert len(data_lines_without) == len(data_lines_with)
+
+
+def make_track_response(
+    track_id, latitude, longitude, track_type="segment", **attributes
+):
+    """Create a TrackResponse centered on the given location."""
+    from src.models.track import TrackResponse
+
+    track_attributes = {
+        "difficulty_level": 3,
+        "surface_type": ["forest-trail"],
+        "tire_dry": "slick",
+        "tire_wet": "knobs",
+    }
+    track_attributes.update(attributes)
+    return TrackResponse(
+        id=track_id,
+        file_path=f"local:///gpx-segments/{track_id}.gpx",
+        bound_north=latitude + 0.01,
+        bound_south=latitude - 0.01,
+        bound_east=longitude + 0.01,
+        bound_west=longitude - 0.01,
+        barycenter_latitude=latitude,
+        barycenter_longitude=longitude,
+        name=f"Track {track_id}",
+        track_type=track_type,
+        comments="",
+        strava_id=123456,
+        **track_attributes,
+    )
+
+
+def test_search_segments_served_from_spatial_index(client):
+    """Test that segment searches use the spatial index without the database."""
+    from src.utils.spatial_index import TrackSpatialIndex
+
+    index = TrackSpatialIndex(
+        [
+            make_track_response(1, 45.3, 4.3),
+            make_track_response(2, 45.0, 4.0),
+            make_track_response(3, 45.1, 4.1, track_type="route"),
+            make_track_response(4, 10.0, 4.0),
+        ]
+    )
+    session_local = Mock(side_effect=AssertionError("database must not be used"))
+
+    with (
+        patch("src.dependencies.track_index", index),
+        patch("src.dependencies.SessionLocal", session_local),
+    ):
+        response = client.get(
+            "/api/segments/search",
+            params={"north": 46.0, "south": 44.0, "east": 5.0, "west": 3.0},
+        )
+
+    assert response.status_code == 200
+    data_lines = [
+        line for line in response.text.strip().split("\n") if line.startswith("data: ")
+    ]
+    assert data_lines[-1] == "data: [DONE]"
+    tracks = [json.loads(line[6:]) for line in data_lines[:-1]]
+    assert [track["id"] for track in tracks] == [2, 1]
+    session_local.assert_not_called()
+
+
+def test_search_releases_database_before_streaming(client):
+    """Test that the database session is closed before the events are sent."""
+    from src.utils.event_stream import stream_events
+    from src.utils.spatial_index import TrackSpatialIndex
+
+    index = TrackSpatialIndex([make_track_response(1, 45.0, 4.0, track_type="route")])
+    session_open = []
+    mock_session = make_auth_session([123456])
+
+    async def enter_session():
+        session_open.append(True)
+        return mock_session
+
+    async def exit_session(*args):
+        session_open.append(False)
+
+    mock_session.__aenter__.side_effect = enter_session
+    mock_session.__aexit__.side_effect = exit_session
+
+    async def checked_stream_events(events, metrics):
+        assert session_open == [True, False]
+        async for event in stream_events(events, metrics):
+            yield event
+
+    before = client.get("/api/search-stats").json()
+    with (
+        patch("src.dependencies.track_index", index),
+        patch("src.dependencies.SessionLocal", Mock(return_value=mock_session)),
+        patch("src.api.segments.stream_events", checked_stream_events),
+    ):
+        response = client.get(
+            "/api/segments/search",
+            params={
+                "north": 46.0,
+                "south": 44.0,
+                "east": 5.0,
+                "west": 3.0,
+                "track_type": "route",
+            },
+        )
+    after = client.get("/api/search-stats").json()
+
+    assert response.status_code == 200
+    assert response.text.count("data: ") == 2
+    assert response.text.endswith("data: [DONE]\n\n")
+    assert after["queries"] == before["queries"] + 1
+    assert after["streams"] == before["streams"] + 1
+    assert after["query_seconds_max"] >= after["query_seconds_total"] / after["queries"]
+    assert after["disconnects"] == before["disconnects"]
+
+
+def test_search_results_cached_until_track_written(client):
+    """Test that identical searches share their results until a track is written."""
+    from src.api.segments import on_track_written
+    from src.models.track import TireType, Track, TrackType
+    from src.utils.search_cache import SearchResultCache
+    from src.utils.spatial_index import TrackSpatialIndex
+
+    index = TrackSpatialIndex([make_track_response(1, 45.0, 4.0)])
+    search_spy = Mock(wraps=index.search)
+    cache = SearchResultCache(ttl=60, max_entries=10)
+    params = {"north": 46.0, "south": 44.0, "east": 5.0, "west": 3.0}
+
+    with (
+        patch("src.dependencies.track_index", index),
+        patch("src.dependencies.search_result_cache", cache),
+        patch.object(index, "search", search_spy),
+    ):
+        first = client.get("/api/segments/search", params=params)
+        # Bounds differing by less than the key precision are the same search
+        second = client.get(
+            "/api/segments/search", params={**params, "north": 46.0000001}
+        )
+        other = client.get("/api/segments/search", params={**params, "limit": 10})
+        assert search_spy.call_count == 2
+
+        on_track_written(
+            Track(
+                id=2,
+                file_path="local:///gpx-segments/2.gpx",
+                bound_north=45.11,
+                bound_south=45.09,
+                bound_east=4.11,
+                bound_west=4.09,
+                barycenter_latitude=45.1,
+                barycenter_longitude=4.1,
+                name="Track 2",
+                track_type=TrackType.SEGMENT,
+                difficulty_level=3,
+                surface_type=["forest-trail"],
+                tire_dry=TireType.SLICK,
+                tire_wet=TireType.KNOBS,
+                strava_id=123456,
+            )
+        )
+        third = client.get("/api/segments/search", params=params)
+        stats = client.get("/api/cache-stats").json()["search_results"]
+
+    assert second.text == first.text
+    assert other.text == first.text
+    assert third.text.count("data: {") == 2
+    assert search_spy.call_count == 3
+    assert stats["requests"] == 4
+    assert stats["hits"] == 1
+    assert stats["invalidations"] == 1
+    assert stats["coalescing_ratio"] == 0.25
+
+
+@pytest.mark.parametrize(
+    "encoded, expected",
+    [("", set()), ("12", {12}), ("12,3,40", {12, 15, 55}), ("5,0,1", {5, 6})],
+)
+def test_decode_track_ids(encoded, expected):
+    """Test the decoding of the delta-encoded track IDs."""
+    from src.api.segments import decode_track_ids
+
+    assert decode_track_ids(encoded) == expected
+
+
+@pytest.mark.parametrize("encoded", ["1,,2", "1,-2", "1, 2", "a", "1.5", "1," * 2001])
+def test_decode_track_ids_invalid(encoded):
+    """Test that malformed or too long lists of track IDs are rejected."""
+    from src.api.segments import decode_track_ids
+
+    with pytest.raises(ValueError):
+        decode_track_ids(encoded)
+
+
+def test_search_segments_only_sends_unknown_tracks(client):
+    """Test that tracks known by the client are not sent again."""
+    from src.utils.search_cache import SearchResultCache
+    from src.utils.spatial_index import TrackSpatialIndex
+
+    index = TrackSpatialIndex(
+        [
+            make_track_response(1, 45.0, 4.0),
+            make_track_response(2, 45.1, 4.1),
+            make_track_response(3, 45.2, 4.2),
+        ]
+    )
+    cache = SearchResultCache(ttl=60, max_entries=10)
+    params = {"north": 46.0, "south": 44.0, "east": 5.0, "west": 3.0}
+
+    with (
+        patch("src.dependencies.track_index", index),
+        patch("src.dependencies.search_result_cache", cache),
+    ):
+        full = client.get("/api/segments/search", params=params)
+        # Tracks 1 and 3 are known, track 7 was in a previous viewport
+        delta = client.get("/api/segments/search", params={**params, "known": "1,2,4"})
+        invalid = client.get("/api/segments/search", params={**params, "known": "1,-1"})
+
+    assert full.text.count("data: {") == 3
+    assert "event: removed" not in full.text
+
+    assert delta.status_code == 200
+    assert delta.text.count("data: {") == 1
+    assert '"id": 2,' in delta.text
+    assert delta.text.endswith("event: removed\ndata: [7]\n\ndata: [DONE]\n\n")
+    # Both searches share the results of the index
+    assert cache.stats.executions == 1
+
+    assert invalid.status_code == 400
+    assert "Invalid known" in invalid.json()["detail"]
+
+
+def test_spatial_index_follows_segment_deletion(client, dependencies_module):
+    """Test that deleting a track removes it from the spatial index."""
+    from src.models.track import TireType, Track, TrackType
+    from src.utils.spatial_index import TrackSpatialIndex
+
+    index = TrackSpatialIndex([make_track_response(1, 45.0, 4.0)])
+    track = Track(
+        id=1,
+        file_path="local:///gpx-segments/1.gpx",
+        name="Track 1",
+        track_type=TrackType.SEGMENT,
+        tire_dry=TireType.SLICK,
+        tire_wet=TireType.KNOBS,
+        strava_id=123456,
+    )
+    track.images = []
+    track.videos = []
+
+    mock_session = AsyncMock()
+    mock_result = Mock()
+    mock_result.scalar_one_or_none.return_value = track
+    mock_session.execute.return_value = mock_result
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.__aexit__.return_value = None
+
+    with (
+        patch("src.dependencies.track_index", index),
+        patch("src.dependencies.SessionLocal", Mock(return_value=mock_session)),
+        patch("src.dependencies.storage_manager", Mock()),
+    ):
+        response = client.delete("/api/segments/1", params={"user_strava_id": 123456})
+
+    assert response.status_code == 200
+    assert 1 not in index
+
+
+def test_search_segments_attribute_filters_from_spatial_index(client):
+    """Test that attribute filters are applied before the search limit."""
+    from src.utils.spatial_index import TrackSpatialIndex
+
+    index = TrackSpatialIndex(
+        [
+            make_track_response(1, 45.0, 4.0, difficulty_level=1),
+            make_track_response(2, 45.1, 4.1, surface_type=["big-stone-road"]),
+            make_track_response(3, 45.2, 4.2, tire_dry="knobs"),
+            make_track_response(4, 45.3, 4.3, tire_wet="semi-slick"),
+            make_track_response(
+                5, 45.4, 4.4, surface_type=["big-stone-road", "forest-trail"]
+            ),
+            make_track_response(6, 45.5, 4.5),
+        ]
+    )
+
+    with patch("src.dependencies.track_index", index):
+        response = client.get(
+            "/api/segments/search",
+            params={
+                "north": 46.0,
+                "south": 44.0,
+                "east": 5.0,
+                "west": 3.0,
+                "limit": 1,
+                "difficulty_min": 2,
+                "difficulty_max": 4,
+                "surface_type": ["forest-trail", "field-trail"],
+                "tire_dry": ["slick", "semi-slick"],
+                "tire_wet": ["knobs"],
+            },
+        )
+
+    assert response.status_code == 200
+    data_lines = [
+        line for line in response.text.strip().split("\n") if line.startswith("data: ")
+    ]
+    assert data_lines[-1] == "data: [DONE]"
+    tracks = [json.loads(line[6:]) for line in data_lines[:-1]]
+    assert [track["id"] for track in tracks] == [5]
+
+
+@pytest.mark.parametrize(
+    "params, detail",
+    [
+        ({"surface_type": "lava"}, "Invalid surface type: lava"),
+        ({"tire_dry": "studded"}, "Invalid tire type: studded"),
+        ({"tire_wet": "studded"}, "Invalid tire type: studded"),
+    ],
+)
+def test_search_segments_invalid_attribute_filters(client, params, detail):
+    """Test that unknown filter values are rejected."""
+    response = client.get(
+        "/api/segments/search",
+        params={"north": 46.0, "south": 44.0, "east": 5.0, "west": 3.0, **params},
+    )
+
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+
+
+def test_search_segments_difficulty_out_of_range(client):
+    """Test that difficulty filters are validated."""
+    response = client.get(
+        "/api/segments/search",
+        params={
+            "north": 46.0,
+            "south": 44.0,
+            "east": 5.0,
+            "west": 3.0,
+            "difficulty_min": 0,
+        },
+    )
+
+    assert response.status_code == 422
+
+
+def test_track_search_filters_sql_conditions():
+    """Test that the filters compile into SQL conditions."""
+    from sqlalchemy.dialects import postgresql
+    from src.api.segments import TrackSearchFilters
+
+    assert TrackSearchFilters().conditions() == []
+
+    filters = TrackSearchFilters(
+        difficulty_min=2,
+        difficulty_max=4,
+        surface_types=frozenset({"forest-trail"}),
+        tires_dry=frozenset({"slick"}),
+        tires_wet=frozenset({"knobs", "semi-slick"}),
+    )
+    compiled = [
+        str(condition.compile(dialect=postgresql.dialect()))
+        for condition in filters.conditions()
+    ]
+
+    assert compiled[0].startswith("tracks.difficulty_level >=")
+    assert compiled[1].startswith("tracks.difficulty_level <=")
+    assert compiled[2].startswith("tracks.surface_type && CAST(")
+    assert compiled[3].startswith("tracks.tire_dry IN")
+    assert compiled[4].startswith("tracks.tire_wet IN")
+
+
+def test_create_segment_stores_simplified_polylines(client, sample_gpx_file):
+    """Test that segment creation precomputes the simplified polylines."""
+    import polyline
+
+    with open(sample_gpx_file, "rb") as f:
+        upload_response = client.post(
+            "/api/upload-gpx", files={"file": ("test.gpx", f, "application/gpx+xml")}
+        )
+    assert upload_response.status_code == 200
+    file_id = upload_response.json()["file_id"]
+
+    added_tracks = []
+    mock_session = AsyncMock()
+    mock_session.add = Mock(side_effect=added_tracks.append)
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.__aexit__.return_value = None
+
+    with (
+        patch("src.dependencies.SessionLocal", Mock(return_value=mock_session)),
+        patch("src.dependencies.track_index", None),
+    ):
+        response = client.post(
+            "/api/segments",
+            data={
+                "name": "Test Segment",
+                "track_type": "segment",
+                "tire_dry": "slick",
+                "tire_wet": "semi-slick",
+                "file_id": file_id,
+                "start_index": "0",
+                "end_index": "100",
+                "surface_type": json.dumps(["forest-trail"]),
+                "difficulty_level": "3",
+                "strava_id": "123456",
+            },
+        )
+
+    assert response.status_code == 200
+    (track,) = added_tracks
+    assert set(track.simplified_polylines) == {"5", "20", "100"}
+    detailed = polyline.decode(track.simplified_polylines["5"])
+    coarse = polyline.decode(track.simplified_polylines["100"])
+    assert 2 <= len(coarse) <= len(detailed) <= 101
+    assert detailed[0] == coarse[0]
+    assert detailed[-1] == coarse[-1]
+
+
+def test_create_segment_stores_track_stats(client, sample_gpx_file):
+    """Test that segment creation stores and returns the track statistics."""
+    with open(sample_gpx_file, "rb") as f:
+        upload_response = client.post(
+            "/api/upload-gpx", files={"file": ("test.gpx", f, "application/gpx+xml")}
+        )
+    assert upload_response.status_code == 200
+    file_id = upload_response.json()["file_id"]
+
+    added_tracks = []
+    mock_session = AsyncMock()
+    mock_session.add = Mock(side_effect=added_tracks.append)
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.__aexit__.return_value = None
+
+    with (
+        patch("src.dependencies.SessionLocal", Mock(return_value=mock_session)),
+        patch("src.dependencies.track_index", None),
+    ):
+        response = client.post(
+            "/api/segments",
+            data={
+                "name": "Test Segment",
+                "track_type": "segment",
+                "tire_dry": "slick",
+                "tire_wet": "semi-slick",
+                "file_id": file_id,
+                "start_index": "0",
+                "end_index": "100",
+                "surface_type": json.dumps(["forest-trail"]),
+                "difficulty_level": "3",
+                "strava_id": "123456",
+            },
+        )
+
+    assert response.status_code == 200
+    (track,) = added_tracks
+    data = response.json()
+    assert track.total_points == data["total_points"] == 101
+    assert track.total_distance == data["total_distance"] > 0
+    assert track.total_elevation_gain == data["total_elevation_gain"] >= 0
+    assert track.total_elevation_loss == data["total_elevation_loss"] >= 0
+    assert track.min_elevation == data["min_elevation"] <= data["max_elevation"]
+
+
+def test_create_segment_stores_levels_of_detail(client, sample_gpx_file):
+    """Test that segment creation stores the levels of detail next to the GPX."""
+    from src.utils.gpx import GPXStreamReader
+    from src.utils.simplify import LOD_TOLERANCES, lod_file_path
+
+    with open(sample_gpx_file, "rb") as f:
+        upload_response = client.post(
+            "/api/upload-gpx", files={"file": ("test.gpx", f, "application/gpx+xml")}
+        )
+    assert upload_response.status_code == 200
+
+    with patch("src.dependencies.SessionLocal", None):
+        response = client.post(
+            "/api/segments",
+            data={
+                "name": "Test Segment",
+                "track_type": "segment",
+                "tire_dry": "slick",
+                "tire_wet": "semi-slick",
+                "file_id": upload_response.json()["file_id"],
+                "start_index": "0",
+                "end_index": "100",
+                "surface_type": json.dumps(["forest-trail"]),
+                "difficulty_level": "3",
+                "strava_id": "123456",
+            },
+        )
+
+    assert response.status_code == 200
+    from src.dependencies import storage_manager
+
+    file_path = response.json()["file_path"]
+    point_counts = [
+        len(list(GPXStreamReader(storage_manager.load_gpx_data(file_path))))
+    ]
+    for tolerance in LOD_TOLERANCES:
+        lod_bytes = storage_manager.load_gpx_data(lod_file_path(file_path, tolerance))
+        point_counts.append(len(list(GPXStreamReader(lod_bytes))))
+    assert point_counts == sorted(point_counts, reverse=True)
+    assert point_counts[0] == 101
+
+
+def test_search_segments_distance_filters_and_sort_from_spatial_index(client):
+    """Test the distance filters and the statistic ordering of the search."""
+    from src.utils.spatial_index import TrackSpatialIndex
+
+    index = TrackSpatialIndex(
+        [
+            make_track_response(1, 45.0, 4.0, total_distance=12.0),
+            make_track_response(
+                2, 45.1, 4.1, total_distance=5.0, total_elevation_gain=300.0
+            ),
+            make_track_response(
+                3, 45.2, 4.2, total_distance=8.0, total_elevation_gain=100.0
+            ),
+            make_track_response(4, 45.3, 4.3),
+            make_track_response(
+                5, 45.4, 4.4, total_distance=2.0, total_elevation_gain=50.0
+            ),
+        ]
+    )
+    params = {"north": 46.0, "south": 44.0, "east": 5.0, "west": 3.0}
+
+    def search(**extra_params):
+        response = client.get("/api/segments/search", params={**params, **extra_params})
+        assert response.status_code == 200
+        data_lines = [
+            line
+            for line in response.text.strip().split("\n")
+            if line.startswith("data: ")
+        ]
+        assert data_lines[-1] == "data: [DONE]"
+        return [json.loads(line[6:])["id"] for line in data_lines[:-1]]
+
+    with patch("src.dependencies.track_index", index):
+        assert search(min_distance=3, max_distance=10) == [2, 3]
+        assert search(sort="distance") == [5, 2, 3, 1, 4]
+        assert search(sort="-distance", limit=2) == [1, 3]
+        assert search(sort="-elevation_gain", min_distance=3) == [2, 3, 1]
+
+
+def test_search_segments_invalid_sort(client):
+    """Test that unknown sort keys are rejected."""
+    response = client.get(
+        "/api/segments/search",
+        params={"north": 46.0, "south": 44.0, "east": 5.0, "west": 3.0, "sort": "name"},
+    )
+
+    assert response.status_code == 400
+    assert "Invalid sort: name" in response.json()["detail"]
+
+
+def test_track_search_distance_filters_and_order_sql():
+    """Test that the distance filters and the ordering compile into SQL."""
+    from sqlalchemy.dialects import postgresql
+    from src.api.segments import TrackSearchFilters, TrackSearchOrder
+
+    def compile_sql(clause):
+        return str(clause.compile(dialect=postgresql.dialect()))
+
+    filters = TrackSearchFilters(min_distance=3.0, max_distance=10.0)
+    compiled = [compile_sql(condition) for condition in filters.conditions()]
+
+    assert compiled[0].startswith("tracks.total_distance >=")
+    assert compiled[1].startswith("tracks.total_distance <=")
+    assert compile_sql(TrackSearchOrder.parse("distance").order_by()) == (
+        "tracks.total_distance ASC NULLS LAST"
+    )
+    assert compile_sql(TrackSearchOrder.parse("-elevation_gain").order_by()) == (
+        "tracks.total_elevation_gain DESC NULLS LAST"
+    )
+    with pytest.raises(ValueError, match="Unknown sort key"):
+        TrackSearchOrder.parse("-")
+
+
+def test_search_segments_inline_polyline_geometry(client):
+    """Test that the search embeds the precomputed polyline on request."""
+    from src.utils.spatial_index import TrackSpatialIndex
+
+    polylines = {"5": "detailed", "20": "medium", "100": "coarse"}
+    index = TrackSpatialIndex(
+        [
+            make_track_response(1, 45.0, 4.0, simplified_polylines=polylines),
+            make_track_response(2, 45.1, 4.1),
+        ]
+    )
+    params = {"north": 46.0, "south": 44.0, "east": 5.0, "west": 3.0}
+
+    def search(**extra_params):
+        response = client.get("/api/segments/search", params={**params, **extra_params})
+        assert response.status_code == 200
+        data_lines = [
+            line
+            for line in response.text.strip().split("\n")
+            if line.startswith("data: ")
+        ]
+        assert data_lines[-1] == "data: [DONE]"
+        return [json.loads(line[6:]) for line in data_lines[:-1]]
+
+    with patch("src.dependencies.track_index", index):
+        default_tracks = search()
+        polyline_tracks = search(geometry="polyline", tolerance=50)
+        detailed_tracks = search(geometry="polyline", tolerance=1)
+
+    assert "polyline" not in default_tracks[0]
+    assert "simplified_polylines" not in default_tracks[0]
+    assert [track["polyline"] for track in polyline_tracks] == ["medium", None]
+    assert detailed_tracks[0]["polyline"] == "detailed"
+
+
+def test_search_segments_invalid_geometry(client):
+    """Test that unknown geometry formats are rejected."""
+    response = client.get(
+        "/api/segments/search",
+        params={
+            "north": 46.0,
+            "south": 44.0,
+            "east": 5.0,
+            "west": 3.0,
+            "geometry": "geojson",
+        },
+    )
+
+    assert response.status_code == 400
+    assert "Invalid geometry" in response.json()["detail"]
+
+
+def location_tile(z, latitude, longitude):
+    """Compute the tile holding a location."""
+    tile_count = 2**z
+    x = int((longitude + 180.0) / 360.0 * tile_count)
+    y = int(
+        (1 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2 * tile_count
+    )
+    return x, y
+
+
+def make_auth_session(authorized_strava_ids):
+    """Create a mocked session returning the authorized users."""
+    from src.models.auth_user import AuthUser
+
+    mock_session = AsyncMock()
+    mock_result = Mock()
+    mock_result.scalars.return_value.all.return_value = [
+        AuthUser(strava_id=strava_id) for strava_id in authorized_strava_ids
+    ]
+    mock_session.execute.return_value = mock_result
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.__aexit__.return_value = None
+    return mock_session
+
+
+def test_get_segments_tile(client, tmp_path):
+    """Test that tiles are built from the indexed tracks and cached on disk."""
+    import polyline
+    from src.utils.spatial_index import TrackSpatialIndex
+    from src.utils.vector_tiles import MVT_MEDIA_TYPE, TileCache
+
+    line = polyline.encode([(44.995, 3.995), (45.005, 4.005)])
+    polylines = {"5": line, "20": line, "100": line}
+    index = TrackSpatialIndex(
+        [
+            make_track_response(1, 45.0, 4.0, simplified_polylines=polylines),
+            make_track_response(
+                2, 45.0, 4.0, track_type="route", simplified_polylines=polylines
+            ),
+        ]
+    )
+    tile_cache = TileCache(tmp_path / "tiles")
+    mock_session = make_auth_session([999])
+    z = 12
+    x, y = location_tile(z, 45.0, 4.0)
+
+    with (
+        patch("src.dependencies.track_index", index),
+        patch("src.dependencies.tile_cache", tile_cache),
+        patch("src.dependencies.SessionLocal", Mock(return_value=mock_session)),
+    ):
+        response = client.get(f"/api/segments/tiles/{z}/{x}/{y}.mvt")
+        cached_response = client.get(f"/api/segments/tiles/{z}/{x}/{y}.mvt")
+        not_modified = client.get(
+            f"/api/segments/tiles/{z}/{x}/{y}.mvt",
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        empty_response = client.get(f"/api/segments/tiles/{z}/0/0.mvt")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MVT_MEDIA_TYPE
+    # The route of a user that is not authorized is not in the tile
+    assert b"segments" in response.content
+    assert b"routes" not in response.content
+    assert b"Track 1" in response.content
+    assert tile_cache.get(z, x, y) == response.content
+
+    # The second request is served from the cache, and the authorized users are
+    # loaded once
+    assert mock_session.execute.await_count == 1
+    assert cached_response.content == response.content
+    assert not_modified.status_code == 304
+
+    assert empty_response.status_code == 200
+    assert empty_response.content == b""
+
+
+def test_get_segments_tile_not_cached_after_concurrent_write(client, tmp_path):
+    """Test that a tile built while a track was written is not cached."""
+    from src.utils.vector_tiles import TileCache
+
+    tile_cache = TileCache(tmp_path / "tiles")
+    z = 12
+    x, y = location_tile(z, 45.0, 4.0)
+
+    async def build_during_write(session_local, z, x, y):
+        tile_cache.invalidate(45.001, 44.999, 4.001, 3.999)
+        return b"stale tile"
+
+    with (
+        patch("src.dependencies.tile_cache", tile_cache),
+        patch("src.dependencies.SessionLocal", Mock()),
+        patch("src.api.segments.build_vector_tile", build_during_write),
+    ):
+        response = client.get(f"/api/segments/tiles/{z}/{x}/{y}.mvt")
+
+    assert response.status_code == 200
+    assert response.content == b"stale tile"
+    assert tile_cache.get(z, x, y) is None
+
+
+@pytest.mark.parametrize("tile", ["23/0/0", "2/4/0", "2/0/4", "2/-1/0"])
+def test_get_segments_tile_invalid_coordinates(client, tile):
+    """Test that tiles outside of the tile pyramid are rejected."""
+    response = client.get(f"/api/segments/tiles/{tile}.mvt")
+
+    assert response.status_code == 400
+
+
+def test_segment_deletion_invalidates_tiles(client, tmp_path):
+    """Test that deleting a track removes the cached tiles it intersects."""
+    from src.models.track import TireType, Track, TrackType
+    from src.utils.vector_tiles import TileCache
+
+    tile_cache = TileCache(tmp_path / "tiles")
+    z = 12
+    x, y = location_tile(z, 45.0, 4.0)
+    tile_cache.put(z, x, y, b"tile")
+    tile_cache.put(z, 0, 0, b"far away")
+
+    track = Track(
+        id=1,
+        file_path="local:///gpx-segments/1.gpx",
+        bound_north=45.001,
+        bound_south=44.999,
+        bound_east=4.001,
+        bound_west=3.999,
+        name="Track 1",
+        track_type=TrackType.SEGMENT,
+        tire_dry=TireType.SLICK,
+        tire_wet=TireType.KNOBS,
+        strava_id=123456,
+    )
+    track.images = []
+    track.videos = []
+
+    mock_session = AsyncMock()
+    mock_result = Mock()
+    mock_result.scalar_one_or_none.return_value = track
+    mock_session.execute.return_value = mock_result
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.__aexit__.return_value = None
+
+    with (
+        patch("src.dependencies.track_index", None),
+        patch("src.dependencies.tile_cache", tile_cache),
+        patch("src.dependencies.SessionLocal", Mock(return_value=mock_session)),
+        patch("src.dependencies.storage_manager", Mock()),
+    ):
+        response = client.delete("/api/segments/1", params={"user_strava_id": 123456})
+
+    assert response.status_code == 200
+    assert tile_cache.get(z, x, y) is None
+    assert tile_cache.get(z, 0, 0) == b"far away"
+
+
+def test_track_update_invalidates_previous_tiles(tmp_path):
+    """Test that moving a track removes the cached tiles of both locations."""
+    from src.api.segments import on_track_written
+    from src.models.track import TireType, Track, TrackType
+    from src.utils.vector_tiles import TileCache
+
+    tile_cache = TileCache(tmp_path / "tiles")
+    z = 12
+    old_x, old_y = location_tile(z, 45.0, 4.0)
+    new_x, new_y = location_tile(z, 46.0, 5.0)
+    tile_cache.put(z, old_x, old_y, b"old location")
+    tile_cache.put(z, new_x, new_y, b"new location")
+    tile_cache.put(z, 0, 0, b"far away")
+
+    track = Track(
+        id=1,
+        file_path="local:///gpx-segments/1.gpx",
+        bound_north=46.001,
+        bound_south=45.999,
+        bound_east=5.001,
+        bound_west=4.999,
+        name="Track 1",
+        track_type=TrackType.SEGMENT,
+        tire_dry=TireType.SLICK,
+        tire_wet=TireType.KNOBS,
+        strava_id=123456,
+    )
+
+    with (
+        patch("src.dependencies.track_index", None),
+        patch("src.dependencies.tile_cache", tile_cache),
+    ):
+        on_track_written(track, (45.001, 44.999, 4.001, 3.999))
+
+    assert tile_cache.get(z, old_x, old_y) is None
+    assert tile_cache.get(z, new_x, new_y) is None
+    assert tile_cache.get(z, 0, 0) == b"far away"
+
+
+def apply_track_notifications(*payloads):
+    """Deliver track notifications and wait until they are applied."""
+    from src.api.segments import _track_change_tasks, on_tracks_changed
+
+    async def deliver():
+        for payload in payloads:
+            on_tracks_changed(payload)
+        await asyncio.gather(*_track_change_tasks)
+
+    asyncio.run(deliver())
+
+
+def test_track_notifications_from_other_processes(tmp_path):
+    """Test that the tracks written or deleted by other processes are applied."""
+    from src.api.segments import NOTIFICATION_SENDER
+    from src.models.track import TireType, Track, TrackType
+    from src.utils.spatial_index import TrackSpatialIndex
+    from src.utils.vector_tiles import TileCache
+
+    index = TrackSpatialIndex([make_track_response(1, 45.0, 4.0)])
+    tile_cache = TileCache(tmp_path / "tiles")
+    z = 12
+    old_x, old_y = location_tile(z, 45.0, 4.0)
+    tile_cache.put(z, old_x, old_y, b"old location")
+    written = Track(
+        id=2,
+        file_path="local:///gpx-segments/2.gpx",
+        bound_north=46.001,
+        bound_south=45.999,
+        bound_east=5.001,
+        bound_west=4.999,
+        barycenter_latitude=46.0,
+        barycenter_longitude=5.0,
+        name="Track 2",
+        track_type=TrackType.SEGMENT,
+        difficulty_level=3,
+        surface_type=["forest-trail"],
+        tire_dry=TireType.SLICK,
+        tire_wet=TireType.KNOBS,
+        strava_id=123456,
+    )
+    mock_result = Mock()
+    mock_result.scalar_one_or_none.return_value = written
+    mock_session = AsyncMock()
+    mock_session.execute.return_value = mock_result
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.__aexit__.return_value = None
+
+    def notification(track_id, deleted, **change):
+        return json.dumps(
+            {
+                "sender": "other",
+                "id": track_id,
+                "deleted": deleted,
+                "file_path": f"local:///gpx-segments/{track_id}.gpx",
+                "bounds": [45.01, 44.99, 4.01, 3.99],
+                "previous_bounds": None,
+                **change,
+            }
+        )
+
+    with (
+        patch("src.dependencies.track_index", index),
+        patch("src.dependencies.tile_cache", tile_cache),
+        patch("src.dependencies.SessionLocal", Mock(return_value=mock_session)),
+    ):
+        # Moved from the location of track 1
+        apply_track_notifications(
+            notification(2, False, previous_bounds=[45.01, 44.99, 4.01, 3.99])
+        )
+        assert 2 in index
+        assert tile_cache.get(z, old_x, old_y) is None
+
+        # Changes sent by this process are already applied
+        apply_track_notifications(
+            notification(1, True, sender=NOTIFICATION_SENDER), "invalid"
+        )
+        assert 1 in index
+
+        apply_track_notifications(notification(1, True))
+        assert 1 not in index
+
+
+def test_track_notifications_missed(tmp_path):
+    """Test that the index is loaded again when notifications may be missed."""
+    from src.utils.spatial_index import TrackSpatialIndex
+    from src.utils.vector_tiles import TileCache
+
+    index = TrackSpatialIndex([make_track_response(1, 45.0, 4.0)])
+    reloaded = TrackSpatialIndex([make_track_response(2, 45.0, 4.0)])
+    tile_cache = TileCache(tmp_path / "tiles")
+    tile_cache.put(12, 0, 0, b"tile")
+
+    with (
+        patch("src.dependencies.track_index", index),
+        patch("src.dependencies.tile_cache", tile_cache),
+        patch("src.dependencies.SessionLocal", Mock()),
+        patch("src.api.segments.build_track_index", AsyncMock(return_value=reloaded)),
+    ):
+        apply_track_notifications(None)
+
+        from src import dependencies
+
+        assert dependencies.track_index is reloaded
+    assert tile_cache.get(12, 0, 0) is None
+
+
+def test_notify_track_changed():
+    """Test that track changes are sent on the tracks channel."""
+    from src.api.segments import NOTIFICATION_SENDER, notify_track_changed
+    from src.models.track import TRACKS_CHANNEL, Track
+
+    track = Track(
+        id=3,
+        file_path="local:///gpx-segments/3.gpx",
+        bound_north=45.01,
+        bound_south=44.99,
+        bound_east=4.01,
+        bound_west=3.99,
+    )
+    connection = AsyncMock()
+    transaction = AsyncMock()
+    transaction.__aenter__.return_value = connection
+    transaction.__aexit__.return_value = None
+    engine = Mock()
+    engine.begin.return_value = transaction
+
+    with patch("src.dependencies.engine", engine):
+        asyncio.run(notify_track_changed(track, previous_bounds=(1.0, 0.0, 1.0, 0.0)))
+
+    statement = connection.execute.await_args.args[0]
+    channel, payload = statement.compile().params.values()
+    assert channel == TRACKS_CHANNEL
+    assert json.loads(payload) == {
+        "sender": NOTIFICATION_SENDER,
+        "id": 3,
+        "deleted": False,
+        "file_path": "local:///gpx-segments/3.gpx",
+        "bounds": [45.01, 44.99, 4.01, 3.99],
+        "previous_bounds": [1.0, 0.0, 1.0, 0.0],
+    }
@@ -590,205 +590,107 @@ class TestStravaGetActivityGpxEndpoint:
                 data = response.json()
                 assert "Temporary directory not initialized" in data["detail"]
 
-    def test_get_activity_gpx_success(self, client):
-        """Test successful GPX retrieval."""
-        from unittest.mock import AsyncMock, Mock, patch
-
-        mock_gpx_data = {
-            "points": [
-                {
-                    "lat": 40.0,
-                    "lon": -74.0,
-                    "elevation": 100,
-                    "timestamp": "2024-01-01T00:00:00Z",
-                }
-            ],
-            "bounds": {"north": 40.1, "south": 39.9, "east": -73.9, "west": -74.1},
-        }
-
-        # Mock temp dir
-        mock_temp_dir = Mock()
-        mock_temp_dir.name = "/tmp"
-
-        # Mock database session
-        mock_db_session = Mock()
-        mock_db_session.__aenter__ = AsyncMock(return_value=mock_db_session)
-        mock_db_session.__aexit__ = AsyncMock(return_value=None)
-
-        with patch("src.dependencies.SessionLocal", return_value=mock_db_session):
-            with patch("src.dependencies.temp_dir", mock_temp_dir):
-                with patch("src.api.strava.StravaService") as mock_service_class:
-                    mock_service = mock_service_class.return_value
-                    # Return GPX string
-                    mock_service.get_activity_gpx = AsyncMock(
-                        return_value='<?xml version="1.0" encoding="UTF-8"?><gpx></gpx>'
-                    )
-
-                    # Mock file system operations
-                    with patch("builtins.open", create=True):
-                        with patch("gpxpy.parse", return_value=Mock()):
-                            with patch(
-                                "src.api.strava.extract_from_gpx_file",
-                                return_value=Mock(
-                                    model_dump=lambda: mock_gpx_data,
-                                    points=mock_gpx_data["points"],
-                                ),
-                            ):
-                                response = client.get(
-                                    "/api/strava/activities/12345/gpx?strava_id=67890"
-                                )
-
-                                assert response.status_code == 200
-                                data = response.json()
-                                assert "file_id" in data
-                                assert "points" in data
-
-    def test_get_activity_gpx_no_gpx_data(self, client):
-        """Test GPX retrieval when no GPX data is available."""
-        from unittest.mock import AsyncMock, patch
-
-        mock_temp_dir = Mock()
-        mock_temp_dir.name = "/tmp"
-
-        mock_db_session = Mock()
-        mock_db_session.__aenter__ = AsyncMock(return_value=mock_db_session)
-        mock_db_session.__aexit__ = AsyncMock(return_value=None)
-
-        with patch("src.dependencies.SessionLocal", return_value=mock_db_session):
-            with patch("src.dependencies.temp_dir", mock_temp_dir):
-                with patch("src.api.strava.StravaService") as mock_service_class:
-                    mock_service = mock_service_class.return_value
-                    # Return None or empty string
-                    mock_service.get_activity_gpx = AsyncMock(return_value=None)
-
-                    response = client.get(
-                        "/api/strava/activities/12345/gpx?strava_id=67890"
-                    )
-
-                    assert response.status_code == 404
-                    data = response.json()
-                    assert "No GPX data available" in data["detail"]
-
-    def test_get_activity_gpx_save_error(self, client):
-        """Test GPX retrieval when saving file fails."""
-        from unittest.mock import AsyncMock, patch
-
-        mock_temp_dir = Mock()
-        mock_temp_dir.name = "/tmp"
-
-        mock_db_session = Mock()
-        mock_db_session.__aenter__ = AsyncMock(return_value=mock_db_session)
-        mock_db_session.__aexit__ = AsyncMock(return_value=None)
-
-        with patch("src.dependencies.SessionLocal", return_value=mock_db_session):
-            with patch("src.dependencies.temp_dir", mock_temp_dir):
-                with patch("src.api.strava.StravaService") as mock_service_class:
-                    mock_service = mock_service_class.return_value
-                    mock_service.get_activity_gpx = AsyncMock(
-                        return_value='<?xml version="1.0"?><gpx></gpx>'
-                    )
-
-                    # Mock file open to raise exception
-                    with patch("builtins.open", side_effect=OSError("Cannot write")):
-                        response = client.get(
-                            "/api/strava/activities/12345/gpx?strava_id=67890"
-                        )
-
-                        assert response.status_code == 500
-                        data = response.json()
-                        assert "Failed to save GPX" in data["detail"]
-
-    def test_get_activity_gpx_parse_error(self, client):
-        """Test GPX retrieval when parsing fails."""
+    @staticmethod
+    def make_streams():
+        """Make the streams of a short activity."""
+        from datetime import UTC, datetime
+
+        from src.services.strava import ActivityStreams
+
+        return ActivityStreams(
+            name="Morning Ride",
+            start_date=datetime(2024, 1, 1, 8, tzinfo=UTC),
+            latlng=[[45.0, 5.0], [45.001, 5.001], [45.002, 5.003]],
+            altitude=[200.0, 201.5, 199.9],
+            time=[0, 10, 20],
+        )
+
+    def get_activity_gpx(self, client, temp_dir, **service_attributes):
+        """Request the GPX data of an activity with a mocked Strava service."""
         from unittest.mock import AsyncMock, patch
 
         mock_temp_dir = Mock()
-        mock_temp_dir.name = "/tmp"
+        mock_temp_dir.name = str(temp_dir)
 
         mock_db_session = Mock()
         mock_db_session.__aenter__ = AsyncMock(return_value=mock_db_session)
         mock_db_session.__aexit__ = AsyncMock(return_value=None)
 
-        with patch("src.dependencies.SessionLocal", return_value=mock_db_session):
-            with patch("src.dependencies.temp_dir", mock_temp_dir):
-                with patch("src.api.strava.StravaService") as mock_service_class:
-                    mock_service = mock_service_class.return_value
-                    mock_service.get_activity_gpx = AsyncMock(
-                        return_value='<?xml version="1.0"?><gpx></gpx>'
-                    )
-
-                    with patch("builtins.open", create=True):
-                        with patch("gpxpy.parse", side_effect=Exception("Parse error")):
-                            with patch("pathlib.Path.exists", return_value=True):
-                                with patch("pathlib.Path.unlink"):
-                                    response = client.get(
-                                        "/api/strava/activities/12345/gpx?strava_id=67890"
-                                    )
-
-                                    assert response.status_code == 400
-                                    data = response.json()
-                                    assert "Invalid GPX file" in data["detail"]
-
-    def test_get_activity_gpx_extract_error(self, client):
-        """Test GPX retrieval when extraction fails."""
-        from unittest.mock import AsyncMock, patch
-
-        mock_temp_dir = Mock()
-        mock_temp_dir.name = "/tmp"
-
-        mock_db_session = Mock()
-        mock_db_session.__aenter__ = AsyncMock(return_value=mock_db_session)
-        mock_db_session.__aexit__ = AsyncMock(return_value=None)
-
-        with patch("src.dependencies.SessionLocal", return_value=mock_db_session):
-            with patch("src.dependencies.temp_dir", mock_temp_dir):
-                with patch("src.api.strava.StravaService") as mock_service_class:
-                    mock_service = mock_service_class.return_value
-                    mock_service.get_activity_gpx = AsyncMock(
-                        return_value='<?xml version="1.0"?><gpx></gpx>'
-                    )
-
-                    mock_gpx_obj = Mock()
-
-                    with patch("builtins.open", create=True):
-                        with patch("gpxpy.parse", return_value=mock_gpx_obj):
-                            with patch(
-                                "src.api.strava.extract_from_gpx_file",
-                                side_effect=Exception("Extract error"),
-                            ):
-                                with patch("pathlib.Path.exists", return_value=True):
-                                    with patch("pathlib.Path.unlink"):
-                                        response = client.get(
-                                            "/api/strava/activities/12345/gpx?strava_id=67890"
-                                        )
-
-                                        assert response.status_code == 400
-                                        data = response.json()
-                                        assert "Invalid GPX file" in data["detail"]
-
-    def test_get_activity_gpx_exception(self, client):
+        with (
+            patch("src.dependencies.SessionLocal", return_value=mock_db_session),
+            patch("src.dependencies.temp_dir", mock_temp_dir),
+            patch("src.api.strava.StravaService") as mock_service_class,
+        ):
+            mock_service = mock_service_class.return_value
+            mock_service.get_activity_streams = AsyncMock(**service_attributes)
+            return client.get("/api/strava/activities/12345/gpx?strava_id=67890")
+
+    def test_get_activity_gpx_success(self, client, tmp_path):
+        """Test that the track is built from the streams and staged."""
+        from src.utils.gpx import gpx_data_from_columns
+        from src.utils.upload_sessions import read_upload_session
+
+        streams = self.make_streams()
+
+        response = self.get_activity_gpx(client, tmp_path, return_value=streams)
+
+        assert response.status_code == 200
+        data = response.json()
+        file_id = data["file_id"]
+        assert data["track_name"] == "Morning Ride"
+        assert [
+            (point["latitude"], point["longitude"], point["elevation"])
+            for point in data["points"]
+        ] == [(45.0, 5.0, 200.0), (45.001, 5.001, 201.5), (45.002, 5.003, 199.9)]
+        assert data["total_stats"]["total_points"] == 3
+        assert data["total_stats"]["total_elevation_gain"] == pytest.approx(1.5)
+        assert data["bounds"]["east"] == 5.003
+        # No GPX file is written, the session of the upload reads the sidecar
+        assert [path.name for path in tmp_path.iterdir()] == [f"{file_id}.trk"]
+
+        session = read_upload_session(tmp_path / f"{file_id}.trk", file_id)
+
+        assert (
+            gpx_data_from_columns(session.track, file_id, "Morning Ride").model_dump()
+            == data
+        )
+
+    def test_get_activity_gpx_no_gpx_data(self, client, tmp_path):
+        """Test GPX retrieval when the activity has no GPS data."""
+        response = self.get_activity_gpx(client, tmp_path, return_value=None)
+
+        assert response.status_code == 404
+        data = response.json()
+        assert "No GPX data available" in data["detail"]
+
+    def test_get_activity_gpx_save_error(self, client, tmp_path):
+        """Test GPX retrieval when staging the track fails."""
+        response = self.get_activity_gpx(
+            client, tmp_path / "missing", return_value=self.make_streams()
+        )
+
+        assert response.status_code == 500
+        data = response.json()
+        assert "Failed to save GPX" in data["detail"]
+
+    @pytest.mark.parametrize("missing_stream", ["altitude", "time"])
+    def test_get_activity_gpx_missing_stream(self, client, tmp_path, missing_stream):
+        """Test GPX retrieval when the activity has no altitude or time."""
+        streams = self.make_streams()._replace(**{missing_stream: None})
+
+        response = self.get_activity_gpx(client, tmp_path, return_value=streams)
+
+        assert response.status_code == 400
+        data = response.json()
+        assert "Invalid GPX file" in data["detail"]
+        assert list(tmp_path.iterdir()) == []
+
+    def test_get_activity_gpx_exception(self, client, tmp_path):
         """Test GPX retrieval exception handling."""
-        from unittest.mock import AsyncMock, patch
-
-        mock_temp_dir = Mock()
-        mock_temp_dir.name = "/tmp"
-
-        mock_db_session = Mock()
-        mock_db_session.__aenter__ = AsyncMock(return_value=mock_db_session)
-        mock_db_session.__aexit__ = AsyncMock(return_value=None)
+        response = self.get_activity_gpx(
+            client, tmp_path, side_effect=Exception("General error")
+        )
 
-        with patch("src.dependencies.SessionLocal", return_value=mock_db_session):
-            with patch("src.dependencies.temp_dir", mock_temp_dir):
-                with patch("src.api.strava.StravaService") as mock_service_class:
-                    mock_service = mock_service_class.return_value
-                    mock_service.get_activity_gpx = AsyncMock(
-                        side_effect=Exception("General error")
-                    )
-
-                    response = client.get(
-                        "/api/strava/activities/12345/gpx?strava_id=67890"
-                    )
-
-                    assert response.status_code == 500
-                    data = response.json()
-                    assert "Failed to fetch GPX" in data["detail"]
+        assert response.status_code == 500
+        data = response.json()
+        assert "Failed to fetch GPX" in data["detail"]
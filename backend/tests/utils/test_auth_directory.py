@@ -0,0 +1,98 @@
+"""Tests for the in-memory directory of the authorized users."""
+
+import asyncio
+
+from src.utils.auth_directory import AuthDirectory
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingLoader:
+    """Loader of the authorized users counting its calls."""
+
+    def __init__(self, users):
+        self.users = users
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return dict(self.users)
+
+
+def test_users_reloaded_after_ttl():
+    """Test that the users are loaded once per time to live."""
+    clock = FakeClock()
+    directory = AuthDirectory(ttl=60, clock=clock)
+    load = CountingLoader({1: "first"})
+
+    async def scenario():
+        assert dict(await directory.users(load)) == {1: "first"}
+        clock.now = 59
+        load.users = {1: "first", 2: "second"}
+        assert await directory.strava_ids(load) == frozenset({1})
+        clock.now = 61
+        assert await directory.strava_ids(load) == frozenset({1, 2})
+
+    asyncio.run(scenario())
+    assert load.calls == 2
+    assert directory.stats._asdict() == {
+        "hits": 1,
+        "loads": 2,
+        "invalidations": 0,
+        "entries": 2,
+    }
+
+
+def test_concurrent_reads_share_one_load():
+    """Test that readers of an expired directory wait for a single load."""
+    directory = AuthDirectory(ttl=60, clock=FakeClock())
+    load = CountingLoader({1: "first"})
+
+    async def scenario():
+        return await asyncio.gather(*(directory.users(load) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert load.calls == 1
+    assert all(dict(users) == {1: "first"} for users in results)
+
+
+def test_invalidate():
+    """Test that invalidated users are loaded again on the next read."""
+    directory = AuthDirectory(ttl=60, clock=FakeClock())
+    load = CountingLoader({1: "first"})
+
+    async def scenario():
+        await directory.users(load)
+        load.users = {}
+        directory.invalidate()
+        assert directory.stats.entries == 0
+        assert await directory.strava_ids(load) == frozenset()
+
+    asyncio.run(scenario())
+    assert load.calls == 2
+    assert directory.stats.invalidations == 1
+
+
+def test_invalidate_during_load():
+    """Test that users loaded before a change are not kept."""
+    directory = AuthDirectory(ttl=60, clock=FakeClock())
+
+    async def stale_load():
+        directory.invalidate()
+        return {1: "stale"}
+
+    async def scenario():
+        assert dict(await directory.users(stale_load)) == {1: "stale"}
+        return await directory.users(CountingLoader({2: "fresh"}))
+
+    assert dict(asyncio.run(scenario())) == {2: "fresh"}
+    assert directory.stats.loads == 2
@@ -0,0 +1,69 @@
+"""Tests for the in-memory LRU cache."""
+
+from src.utils.cache import CacheStats, LRUCache
+
+
+def test_get_and_put_count_hits_and_misses():
+    """Test the basic operations and their counters."""
+    cache = LRUCache(max_size=2)
+
+    assert cache.get("a") is None
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    assert "a" in cache
+    assert len(cache) == 1
+
+    assert cache.stats == CacheStats(
+        hits=1, misses=1, evictions=0, entries=1, size=1, max_size=2
+    )
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test that reading an entry protects it from the next eviction."""
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.evictions == 1
+
+
+def test_size_bounded_by_sizeof():
+    """Test that entries are evicted until their total size fits."""
+    cache = LRUCache(max_size=10, sizeof=len)
+    cache.put("a", [0] * 4)
+    cache.put("b", [0] * 4)
+    cache.put("c", [0] * 4)
+
+    assert "a" not in cache
+    assert cache.stats.size == 8
+
+    # Values larger than the cache are not cached and do not evict anything
+    cache.put("d", [0] * 11)
+    assert "d" not in cache
+    assert len(cache) == 2
+
+    # Replacing a value updates the size
+    cache.put("b", [0])
+    assert cache.stats.size == 5
+
+
+def test_invalidate_and_clear():
+    """Test the removal of cached entries."""
+    cache = LRUCache(max_size=10, sizeof=len)
+    cache.put("a", "xyz")
+    cache.put("b", "xy")
+
+    assert cache.invalidate("a")
+    assert not cache.invalidate("a")
+    assert cache.stats.size == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats.size == 0
+    assert cache.evictions == 0
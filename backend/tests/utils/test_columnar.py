@@ -0,0 +1,147 @@
+"""Tests for the columnar track representation."""
+
+import math
+from pathlib import Path
+
+import gpxpy
+import numpy as np
+import pytest
+from src.utils.columnar import ColumnarTrack
+from src.utils.gpx import convert_gpx_to_fit, extract_from_gpx_file
+from src.utils.math import haversine_distance
+
+
+def scalar_track_stats(points):
+    """Reference implementation of the statistics with Python loops."""
+    total_distance, gain, loss = 0.0, 0.0, 0.0
+    for previous, point in zip(points, points[1:], strict=False):
+        if previous[4] != point[4]:
+            continue
+        total_distance += haversine_distance(
+            latitude_1=previous[0],
+            longitude_1=previous[1],
+            latitude_2=point[0],
+            longitude_2=point[1],
+        )
+        elevation_diff = point[2] - previous[2]
+        if elevation_diff > 0:
+            gain += elevation_diff
+        else:
+            loss += abs(elevation_diff)
+    return total_distance, gain, loss
+
+
+def random_points(count, segments=1, seed=0):
+    """Create a random walk split into segments."""
+    rng = np.random.default_rng(seed)
+    latitudes = 45.0 + np.cumsum(rng.normal(0, 1e-4, count))
+    longitudes = 4.0 + np.cumsum(rng.normal(0, 1e-4, count))
+    elevations = 500.0 + np.cumsum(rng.normal(0, 0.5, count))
+    segment_ids = np.sort(rng.integers(0, segments, count))
+    return [
+        (latitude, longitude, elevation, f"2024-05-01T10:00:{i % 60:02d}Z", segment)
+        for i, (latitude, longitude, elevation, segment) in enumerate(
+            zip(latitudes, longitudes, elevations, segment_ids, strict=True)
+        )
+    ]
+
+
+@pytest.mark.parametrize("count, segments", [(0, 1), (1, 1), (2, 1), (5000, 3)])
+def test_columnar_statistics_match_scalar_implementation(count, segments):
+    """Test the vectorized reductions against the scalar loops."""
+    points = random_points(count, segments)
+    track = ColumnarTrack.from_points(points)
+
+    total_distance, gain, loss = scalar_track_stats(points)
+
+    assert len(track) == count
+    assert track.total_distance() == pytest.approx(total_distance, rel=1e-9)
+    assert track.elevation_gain_loss() == pytest.approx((gain, loss), rel=1e-9)
+    if count:
+        assert track.bounds() == (
+            max(point[0] for point in points),
+            min(point[0] for point in points),
+            max(point[1] for point in points),
+            min(point[1] for point in points),
+            min(point[2] for point in points),
+            max(point[2] for point in points),
+        )
+    else:
+        assert track.bounds() == (
+            -math.inf,
+            math.inf,
+            -math.inf,
+            math.inf,
+            math.inf,
+            -math.inf,
+        )
+
+
+def test_cumulative_distances_do_not_cross_segments():
+    """Test that the distance does not increase between segments."""
+    points = [
+        (45.0, 4.0, 100.0, "t0", 0),
+        (45.01, 4.0, 100.0, "t1", 0),
+        (46.0, 5.0, 100.0, "t2", 1),
+        (46.01, 5.0, 100.0, "t3", 1),
+    ]
+    track = ColumnarTrack.from_points(points)
+
+    distances = track.cumulative_distances()
+
+    assert distances[0] == 0.0
+    assert distances[2] == distances[1]
+    assert distances[3] == pytest.approx(2 * distances[1], rel=1e-3)
+    assert track.times.tolist() == ["t0", "t1", "t2", "t3"]
+
+
+def test_extract_from_gpx_file_matches_scalar_implementation():
+    """Test the ported GPX statistics against the scalar implementation."""
+    gpx_file_path = Path(__file__).parent.parent / "data" / "file.gpx"
+    with open(gpx_file_path, encoding="utf-8") as gpx_file:
+        gpx = gpxpy.parse(gpx_file)
+    points = [
+        (point.latitude, point.longitude, point.elevation, None, segment_index)
+        for segment_index, segment in enumerate(gpx.tracks[0].segments)
+        for point in segment.points
+    ]
+
+    result = extract_from_gpx_file(gpx, "file")
+
+    total_distance, gain, loss = scalar_track_stats(points)
+    assert result.total_stats.total_distance == pytest.approx(total_distance)
+    assert result.total_stats.total_elevation_gain == pytest.approx(gain)
+    assert result.total_stats.total_elevation_loss == pytest.approx(loss)
+
+
+def test_convert_gpx_to_fit_distances_match_scalar_implementation():
+    """Test the FIT record distances against the scalar accumulation."""
+    from fit_tool.fit_file import FitFile
+    from fit_tool.profile.messages.record_message import RecordMessage
+
+    gpx_file_path = Path(__file__).parent.parent / "data" / "file.gpx"
+    with open(gpx_file_path, encoding="utf-8") as gpx_file:
+        gpx = gpxpy.parse(gpx_file)
+    segment_points = gpx.tracks[0].segments[0].points[:200]
+    gpx.tracks[0].segments[0].points = segment_points
+
+    fit_file = FitFile.from_bytes(convert_gpx_to_fit(gpx, "Course"))
+
+    distances = [
+        record.message.distance
+        for record in fit_file.records
+        if isinstance(record.message, RecordMessage)
+    ]
+    expected, distance = [], 0.0
+    for index, point in enumerate(segment_points):
+        if index:
+            previous = segment_points[index - 1]
+            distance += 1000 * haversine_distance(
+                latitude_1=previous.latitude,
+                longitude_1=previous.longitude,
+                latitude_2=point.latitude,
+                longitude_2=point.longitude,
+            )
+        expected.append(distance)
+    # FIT stores distances in centimeters
+    np.testing.assert_allclose(distances, expected, atol=0.01)
@@ -0,0 +1,115 @@
+"""Tests for the compression of the GPX files at rest."""
+
+from pathlib import Path
+
+import pytest
+from src.utils.compression import (
+    StreamCompressor,
+    accepts_encoding,
+    available_http_encodings,
+    compress,
+    decompress,
+    negotiate_encoding,
+    validate_content_encoding,
+)
+
+GPX_FILE_PATH = Path(__file__).parent.parent / "data" / "file.gpx"
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_compress_round_trip(encoding):
+    """Test that compressed GPX files are smaller and restored exactly."""
+    if encoding == "zstd":
+        pytest.importorskip("zstandard")
+    gpx_bytes = GPX_FILE_PATH.read_bytes()
+
+    compressed = compress(gpx_bytes, encoding)
+
+    assert len(compressed) < len(gpx_bytes) / 5
+    assert decompress(compressed, encoding) == gpx_bytes
+    # Compression only depends on the content
+    assert compress(gpx_bytes, encoding) == compressed
+
+
+def test_compress_without_encoding():
+    """Test that content without encoding is left as is."""
+    assert compress(b"<gpx/>", None) == b"<gpx/>"
+    assert decompress(b"<gpx/>", None) == b"<gpx/>"
+
+
+def test_validate_content_encoding():
+    """Test that unknown encodings are rejected."""
+    validate_content_encoding(None)
+    validate_content_encoding("gzip")
+    with pytest.raises(ValueError, match="Invalid content encoding: br"):
+        validate_content_encoding("br")
+    with pytest.raises(ValueError, match="Invalid content encoding: deflate"):
+        compress(b"<gpx/>", "deflate")
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, False),
+        ("", False),
+        ("gzip", True),
+        ("deflate, GZIP;q=0.5", True),
+        ("br, zstd", False),
+        ("gzip;q=0", False),
+        ("*", True),
+        ("*, gzip;q=0", False),
+        ("gzip;q=invalid", False),
+    ],
+)
+def test_accepts_encoding(accept_encoding, expected):
+    """Test the parsing of the Accept-Encoding header."""
+    assert accepts_encoding(accept_encoding, "gzip") is expected
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, br, zstd", "zstd"),
+        ("gzip, br;q=0.9", "gzip"),
+        ("br;q=0.5, *;q=0.8", "zstd"),
+        ("*, zstd;q=0, br;q=0", "gzip"),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    """Test the selection of the content encoding of a response."""
+    encodings = ("zstd", "br", "gzip")
+    assert negotiate_encoding(accept_encoding, encodings) == expected
+
+
+@pytest.mark.parametrize("encoding", available_http_encodings())
+def test_stream_compressor_flushes_every_chunk(encoding):
+    """Test that every compressed chunk is decodable without the next ones."""
+    chunks = [f"data: {i}\n\n".encode() * 50 for i in range(5)]
+    compressor = StreamCompressor(encoding)
+
+    if encoding == "gzip":
+        import zlib
+
+        decoder = zlib.decompressobj(31)
+        decode = decoder.decompress
+    elif encoding == "zstd":
+        import zstandard
+
+        decode = zstandard.ZstdDecompressor().decompressobj().decompress
+    else:
+        import brotli
+
+        decode = brotli.Decompressor().process
+
+    for chunk in chunks:
+        assert decode(compressor.compress(chunk)) == chunk
+    assert decode(compressor.finish()) == b""
+
+
+def test_stream_compressor_unavailable_encoding():
+    """Test that unavailable encodings are rejected."""
+    with pytest.raises(ValueError, match="Unavailable content encoding: deflate"):
+        StreamCompressor("deflate")
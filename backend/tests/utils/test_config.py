@@ -4,10 +4,12 @@ import os
 
 import pytest
 from src.utils.config import (
+    DEFAULT_WORKER_PROCESSES,
     DatabaseConfig,
     LocalStorageConfig,
     MapConfig,
     S3StorageConfig,
+    ServerConfig,
     StravaConfig,
     WahooConfig,
     load_environment_config,
@@ -929,3 +931,66 @@ WAHOO_TOKENS_FILE_PATH=/secure/path/to/wahoo_tokens.json""")
         "Please set this environment variable in your .env/thunderforest file"
         in error_message
     )
+
+
+@pytest.mark.parametrize("compression", ["gzip", "none", "brotli"])
+def test_load_storage_gpx_compression(tmp_path, monkeypatch, compression):
+    """Test loading and validating the compression of the GPX files."""
+    env_folder = tmp_path / ".env"
+    env_folder.mkdir()
+    # Restore the variables set by the configuration files after the test
+    monkeypatch.setenv("STORAGE_GPX_COMPRESSION", "")
+    monkeypatch.setenv("WAHOO_CALLBACK_URL", "https://example.com/callback")
+    monkeypatch.setenv("WAHOO_SCOPES", "routes_write")
+
+    storage_line = "" if compression == "none" else compression
+    (env_folder / "storage").write_text(f"""STORAGE_TYPE=local
+LOCAL_STORAGE_ROOT=./storage
+LOCAL_STORAGE_BASE_URL=http://localhost:8000/storage
+STORAGE_GPX_COMPRESSION={storage_line}""")
+    (env_folder / "database").write_text("""DB_HOST=localhost
+DB_PORT=5432
+DB_NAME=cycling
+DB_USER=postgres
+DB_PASSWORD=password""")
+    (env_folder / "strava").write_text("""STRAVA_CLIENT_ID=test_client_id
+STRAVA_CLIENT_SECRET=test_client_secret""")
+    (env_folder / "wahoo").write_text("""WAHOO_CLIENT_ID=test_wahoo_client_id
+WAHOO_CLIENT_SECRET=test_wahoo_client_secret""")
+    (env_folder / "thunderforest").write_text("THUNDERFOREST_API_KEY=test_api_key")
+
+    if compression == "brotli":
+        with pytest.raises(ValueError, match="Invalid content encoding: brotli"):
+            load_environment_config(project_root=tmp_path)
+        return
+
+    _, storage_config, *_ = load_environment_config(project_root=tmp_path)
+    expected = None if compression == "none" else compression
+    assert storage_config.gpx_compression == expected
+
+
+def test_worker_processes_default(tmp_path, monkeypatch):
+    """Test that the loader and the server configuration share the default."""
+    env_folder = tmp_path / ".env"
+    env_folder.mkdir()
+    monkeypatch.delenv("WORKER_PROCESSES", raising=False)
+
+    (env_folder / "storage").write_text("""STORAGE_TYPE=local
+LOCAL_STORAGE_ROOT=./storage
+LOCAL_STORAGE_BASE_URL=http://localhost:8000/storage""")
+    (env_folder / "database").write_text("""DB_HOST=localhost
+DB_PORT=5432
+DB_NAME=cycling
+DB_USER=postgres
+DB_PASSWORD=password""")
+    (env_folder / "strava").write_text("""STRAVA_CLIENT_ID=test_client_id
+STRAVA_CLIENT_SECRET=test_client_secret""")
+    (env_folder / "wahoo").write_text("""WAHOO_CLIENT_ID=test_wahoo_client_id
+WAHOO_CLIENT_SECRET=test_wahoo_client_secret""")
+    (env_folder / "thunderforest").write_text("THUNDERFOREST_API_KEY=test_api_key")
+
+    *_, server_config = load_environment_config(project_root=tmp_path)
+
+    assert server_config.worker_processes == DEFAULT_WORKER_PROCESSES
+    assert ServerConfig._field_defaults["worker_processes"] == DEFAULT_WORKER_PROCESSES
+    assert 1 <= DEFAULT_WORKER_PROCESSES <= 4
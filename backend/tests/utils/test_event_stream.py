@@ -0,0 +1,98 @@
+"""Tests for the server-sent event helpers."""
+
+import asyncio
+
+import pytest
+from src.utils.event_stream import (
+    EventStreamMetrics,
+    run_until_disconnect,
+    stream_events,
+)
+from starlette.requests import ClientDisconnect
+
+
+def make_receive(disconnect: asyncio.Event):
+    """Make an ASGI receive channel disconnecting when an event is set."""
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+def test_run_until_disconnect_returns_result():
+    """Test that the result of the work is returned while the client waits."""
+
+    async def scenario():
+        disconnect = asyncio.Event()
+        return await run_until_disconnect(
+            make_receive(disconnect), asyncio.sleep(0.01, result="events")
+        )
+
+    assert asyncio.run(scenario()) == "events"
+
+
+def test_run_until_disconnect_cancels_work():
+    """Test that the work is cancelled when the client disconnects."""
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        disconnect = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.01, disconnect.set)
+        await run_until_disconnect(make_receive(disconnect), work())
+
+    with pytest.raises(ClientDisconnect):
+        asyncio.run(scenario())
+    assert cancelled == [True]
+
+
+def test_run_until_disconnect_propagates_errors():
+    """Test that errors of the work are raised."""
+
+    async def work():
+        raise ValueError("Query failed")
+
+    async def scenario():
+        await run_until_disconnect(make_receive(asyncio.Event()), work())
+
+    with pytest.raises(ValueError, match="Query failed"):
+        asyncio.run(scenario())
+
+
+def test_stream_events_records_durations():
+    """Test that complete and interrupted streams are recorded."""
+    metrics = EventStreamMetrics()
+
+    async def scenario():
+        assert [event async for event in stream_events(["a", "b"], metrics)] == [
+            "a",
+            "b",
+        ]
+        # A client leaving after the first event closes the generator
+        stream = stream_events(["a", "b"], metrics)
+        assert await anext(stream) == "a"
+        await stream.aclose()
+
+    asyncio.run(scenario())
+    metrics.record_query(0.5)
+    metrics.record_query(0.25)
+    metrics.record_disconnect()
+
+    stats = metrics.stats
+    assert stats.streams == 2
+    assert stats.disconnects == 2
+    assert stats.queries == 2
+    assert stats.query_seconds_total == 0.75
+    assert stats.query_seconds_max == 0.5
+    assert 0 <= stats.stream_seconds_max <= stats.stream_seconds_total
@@ -0,0 +1,222 @@
+"""Tests for the direct FIT course encoder."""
+
+import time
+
+import numpy as np
+import pytest
+from fit_tool.fit_file import FitFile
+from fit_tool.fit_file_builder import FitFileBuilder
+from fit_tool.profile.messages.course_message import CourseMessage
+from fit_tool.profile.messages.course_point_message import CoursePointMessage
+from fit_tool.profile.messages.event_message import EventMessage
+from fit_tool.profile.messages.file_id_message import FileIdMessage
+from fit_tool.profile.messages.lap_message import LapMessage
+from fit_tool.profile.messages.record_message import RecordMessage
+from fit_tool.profile.profile_type import (
+    CoursePoint,
+    Event,
+    EventType,
+    FileType,
+    Manufacturer,
+    Sport,
+)
+from fit_tool.utils.crc import crc16
+from src.utils.fit_encoder import (
+    FIT_HEADER_SIZE,
+    encode_fit_course,
+    fit_crc16,
+)
+from src.utils.math import cumulative_distances
+
+START_TIMESTAMP = 1792188888123
+
+
+def build_fit_tool_course(latitudes, longitudes, elevations, start_timestamp):
+    """Build a FIT course with the fit_tool builder, as done before the encoder.
+
+    The attributes misspelt in the original conversion (time created, serial
+    number, course name, stop event type and end longitude of the lap) are not
+    set, as they were ignored by fit_tool.
+    """
+    builder = FitFileBuilder(auto_define=True, min_string_size=50)
+
+    message = FileIdMessage()
+    message.type = FileType.COURSE
+    message.manufacturer = Manufacturer.DEVELOPMENT.value
+    message.product = 0
+    builder.add(message)
+
+    message = CourseMessage()
+    message.sport = Sport.CYCLING
+    builder.add(message)
+
+    message = EventMessage()
+    message.event = Event.TIMER
+    message.event_type = EventType.START
+    message.timestamp = start_timestamp
+    builder.add(message)
+
+    distances = cumulative_distances(np.asarray(latitudes), np.asarray(longitudes))
+    records = []
+    for i, (latitude, longitude, elevation, distance) in enumerate(
+        zip(latitudes, longitudes, elevations, (distances * 1000).tolist(), strict=True)
+    ):
+        message = RecordMessage()
+        message.position_lat = latitude
+        message.position_long = longitude
+        message.altitude = None if np.isnan(elevation) else elevation
+        message.distance = distance
+        message.timestamp = start_timestamp + i
+        records.append(message)
+    builder.add_all(records)
+
+    for record, point_type, name in [
+        (records[0], CoursePoint.SEGMENT_START, "start"),
+        (records[-1], CoursePoint.SEGMENT_END, "end"),
+    ]:
+        message = CoursePointMessage()
+        message.timestamp = record.timestamp
+        message.position_lat = record.position_lat
+        message.position_long = record.position_long
+        message.type = point_type
+        message.course_point_name = name
+        builder.add(message)
+
+    end_timestamp = start_timestamp + len(records)
+    message = EventMessage()
+    message.event = Event.TIMER
+    message.timestamp = end_timestamp
+    builder.add(message)
+
+    message = LapMessage()
+    message.timestamp = end_timestamp
+    message.start_time = start_timestamp
+    message.total_elapsed_time = len(records)
+    message.total_timer_time = len(records)
+    message.start_position_lat = records[0].position_lat
+    message.start_position_long = records[0].position_long
+    message.end_position_lat = records[-1].position_lat
+    message.total_distance = records[-1].distance
+    builder.add(message)
+
+    return builder.build().to_bytes()
+
+
+def make_track(n_points: int, seed: int = 0):
+    """Make a random walk track, with some points without elevation."""
+    rng = np.random.default_rng(seed)
+    latitudes = 45 + np.cumsum(rng.normal(0, 1e-4, n_points))
+    longitudes = 5 + np.cumsum(rng.normal(0, 1e-4, n_points))
+    elevations = 200 + np.cumsum(rng.normal(0, 1, n_points))
+    elevations[rng.random(n_points) < 0.05] = np.nan
+    return latitudes, longitudes, elevations
+
+
+@pytest.mark.parametrize("n_points", [1, 2, 50, 300])
+def test_encode_fit_course_matches_fit_tool(n_points):
+    """Test that the encoder output is byte for byte the fit_tool one."""
+    latitudes, longitudes, elevations = make_track(n_points)
+
+    expected = build_fit_tool_course(
+        latitudes.tolist(), longitudes.tolist(), elevations, START_TIMESTAMP
+    )
+    fit_bytes = encode_fit_course(latitudes, longitudes, elevations, START_TIMESTAMP)
+
+    assert fit_bytes == expected
+
+
+def test_encode_fit_course_round_trip():
+    """Test that the records decoded by fit_tool hold the track points."""
+    latitudes, longitudes, elevations = make_track(1000, seed=1)
+    elevations[:3] = [-12.3, np.nan, 4807.8]
+
+    fit_file = FitFile.from_bytes(
+        encode_fit_course(latitudes, longitudes, elevations, START_TIMESTAMP)
+    )
+    messages = [record.message for record in fit_file.records]
+    records = [message for message in messages if isinstance(message, RecordMessage)]
+    course_points = [
+        message for message in messages if isinstance(message, CoursePointMessage)
+    ]
+    laps = [message for message in messages if isinstance(message, LapMessage)]
+
+    assert len(records) == 1000
+    np.testing.assert_allclose(
+        [record.position_lat for record in records], latitudes, atol=1e-7
+    )
+    np.testing.assert_allclose(
+        [record.position_long for record in records], longitudes, atol=1e-7
+    )
+    decoded_elevations = np.array(
+        [np.nan if record.altitude is None else record.altitude for record in records]
+    )
+    np.testing.assert_allclose(decoded_elevations, elevations, atol=0.1)
+    np.testing.assert_allclose(
+        [record.distance for record in records],
+        cumulative_distances(latitudes, longitudes) * 1000,
+        atol=0.01,
+    )
+    assert records[0].timestamp == START_TIMESTAMP // 1000 * 1000
+    assert [point.course_point_name for point in course_points] == ["start", "end"]
+    assert laps[0].total_distance == records[-1].distance
+
+
+@pytest.mark.parametrize("n_points", [1_000, 10_000, 100_000])
+def test_encode_fit_course_benchmark(n_points):
+    """Benchmark the encoder and check the structure of large FIT files.
+
+    Records are 19 bytes, 17 without altitude, and every change of altitude
+    presence adds a record definition of 21 bytes, 18 without altitude. The
+    other messages and their definitions take 284 bytes.
+    """
+    latitudes, longitudes, elevations = make_track(n_points)
+    has_elevation = ~np.isnan(elevations)
+
+    start = time.perf_counter()
+    fit_bytes = encode_fit_course(latitudes, longitudes, elevations)
+    elapsed = time.perf_counter() - start
+
+    run_starts = np.r_[True, has_elevation[1:] != has_elevation[:-1]]
+    definitions_size = 21 * np.count_nonzero(
+        run_starts & has_elevation
+    ) + 18 * np.count_nonzero(run_starts & ~has_elevation)
+    records_size = 17 * n_points + 2 * np.count_nonzero(has_elevation)
+    data_size = int.from_bytes(fit_bytes[4:8], byteorder="little")
+    assert data_size == len(fit_bytes) - FIT_HEADER_SIZE - 2
+    assert data_size == 284 + records_size + definitions_size
+    # The CRC of a file ending with its CRC is 0
+    assert fit_crc16(fit_bytes) == 0
+    # fit_tool takes about 10 seconds for 10,000 points
+    assert elapsed < n_points * 1e-5 + 1
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 1000, 4096, 12345])
+def test_fit_crc16(size):
+    """Test that the vectorized CRC is the one of the FIT SDK."""
+    data = np.random.default_rng(size).bytes(size)
+    assert fit_crc16(data) == crc16(data)
+
+
+def test_encode_fit_course_timestamps():
+    """Test that the course starts at the current time by default."""
+    latitudes, longitudes, elevations = make_track(2)
+
+    before = int(time.time() * 1000)
+    fit_file = FitFile.from_bytes(encode_fit_course(latitudes, longitudes, elevations))
+    after = int(time.time() * 1000)
+
+    events = [
+        record.message
+        for record in fit_file.records
+        if isinstance(record.message, EventMessage)
+    ]
+    # FIT timestamps are rounded to the second
+    assert before - 1000 <= events[0].timestamp <= after + 1000
+
+
+def test_encode_fit_course_invalid():
+    """Test that empty tracks and values out of the FIT ranges are rejected."""
+    with pytest.raises(ValueError, match="No track points found in GPX file"):
+        encode_fit_course(np.array([]), np.array([]), np.array([]))
+    with pytest.raises(ValueError, match="Elevation out of the range"):
+        encode_fit_course(np.array([45.0]), np.array([5.0]), np.array([-600.0]))
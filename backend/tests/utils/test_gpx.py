@@ -3,15 +3,58 @@
 from pathlib import Path
 
 import gpxpy
+import numpy as np
+import polyline
 import pytest
+from src.utils import gpx as gpx_module
 from src.utils.gpx import (
     GPXBounds,
     GPXData,
+    GPXStreamError,
+    GPXStreamReader,
+    build_fit_course,
+    compute_track_stats,
     convert_gpx_to_fit,
+    encode_gpx_points,
     extract_from_gpx_file,
     generate_gpx_segment,
+    gpx_data_from_streams,
+    parse_gpx_data,
+    read_gpx_time,
+    stream_gpx_data,
+    write_gpx_file,
 )
 
+MULTI_TRACK_GPX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx xmlns="http://www.topografix.com/GPX/1/0" version="1.0">
+ <metadata><name>Metadata name</name></metadata>
+ <wpt lat="1.0" lon="1.0"><name>Waypoint</name></wpt>
+ <trk>
+  <name> First track </name>
+  <trkseg>
+   <trkpt lat="45.0" lon="4.0">
+    <ele>100</ele><time>2024-05-01T10:00:00Z</time>
+   </trkpt>
+   <trkpt lat="45.01" lon="4.0">
+    <ele>110</ele><time>2024-05-01T10:00:10Z</time>
+   </trkpt>
+  </trkseg>
+  <trkseg>
+   <trkpt lat="46.0" lon="5.0">
+    <ele>90</ele><time>2024-05-01T11:00:00.5+02:00</time>
+   </trkpt>
+   <trkpt lat="46.0" lon="5.01">
+    <ele>95</ele><time>2024-05-01T11:00:10+02:00</time>
+   </trkpt>
+  </trkseg>
+ </trk>
+ <trk>
+  <name>Second track</name>
+  <trkseg><trkpt lat="0.0" lon="0.0"/></trkseg>
+ </trk>
+</gpx>
+"""
+
 
 def test_extract_from_gpx_file_with_data_file():
     """Test extract_from_gpx_file function with the file.gpx from data folder."""
@@ -303,3 +346,285 @@ class TestConvertGpxToFit:
 
         # Byte 8: Data type (should be '.FIT')
         assert fit_bytes[8:12] == b".FIT"
+
+
+def test_build_fit_course_without_gpxpy(monkeypatch):
+    """Test that FIT courses are built from the streamed track columns."""
+    gpx_file_path = Path(__file__).parent.parent / "data" / "file.gpx"
+    gpx_bytes = gpx_file_path.read_bytes()
+    gpx = gpxpy.parse(gpx_bytes.decode("utf-8"))
+
+    def failing_parse(*args, **kwargs):
+        raise AssertionError("gpxpy must not be used")
+
+    monkeypatch.setattr(gpx_module.gpxpy, "parse", failing_parse)
+    fit_course = build_fit_course(gpx_bytes, "test_file", "Course")
+
+    assert (
+        fit_course.gpx_data.model_dump()
+        == parse_gpx_data(gpx_file_path, "test_file").model_dump()
+    )
+    assert fit_course.fit_bytes[8:12] == b".FIT"
+    assert fit_course.time == gpx.time
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (b"<gpx><metadata><time>2024-05-01T10:00:00Z</time></metadata></gpx>", 10),
+        # GPX 1.0 files have the time at the root
+        (b'<gpx version="1.0"><time>2024-05-01T11:00:00Z</time><trk/></gpx>', 11),
+        (MULTI_TRACK_GPX, None),
+        (b"<gpx><metadata><time>yesterday</time></metadata></gpx>", None),
+    ],
+)
+def test_read_gpx_time(content, expected):
+    """Test that the time of the GPX file is read, not the one of the points."""
+    time = read_gpx_time(content)
+
+    if expected is None:
+        assert time is None
+    else:
+        assert (time.hour, time.tzinfo is not None) == (expected, True)
+
+
+def test_stream_gpx_data_matches_gpxpy():
+    """Test that the streaming parser gives the same result as gpxpy."""
+    gpx_file_path = Path(__file__).parent.parent / "data" / "file.gpx"
+    with open(gpx_file_path, encoding="utf-8") as gpx_file:
+        expected = extract_from_gpx_file(gpxpy.parse(gpx_file), "test_file")
+
+    from_path = stream_gpx_data(gpx_file_path, "test_file")
+    from_bytes = stream_gpx_data(gpx_file_path.read_bytes(), "test_file")
+
+    assert from_path.model_dump() == expected.model_dump()
+    assert from_bytes.model_dump() == expected.model_dump()
+
+
+def test_stream_gpx_data_multiple_segments_and_tracks():
+    """Test GPX 1.0 files with several segments and tracks."""
+    expected = extract_from_gpx_file(
+        gpxpy.parse(MULTI_TRACK_GPX.decode("utf-8")), "multi"
+    )
+
+    result = stream_gpx_data(MULTI_TRACK_GPX, "multi")
+
+    assert result.track_name == "First track"
+    assert result.total_stats.total_points == 4
+    assert [point.time for point in result.points] == [
+        point.time for point in expected.points
+    ]
+    assert result.total_stats.total_distance == pytest.approx(
+        expected.total_stats.total_distance
+    )
+    assert result.total_stats.total_elevation_gain == pytest.approx(15.0)
+    assert result.total_stats.total_elevation_loss == pytest.approx(0.0)
+    assert result.bounds == expected.bounds
+
+
+def test_stream_reader_ignores_namespace_prefixes():
+    """Test that prefixed tags are read like unprefixed ones."""
+    prefixed = MULTI_TRACK_GPX.replace(b"<", b"<gpx:").replace(b"<gpx:/", b"</gpx:")
+    prefixed = prefixed.replace(b"<gpx:?xml", b"<?xml").replace(
+        b"xmlns=", b"xmlns:gpx="
+    )
+
+    result = stream_gpx_data(prefixed, "prefixed")
+
+    assert result.model_dump() == stream_gpx_data(MULTI_TRACK_GPX, "x").model_dump() | {
+        "file_id": "prefixed"
+    }
+
+
+def test_stream_reader_yields_raw_points():
+    """Test the points yielded by the streaming reader."""
+    reader = GPXStreamReader(MULTI_TRACK_GPX)
+
+    points = list(reader)
+
+    assert reader.track_found
+    assert reader.track_name == "First track"
+    assert [point.segment_index for point in points] == [0, 0, 1, 1]
+    assert points[0].latitude == 45.0
+    assert points[0].elevation == 100.0
+    assert points[2].time == "2024-05-01T11:00:00.5+02:00"
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"<gpx></gpx>",
+        b'<gpx><trk><trkseg><trkpt lat="1" lon="2"/></trkseg></trk></gpx>',
+    ],
+)
+def test_stream_gpx_data_unsupported_files(content):
+    """Test that files without tracks or point details are rejected."""
+    with pytest.raises(GPXStreamError):
+        stream_gpx_data(content, "invalid")
+
+
+def test_parse_gpx_data_falls_back_to_gpxpy(monkeypatch):
+    """Test that gpxpy is used when the streaming parser fails."""
+
+    def failing_stream(source, file_id):
+        raise GPXStreamError("Unsupported")
+
+    monkeypatch.setattr(gpx_module, "stream_gpx_data", failing_stream)
+    expected = extract_from_gpx_file(
+        gpxpy.parse(MULTI_TRACK_GPX.decode("utf-8")), "multi"
+    )
+
+    result = parse_gpx_data(MULTI_TRACK_GPX, "multi")
+
+    assert result.model_dump() == expected.model_dump()
+
+
+def test_parse_gpx_data_invalid_xml():
+    """Test that invalid XML fails with both parsers."""
+    with pytest.raises(gpxpy.gpx.GPXException):
+        parse_gpx_data(b"<gpx><trk>", "invalid")
+
+
+def test_compute_track_stats_matches_parsed_data():
+    """Test that the stored statistics match the parsed GPX data."""
+    gpx_file_path = Path(__file__).parent.parent / "data" / "file.gpx"
+    expected = parse_gpx_data(gpx_file_path, "test_file")
+
+    stats = compute_track_stats(gpx_file_path)
+
+    assert stats.total_points == expected.total_stats.total_points
+    assert stats.total_distance == pytest.approx(expected.total_stats.total_distance)
+    assert stats.total_elevation_gain == pytest.approx(
+        expected.total_stats.total_elevation_gain
+    )
+    assert stats.total_elevation_loss == pytest.approx(
+        expected.total_stats.total_elevation_loss
+    )
+    assert stats.min_elevation == expected.bounds.min_elevation
+    assert stats.max_elevation == expected.bounds.max_elevation
+    assert compute_track_stats(MULTI_TRACK_GPX).total_elevation_gain == 15.0
+
+
+def test_compute_track_stats_missing_elevations():
+    """Test that points without elevation only count for the distance."""
+    content = b"""<gpx><trk><trkseg>
+     <trkpt lat="45.0" lon="4.0"><ele>100</ele></trkpt>
+     <trkpt lat="45.01" lon="4.0"/>
+     <trkpt lat="45.02" lon="4.0"><ele>90</ele></trkpt>
+     <trkpt lat="45.03" lon="4.0"><ele>120</ele></trkpt>
+    </trkseg></trk></gpx>"""
+
+    stats = compute_track_stats(content)
+    without_elevation = compute_track_stats(
+        b'<gpx><trk><trkseg><trkpt lat="1" lon="2"/></trkseg></trk></gpx>'
+    )
+
+    assert stats.total_points == 4
+    assert stats.total_distance == pytest.approx(3.336, abs=1e-3)
+    assert stats.total_elevation_gain == 30.0
+    assert stats.total_elevation_loss == 0.0
+    assert (stats.min_elevation, stats.max_elevation) == (90.0, 120.0)
+    assert without_elevation.total_points == 1
+    assert without_elevation.min_elevation is None
+    assert without_elevation.max_elevation is None
+
+
+def test_encode_gpx_points_columnar():
+    """Test that the columnar format holds the points as parallel arrays."""
+    gpx_data = stream_gpx_data(MULTI_TRACK_GPX, "multi")
+
+    encoded = encode_gpx_points(gpx_data, "columnar")
+
+    assert encoded.model_dump() == {
+        "format": "columnar",
+        "lat": [point.latitude for point in gpx_data.points],
+        "lon": [point.longitude for point in gpx_data.points],
+        "ele": [point.elevation for point in gpx_data.points],
+        "time": [point.time for point in gpx_data.points],
+    }
+
+
+def test_encode_gpx_points_polyline_round_trip():
+    """Test that the polyline format decodes back to the track points."""
+    gpx_data = parse_gpx_data(Path(__file__).parent.parent / "data" / "file.gpx", "f")
+
+    encoded = encode_gpx_points(gpx_data, "polyline")
+
+    coordinates = polyline.decode(encoded.polyline)
+    elevations = np.cumsum(encoded.ele) / encoded.elevation_scale
+    assert encoded.format == "polyline"
+    assert len(coordinates) == len(elevations) == len(gpx_data.points)
+    for (latitude, longitude), elevation, point in zip(
+        coordinates, elevations, gpx_data.points, strict=True
+    ):
+        assert latitude == pytest.approx(point.latitude, abs=1e-5)
+        assert longitude == pytest.approx(point.longitude, abs=1e-5)
+        assert elevation == pytest.approx(point.elevation, abs=0.05)
+    assert len(encoded.model_dump_json()) < len(gpx_data.model_dump_json()) / 4
+
+
+def test_encode_gpx_points_unknown_format():
+    """Test that unknown formats are rejected."""
+    gpx_data = stream_gpx_data(MULTI_TRACK_GPX, "multi")
+
+    with pytest.raises(ValueError, match="Unknown point format"):
+        encode_gpx_points(gpx_data, "geojson")
+
+
+def test_write_gpx_file_round_trip(tmp_path):
+    """Test that written GPX files are parsed back to the same track."""
+    gpx_file_path = Path(__file__).parent.parent / "data" / "file.gpx"
+    gpx_data = parse_gpx_data(gpx_file_path, "test_file")
+    gpx_data.track_name = "Col <du> Galibier & Télégraphe"
+
+    write_gpx_file(gpx_data, tmp_path / "written.gpx")
+
+    assert stream_gpx_data(tmp_path / "written.gpx", "test_file") == gpx_data
+
+
+def test_gpx_data_from_streams():
+    """Test the track built from activity streams."""
+    import datetime
+
+    start_date = datetime.datetime(2024, 5, 1, 10, tzinfo=datetime.UTC)
+    gpx_data = gpx_data_from_streams(
+        [[45.0, 4.0], [45.01, 4.0], [45.01, 4.01]],
+        [100.0, 110.0, 105.0],
+        [0, 10, 25],
+        start_date,
+        "streams",
+        None,
+    )
+
+    assert gpx_data.track_name == "Unnamed Track"
+    assert [point.elevation for point in gpx_data.points] == [100.0, 110.0, 105.0]
+    assert [
+        datetime.datetime.fromisoformat(point.time).astimezone(datetime.UTC)
+        for point in gpx_data.points
+    ] == [start_date + datetime.timedelta(seconds=t) for t in [0, 10, 25]]
+    assert gpx_data.total_stats.total_points == 3
+    assert gpx_data.total_stats.total_elevation_gain == 10.0
+    assert gpx_data.total_stats.total_elevation_loss == 5.0
+    assert gpx_data.bounds.north == 45.01
+    assert gpx_data.bounds.east == 4.01
+
+
+@pytest.mark.parametrize(
+    "altitude, time, message",
+    [
+        (None, [0, 1], "must have an elevation"),
+        ([100.0], [0, 1], "must have an elevation"),
+        ([100.0, 101.0], None, "must have a time"),
+    ],
+)
+def test_gpx_data_from_streams_missing_streams(altitude, time, message):
+    """Test that streams without elevation or time for every point are rejected."""
+    import datetime
+
+    start_date = datetime.datetime(2024, 5, 1, 10, tzinfo=datetime.UTC)
+    with pytest.raises(ValueError, match=message):
+        gpx_data_from_streams(
+            [[45.0, 4.0], [45.01, 4.0]], altitude, time, start_date, "x", "Track"
+        )
+    with pytest.raises(ValueError, match="at least one track"):
+        gpx_data_from_streams([], [], [], start_date, "x", "Track")
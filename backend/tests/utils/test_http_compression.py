@@ -0,0 +1,139 @@
+"""Tests for the compression of the HTTP responses."""
+
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+from src.utils.http_compression import (
+    CompressionMiddleware,
+    etag_matches,
+    is_compressible,
+)
+
+LARGE_JSON = b'{"points": [' + b"[45.0, 5.0, 1234.5]," * 200 + b"[0, 0, 0]]}"
+
+
+def make_client() -> TestClient:
+    """Create a client of an application with compressed responses."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return Response(content=LARGE_JSON, media_type="application/json")
+
+    @app.get("/tagged")
+    async def tagged():
+        return Response(
+            content=LARGE_JSON, media_type="application/json", headers={"ETag": '"v1"'}
+        )
+
+    @app.get("/small")
+    async def small():
+        return Response(content=b'{"ok": true}', media_type="application/json")
+
+    @app.get("/image")
+    async def image():
+        return Response(content=b"\xff\xd8" * 1000, media_type="image/jpeg")
+
+    @app.get("/precompressed")
+    async def precompressed():
+        return Response(
+            content=gzip.compress(b"<gpx/>" * 1000),
+            media_type="application/gpx+xml",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    @app.get("/stream")
+    async def stream():
+        async def generate():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+def test_compress_large_response():
+    """Test that responses above the minimum size are compressed."""
+    client = make_client()
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(LARGE_JSON) / 5
+    assert response.content == LARGE_JSON
+
+
+def test_compressed_response_has_weak_etag():
+    """Test that the ETag of a compressed response is weak."""
+    client = make_client()
+
+    compressed = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/tagged", headers={"Accept-Encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.headers["etag"] == 'W/"v1"'
+    assert identity.headers["etag"] == '"v1"'
+
+
+def test_etag_matches():
+    """Test the weak comparison of the ETags of conditional requests."""
+    assert etag_matches('"v1"', '"v1"')
+    assert etag_matches('W/"v1"', '"v1"')
+    assert etag_matches('"v0", W/"v1"', '"v1"')
+    assert etag_matches("*", '"v1"')
+    assert not etag_matches('"v2"', '"v1"')
+    assert not etag_matches(None, '"v1"')
+
+
+def test_skip_small_response_and_unaccepted_encoding():
+    """Test that small responses and clients without encoding are not compressed."""
+    client = make_client()
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"ok": True}
+    assert "content-encoding" not in identity.headers
+    assert identity.content == LARGE_JSON
+
+
+def test_skip_incompressible_and_precompressed_responses():
+    """Test that binary and already encoded responses are sent as is."""
+    client = make_client()
+
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    precompressed = client.get("/precompressed", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in image.headers
+    assert image.content == b"\xff\xd8" * 1000
+    assert precompressed.headers["content-encoding"] == "gzip"
+    assert precompressed.content == b"<gpx/>" * 1000
+
+
+def test_compress_event_stream():
+    """Test that streamed responses are compressed whatever their size."""
+    client = make_client()
+
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"data: {i}\n\n" for i in [0, 1, 2, "[DONE]"])
+
+
+def test_is_compressible():
+    """Test the selection of the compressible content types."""
+    assert is_compressible("text/event-stream")
+    assert is_compressible("application/json; charset=utf-8")
+    assert is_compressible("application/vnd.mapbox-vector-tile")
+    assert not is_compressible("image/png")
+    assert not is_compressible(None)
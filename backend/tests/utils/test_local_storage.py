@@ -883,3 +883,141 @@ def test_delete_image_invalid_url_format(local_storage_manager):
     invalid_url = "https://example.com/image.jpg"
     result = local_storage_manager.delete_image_by_url(invalid_url)
     assert result is False
+
+
+@pytest.mark.asyncio
+async def test_async_operations_round_trip(local_storage_manager, real_gpx_file):
+    """Test the asynchronous upload, load and delete of a GPX file."""
+    storage_key = await local_storage_manager.aupload_gpx_segment(
+        real_gpx_file, "async-file"
+    )
+    url = f"{local_storage_manager.get_storage_root_prefix()}/{storage_key}"
+
+    assert await local_storage_manager.aload_gpx_data(url) == (
+        real_gpx_file.read_bytes()
+    )
+    assert await local_storage_manager.adelete_gpx_segment_by_url(url)
+    assert await local_storage_manager.aload_gpx_data(url) is None
+    assert not await local_storage_manager.adelete_gpx_segment_by_url(url)
+
+
+@pytest.mark.asyncio
+async def test_async_operations_run_off_the_event_loop(local_storage_manager):
+    """Test that the blocking file operations run on the storage threads."""
+    import threading
+
+    threads = []
+
+    def load_gpx_data(url):
+        threads.append(threading.current_thread().name)
+        return b"<gpx/>"
+
+    with patch.object(local_storage_manager, "load_gpx_data", load_gpx_data):
+        assert await local_storage_manager.aload_gpx_data("local:///x.gpx") == (
+            b"<gpx/>"
+        )
+
+    assert threads[0].startswith("storage")
+    local_storage_manager.close()
+
+
+def test_upload_gpx_segment_writes_track_sidecar(local_storage_manager, real_gpx_file):
+    """Test that the track sidecar is stored, loaded and deleted with the GPX."""
+    from src.utils.track_sidecar import build_track_sidecar
+
+    sidecar = build_track_sidecar(real_gpx_file)
+    storage_key = local_storage_manager.upload_gpx_segment(
+        real_gpx_file, "tracked", track_sidecar=sidecar
+    )
+    url = f"{local_storage_manager.get_storage_root_prefix()}/{storage_key}"
+
+    sidecar_file = local_storage_manager.storage_root / "gpx-segments/tracked.trk"
+    assert sidecar_file.exists()
+    assert local_storage_manager.load_track_sidecar(url) == sidecar
+
+    assert local_storage_manager.delete_gpx_segment_by_url(url)
+    assert not sidecar_file.exists()
+    assert local_storage_manager.load_track_sidecar(url) is None
+
+
+def test_upload_gpx_segment_without_track_sidecar(local_storage_manager, tmp_path):
+    """Test that a GPX file that has no sidecar is still uploaded."""
+    gpx_file = tmp_path / "route.gpx"
+    gpx_file.write_text(
+        '<?xml version="1.0"?><gpx version="1.1"><trk><trkseg>'
+        '<trkpt lat="45.0" lon="5.0"></trkpt></trkseg></trk></gpx>'
+    )
+
+    storage_key = local_storage_manager.upload_gpx_segment(gpx_file, "no-time")
+    url = f"{local_storage_manager.get_storage_root_prefix()}/{storage_key}"
+
+    assert not (
+        local_storage_manager.storage_root / "gpx-segments/no-time.trk"
+    ).exists()
+    assert local_storage_manager.load_gpx_data(url) == gpx_file.read_bytes()
+    assert local_storage_manager.load_track_sidecar(url) is None
+    assert local_storage_manager.delete_gpx_segment_by_url(url)
+
+
+def test_upload_gpx_segment_compressed(temp_storage_dir, real_gpx_file):
+    """Test that GPX files are compressed at rest and loaded decompressed."""
+    import gzip
+
+    manager = LocalStorageManager(
+        LocalStorageConfig(
+            storage_type="local",
+            storage_root=str(temp_storage_dir),
+            base_url="http://localhost:8000/storage",
+            gpx_compression="gzip",
+        )
+    )
+
+    storage_key = manager.upload_gpx_segment(real_gpx_file, "compressed")
+    url = f"{manager.get_storage_root_prefix()}/{storage_key}"
+
+    stored_file = temp_storage_dir / storage_key
+    metadata = (temp_storage_dir / "gpx-segments/compressed.gpx.metadata").read_text()
+    assert gzip.decompress(stored_file.read_bytes()) == real_gpx_file.read_bytes()
+    assert "content-encoding: gzip" in metadata
+    assert manager.get_content_encoding(storage_key) == "gzip"
+    assert manager.load_gpx_data(url) == real_gpx_file.read_bytes()
+    stored = manager.load_stored_gpx_data(url)
+    assert stored.content == stored_file.read_bytes()
+    assert stored.content_encoding == "gzip"
+    # The sidecar is built from the uncompressed GPX file
+    assert manager.load_track_sidecar(url) is not None
+
+
+def test_load_gpx_data_uncompressed_has_no_content_encoding(
+    local_storage_manager, real_gpx_file
+):
+    """Test that GPX files stored without compression are loaded as stored."""
+    storage_key = local_storage_manager.upload_gpx_segment(real_gpx_file, "raw")
+    url = f"{local_storage_manager.get_storage_root_prefix()}/{storage_key}"
+
+    stored = local_storage_manager.load_stored_gpx_data(url)
+
+    assert stored.content == real_gpx_file.read_bytes()
+    assert stored.content_encoding is None
+    assert local_storage_manager.get_content_encoding("gpx-segments/unknown.gpx") is (
+        None
+    )
+
+
+def test_fit_export_round_trip(local_storage_manager):
+    """Test that FIT exports are stored and loaded by cache key."""
+    assert local_storage_manager.load_fit_export("abc") is None
+
+    storage_key = local_storage_manager.upload_fit_export(b".FIT content", "abc")
+
+    assert storage_key == "fit-exports/abc.fit"
+    assert (local_storage_manager.storage_root / storage_key).read_bytes() == (
+        b".FIT content"
+    )
+    assert local_storage_manager.load_fit_export("abc") == b".FIT content"
+    # Exports are replaced, not appended to
+    local_storage_manager.upload_fit_export(b"new", "abc")
+    assert local_storage_manager.load_fit_export("abc") == b"new"
+    assert list((local_storage_manager.storage_root / "fit-exports").iterdir()) == [
+        local_storage_manager.storage_root / storage_key
+    ]
@@ -1,8 +1,13 @@
 from dataclasses import dataclass
 
+import numpy as np
 import pytest
 
-from backend.src.utils.math import haversine_distance
+from backend.src.utils.math import (
+    cumulative_distances,
+    haversine_distance,
+    haversine_distances,
+)
 
 
 @dataclass
@@ -25,3 +30,40 @@ def test_paris_to_london_distance():
         longitude_2=london.longitude,
     )
     assert distance == pytest.approx(343.556, rel=1e-3)
+
+
+def test_haversine_distances_matches_scalar_version():
+    """Test the vectorized haversine distance against the scalar one."""
+    rng = np.random.default_rng(0)
+    latitudes_1 = rng.uniform(-89, 89, 200)
+    longitudes_1 = rng.uniform(-180, 180, 200)
+    latitudes_2 = rng.uniform(-89, 89, 200)
+    longitudes_2 = rng.uniform(-180, 180, 200)
+
+    distances = haversine_distances(
+        latitudes_1, longitudes_1, latitudes_2, longitudes_2
+    )
+
+    expected = [
+        haversine_distance(
+            latitude_1=latitude_1,
+            longitude_1=longitude_1,
+            latitude_2=latitude_2,
+            longitude_2=longitude_2,
+        )
+        for latitude_1, longitude_1, latitude_2, longitude_2 in zip(
+            latitudes_1, longitudes_1, latitudes_2, longitudes_2, strict=True
+        )
+    ]
+    np.testing.assert_allclose(distances, expected, rtol=1e-12)
+
+
+def test_cumulative_distances():
+    """Test the distance along a path."""
+    latitudes = np.array([48.8566, 51.5074, 48.8566])
+    longitudes = np.array([2.3522, -0.1278, 2.3522])
+
+    distances = cumulative_distances(latitudes, longitudes)
+
+    np.testing.assert_allclose(distances, [0.0, 343.556, 687.112], rtol=1e-3)
+    assert cumulative_distances(latitudes[:1], longitudes[:1]).tolist() == [0.0]
@@ -0,0 +1,126 @@
+"""Tests for the nearest-point index of the uploaded tracks."""
+
+import pickle
+import time
+
+import numpy as np
+import pytest
+from src.utils.math import cumulative_distances, haversine_distances
+from src.utils.point_index import (
+    EARTH_RADIUS_M,
+    TrackPointIndex,
+)
+
+
+def make_track(n_points: int, seed: int = 0):
+    """Make a random walk track."""
+    rng = np.random.default_rng(seed)
+    latitudes = 45 + np.cumsum(rng.normal(0, 1e-4, n_points))
+    longitudes = 5 + np.cumsum(rng.normal(0, 1e-4, n_points))
+    elevations = 200 + np.cumsum(rng.normal(0, 1, n_points))
+    return latitudes, longitudes, elevations
+
+
+def brute_force(latitudes, longitudes, latitude, longitude, k):
+    """Find the k closest points on the projection plane of the index."""
+    scale = np.cos(np.radians(latitudes.mean()))
+    distances = ((longitudes - longitude) * scale) ** 2 + (latitudes - latitude) ** 2
+    indices = np.arange(len(latitudes))
+    return indices[np.lexsort((indices, distances))][:k]
+
+
+@pytest.mark.parametrize("n_points", [1, 5, 33, 1000])
+@pytest.mark.parametrize("k", [1, 3, 40])
+def test_query_matches_brute_force(n_points, k):
+    """Test that the KD-tree finds the same points as a linear scan."""
+    latitudes, longitudes, elevations = make_track(n_points)
+    point_index = TrackPointIndex(latitudes, longitudes, elevations)
+    rng = np.random.default_rng(1)
+
+    for latitude, longitude in zip(
+        rng.uniform(latitudes.min() - 0.01, latitudes.max() + 0.01, 20),
+        rng.uniform(longitudes.min() - 0.01, longitudes.max() + 0.01, 20),
+        strict=True,
+    ):
+        expected = brute_force(latitudes, longitudes, latitude, longitude, k)
+        np.testing.assert_array_equal(
+            point_index.query(latitude, longitude, k), expected
+        )
+
+
+def test_query_far_location_and_duplicates():
+    """Test lookups far from the track and on repeated points."""
+    latitudes = np.array([45.0, 45.0, 45.001, 45.0])
+    longitudes = np.array([5.0, 5.0, 5.001, 5.0])
+    point_index = TrackPointIndex(latitudes, longitudes, np.zeros(4), leaf_size=1)
+
+    np.testing.assert_array_equal(point_index.query(45.0, 5.0, 3), [0, 1, 3])
+    np.testing.assert_array_equal(point_index.query(-45.0, -170.0, 1), [0])
+    np.testing.assert_array_equal(point_index.query(46.0, 6.0, 10), [2, 0, 1, 3])
+
+
+def test_query_invalid():
+    """Test that empty indexes return nothing and k must be positive."""
+    point_index = TrackPointIndex(np.array([]), np.array([]), np.array([]))
+
+    assert len(point_index) == 0
+    assert len(point_index.query(45.0, 5.0, 3)) == 0
+    assert point_index.nearest(45.0, 5.0) == []
+    with pytest.raises(ValueError, match="At least one point"):
+        point_index.query(45.0, 5.0, 0)
+
+
+def test_nearest():
+    """Test the distances and the coordinates of the returned points."""
+    latitudes, longitudes, elevations = make_track(500)
+    point_index = TrackPointIndex(latitudes, longitudes, elevations)
+    distances = cumulative_distances(latitudes, longitudes)
+
+    points = point_index.nearest(latitudes[123] + 1e-5, longitudes[123], k=2)
+
+    assert len(points) == 2
+    assert points[0].index == 123
+    assert points[0].latitude == latitudes[123]
+    assert points[0].longitude == longitudes[123]
+    assert points[0].elevation == elevations[123]
+    assert points[0].distance == pytest.approx(1e-5 * np.pi / 180 * EARTH_RADIUS_M)
+    assert points[1].distance >= points[0].distance
+    for point in points:
+        assert point.cumulative_distance == distances[point.index]
+        assert point.distance == pytest.approx(
+            haversine_distances(
+                np.array([latitudes[123] + 1e-5]),
+                np.array([longitudes[123]]),
+                np.array([point.latitude]),
+                np.array([point.longitude]),
+            )[0]
+            * 1000
+        )
+
+
+def test_pickle():
+    """Test that indexes built in the worker processes can be sent back."""
+    latitudes, longitudes, elevations = make_track(200)
+    point_index = pickle.loads(
+        pickle.dumps(TrackPointIndex(latitudes, longitudes, elevations))
+    )
+
+    np.testing.assert_array_equal(
+        point_index.query(45.0, 5.0, 5), brute_force(latitudes, longitudes, 45, 5, 5)
+    )
+
+
+def test_query_benchmark():
+    """Test that lookups on 100,000 points only visit a few leaves."""
+    latitudes, longitudes, elevations = make_track(100_000)
+    point_index = TrackPointIndex(latitudes, longitudes, elevations)
+    rng = np.random.default_rng(2)
+    locations = rng.integers(0, 100_000, 200)
+
+    start = time.perf_counter()
+    for location in locations.tolist():
+        point_index.query(latitudes[location], longitudes[location], 5)
+    elapsed = time.perf_counter() - start
+
+    # A linear scan takes about 1 ms per lookup
+    assert elapsed / len(locations) < 5e-3
@@ -1,8 +1,27 @@
 """Tests for PostgreSQL database configuration utilities."""
 
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock, call
+
 import pytest
+from sqlalchemy import (
+    JSON,
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    inspect,
+)
 
-from backend.src.utils.postgres import get_database_url
+from backend.src.utils.postgres import (
+    add_missing_columns,
+    create_missing_indexes,
+    get_database_url,
+    listen_for_notifications,
+)
 
 
 def test_basic_url_construction():
@@ -167,3 +186,131 @@ def test_function_signature_missing_parameters(args):
     # calling the function with insufficient parameters raises a TypeError
     with pytest.raises(TypeError):
         get_database_url(*args)
+
+
+def test_create_missing_indexes():
+    """Test that indexes added to an existing table get created."""
+    engine = create_engine("sqlite://")
+    old_metadata = MetaData()
+    Table("tracks", old_metadata, Column("id", Integer, primary_key=True))
+    old_metadata.create_all(engine)
+
+    metadata = MetaData()
+    Table(
+        "tracks",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Index("idx_track_id", "id"),
+    )
+    Table("other", metadata, Column("id", Integer, primary_key=True))
+
+    with engine.begin() as connection:
+        assert create_missing_indexes(connection, metadata) == ["idx_track_id"]
+        # Running it again is a no-op
+        assert create_missing_indexes(connection, metadata) == []
+
+    index_names = {index["name"] for index in inspect(engine).get_indexes("tracks")}
+    assert "idx_track_id" in index_names
+
+
+def test_add_missing_columns():
+    """Test that nullable columns added to an existing table get created."""
+    engine = create_engine("sqlite://")
+    old_metadata = MetaData()
+    Table("tracks", old_metadata, Column("id", Integer, primary_key=True))
+    old_metadata.create_all(engine)
+
+    metadata = MetaData()
+    Table(
+        "tracks",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("polylines", JSON, nullable=True),
+        Column("required", Integer, nullable=False),
+    )
+
+    with engine.begin() as connection:
+        assert add_missing_columns(connection, metadata) == ["tracks.polylines"]
+        assert add_missing_columns(connection, metadata) == []
+
+    column_names = {column["name"] for column in inspect(engine).get_columns("tracks")}
+    assert column_names == {"id", "polylines"}
+
+
+class FakeDriverConnection:
+    """asyncpg connection delivering the notifications by hand."""
+
+    def __init__(self):
+        self.listeners = {}
+        self.termination_listeners = []
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def remove_listener(self, channel, callback):
+        del self.listeners[channel]
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    def is_closed(self):
+        return self.closed
+
+    def notify(self, channel, payload=""):
+        self.listeners[channel](self, 1, channel, payload)
+
+    def terminate(self):
+        self.closed = True
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+class FakeEngine:
+    """Engine opening fake asyncpg connections."""
+
+    def __init__(self):
+        self.connections = []
+
+    @asynccontextmanager
+    async def connect(self):
+        driver_connection = FakeDriverConnection()
+        self.connections.append(driver_connection)
+        connection = Mock()
+        connection.get_raw_connection = AsyncMock(
+            return_value=Mock(driver_connection=driver_connection)
+        )
+        yield connection
+
+
+def test_listen_for_notifications():
+    """Test that notifications are received until cancelled, across reconnections."""
+    engine = FakeEngine()
+    callback = Mock()
+
+    async def settle():
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def scenario():
+        listener = asyncio.create_task(
+            listen_for_notifications(engine, "changes", callback, retry_delay=0)
+        )
+        await settle()
+        engine.connections[0].notify("changes", "payload")
+        assert callback.call_args_list == [call("payload")]
+
+        # Notifications may be missed while reconnecting
+        engine.connections[0].terminate()
+        await settle()
+        assert len(engine.connections) == 2
+        assert callback.call_args_list[1] == call(None)
+        engine.connections[1].notify("changes")
+        assert callback.call_count == 3
+
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+        assert engine.connections[1].listeners == {}
+
+    asyncio.run(scenario())
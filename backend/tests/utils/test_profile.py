@@ -0,0 +1,109 @@
+"""Tests for the elevation profile downsampling."""
+
+import numpy as np
+import pytest
+from src.utils.math import cumulative_distances
+from src.utils.profile import (
+    compute_elevation_profile,
+    lttb_indices,
+    profile_width_bucket,
+)
+
+
+def reference_lttb(x, y, n_out):
+    """Straightforward implementation of Largest-Triangle-Three-Buckets."""
+    n_points = len(x)
+    bucket_size = (n_points - 2) / (n_out - 2)
+    indices = [0]
+    selected = 0
+    for bucket in range(n_out - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n_points)
+        if bucket == n_out - 3:
+            end, next_start, next_end = n_points - 1, n_points - 1, n_points
+        mean_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        mean_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best_area = -1.0
+        for index in range(start, end):
+            area = abs(
+                (x[selected] - mean_x) * (y[index] - y[selected])
+                - (x[selected] - x[index]) * (mean_y - y[selected])
+            )
+            if area > best_area:
+                best_area, best_index = area, index
+        selected = best_index
+        indices.append(selected)
+    indices.append(n_points - 1)
+    return indices
+
+
+@pytest.mark.parametrize(
+    "n_points, n_out", [(10, 3), (100, 7), (1000, 64), (5000, 512)]
+)
+def test_lttb_indices_matches_reference(n_points, n_out):
+    """Test the vectorized buckets against a straightforward implementation."""
+    rng = np.random.default_rng(n_points)
+    x = np.cumsum(rng.random(n_points))
+    y = np.cumsum(rng.normal(0, 1, n_points))
+
+    indices = lttb_indices(x, y, n_out)
+
+    assert indices.tolist() == reference_lttb(x.tolist(), y.tolist(), n_out)
+    assert len(indices) == n_out
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_indices_keeps_peaks():
+    """Test that summits and valleys are kept, unlike regular sampling."""
+    x = np.arange(1001, dtype=np.float64)
+    y = np.zeros(1001)
+    y[333], y[777] = 100.0, -50.0
+
+    indices = lttb_indices(x, y, 10)
+
+    assert 333 in indices
+    assert 777 in indices
+
+
+def test_lttb_indices_short_series():
+    """Test that series shorter than the output are returned in full."""
+    x = np.arange(5, dtype=np.float64)
+
+    assert lttb_indices(x, x, 5).tolist() == [0, 1, 2, 3, 4]
+    assert lttb_indices(x, x, 64).tolist() == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError, match="At least 3 points"):
+        lttb_indices(x, x, 2)
+
+
+@pytest.mark.parametrize(
+    "width, bucket",
+    [(1, 64), (64, 64), (65, 128), (500, 512), (513, 1024), (4096, 4096)],
+)
+def test_profile_width_bucket(width, bucket):
+    """Test that widths are rounded up to a power of two."""
+    assert profile_width_bucket(width) == bucket
+
+
+def test_compute_elevation_profile():
+    """Test that the profile points are the track points at their distance."""
+    rng = np.random.default_rng(0)
+    latitudes = 45 + np.cumsum(rng.normal(0, 1e-4, 2000))
+    longitudes = 5 + np.cumsum(rng.normal(0, 1e-4, 2000))
+    elevations = 200 + np.cumsum(rng.normal(0, 1, 2000))
+
+    profile = compute_elevation_profile(latitudes, longitudes, elevations, 128)
+
+    distances = cumulative_distances(latitudes, longitudes)
+    assert len(profile.indices) == 128
+    assert profile.indices[0] == 0
+    assert profile.indices[-1] == 1999
+    assert profile.distances == distances[profile.indices].tolist()
+    assert profile.elevations == elevations[profile.indices].tolist()
+    assert profile.total_points == 2000
+    assert profile.total_distance == pytest.approx(distances[-1])
+
+    empty = compute_elevation_profile(np.array([]), np.array([]), np.array([]), 64)
+    assert empty.indices == []
+    assert empty.total_distance == 0
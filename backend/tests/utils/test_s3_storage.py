@@ -842,3 +842,101 @@ def test_delete_image_generic_exception(mock_s3_manager):
     ):
         result = mock_s3_manager.delete_image_by_url(valid_url)
         assert result is False
+
+
+def test_s3_client_connection_pool_size(mock_bucket_name):
+    """Test that the shared S3 client uses the configured connection pool size."""
+    with mock_aws():
+        config = S3StorageConfig(
+            storage_type="s3",
+            bucket=mock_bucket_name,
+            access_key_id="test-key",
+            secret_access_key="test-secret",
+            region="us-east-1",
+            max_connections=32,
+        )
+        manager = S3Manager(config)
+
+    assert manager.s3_client.meta.config.max_pool_connections == 32
+    assert manager._executor._max_workers == 32
+
+
+@pytest.mark.asyncio
+async def test_async_operations_round_trip(mock_s3_manager, real_gpx_file):
+    """Test the asynchronous upload, load and delete of a GPX file on S3."""
+    s3_key = await mock_s3_manager.aupload_gpx_segment(real_gpx_file, "async-file")
+    url = f"{mock_s3_manager.get_storage_root_prefix()}/{s3_key}"
+
+    assert await mock_s3_manager.aload_gpx_data(url) == real_gpx_file.read_bytes()
+    assert await mock_s3_manager.adelete_gpx_segment_by_url(url)
+    assert await mock_s3_manager.aload_gpx_data(url) is None
+
+
+@pytest.mark.asyncio
+async def test_track_sidecar_round_trip(mock_s3_manager, real_gpx_file):
+    """Test that the track sidecar is stored, loaded and deleted with the GPX."""
+    from src.utils.track_sidecar import build_track_sidecar
+
+    sidecar = build_track_sidecar(real_gpx_file)
+    s3_key = await mock_s3_manager.aupload_gpx_segment(
+        real_gpx_file, "tracked", track_sidecar=sidecar
+    )
+    url = f"{mock_s3_manager.get_storage_root_prefix()}/{s3_key}"
+
+    response = mock_s3_manager.s3_client.head_object(
+        Bucket=mock_s3_manager.bucket_name, Key="gpx-segments/tracked.trk"
+    )
+    assert response["Metadata"]["file-type"] == "track-sidecar"
+    assert await mock_s3_manager.aload_track_sidecar(url) == sidecar
+
+    assert await mock_s3_manager.adelete_gpx_segment_by_url(url)
+    assert await mock_s3_manager.aload_track_sidecar(url) is None
+
+
+@pytest.mark.asyncio
+async def test_fit_export_round_trip(mock_s3_manager):
+    """Test that FIT exports are stored and loaded by cache key."""
+    assert await mock_s3_manager.aload_fit_export("abc") is None
+
+    s3_key = await mock_s3_manager.aupload_fit_export(b".FIT content", "abc")
+
+    assert s3_key == "fit-exports/abc.fit"
+    response = mock_s3_manager.s3_client.head_object(
+        Bucket=mock_s3_manager.bucket_name, Key=s3_key
+    )
+    assert response["ContentType"] == "application/vnd.ant.fit"
+    assert response["Metadata"]["file-type"] == "fit-export"
+    assert await mock_s3_manager.aload_fit_export("abc") == b".FIT content"
+
+
+@pytest.mark.asyncio
+async def test_upload_gpx_segment_compressed(mock_bucket_name, real_gpx_file):
+    """Test that GPX files are compressed at rest and loaded decompressed."""
+    import gzip
+
+    with mock_aws():
+        s3_client = boto3.client("s3", region_name="us-east-1")
+        s3_client.create_bucket(Bucket=mock_bucket_name)
+        manager = S3Manager(
+            S3StorageConfig(
+                storage_type="s3",
+                bucket=mock_bucket_name,
+                access_key_id="test-key",
+                secret_access_key="test-secret",
+                region="us-east-1",
+                gpx_compression="gzip",
+            )
+        )
+
+        s3_key = await manager.aupload_gpx_segment(real_gpx_file, "compressed")
+        url = f"{manager.get_storage_root_prefix()}/{s3_key}"
+
+        response = s3_client.head_object(Bucket=mock_bucket_name, Key=s3_key)
+        assert response["ContentEncoding"] == "gzip"
+        assert response["ContentType"] == "application/gpx+xml"
+        assert response["Metadata"]["file-type"] == "gpx-segment"
+
+        stored = await manager.aload_stored_gpx_data(url)
+        assert stored.content_encoding == "gzip"
+        assert gzip.decompress(stored.content) == real_gpx_file.read_bytes()
+        assert await manager.aload_gpx_data(url) == real_gpx_file.read_bytes()
@@ -0,0 +1,176 @@
+"""Tests for the result cache of the segment search."""
+
+import asyncio
+
+import pytest
+from src.utils.search_cache import SearchResultCache
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingSearch:
+    """Search waiting for a signal, counting its executions."""
+
+    def __init__(self, result="events"):
+        self.result = result
+        self.calls = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_concurrent_searches_are_coalesced():
+    """Test that identical concurrent searches share one execution."""
+
+    async def scenario():
+        cache = SearchResultCache(ttl=5, max_entries=10, clock=FakeClock())
+        search = CountingSearch()
+        other_search = CountingSearch("other events")
+        requests = [
+            asyncio.ensure_future(cache.get_or_run("key", search)) for _ in range(3)
+        ]
+        other = asyncio.ensure_future(cache.get_or_run("other", other_search))
+        await asyncio.sleep(0)
+        search.release.set()
+        other_search.release.set()
+        return cache, search, await asyncio.gather(*requests, other)
+
+    cache, search, results = asyncio.run(scenario())
+
+    assert results == ["events", "events", "events", "other events"]
+    assert search.calls == 1
+    stats = cache.stats
+    assert (stats.requests, stats.coalesced, stats.executions) == (4, 2, 2)
+    assert stats.entries == 2
+    assert stats.coalescing_ratio == 0.5
+
+
+def test_results_expire():
+    """Test that results are served from the cache during their time to live."""
+    clock = FakeClock()
+
+    async def scenario():
+        cache = SearchResultCache(ttl=5, max_entries=10, clock=clock)
+        search = CountingSearch()
+        search.release.set()
+        assert await cache.get_or_run("key", search) == "events"
+        clock.now = 4
+        assert await cache.get_or_run("key", search) == "events"
+        assert search.calls == 1
+        clock.now = 10
+        assert await cache.get_or_run("key", search) == "events"
+        assert search.calls == 2
+        return cache.stats
+
+    stats = asyncio.run(scenario())
+    assert (stats.requests, stats.hits, stats.executions) == (3, 1, 2)
+
+
+def test_zero_ttl_only_coalesces():
+    """Test that no result is kept without a time to live."""
+
+    async def scenario():
+        cache = SearchResultCache(ttl=0, max_entries=10, clock=FakeClock())
+        search = CountingSearch()
+        search.release.set()
+        await cache.get_or_run("key", search)
+        await cache.get_or_run("key", search)
+        return cache, search
+
+    cache, search = asyncio.run(scenario())
+    assert search.calls == 2
+    assert len(cache) == 0
+
+
+def test_invalidation_during_search():
+    """Test that results of searches older than a write are not cached."""
+
+    async def scenario():
+        cache = SearchResultCache(ttl=5, max_entries=10, clock=FakeClock())
+        stale_search = CountingSearch("stale")
+        fresh_search = CountingSearch("fresh")
+        fresh_search.release.set()
+
+        stale = asyncio.ensure_future(cache.get_or_run("key", stale_search))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        # Requests after the write do not join the stale search
+        assert await cache.get_or_run("key", fresh_search) == "fresh"
+        stale_search.release.set()
+        assert await stale == "stale"
+        assert await cache.get_or_run("key", stale_search) == "fresh"
+        return cache.stats
+
+    stats = asyncio.run(scenario())
+    assert stats.invalidations == 1
+    assert stats.executions == 2
+    assert stats.hits == 1
+
+
+def test_errors_are_not_cached():
+    """Test that a failed search is raised to every waiting request."""
+
+    async def scenario():
+        cache = SearchResultCache(ttl=5, max_entries=10, clock=FakeClock())
+        search = CountingSearch(ValueError("Query failed"))
+        requests = [
+            asyncio.ensure_future(cache.get_or_run("key", search)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        search.release.set()
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        search.result = "events"
+        assert await cache.get_or_run("key", search) == "events"
+        return search
+
+    search = asyncio.run(scenario())
+    assert search.calls == 2
+
+
+def test_cancelled_requests():
+    """Test that a search is only cancelled once nobody waits for it."""
+
+    async def scenario():
+        cache = SearchResultCache(ttl=5, max_entries=10, clock=FakeClock())
+        search = CountingSearch()
+        first = asyncio.ensure_future(cache.get_or_run("key", search))
+        second = asyncio.ensure_future(cache.get_or_run("key", search))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        assert search.cancelled == 0
+        second.cancel()
+        for request in (first, second):
+            with pytest.raises(asyncio.CancelledError):
+                await request
+        await asyncio.sleep(0)
+        assert search.cancelled == 1
+
+        # The next request starts a new search
+        search.release.set()
+        assert await cache.get_or_run("key", search) == "events"
+        return search
+
+    search = asyncio.run(scenario())
+    assert search.calls == 2
@@ -0,0 +1,161 @@
+"""Tests for the track simplification utilities."""
+
+import math
+from pathlib import Path
+
+import polyline
+import pytest
+from src.utils.gpx import GPXStreamReader, parse_gpx_data
+from src.utils.simplify import (
+    LOD_TOLERANCES,
+    POLYLINE_TOLERANCES,
+    encode_simplified_polylines,
+    lod_file_path,
+    select_simplified_polyline,
+    simplify_douglas_peucker,
+    simplify_gpx,
+    simplify_gpx_coordinates,
+    write_lod_files,
+)
+from src.utils.track_sidecar import build_track_sidecar
+
+GPX_FILE_PATH = Path(__file__).parent.parent / "data" / "file.gpx"
+
+
+def test_simplify_removes_collinear_points():
+    """Test that points on a straight line are dropped."""
+    points = [(45.0, 4.0 + i * 0.001) for i in range(50)]
+
+    assert simplify_douglas_peucker(points, 1.0) == [points[0], points[-1]]
+
+
+def test_simplify_keeps_points_above_tolerance():
+    """Test that a detour larger than the tolerance is kept."""
+    # About 111 m north of the straight line
+    points = [(45.0, 4.0), (45.0, 4.005), (45.001, 4.01), (45.0, 4.015), (45.0, 4.02)]
+
+    assert simplify_douglas_peucker(points, 80.0) == [
+        (45.0, 4.0),
+        (45.001, 4.01),
+        (45.0, 4.02),
+    ]
+    assert simplify_douglas_peucker(points, 200.0) == [(45.0, 4.0), (45.0, 4.02)]
+
+
+@pytest.mark.parametrize("count", [0, 1, 2])
+def test_simplify_short_tracks(count):
+    """Test that tracks with at most two points are returned unchanged."""
+    points = [(45.0, 4.0), (45.1, 4.1)][:count]
+
+    assert simplify_douglas_peucker(points, 10.0) == points
+
+
+def test_encode_simplified_polylines():
+    """Test that one polyline is encoded per tolerance, coarser ones being shorter."""
+    points = [(45.0 + 0.01 * math.sin(i / 10), 4.0 + 0.001 * i) for i in range(1000)]
+
+    polylines = encode_simplified_polylines(points)
+
+    assert set(polylines) == {str(tolerance) for tolerance in POLYLINE_TOLERANCES}
+    lengths = [len(polyline.decode(polylines[str(t)])) for t in POLYLINE_TOLERANCES]
+    assert lengths == sorted(lengths, reverse=True)
+    assert lengths[0] < len(points)
+    assert encode_simplified_polylines(points[:1]) is None
+
+
+@pytest.mark.parametrize(
+    "tolerance, expected",
+    [
+        (1, "detailed"),
+        (5, "detailed"),
+        (19.9, "detailed"),
+        (20, "medium"),
+        (1000, "coarse"),
+    ],
+)
+def test_select_simplified_polyline(tolerance, expected):
+    """Test that the coarsest polyline not exceeding the tolerance is selected."""
+    polylines = {"100": "coarse", "5": "detailed", "20": "medium"}
+
+    assert select_simplified_polyline(polylines, tolerance) == expected
+
+
+def test_select_simplified_polyline_missing():
+    """Test that tracks without precomputed polylines have no geometry."""
+    assert select_simplified_polyline(None, 20) is None
+    assert select_simplified_polyline({}, 20) is None
+
+
+def test_simplify_gpx_coordinates():
+    """Test that the track of a GPX file is simplified from bytes or a path."""
+    points = [
+        (point.latitude, point.longitude)
+        for point in parse_gpx_data(GPX_FILE_PATH, "file").points
+    ]
+
+    simplified = simplify_gpx_coordinates(GPX_FILE_PATH.read_bytes(), 20)
+
+    assert simplified == simplify_douglas_peucker(points, 20)
+    assert simplified == simplify_gpx_coordinates(GPX_FILE_PATH, 20)
+
+
+def test_lod_file_path():
+    """Test that level of detail files are named after the track GPX file."""
+    assert lod_file_path("s3://bucket/gpx-segments/abc.gpx", 10) == (
+        "s3://bucket/gpx-segments/abc.lod10.gpx"
+    )
+    assert lod_file_path("gpx-segments/abc", 1) == "gpx-segments/abc.lod1.gpx"
+
+
+def test_simplify_gpx_levels():
+    """Test that each level is a valid GPX file with fewer points."""
+    full = parse_gpx_data(GPX_FILE_PATH, "file")
+
+    levels = simplify_gpx(GPX_FILE_PATH)
+
+    assert list(levels) == list(LOD_TOLERANCES)
+    point_counts = []
+    for content in levels.values():
+        simplified = parse_gpx_data(content, "file")
+        assert simplified.track_name == full.track_name
+        assert simplified.points[0] == full.points[0]
+        assert simplified.points[-1] == full.points[-1]
+        # Kept points retain their coordinates, elevation and time
+        assert {point.time: point for point in simplified.points}.items() <= {
+            point.time: point for point in full.points
+        }.items()
+        point_counts.append(len(simplified.points))
+    assert len(full.points) >= point_counts[0] >= point_counts[1] >= point_counts[2]
+    assert point_counts[2] < len(full.points)
+
+
+def test_simplify_gpx_keeps_segments_and_escapes_names():
+    """Test that segments are simplified separately and names are escaped."""
+    content = b"""<gpx><trk><name>Up &amp; down</name>
+     <trkseg>
+      <trkpt lat="45.0" lon="4.0"/><trkpt lat="45.0" lon="4.001"/>
+      <trkpt lat="45.0" lon="4.002"/>
+     </trkseg>
+     <trkseg><trkpt lat="46.0" lon="5.0"><ele>10.5</ele></trkpt></trkseg>
+    </trk></gpx>"""
+
+    reader = GPXStreamReader(simplify_gpx(content, (10,))[10])
+    points = list(reader)
+
+    assert reader.track_name == "Up & down"
+    assert [point.segment_index for point in points] == [0, 0, 1]
+    assert [point.longitude for point in points] == [4.0, 4.002, 5.0]
+    assert points[2].elevation == 10.5
+    assert points[0].elevation is None
+
+
+def test_write_lod_files(tmp_path):
+    """Test that the level of detail files are written with their sidecars."""
+    files = write_lod_files(GPX_FILE_PATH, tmp_path, "abc")
+
+    assert {tolerance: lod_file.path for tolerance, lod_file in files.items()} == {
+        tolerance: tmp_path / f"abc.lod{tolerance}.gpx" for tolerance in LOD_TOLERANCES
+    }
+    for lod_file in files.values():
+        assert lod_file.path.read_bytes().startswith(b"<?xml")
+        assert lod_file.sidecar == build_track_sidecar(lod_file.path)
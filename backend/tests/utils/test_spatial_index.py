@@ -0,0 +1,207 @@
+"""Tests for the in-memory track spatial index."""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+from src.utils import spatial_index
+from src.utils.spatial_index import TrackSpatialIndex
+
+
+def make_track(track_id, north, south, east, west, **kwargs):
+    """Create a minimal track-like item for the index."""
+    return SimpleNamespace(
+        id=track_id,
+        bound_north=north,
+        bound_south=south,
+        bound_east=east,
+        bound_west=west,
+        barycenter_latitude=(north + south) / 2,
+        barycenter_longitude=(east + west) / 2,
+        **kwargs,
+    )
+
+
+def random_tracks(count, seed=0):
+    """Create random small tracks spread over France."""
+    rng = random.Random(seed)
+    tracks = []
+    for track_id in range(1, count + 1):
+        south = rng.uniform(42.0, 50.0)
+        west = rng.uniform(-4.0, 7.0)
+        tracks.append(
+            make_track(
+                track_id,
+                north=south + rng.uniform(0.001, 0.2),
+                south=south,
+                east=west + rng.uniform(0.001, 0.2),
+                west=west,
+            )
+        )
+    return tracks
+
+
+def brute_force_search(tracks, north, south, east, west, limit):
+    """Reference implementation of the database search."""
+    center_latitude = (north + south) / 2
+    center_longitude = (east + west) / 2
+    matches = [
+        track
+        for track in tracks
+        if track.bound_north > south
+        and track.bound_south < north
+        and track.bound_east > west
+        and track.bound_west < east
+    ]
+    matches.sort(
+        key=lambda track: (
+            (track.barycenter_latitude - center_latitude) ** 2
+            + (track.barycenter_longitude - center_longitude) ** 2,
+            track.id,
+        )
+    )
+    return [track.id for track in matches[:limit]]
+
+
+@pytest.mark.parametrize("count", [0, 1, 15, 500])
+def test_search_matches_brute_force(count):
+    """Test that the index returns the same tracks as a linear scan."""
+    tracks = random_tracks(count)
+    index = TrackSpatialIndex(tracks)
+    assert len(index) == count
+
+    rng = random.Random(42)
+    for _ in range(50):
+        south = rng.uniform(41.0, 50.0)
+        west = rng.uniform(-5.0, 7.0)
+        north = south + rng.uniform(0.05, 3.0)
+        east = west + rng.uniform(0.05, 3.0)
+        limit = rng.choice([1, 10, 50])
+
+        result = index.search(north, south, east, west, limit)
+
+        assert [track.id for track in result] == brute_force_search(
+            tracks, north, south, east, west, limit
+        )
+
+
+def test_search_excludes_tracks_touching_the_border():
+    """Test that bounds equal to the search area border do not intersect."""
+    index = TrackSpatialIndex([make_track(1, 46.0, 45.0, 5.0, 4.0)])
+
+    assert index.search(47.0, 46.0, 5.0, 4.0, 10) == []
+    assert [track.id for track in index.search(47.0, 45.5, 5.0, 4.0, 10)] == [1]
+
+
+def test_search_applies_predicate_before_limit():
+    """Test that filtered out tracks do not count towards the limit."""
+    tracks = [
+        make_track(1, 45.001, 45.0, 4.001, 4.0, track_type="route"),
+        make_track(2, 45.11, 45.1, 4.11, 4.1, track_type="segment"),
+        make_track(3, 45.21, 45.2, 4.21, 4.2, track_type="segment"),
+    ]
+    index = TrackSpatialIndex(tracks)
+
+    result = index.search(
+        46.0,
+        44.0,
+        5.0,
+        3.0,
+        limit=1,
+        predicate=lambda track: track.track_type == "segment",
+    )
+
+    assert [track.id for track in result] == [2]
+
+
+def test_search_orders_by_key_before_limit():
+    """Test that the sort key takes precedence over the proximity to the center."""
+    tracks = [
+        make_track(1, 45.001, 45.0, 4.001, 4.0, length=3.0),
+        make_track(2, 45.11, 45.1, 4.11, 4.1, length=1.0),
+        make_track(3, 45.21, 45.2, 4.21, 4.2, length=1.0),
+        make_track(4, 45.31, 45.3, 4.31, 4.3, length=2.0),
+    ]
+    index = TrackSpatialIndex(tracks)
+
+    result = index.search(45.4, 44.8, 4.4, 3.8, limit=3, key=lambda track: track.length)
+
+    # Ties are broken by the distance to the center (45.1, 4.1)
+    assert [track.id for track in result] == [2, 3, 4]
+
+
+def test_upsert_and_remove_are_visible_immediately():
+    """Test incremental updates before the tree gets repacked."""
+    index = TrackSpatialIndex([make_track(1, 45.1, 45.0, 4.1, 4.0)])
+
+    assert index.upsert(make_track(2, 45.1, 45.0, 4.1, 4.0))
+    assert {track.id for track in index.search(46.0, 44.0, 5.0, 3.0, 10)} == {1, 2}
+
+    # Move track 1 away from the search area
+    assert index.upsert(make_track(1, 10.1, 10.0, 4.1, 4.0))
+    assert [track.id for track in index.search(46.0, 44.0, 5.0, 3.0, 10)] == [2]
+    assert [track.id for track in index.search(11.0, 9.0, 5.0, 3.0, 10)] == [1]
+
+    assert index.remove(2)
+    assert not index.remove(2)
+    assert index.search(46.0, 44.0, 5.0, 3.0, 10) == []
+    assert len(index) == 1
+    assert 1 in index
+    assert 2 not in index
+
+
+def test_updates_survive_rebuild(monkeypatch):
+    """Test that repacking the tree keeps the latest version of each track."""
+    monkeypatch.setattr(spatial_index, "MIN_REBUILD_THRESHOLD", 2)
+    tracks = random_tracks(100, seed=1)
+    index = TrackSpatialIndex(tracks)
+
+    moved = random_tracks(100, seed=2)
+    for track in moved[:50]:
+        index.upsert(track)
+    for track in moved[50:60]:
+        index.remove(track.id)
+
+    expected = moved[:50] + tracks[60:]
+    assert len(index) == len(expected)
+    for north, south, east, west in [(50, 42, 7, -4), (46, 44, 3, 0)]:
+        result = index.search(north, south, east, west, 1000)
+        assert [track.id for track in result] == brute_force_search(
+            expected, north, south, east, west, 1000
+        )
+
+
+def test_non_finite_bounds_are_not_indexed():
+    """Test that tracks with non-finite bounds are skipped."""
+    index = TrackSpatialIndex(
+        [
+            make_track(1, 45.1, 45.0, 4.1, 4.0),
+            make_track(2, float("nan"), 45.0, 4.1, 4.0),
+        ]
+    )
+    assert len(index) == 1
+
+    assert not index.upsert(make_track(1, float("inf"), 45.0, 4.1, 4.0))
+    assert len(index) == 0
+
+
+def test_nearest_orders_by_barycenter_distance():
+    """Test the nearest-center query against a linear scan."""
+    tracks = random_tracks(300, seed=3)
+    index = TrackSpatialIndex(tracks)
+    index.upsert(make_track(1000, 46.01, 46.0, 2.01, 2.0))
+    index.remove(5)
+    remaining = [track for track in tracks if track.id != 5]
+    remaining.append(make_track(1000, 46.01, 46.0, 2.01, 2.0))
+
+    result = index.nearest(46.0, 2.0, 20)
+
+    expected = sorted(
+        remaining,
+        key=lambda track: (
+            (track.barycenter_latitude - 46.0) ** 2
+            + (track.barycenter_longitude - 2.0) ** 2
+        ),
+    )[:20]
+    assert [track.id for track in result] == [track.id for track in expected]
+    assert result[0].id == 1000
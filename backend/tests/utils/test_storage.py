@@ -164,7 +164,11 @@ class MockStorageManager:
         self.bucket_calls = []
 
     def upload_gpx_segment(
-        self, local_file_path: Path, file_id: str, prefix: str = "gpx-segments"
+        self,
+        local_file_path: Path,
+        file_id: str,
+        prefix: str = "gpx-segments",
+        track_sidecar: bytes | None = None,
     ) -> str:
         """Mock upload implementation."""
         self.upload_calls.append((local_file_path, file_id, prefix))
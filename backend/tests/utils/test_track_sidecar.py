@@ -0,0 +1,207 @@
+"""Tests for the binary track sidecar."""
+
+import struct
+from pathlib import Path
+
+import pytest
+from fit_tool.fit_file import FitFile
+from fit_tool.profile.messages.record_message import RecordMessage
+from src.utils.gpx import (
+    GPXBounds,
+    GPXData,
+    GPXPoint,
+    GPXTotalStats,
+    compute_track_stats,
+    parse_gpx_data,
+)
+from src.utils.track_sidecar import (
+    HEADER,
+    SIDECAR_VERSION,
+    TrackSidecarError,
+    build_fit_course_from_sidecar,
+    build_track_sidecar,
+    compute_track_stats_and_sidecar,
+    decode_track_columns,
+    decode_track_sidecar,
+    encode_track_sidecar,
+    read_track_sidecar,
+    sidecar_path,
+)
+
+GPX_FILE_PATH = Path(__file__).parent.parent / "data" / "file.gpx"
+
+
+def make_gpx_data(times: list[str], elevations: list[float] | None = None) -> GPXData:
+    """Build a small track with the given point times."""
+    elevations = elevations or [100.0 + i for i in range(len(times))]
+    return GPXData(
+        file_id="track",
+        track_name="Côte <raide>",
+        points=[
+            GPXPoint(
+                latitude=45.0 + i * 0.0001,
+                longitude=-5.0 - i * 0.0001,
+                elevation=elevation,
+                time=time,
+            )
+            for i, (time, elevation) in enumerate(zip(times, elevations, strict=True))
+        ],
+        total_stats=GPXTotalStats(
+            total_points=len(times),
+            total_distance=1.5,
+            total_elevation_gain=10.0,
+            total_elevation_loss=5.0,
+        ),
+        bounds=GPXBounds(
+            north=45.1,
+            south=45.0,
+            east=-5.0,
+            west=-5.1,
+            min_elevation=min(elevations),
+            max_elevation=max(elevations),
+        ),
+    )
+
+
+def test_sidecar_path():
+    """Test that the sidecar is stored next to the GPX file."""
+    assert sidecar_path("local:///gpx-segments/abc.gpx") == (
+        "local:///gpx-segments/abc.trk"
+    )
+    assert sidecar_path("gpx-segments/abc.lod10.gpx") == "gpx-segments/abc.lod10.trk"
+
+
+def test_sidecar_round_trip_matches_parsed_gpx():
+    """Test that the decoded sidecar matches the parsed GPX file."""
+    expected = parse_gpx_data(GPX_FILE_PATH, "file")
+
+    sidecar = build_track_sidecar(GPX_FILE_PATH)
+    decoded = decode_track_sidecar(sidecar, "file")
+
+    assert len(sidecar) < len(GPX_FILE_PATH.read_bytes()) / 10
+    assert decoded.file_id == "file"
+    assert decoded.track_name == expected.track_name
+    assert decoded.total_stats == expected.total_stats
+    assert decoded.bounds == expected.bounds
+    assert len(decoded.points) == len(expected.points)
+    for point, expected_point in zip(decoded.points, expected.points, strict=True):
+        assert point.latitude == pytest.approx(expected_point.latitude, abs=1e-7)
+        assert point.longitude == pytest.approx(expected_point.longitude, abs=1e-7)
+        assert point.elevation == pytest.approx(expected_point.elevation, abs=0.005)
+        assert point.time == expected_point.time
+
+
+def test_sidecar_layout_is_aligned():
+    """Test that the columns start at aligned offsets after the header."""
+    gpx_data = make_gpx_data(["2024-05-01T08:00:00+02:00"] * 3)
+    sidecar = encode_track_sidecar(gpx_data)
+
+    name_length = len(gpx_data.track_name.encode("utf-8"))
+    columns_offset = HEADER.size + (name_length + 7) // 8 * 8
+    assert HEADER.size % 8 == 0
+    assert len(sidecar) == columns_offset + 4 * 4 * 3
+    assert struct.unpack_from("<3i", sidecar, columns_offset) == (450000000, 1000, 1000)
+
+
+@pytest.mark.parametrize(
+    "times",
+    [
+        # Time zone aware, whole seconds
+        ["2024-05-01T08:00:00+02:00", "2024-05-01T09:30:00+02:00"],
+        # Naive timestamps with milliseconds and a long pause
+        ["2024-05-01T08:00:00.250000", "2024-05-20T08:00:01.500000"],
+        # Microseconds, e.g. the routes built from the route planner
+        ["2024-05-01T08:00:00.123456+00:00", "2024-05-01T08:00:10.123456+00:00"],
+    ],
+)
+def test_sidecar_round_trip_times(times):
+    """Test that timestamps are restored with their time zone and precision."""
+    decoded = decode_track_sidecar(encode_track_sidecar(make_gpx_data(times)), "id")
+
+    assert [point.time for point in decoded.points] == times
+    assert decoded.track_name == "Côte <raide>"
+    assert [point.elevation for point in decoded.points] == [100.0, 101.0]
+
+
+def test_sidecar_rejects_unsupported_tracks():
+    """Test that tracks the format cannot represent are rejected."""
+    with pytest.raises(TrackSidecarError, match="different UTC offsets"):
+        encode_track_sidecar(
+            make_gpx_data(["2024-05-01T08:00:00+02:00", "2024-05-01T08:00:00+00:00"])
+        )
+    # Gap of more than 35 minutes between microsecond timestamps
+    with pytest.raises(TrackSidecarError, match="times do not fit"):
+        encode_track_sidecar(
+            make_gpx_data(["2024-05-01T08:00:00.000001", "2024-05-01T09:00:00"])
+        )
+
+
+def test_decode_sidecar_rejects_invalid_content():
+    """Test that invalid and future versions of the format are rejected."""
+    sidecar = bytearray(encode_track_sidecar(make_gpx_data(["2024-05-01T08:00:00"])))
+
+    with pytest.raises(TrackSidecarError, match="truncated"):
+        decode_track_columns(bytes(sidecar[:10]))
+    with pytest.raises(TrackSidecarError, match="size does not match"):
+        decode_track_columns(bytes(sidecar[:-4]))
+    with pytest.raises(TrackSidecarError, match="Not a track sidecar"):
+        decode_track_columns(b"<gpx" + bytes(sidecar[4:]))
+
+    struct.pack_into("<H", sidecar, 4, SIDECAR_VERSION + 1)
+    with pytest.raises(TrackSidecarError, match="Unsupported track sidecar version"):
+        decode_track_columns(bytes(sidecar))
+
+
+def test_read_track_sidecar_memory_maps_file(tmp_path):
+    """Test that a sidecar file is read through a memory map."""
+    sidecar_file = tmp_path / "file.trk"
+    sidecar_file.write_bytes(build_track_sidecar(GPX_FILE_PATH))
+
+    decoded = read_track_sidecar(sidecar_file, "file")
+
+    assert decoded == decode_track_sidecar(sidecar_file.read_bytes(), "file")
+
+    sidecar_file.write_bytes(b"")
+    with pytest.raises(TrackSidecarError, match="truncated"):
+        read_track_sidecar(sidecar_file, "file")
+
+
+def test_compute_track_stats_and_sidecar():
+    """Test that the statistics and the sidecar are built from a single parse."""
+    stats, sidecar = compute_track_stats_and_sidecar(GPX_FILE_PATH)
+
+    assert stats == compute_track_stats(GPX_FILE_PATH)
+    assert sidecar == build_track_sidecar(GPX_FILE_PATH)
+
+
+def test_compute_track_stats_without_sidecar():
+    """Test that tracks without elevation or time have statistics only."""
+    content = (
+        b'<gpx><trk><trkseg><trkpt lat="45.0" lon="5.0"><ele>10</ele></trkpt>'
+        b'<trkpt lat="45.001" lon="5.0"><ele>12</ele></trkpt></trkseg></trk></gpx>'
+    )
+
+    stats, sidecar = compute_track_stats_and_sidecar(content)
+
+    assert stats.total_points == 2
+    assert stats.total_elevation_gain == 2.0
+    assert sidecar is None
+
+
+def test_build_fit_course_from_sidecar():
+    """Test that a FIT course is built from the sidecar of a GPX file."""
+    sidecar = build_track_sidecar(GPX_FILE_PATH)
+
+    fit_course = build_fit_course_from_sidecar(sidecar, "42", "Sidecar Course")
+
+    records = [
+        record.message
+        for record in FitFile.from_bytes(fit_course.fit_bytes).records
+        if isinstance(record.message, RecordMessage)
+    ]
+    assert fit_course.gpx_data == decode_track_sidecar(sidecar, "42")
+    assert fit_course.time is None
+    assert len(records) == len(fit_course.gpx_data.points)
+    assert records[0].position_lat == pytest.approx(
+        fit_course.gpx_data.points[0].latitude, abs=1e-6
+    )
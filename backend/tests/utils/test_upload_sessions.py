@@ -0,0 +1,142 @@
+"""Tests for the upload sessions of the segment editor."""
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+from src.utils.gpx import generate_gpx_segment, parse_gpx_data, write_gpx_segment
+from src.utils.track_sidecar import encode_track_sidecar
+from src.utils.upload_sessions import (
+    UploadSessionStore,
+    parse_upload_session,
+    read_upload_session,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+MULTI_SEGMENT_GPX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1">
+ <trk>
+  <name>Two segments</name>
+  <trkseg>
+   <trkpt lat="45.0" lon="4.0"><ele>100</ele><time>2024-05-01T10:00:00Z</time></trkpt>
+   <trkpt lat="45.01" lon="4.0"><ele>110</ele><time>2024-05-01T10:00:10Z</time></trkpt>
+   <trkpt lat="45.02" lon="4.0"><ele>105</ele><time>2024-05-01T10:00:20Z</time></trkpt>
+  </trkseg>
+  <trkseg>
+   <trkpt lat="46.0" lon="5.0"><ele>90</ele><time>2024-05-01T11:00:00Z</time></trkpt>
+  </trkseg>
+ </trk>
+</gpx>
+"""
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize(
+    "start_index, end_index",
+    [(0, 6950), (10, 50), (6900, 10000), (-5, 3), (100, 99), (0, -1)],
+)
+def test_slice_segment_matches_generate_gpx_segment(tmp_path, start_index, end_index):
+    """Test that segments sliced from a session are the ones read from the file."""
+    gpx_file = DATA_DIR / "file.gpx"
+    _, session = parse_upload_session(gpx_file.read_bytes(), "id")
+
+    _, expected_path, expected_bounds = generate_gpx_segment(
+        gpx_file, start_index, end_index, "Segment", tmp_path / "expected"
+    )
+    _, path, bounds = write_gpx_segment(
+        session.slice_segment(start_index, end_index), "Segment", tmp_path / "sliced"
+    )
+
+    assert path.read_text() == expected_path.read_text()
+    assert bounds == expected_bounds
+
+
+def test_session_of_multi_segment_track(tmp_path):
+    """Test that the editor gets every point and segments use the first one."""
+    gpx_data, session = parse_upload_session(MULTI_SEGMENT_GPX, "id")
+
+    assert gpx_data == parse_gpx_data(MULTI_SEGMENT_GPX, "id")
+    assert len(session.track) == len(session.point_index) == 4
+    assert (session.segment_start, session.segment_end) == (0, 3)
+    assert len(session.slice_segment(1, 10)) == 2
+    assert session.point_index.nearest(46.0, 5.0)[0].index == 3
+
+
+def test_read_upload_session(tmp_path):
+    """Test that uploaded files and staged sidecars give the same session."""
+    gpx_file = DATA_DIR / "file.gpx"
+    gpx_data, session = parse_upload_session(gpx_file.read_bytes(), "id")
+    sidecar_file = tmp_path / "id.trk"
+    sidecar_file.write_bytes(encode_track_sidecar(gpx_data))
+
+    for other_session in [
+        read_upload_session(gpx_file, "id"),
+        read_upload_session(sidecar_file, "id"),
+        pickle.loads(pickle.dumps(session)),
+    ]:
+        assert other_session.file_id == "id"
+        np.testing.assert_allclose(
+            other_session.track.latitudes, session.track.latitudes
+        )
+        np.testing.assert_allclose(
+            other_session.track.elevations, session.track.elevations
+        )
+        assert other_session.track.times.tolist() == session.track.times.tolist()
+        assert other_session.point_index.query(45.0, 5.0, 3).tolist() == (
+            session.point_index.query(45.0, 5.0, 3).tolist()
+        )
+
+
+def test_store_expires_uploads(tmp_path):
+    """Test that unused uploads expire with their files."""
+    clock = FakeClock()
+    store = UploadSessionStore(tmp_path, ttl=100, max_points=100, clock=clock)
+    _, session = parse_upload_session(MULTI_SEGMENT_GPX, "first")
+    for name in ["first.gpx", "second.trk", "other.gpx"]:
+        (tmp_path / name).write_bytes(b"")
+
+    store.put(session)
+    clock.now = 50
+    store.register("second")
+    clock.now = 90
+    # Using a session pushes back its deadline
+    assert store.get("first") is session
+    clock.now = 160
+
+    assert store.expire() == ["second"]
+    assert "second" not in store
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "first.gpx",
+        "other.gpx",
+    ]
+
+    clock.now = 190
+    assert store.get("first") is None
+    assert len(store) == 0
+    assert [path.name for path in tmp_path.iterdir()] == ["other.gpx"]
+
+
+def test_store_evicts_sessions(tmp_path):
+    """Test that sessions over the maximum number of points are evicted."""
+    store = UploadSessionStore(tmp_path, ttl=100, max_points=10, clock=FakeClock())
+    for file_id in ["first", "second", "third"]:
+        store.put(parse_upload_session(MULTI_SEGMENT_GPX, file_id)[1])
+
+    assert store.get("first") is None
+    assert store.get("third") is not None
+    # Evicted uploads are still registered, their session is rebuilt from file
+    assert len(store) == 3
+    assert store.stats.entries == 2
+    assert store.stats.size == 10
+    assert store.stats.evictions == 1
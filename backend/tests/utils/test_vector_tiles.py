@@ -0,0 +1,233 @@
+"""Tests for the vector tile utilities."""
+
+import struct
+
+import pytest
+from src.utils.vector_tiles import (
+    TILE_EXTENT,
+    TileCache,
+    TileFeature,
+    encode_tile,
+    project_to_tile,
+    tile_bounds,
+    tile_range,
+)
+
+
+def read_varint(data, position):
+    """Read a protobuf varint, returning the value and the next position."""
+    value, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+def read_message(data):
+    """Decode a protobuf message into a list of (field number, value) pairs."""
+    fields, position = [], 0
+    while position < len(data):
+        key, position = read_varint(data, position)
+        number, wire_type = key >> 3, key & 0x07
+        if wire_type == 0:
+            value, position = read_varint(data, position)
+        elif wire_type == 1:
+            value = struct.unpack("<d", data[position : position + 8])[0]
+            position += 8
+        elif wire_type == 2:
+            length, position = read_varint(data, position)
+            value = data[position : position + length]
+            position += length
+        else:
+            raise AssertionError(f"Unexpected wire type {wire_type}")
+        fields.append((number, value))
+    return fields
+
+
+def read_packed(data):
+    """Decode a packed repeated varint field."""
+    values, position = [], 0
+    while position < len(data):
+        value, position = read_varint(data, position)
+        values.append(value)
+    return values
+
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_geometry(commands):
+    """Decode MVT line geometry commands into lists of absolute coordinates."""
+    lines, cursor, position = [], (0, 0), 0
+    while position < len(commands):
+        command, count = commands[position] & 0x7, commands[position] >> 3
+        position += 1
+        if command == 1:
+            lines.append([])
+        for _ in range(count):
+            cursor = (
+                cursor[0] + unzigzag(commands[position]),
+                cursor[1] + unzigzag(commands[position + 1]),
+            )
+            position += 2
+            lines[-1].append(cursor)
+    return lines
+
+
+def decode_tile(data):
+    """Decode a tile into {layer name: (extent, [(id, properties, lines)])}."""
+    layers = {}
+    for number, layer_data in read_message(data):
+        assert number == 3
+        layer_fields = read_message(layer_data)
+        name = next(value for number, value in layer_fields if number == 1).decode()
+        keys = [value.decode() for number, value in layer_fields if number == 3]
+        values = []
+        for number, value_data in layer_fields:
+            if number == 4:
+                ((value_type, value),) = read_message(value_data)
+                values.append(value.decode() if value_type == 1 else value)
+        extent = next(value for number, value in layer_fields if number == 5)
+        version = next(value for number, value in layer_fields if number == 15)
+        assert version == 2
+
+        features = []
+        for number, feature_data in layer_fields:
+            if number != 2:
+                continue
+            feature = dict(read_message(feature_data))
+            assert feature[3] == 2  # LineString
+            tags = read_packed(feature[2])
+            properties = {
+                keys[tags[index]]: values[tags[index + 1]]
+                for index in range(0, len(tags), 2)
+            }
+            features.append(
+                (feature[1], properties, decode_geometry(read_packed(feature[4])))
+            )
+        layers[name] = (extent, features)
+    return layers
+
+
+def test_tile_bounds():
+    """Test the bounds of the world tile and of its children."""
+    north, south, east, west = tile_bounds(0, 0, 0)
+    assert north == pytest.approx(85.0511287798)
+    assert south == pytest.approx(-85.0511287798)
+    assert (east, west) == (180.0, -180.0)
+
+    north, south, east, west = tile_bounds(1, 1, 0)
+    assert south == pytest.approx(0.0)
+    assert (east, west) == (180.0, 0.0)
+
+
+def test_tile_range_covers_bounds():
+    """Test that the tile range holds the tiles of the corners of the bounds."""
+    z, x, y = 12, 2093, 1459
+    north, south, east, west = tile_bounds(z, x, y)
+    center_latitude, center_longitude = (north + south) / 2, (east + west) / 2
+
+    assert tile_range(
+        z,
+        center_latitude + 1e-4,
+        center_latitude,
+        center_longitude + 1e-4,
+        center_longitude,
+    ) == (x, x, y, y)
+    # The buffer of the neighbor tiles overlaps bounds close to the tile border
+    assert tile_range(z, north - 1e-6, north - 2e-6, east - 1e-6, east - 2e-6) == (
+        x,
+        x + 1,
+        y - 1,
+        y,
+    )
+
+
+def test_project_to_tile_clips_outside_segments():
+    """Test that the parts of a track outside of the buffered tile are dropped."""
+    z, x, y = 10, 523, 364
+    north, south, east, west = tile_bounds(z, x, y)
+    latitude = (north + south) / 2
+    inside = [(latitude, west + (east - west) * ratio) for ratio in (0.25, 0.5)]
+    far_away = [(latitude, east + 10 * (east - west))]
+
+    lines = project_to_tile(inside + far_away + far_away + inside, z, x, y)
+
+    # Segments crossing the tile are kept, the one between the far points is not
+    assert len(lines) == 2
+    assert [point[0] for point in lines[0]] == [
+        TILE_EXTENT // 4,
+        TILE_EXTENT // 2,
+        11 * TILE_EXTENT,
+    ]
+    assert [point[0] for point in lines[1]] == [
+        11 * TILE_EXTENT,
+        TILE_EXTENT // 4,
+        TILE_EXTENT // 2,
+    ]
+    assert project_to_tile(far_away + far_away, z, x, y) == []
+
+
+def test_encode_tile_round_trip():
+    """Test that the encoded tile follows the MVT specification."""
+    features = [
+        TileFeature(
+            id=1,
+            lines=[[(10, 20), (30, 40), (25, 5)], [(-10, 4100), (0, 0)]],
+            properties={"name": "Col", "difficulty_level": 3, "flag": True},
+        ),
+        TileFeature(
+            id=2,
+            lines=[[(0, 0), (4096, 4096)]],
+            properties={"name": "Col", "difficulty_level": 1, "ratio": 0.5},
+        ),
+        TileFeature(id=3, lines=[], properties={"name": "Empty"}),
+    ]
+
+    layers = decode_tile(encode_tile({"segments": features, "routes": []}))
+
+    assert set(layers) == {"segments"}
+    extent, decoded = layers["segments"]
+    assert extent == TILE_EXTENT
+    assert decoded == [
+        (
+            1,
+            {"name": "Col", "difficulty_level": 3, "flag": 1},
+            [[(10, 20), (30, 40), (25, 5)], [(-10, 4100), (0, 0)]],
+        ),
+        (
+            2,
+            {"name": "Col", "difficulty_level": 1, "ratio": 0.5},
+            [[(0, 0), (4096, 4096)]],
+        ),
+    ]
+    assert encode_tile({"segments": []}) == b""
+
+
+def test_tile_cache(tmp_path):
+    """Test the cache storage and the invalidation by bounds."""
+    cache = TileCache(tmp_path / "tiles")
+    z, x, y = 12, 2093, 1459
+    north, south, east, west = tile_bounds(z, x, y)
+    cache.put(z, x, y, b"tile")
+    cache.put(z, x + 10, y, b"other")
+    cache.put(0, 0, 0, b"world")
+
+    assert cache.get(z, x, y) == b"tile"
+    assert cache.get(z, x, y + 1) is None
+
+    removed = cache.invalidate(north - 1e-3, south + 1e-3, east - 1e-3, west + 1e-3)
+
+    assert removed == 2
+    assert cache.generation == 1
+    assert cache.get(z, x, y) is None
+    assert cache.get(0, 0, 0) is None
+    assert cache.get(z, x + 10, y) == b"other"
+
+    cache.clear()
+    assert cache.generation == 2
+    assert cache.get(z, x + 10, y) is None
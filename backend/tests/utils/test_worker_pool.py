@@ -0,0 +1,70 @@
+"""Tests for the worker pool of the CPU-bound track processing."""
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from src.utils.gpx import parse_gpx_data
+from src.utils.worker_pool import WorkerPool, WorkerPoolFullError
+
+GPX_FILE_PATH = Path(__file__).parent.parent / "data" / "file.gpx"
+
+
+@pytest.mark.parametrize(
+    "max_workers, max_pending", [(-1, 1), (1, 0)], ids=["workers", "pending"]
+)
+def test_invalid_parameters(max_workers, max_pending):
+    """Test that negative workers or no pending task are rejected."""
+    with pytest.raises(ValueError):
+        WorkerPool(max_workers=max_workers, max_pending=max_pending)
+
+
+def test_inline_pool_runs_in_process():
+    """Test that a pool without worker runs the functions inline."""
+    pool = WorkerPool(max_workers=0, max_pending=1)
+
+    result = asyncio.run(pool.run(parse_gpx_data, GPX_FILE_PATH, file_id="file"))
+
+    assert result.file_id == "file"
+    assert pool.pending == 0
+
+
+def test_worker_processes_return_results_and_errors():
+    """Test that results and exceptions are sent back from the workers."""
+    pool = WorkerPool(max_workers=1, max_pending=4)
+
+    async def run():
+        content = GPX_FILE_PATH.read_bytes()
+        parsed = await pool.run(parse_gpx_data, content, "file")
+        with pytest.raises(ValueError):
+            await pool.run(int, "not a number")
+        return parsed
+
+    try:
+        parsed = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert parsed == parse_gpx_data(GPX_FILE_PATH, "file")
+    assert pool.pending == 0
+
+
+def test_full_pool_rejects_tasks():
+    """Test that tasks beyond the pending limit are rejected immediately."""
+    pool = WorkerPool(max_workers=1, max_pending=1)
+
+    async def run():
+        slow_task = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+        await asyncio.sleep(0)
+        assert pool.pending == 1
+        with pytest.raises(WorkerPoolFullError):
+            await pool.run(time.sleep, 0)
+        await slow_task
+        # The slot is released once the task completed
+        await pool.run(time.sleep, 0)
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
@@ -136,6 +136,7 @@ global.EventSource = vi.fn(() => ({
   onerror: null,
   readyState: 1,
   url: '/api/segments/search',
+  addEventListener: vi.fn(),
   close: vi.fn()
 })) as any
 
@@ -642,6 +643,18 @@ describe('Explorer', () => {
       expect(Array.isArray(wrapper.vm.segments)).toBe(true)
       expect(wrapper.vm.segments).toHaveLength(0)
     })
+
+    it('should remove the tracks that left the result set', () => {
+      wrapper = mountWithRouter(Explorer)
+
+      wrapper.vm.segments = [
+        { id: 1, name: 'Kept' },
+        { id: 2, name: 'Removed' }
+      ]
+      wrapper.vm.removeTracks([2, 3])
+
+      expect(wrapper.vm.segments.map((segment: any) => segment.id)).toEqual([1])
+    })
   })
 
   describe('GPX Data Processing', () => {
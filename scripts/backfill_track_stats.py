@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Backfill Script for Track Statistics
+
+This script computes and stores the statistics (distance, elevation gain and
+loss, number of points, elevation range) and the simplified polylines of the
+tracks written before they were stored with each track. The GPX file of every
+track without a distance or without polylines is loaded from storage and the
+missing data are saved in the database.
+
+Tracks are processed by batches ordered by ID, so that the script can be
+interrupted and run again: tracks already backfilled are skipped.
+
+Usage:
+    pixi run backfill-track-stats
+    pixi run python scripts/backfill_track_stats.py --batch-size 200
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add the backend src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent / "backend" / "src"))
+
+from models.base import Base
+from models.track import Track
+from utils.config import load_environment_config
+from utils.gpx import compute_track_stats
+from utils.postgres import add_missing_columns, get_database_url
+from utils.simplify import encode_gpx_polylines
+from utils.storage import get_storage_manager
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+async def backfill_track_stats(batch_size: int = 100) -> tuple[int, int]:
+    """Compute and store the statistics and polylines of the tracks missing them.
+
+    Parameters
+    ----------
+    batch_size : int
+        Number of tracks loaded and committed at once.
+
+    Returns
+    -------
+    tuple[int, int]
+        Number of updated tracks and number of tracks that could not be
+        processed (missing or invalid GPX file).
+    """
+    db_config, storage_config, *_ = load_environment_config()
+    storage_manager = get_storage_manager(storage_config)
+
+    database_url = get_database_url(
+        host=db_config.host,
+        port=db_config.port,
+        database=db_config.name,
+        username=db_config.user,
+        password=db_config.password,
+    )
+    engine = create_async_engine(database_url, echo=False, future=True)
+    SessionLocal = async_sessionmaker(
+        engine, expire_on_commit=False, class_=AsyncSession
+    )
+
+    updated, failed = 0, 0
+    try:
+        # Add the statistics columns to a database created before them
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(add_missing_columns, Base.metadata)
+
+        last_id = 0
+        while True:
+            async with SessionLocal() as session:
+                result = await session.execute(
+                    select(Track)
+                    .filter(
+                        or_(
+                            Track.total_distance.is_(None),
+                            Track.simplified_polylines.is_(None),
+                        ),
+                        Track.id > last_id,
+                    )
+                    .order_by(Track.id)
+                    .limit(batch_size)
+                )
+                tracks = result.scalars().all()
+                if not tracks:
+                    break
+
+                for track in tracks:
+                    last_id = track.id
+                    try:
+                        gpx_bytes = await storage_manager.aload_gpx_data(
+                            track.file_path
+                        )
+                        if gpx_bytes is None:
+                            raise FileNotFoundError(track.file_path)
+                        if track.total_distance is None:
+                            stats = await asyncio.to_thread(
+                                compute_track_stats, gpx_bytes
+                            )
+                            for field, value in stats._asdict().items():
+                                setattr(track, field, value)
+                        if track.simplified_polylines is None:
+                            track.simplified_polylines = await asyncio.to_thread(
+                                encode_gpx_polylines, gpx_bytes
+                            )
+                    except Exception as e:
+                        logger.warning(f"Skipping track {track.id}: {str(e)}")
+                        failed += 1
+                        continue
+
+                    updated += 1
+
+                await session.commit()
+                logger.info(f"Backfilled tracks up to track {last_id}")
+    finally:
+        storage_manager.close()
+        await engine.dispose()
+
+    return updated, failed
+
+
+async def main():
+    """Main function to run the track statistics backfill."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Number of tracks processed per database transaction",
+    )
+    args = parser.parse_args()
+
+    logger.info("Starting track statistics backfill")
+    try:
+        updated, failed = await backfill_track_stats(batch_size=args.batch_size)
+        logger.info(
+            f"Track statistics backfill completed: {updated} tracks updated, "
+            f"{failed} tracks skipped"
+        )
+    except Exception as e:
+        logger.error(f"Track statistics backfill failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
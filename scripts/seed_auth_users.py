@@ -4,6 +4,7 @@ Database Seeding Script for Authorized Strava Users
 
 This script seeds the database with authorized Strava users who have access
 to the editor feature. The authorized users are defined in a configuration file.
+The running servers are notified to reload the authorized users.
 
 Usage:
     pixi run python scripts/seed_auth_users.py
@@ -18,8 +19,9 @@ from pathlib import Path
 # Add the backend src directory to the Python path
 sys.path.append(str(Path(__file__).parent.parent / "backend" / "src"))
 
-from models.auth_user import AuthUser
+from models.auth_user import AUTH_USERS_CHANNEL, AuthUser
 from models.base import Base
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from utils.config import load_environment_config
 from utils.postgres import get_database_url
@@ -104,8 +106,6 @@ async def seed_authorized_users():
             for user_data in auth_users_to_add:
                 try:
                     # Check if user already exists
-                    from sqlalchemy import select
-
                     existing_user = await session.execute(
                         select(AuthUser).where(
                             AuthUser.strava_id == user_data["strava_id"]
@@ -129,6 +129,10 @@ async def seed_authorized_users():
                     logger.error(f"Failed to add user {user_data}: {e}")
                     continue
 
+            # Let the running servers reload the authorized users, the
+            # notification is delivered when the transaction is committed
+            await session.execute(select(func.pg_notify(AUTH_USERS_CHANNEL, "")))
+
             # Commit all changes
             await session.commit()
             logger.info(